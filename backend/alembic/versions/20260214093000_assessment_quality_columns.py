@@ -0,0 +1,47 @@
+"""Assessment quality columns and backfill index
+
+Revision ID: 20260214093000
+Revises: 20251120224805
+Create Date: 2026-02-14 09:30:00
+
+Adds the quality metric columns written by EPAssessmentServiceEnhanced and a
+partial index over rows still missing metrics, so the keyset backfill scan
+only touches pending rows.
+"""
+from alembic import op
+
+revision = '20260214093000'
+down_revision = '20251120224805'
+branch_labels = None
+depends_on = None
+
+
+QUALITY_COLUMNS = [
+    ('confidence_score', 'DOUBLE PRECISION'),
+    ('answer_pattern_signature', 'VARCHAR(50)'),
+    ('completion_percentage', 'DOUBLE PRECISION'),
+    ('time_to_complete_seconds', 'INTEGER'),
+    ('clinical_notes', 'TEXT'),
+]
+
+
+def upgrade():
+    """Add quality columns (if missing) and the pending-backfill index"""
+    for col_name, col_type in QUALITY_COLUMNS:
+        op.execute(
+            f"ALTER TABLE user_assessments ADD COLUMN IF NOT EXISTS {col_name} {col_type}"
+        )
+
+    # Built concurrently so the migration can run against a live table
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_assessments_quality_pending
+            ON user_assessments (id)
+            WHERE confidence_score IS NULL
+        """)
+
+
+def downgrade():
+    """Drop the backfill index (quality columns are kept; they hold data)"""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_assessments_quality_pending")
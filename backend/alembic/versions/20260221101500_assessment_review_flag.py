@@ -0,0 +1,50 @@
+"""Assessment review flag column and quality statistics index
+
+Revision ID: 20260221101500
+Revises: 20260214093000
+Create Date: 2026-02-21 10:15:00
+
+Replaces the "FLAGGED" substring search on clinical_notes with a boolean
+flagged_for_review column, and adds a covering index so the grouped
+quality statistics query is an index-only scan over the date window.
+"""
+from alembic import op
+
+revision = '20260221101500'
+down_revision = '20260214093000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add flagged_for_review, seed it from clinical_notes, index it"""
+    op.execute("""
+        ALTER TABLE user_assessments
+        ADD COLUMN IF NOT EXISTS flagged_for_review BOOLEAN NOT NULL DEFAULT false
+    """)
+    op.execute("""
+        UPDATE user_assessments
+        SET flagged_for_review = true
+        WHERE clinical_notes LIKE '%FLAGGED%'
+            AND NOT flagged_for_review
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_assessments_quality_stats
+            ON user_assessments (completed_at)
+            INCLUDE (answer_pattern_signature, confidence_score, flagged_for_review)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_assessments_flagged
+            ON user_assessments (completed_at)
+            WHERE flagged_for_review
+        """)
+
+
+def downgrade():
+    """Drop the indexes and the flag column"""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_assessments_flagged")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_assessments_quality_stats")
+    op.execute("ALTER TABLE user_assessments DROP COLUMN IF EXISTS flagged_for_review")
@@ -0,0 +1,76 @@
+"""Daily assessment quality rollup table
+
+Revision ID: 20260228110000
+Revises: 20260221101500
+Create Date: 2026-02-28 11:00:00
+
+One row per day of assessment counts, confidence sums, pattern histogram
+and flag/review counts, maintained by the assessment service in the same
+transaction as each write. Seeded here from user_assessments; repair with
+scripts/rebuild_quality_rollups.py.
+"""
+from alembic import op
+
+revision = '20260228110000'
+down_revision = '20260221101500'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create and seed assessment_quality_daily"""
+    op.execute("ALTER TABLE user_assessments ADD COLUMN IF NOT EXISTS reviewed_at TIMESTAMP")
+    op.execute("ALTER TABLE user_assessments ADD COLUMN IF NOT EXISTS reviewed_by UUID")
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS assessment_quality_daily (
+            day DATE PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            scored INTEGER NOT NULL DEFAULT 0,
+            confidence_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            missing INTEGER NOT NULL DEFAULT 0,
+            flagged INTEGER NOT NULL DEFAULT 0,
+            reviewed INTEGER NOT NULL DEFAULT 0,
+            pattern_counts JSONB NOT NULL DEFAULT '{}'::jsonb
+        )
+    """)
+
+    op.execute("""
+        INSERT INTO assessment_quality_daily
+            (day, total, scored, confidence_sum, missing, flagged, reviewed, pattern_counts)
+        SELECT
+            day,
+            SUM(total),
+            SUM(scored),
+            SUM(confidence_sum),
+            SUM(missing),
+            SUM(flagged),
+            SUM(reviewed),
+            COALESCE(
+                jsonb_object_agg(pattern, total) FILTER (WHERE pattern IS NOT NULL),
+                '{}'::jsonb
+            )
+        FROM (
+            SELECT
+                CAST(completed_at AS date) AS day,
+                answer_pattern_signature AS pattern,
+                COUNT(*) AS total,
+                COUNT(confidence_score) AS scored,
+                COALESCE(SUM(confidence_score), 0) AS confidence_sum,
+                COUNT(*) FILTER (
+                    WHERE confidence_score IS NULL OR answer_pattern_signature IS NULL
+                ) AS missing,
+                COUNT(*) FILTER (WHERE flagged_for_review) AS flagged,
+                COUNT(reviewed_at) AS reviewed
+            FROM user_assessments
+            WHERE completed_at IS NOT NULL
+            GROUP BY 1, 2
+        ) AS per_pattern
+        GROUP BY day
+        ON CONFLICT (day) DO NOTHING
+    """)
+
+
+def downgrade():
+    """Drop the rollup table"""
+    op.execute("DROP TABLE IF EXISTS assessment_quality_daily")
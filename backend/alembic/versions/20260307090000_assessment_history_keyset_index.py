@@ -0,0 +1,35 @@
+"""Keyset indexes for assessment history
+
+Revision ID: 20260307090000
+Revises: 20260228110000
+Create Date: 2026-03-07 09:00:00
+
+History pages and exports walk (completed_at, id) newest first; these
+composite indexes make every page a bounded index range scan.
+"""
+from alembic import op
+
+revision = '20260307090000'
+down_revision = '20260228110000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the per-user and global (completed_at, id) indexes"""
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_assessments_user_history
+            ON user_assessments (user_id, completed_at DESC, id DESC)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_assessments_history
+            ON user_assessments (completed_at DESC, id DESC)
+        """)
+
+
+def downgrade():
+    """Drop the keyset indexes"""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_assessments_history")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_assessments_user_history")
@@ -0,0 +1,41 @@
+"""Per-user assessment trend aggregates
+
+Revision ID: 20260314100000
+Revises: 20260307090000
+Create Date: 2026-03-14 10:00:00
+
+Running count, first/latest and sums of physical/emotional percentages
+plus an EWMA per user, updated on every submission. Seed or repair with
+scripts/rebuild_trend_aggregates.py (the EWMA needs ordered folding).
+"""
+from alembic import op
+
+revision = '20260314100000'
+down_revision = '20260307090000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create assessment_trend_aggregates"""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS assessment_trend_aggregates (
+            user_id UUID PRIMARY KEY,
+            assessment_count INTEGER NOT NULL,
+            first_assessment_at TIMESTAMP NOT NULL,
+            first_physical INTEGER NOT NULL,
+            first_emotional INTEGER NOT NULL,
+            latest_assessment_at TIMESTAMP NOT NULL,
+            latest_physical INTEGER NOT NULL,
+            latest_emotional INTEGER NOT NULL,
+            physical_sum BIGINT NOT NULL,
+            emotional_sum BIGINT NOT NULL,
+            ewma_physical DOUBLE PRECISION NOT NULL,
+            ewma_emotional DOUBLE PRECISION NOT NULL
+        )
+    """)
+
+
+def downgrade():
+    """Drop assessment_trend_aggregates"""
+    op.execute("DROP TABLE IF EXISTS assessment_trend_aggregates")
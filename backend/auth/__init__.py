@@ -1 +1,20 @@
-﻿
+﻿"""Authentication & authorization"""
+from .dependencies import (
+    create_access_token,
+    verify_token,
+    revoke_token,
+    revoke_user_tokens,
+    get_current_user,
+    require_role,
+    token_cache
+)
+
+__all__ = [
+    'create_access_token',
+    'verify_token',
+    'revoke_token',
+    'revoke_user_tokens',
+    'get_current_user',
+    'require_role',
+    'token_cache'
+]
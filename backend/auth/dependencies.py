@@ -5,10 +5,16 @@ JWT token validation and role-based access control
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+from jose import jwt
 from datetime import datetime, timedelta
 import os
 
+from auth.token_cache import (
+    TokenVerificationError,
+    VerifiedTokenCache,
+    create_verifier
+)
+
 
 # Security
 security = HTTPBearer()
@@ -17,6 +23,14 @@ security = HTTPBearer()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Verification backend on cache misses: jose, pyjwt or hs256
+JWT_VERIFIER = os.getenv("JWT_VERIFIER", "jose")
+
+# Verified-token cache shared by every request in this worker
+token_cache = VerifiedTokenCache(
+    create_verifier(JWT_VERIFIER, SECRET_KEY, ALGORITHM),
+    max_token_lifetime_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
 
 
 # ============================================================================
@@ -31,17 +45,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str) -> dict:
-    """Verify JWT token and return payload"""
+    """Verify JWT token and return payload (cached per token until exp)"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+        return token_cache.verify(token)
+    except TokenVerificationError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -49,6 +62,23 @@ def verify_token(token: str) -> dict:
         )
 
 
+def revoke_token(token: str) -> None:
+    """Reject a token from now on (e.g. logout), even if still cached"""
+    expires_at = None
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = exp
+    except Exception:
+        pass
+    token_cache.revoke_token(token, expires_at)
+
+
+def revoke_user_tokens(user_id: str) -> None:
+    """Reject every token issued to a user so far (e.g. password change)"""
+    token_cache.revoke_subject(user_id)
+
+
 # ============================================================================
 # DEPENDENCIES
 # ============================================================================
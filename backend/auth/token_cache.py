@@ -0,0 +1,305 @@
+"""
+Verified JWT Cache
+Bounded cache of verified token payloads, revocation and pluggable verifiers
+"""
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from threading import Lock
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+
+DEFAULT_TOKEN_CACHE_MAXSIZE = int(os.getenv("JWT_CACHE_MAXSIZE", "10000"))
+# Upper bound on how long a verified token is trusted without re-checking
+# (also bounds how long a revocation made in another worker can go unseen)
+DEFAULT_TOKEN_CACHE_MAX_TTL_SECONDS = int(os.getenv("JWT_CACHE_MAX_TTL_SECONDS", "300"))
+# Longest lifetime of an issued token; a user revocation is forgotten after it
+DEFAULT_TOKEN_MAX_LIFETIME_SECONDS = int(os.getenv("JWT_MAX_LIFETIME_SECONDS", "86400"))
+
+
+class TokenVerificationError(Exception):
+    """Raised by verifiers for invalid, expired or revoked tokens."""
+
+
+# ============================================================================
+# VERIFIERS
+# ============================================================================
+
+class TokenVerifier(ABC):
+    """
+    Signature and claims check behind VerifiedTokenCache.
+
+    decode() returns the claims of a valid token and raises
+    TokenVerificationError otherwise (bad signature, wrong algorithm,
+    expired or not yet valid).
+    """
+
+    @abstractmethod
+    def decode(self, token: str) -> Dict:
+        """Claims of a valid token"""
+
+
+class JoseVerifier(TokenVerifier):
+    """python-jose (default)"""
+
+    def __init__(self, secret_key: str, algorithm: str):
+        from jose import JWTError, jwt
+        self._jwt = jwt
+        self._error = JWTError
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+
+    def decode(self, token: str) -> Dict:
+        try:
+            return self._jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except self._error as e:
+            raise TokenVerificationError(str(e)) from e
+
+
+class PyJWTVerifier(TokenVerifier):
+    """PyJWT (pip install pyjwt)"""
+
+    def __init__(self, secret_key: str, algorithm: str):
+        try:
+            import jwt
+        except ImportError as e:
+            raise ImportError("PyJWT is not installed; pip install pyjwt") from e
+        self._jwt = jwt
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+
+    def decode(self, token: str) -> Dict:
+        try:
+            return self._jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except self._jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e)) from e
+
+
+class HS256Verifier(TokenVerifier):
+    """
+    Standard-library HS256 verifier (hmac + base64 + json).
+
+    Only accepts HS256 tokens, checks exp and nbf like python-jose, and
+    rejects tokens carrying an aud claim (no audience is configured).
+    """
+
+    def __init__(self, secret_key: str, algorithm: str = "HS256"):
+        if algorithm != "HS256":
+            raise ValueError(f"HS256Verifier cannot verify {algorithm} tokens")
+        self._key = secret_key.encode("utf-8")
+
+    @staticmethod
+    def _b64decode(segment: str) -> bytes:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+    def decode(self, token: str) -> Dict:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(self._b64decode(header_segment))
+            signature = self._b64decode(signature_segment)
+            payload = json.loads(self._b64decode(payload_segment))
+        except (ValueError, TypeError) as e:
+            raise TokenVerificationError("Malformed token") from e
+
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            raise TokenVerificationError("Unsupported algorithm")
+        expected = hmac.new(
+            self._key,
+            f"{header_segment}.{payload_segment}".encode("ascii"),
+            hashlib.sha256
+        ).digest()
+        if not hmac.compare_digest(signature, expected):
+            raise TokenVerificationError("Signature verification failed")
+        if not isinstance(payload, dict):
+            raise TokenVerificationError("Invalid payload")
+
+        now = time.time()
+        try:
+            if "exp" in payload and now >= int(payload["exp"]):
+                raise TokenVerificationError("Signature has expired")
+            if "nbf" in payload and now < int(payload["nbf"]):
+                raise TokenVerificationError("The token is not yet valid (nbf)")
+        except (TypeError, ValueError) as e:
+            raise TokenVerificationError("Invalid exp/nbf claim") from e
+        if "aud" in payload:
+            raise TokenVerificationError("Invalid audience")
+        return payload
+
+
+VERIFIERS = {
+    "jose": JoseVerifier,
+    "pyjwt": PyJWTVerifier,
+    "hs256": HS256Verifier
+}
+
+
+def create_verifier(name: str, secret_key: str, algorithm: str) -> TokenVerifier:
+    """Build a verifier by name (jose, pyjwt, hs256)."""
+    try:
+        verifier_class = VERIFIERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown JWT verifier {name!r}; choose from {sorted(VERIFIERS)}")
+    return verifier_class(secret_key, algorithm)
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def token_key(token: str) -> str:
+    """Cache key: SHA-256 of the token (raw tokens are never stored)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    Read-through cache of verified token claims keyed by token hash.
+
+    verify() returns cached claims until the earliest of the token's exp
+    and max_ttl_seconds after it was verified, so a repeat token costs a
+    hash and a dict lookup. Misses go to the verifier. The cache is an LRU
+    bounded by maxsize.
+
+    Revocation: revoke_token() rejects one token until it expires;
+    revoke_subject() rejects every token of a user issued before the call
+    (by iat, which has whole-second precision: a token issued in the same
+    second as the revocation is accepted; tokens without iat are rejected)
+    for max_token_lifetime_seconds, after which none of them is valid. An
+    optional revocation_check(claims) -> bool hook (e.g. a shared denylist)
+    runs on every miss, so revocations made elsewhere apply within
+    max_ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        verifier: TokenVerifier,
+        maxsize: int = DEFAULT_TOKEN_CACHE_MAXSIZE,
+        max_ttl_seconds: int = DEFAULT_TOKEN_CACHE_MAX_TTL_SECONDS,
+        revocation_check: Optional[Callable[[Dict], bool]] = None,
+        max_token_lifetime_seconds: int = DEFAULT_TOKEN_MAX_LIFETIME_SECONDS
+    ):
+        self.verifier = verifier
+        self.maxsize = maxsize
+        self.max_ttl_seconds = max_ttl_seconds
+        self.max_token_lifetime_seconds = max_token_lifetime_seconds
+        self.revocation_check = revocation_check
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._revoked_tokens: Dict[str, float] = {}
+        self._revoked_subjects: Dict[str, int] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    def verify(self, token: str) -> Dict:
+        """
+        Claims of a valid, unrevoked token.
+
+        Raises:
+            TokenVerificationError: invalid, expired or revoked token
+        """
+        key = token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+
+        try:
+            claims = self.verifier.decode(token)
+            if self._is_revoked(key, claims):
+                raise TokenVerificationError("Token has been revoked")
+        except TokenVerificationError:
+            with self._lock:
+                self.rejections += 1
+            raise
+
+        expires_at = now + self.max_ttl_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return claims
+
+    def _is_revoked(self, key: str, claims: Dict) -> bool:
+        with self._lock:
+            if key in self._revoked_tokens:
+                return True
+            revoked_at = self._revoked_subjects.get(str(claims.get("sub")))
+        if revoked_at is not None:
+            issued_at = claims.get("iat")
+            if not isinstance(issued_at, (int, float)) or issued_at < revoked_at:
+                return True
+        return bool(self.revocation_check and self.revocation_check(claims))
+
+    def revoke_token(self, token: str, expires_at: Optional[float] = None) -> None:
+        """
+        Reject this token from now on (logout).
+
+        expires_at (epoch seconds, normally the token's exp) bounds how
+        long the revocation is remembered; default max_ttl_seconds.
+        """
+        key = token_key(token)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked_tokens[key] = expires_at or time.time() + self.max_ttl_seconds
+            self._prune_revocations()
+
+    def revoke_subject(self, subject: str) -> None:
+        """Reject every token of this user issued up to now."""
+        subject = str(subject)
+        with self._lock:
+            self._revoked_subjects[subject] = int(time.time())
+            for key in [
+                key for key, (_, claims) in self._entries.items()
+                if str(claims.get("sub")) == subject
+            ]:
+                del self._entries[key]
+            self._prune_revocations()
+
+    def clear(self) -> None:
+        """Drop every cached token (revocations are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "rejections": self.rejections,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "revoked_tokens": len(self._revoked_tokens),
+                "revoked_subjects": len(self._revoked_subjects),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _prune_revocations(self) -> None:
+        now = time.time()
+        for key in [key for key, until in self._revoked_tokens.items() if until <= now]:
+            del self._revoked_tokens[key]
+        # Every token issued before these revocations has expired by now
+        forget_before = now - self.max_token_lifetime_seconds
+        for subject in [
+            subject for subject, revoked_at in self._revoked_subjects.items()
+            if revoked_at <= forget_before
+        ]:
+            del self._revoked_subjects[subject]
@@ -0,0 +1,119 @@
+"""
+E&P Profile Memory Benchmark
+Bytes per profile for dict-backed dataclasses, slotted dataclasses and
+the columnar EPProfileBatch
+
+Usage:
+    python benchmark_profile_memory.py [count]
+"""
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from ep_scoring_engine import EPScoringEngine, EPProfileBatch, EPProfile, TraitScore
+
+
+# Pre-slots layout of TraitScore / EPProfile (per-instance __dict__)
+@dataclass
+class DictTraitScore:
+    trait_name: str
+    physical_score: int
+    emotional_score: int
+    total_questions: int
+    physical_percentage: float
+    emotional_percentage: float
+    dominant_type: str
+
+
+@dataclass
+class DictEPProfile:
+    ep_type: str
+    primary_type: str
+    secondary_type: str
+    trait_scores: Dict[str, DictTraitScore]
+    overall_physical_percentage: float
+    overall_emotional_percentage: float
+    confidence_score: float
+
+
+def _materialize(batch: EPProfileBatch, trait_cls, profile_cls) -> List:
+    """Build one object graph per respondent, allocating fresh scalars"""
+    profiles = []
+    for index in range(len(batch)):
+        trait_scores = {}
+        for t, trait_name in enumerate(batch.trait_names):
+            physical = int(batch.physical_scores[t, index])
+            emotional = int(batch.emotional_scores[t, index])
+            total = physical + emotional
+            trait_scores[trait_name] = trait_cls(
+                trait_name=trait_name,
+                physical_score=physical,
+                emotional_score=emotional,
+                total_questions=total,
+                physical_percentage=(physical / total) * 100 if total else 0.0,
+                emotional_percentage=(emotional / total) * 100 if total else 0.0,
+                dominant_type='Physical' if physical > emotional else 'Emotional'
+            )
+        primary = 'Physical' if batch.primary_physical[index] else 'Emotional'
+        secondary = 'Physical' if batch.secondary_physical[index] else 'Emotional'
+        profiles.append(profile_cls(
+            ep_type=primary[0] + secondary[0],
+            primary_type=primary,
+            secondary_type=secondary,
+            trait_scores=trait_scores,
+            overall_physical_percentage=float(batch.overall_physical_percentage[index]),
+            overall_emotional_percentage=float(batch.overall_emotional_percentage[index]),
+            confidence_score=float(batch.confidence_score[index])
+        ))
+    return profiles
+
+
+def _measure(build: Callable[[], object]) -> int:
+    """Net bytes still allocated by build() once it returns"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main(count: int = 10000) -> int:
+    engine = EPScoringEngine()
+    matrix = np.random.default_rng(6).integers(
+        EPScoringEngine.RESPONSE_EMOTIONAL,
+        EPScoringEngine.RESPONSE_PHYSICAL + 1,
+        size=(EPScoringEngine.TOTAL_QUESTIONS, count),
+        dtype=np.int8
+    )
+    batch = engine.score_batch(matrix)
+    slotted: List[EPProfile] = batch.to_profiles()
+
+    results = {
+        "dataclass (__dict__)": _measure(
+            lambda: _materialize(batch, DictTraitScore, DictEPProfile)
+        ),
+        "dataclass (__slots__)": _measure(
+            lambda: _materialize(batch, TraitScore, EPProfile)
+        ),
+        "EPProfileBatch (columnar)": _measure(
+            lambda: EPProfileBatch.from_profiles(slotted)
+        ),
+    }
+
+    print(f"E&P profile memory, {count} profiles")
+    print(f"{'representation':<28}{'bytes/profile':>14}")
+    baseline = results["dataclass (__dict__)"]
+    for name, total in results.items():
+        print(f"{name:<28}{total / count:>14.1f}   ({total / baseline:.0%})")
+
+    assert isinstance(slotted[0].trait_scores['logical'], TraitScore)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
@@ -0,0 +1,186 @@
+"""
+E&P Profile JSONL Exporter
+Streams scored profiles to newline-delimited JSON (optionally gzip-compressed)
+"""
+from typing import Callable, Dict, Iterable, Optional
+from dataclasses import dataclass
+from itertools import islice
+import gzip
+import json
+import os
+import zlib
+
+from ep_scoring_engine import EPProfile, EPScoringEngine
+
+# Read/scan size used when recovering an existing export
+CHUNK_SIZE = 1024 * 1024
+
+EXPORT_MODES = ('write', 'append', 'resume')
+
+
+@dataclass
+class ExportSummary:
+    """Outcome of one export run"""
+    filepath: str
+    written: int  # records written by this run
+    skipped: int  # records already present and skipped (resume mode)
+    existing: int  # complete records found in the file before this run
+
+    @property
+    def total(self) -> int:
+        """Complete records in the file after this run"""
+        return self.existing + self.written
+
+
+def json_serializer(record: Dict) -> bytes:
+    """Default serializer: compact stdlib JSON"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def orjson_serializer() -> Callable[[Dict], bytes]:
+    """orjson-backed serializer (pip install orjson)"""
+    try:
+        import orjson
+    except ImportError as e:
+        raise ImportError("orjson is not installed; pip install orjson") from e
+    return orjson.dumps
+
+
+class EPProfileJSONLExporter:
+    """
+    Write profiles as one JSON object per line
+
+    Profiles are consumed from any iterable (a generator, an EPProfileBatch)
+    and written one at a time, so memory stays bounded regardless of the
+    export size.
+
+    Modes:
+        write  - start a new file (overwrites)
+        append - add records after the existing complete records
+        resume - skip as many input profiles as the file already holds,
+                 then continue; the input must be replayed in the same order
+
+    In append/resume mode a trailing partial record left by an interrupted
+    run is discarded first.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        engine: Optional[EPScoringEngine] = None,
+        compress: Optional[bool] = None,
+        serializer: Optional[Callable[[Dict], bytes]] = None,
+        mode: str = 'write',
+        flush_every: int = 1000
+    ):
+        if mode not in EXPORT_MODES:
+            raise ValueError(f"mode must be one of {EXPORT_MODES}, got '{mode}'")
+
+        self.filepath = filepath
+        self.engine = engine or EPScoringEngine()
+        self.compress = filepath.endswith('.gz') if compress is None else compress
+        self.serializer = serializer or json_serializer
+        self.mode = mode
+        self.flush_every = max(1, flush_every)
+
+    def export(self, profiles: Iterable[EPProfile]) -> ExportSummary:
+        """Stream profiles to the export file"""
+        existing = 0
+        if self.mode != 'write' and os.path.exists(self.filepath):
+            existing = self.recover()
+
+        skipped = 0
+        profiles = iter(profiles)
+        if self.mode == 'resume' and existing:
+            for _ in islice(profiles, existing):
+                skipped += 1
+
+        written = 0
+        with self._open('wb' if self.mode == 'write' else 'ab') as f:
+            for profile in profiles:
+                f.write(self.serializer(self.engine.profile_to_dict(profile)))
+                f.write(b'\n')
+                written += 1
+                if written % self.flush_every == 0:
+                    f.flush()
+
+        return ExportSummary(
+            filepath=self.filepath,
+            written=written,
+            skipped=skipped,
+            existing=existing
+        )
+
+    def recover(self) -> int:
+        """
+        Count complete records in an existing export
+
+        Drops any trailing partial record so new records start on a fresh
+        line. Returns the number of complete records kept.
+        """
+        if self.compress:
+            return self._recover_gzip()
+        return self._recover_plain()
+
+    def _open(self, mode: str):
+        if self.compress:
+            return gzip.open(self.filepath, mode)
+        return open(self.filepath, mode)
+
+    def _recover_plain(self) -> int:
+        records = 0
+        last_newline_end = 0
+        offset = 0
+        with open(self.filepath, 'r+b') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                newlines = chunk.count(b'\n')
+                if newlines:
+                    records += newlines
+                    last_newline_end = offset + chunk.rindex(b'\n') + 1
+                offset += len(chunk)
+
+            if last_newline_end != offset:
+                f.truncate(last_newline_end)
+
+        return records
+
+    def _recover_gzip(self) -> int:
+        records = 0
+        complete_bytes = 0
+        total_bytes = 0
+        damaged = False
+        try:
+            with gzip.open(self.filepath, 'rb') as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    newlines = chunk.count(b'\n')
+                    if newlines:
+                        records += newlines
+                        complete_bytes = total_bytes + chunk.rindex(b'\n') + 1
+                    total_bytes += len(chunk)
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            # Interrupted mid-member: keep whatever decompressed cleanly
+            damaged = True
+
+        if damaged or complete_bytes != total_bytes:
+            self._rewrite_gzip_prefix(complete_bytes)
+
+        return records
+
+    def _rewrite_gzip_prefix(self, length: int) -> None:
+        """Replace the export with its first `length` decompressed bytes"""
+        tmp_path = self.filepath + '.recover'
+        remaining = length
+        with gzip.open(self.filepath, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            while remaining:
+                chunk = src.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                remaining -= len(chunk)
+        os.replace(tmp_path, self.filepath)
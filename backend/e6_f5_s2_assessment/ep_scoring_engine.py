@@ -2,13 +2,20 @@
 E&P Scoring Engine
 Calculates trait scores and determines E&P personality type
 """
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 from dataclasses import dataclass
 import json
+import numpy as np
 
 @dataclass
 class TraitScore:
     """Scores for a single trait"""
+    # Slotted: no per-instance __dict__ (profiles are held in bulk for analytics)
+    __slots__ = (
+        'trait_name', 'physical_score', 'emotional_score', 'total_questions',
+        'physical_percentage', 'emotional_percentage', 'dominant_type'
+    )
+    
     trait_name: str
     physical_score: int
     emotional_score: int
@@ -20,6 +27,12 @@ class TraitScore:
 @dataclass
 class EPProfile:
     """Complete E&P personality profile"""
+    __slots__ = (
+        'ep_type', 'primary_type', 'secondary_type', 'trait_scores',
+        'overall_physical_percentage', 'overall_emotional_percentage',
+        'confidence_score'
+    )
+    
     ep_type: str  # 'PP', 'PE', 'EP', 'EE'
     primary_type: str  # 'Physical' or 'Emotional'
     secondary_type: str  # 'Physical' or 'Emotional'
@@ -28,9 +41,155 @@ class EPProfile:
     overall_emotional_percentage: float
     confidence_score: float  # How clear the type is (0-100)
 
+@dataclass
+class EPProfileBatch:
+    """
+    Columnar E&P profiles for many respondents
+    
+    Trait arrays are (traits x respondents), per-respondent arrays are (N,).
+    This is the struct-of-arrays form for large collections: a few numpy
+    arrays instead of one EPProfile plus four TraitScores per respondent.
+    Indexing or iterating materializes EPProfile objects with the usual
+    attribute API; from_profiles() packs existing profiles.
+    """
+    trait_names: Tuple[str, ...]
+    physical_scores: np.ndarray  # int16 (T, N)
+    emotional_scores: np.ndarray  # int16 (T, N)
+    primary_physical: np.ndarray  # bool (N,)
+    secondary_physical: np.ndarray  # bool (N,)
+    overall_physical_percentage: np.ndarray  # float64 (N,)
+    overall_emotional_percentage: np.ndarray  # float64 (N,)
+    confidence_score: np.ndarray  # float64 (N,)
+    
+    def __len__(self) -> int:
+        return self.primary_physical.shape[0]
+    
+    def __getitem__(self, index: int) -> EPProfile:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("EPProfileBatch index out of range")
+        return self.profile(index)
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.profile(index)
+    
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[EPProfile]) -> 'EPProfileBatch':
+        """Pack scored profiles into columnar form"""
+        profiles = list(profiles)
+        trait_names = tuple(EPScoringEngine.TRAIT_RANGES)
+        count = len(profiles)
+        
+        physical_scores = np.zeros((len(trait_names), count), dtype=np.int16)
+        emotional_scores = np.zeros((len(trait_names), count), dtype=np.int16)
+        for column, profile in enumerate(profiles):
+            for t, trait_name in enumerate(trait_names):
+                score = profile.trait_scores.get(trait_name)
+                if score is not None:
+                    physical_scores[t, column] = score.physical_score
+                    emotional_scores[t, column] = score.emotional_score
+        
+        return cls(
+            trait_names=trait_names,
+            physical_scores=physical_scores,
+            emotional_scores=emotional_scores,
+            primary_physical=np.array(
+                [p.primary_type == 'Physical' for p in profiles], dtype=bool
+            ),
+            secondary_physical=np.array(
+                [p.secondary_type == 'Physical' for p in profiles], dtype=bool
+            ),
+            overall_physical_percentage=np.array(
+                [p.overall_physical_percentage for p in profiles], dtype=np.float64
+            ),
+            overall_emotional_percentage=np.array(
+                [p.overall_emotional_percentage for p in profiles], dtype=np.float64
+            ),
+            confidence_score=np.array(
+                [p.confidence_score for p in profiles], dtype=np.float64
+            )
+        )
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays"""
+        return sum(
+            column.nbytes for column in (
+                self.physical_scores, self.emotional_scores,
+                self.primary_physical, self.secondary_physical,
+                self.overall_physical_percentage,
+                self.overall_emotional_percentage, self.confidence_score
+            )
+        )
+    
+    @property
+    def total_questions(self) -> np.ndarray:
+        return self.physical_scores + self.emotional_scores
+    
+    @property
+    def ep_type(self) -> np.ndarray:
+        """Two-letter EP type per respondent ('PP', 'PE', 'EP', 'EE')"""
+        codes = self.primary_physical.astype(np.int8) * 2 + self.secondary_physical
+        return np.array(['EE', 'EP', 'PE', 'PP'], dtype=object)[codes]
+    
+    def type_counts(self) -> Dict[str, int]:
+        """Number of respondents per EP type"""
+        types, counts = np.unique(self.ep_type.astype(str), return_counts=True)
+        return {str(t): int(c) for t, c in zip(types, counts)}
+    
+    def profile(self, index: int) -> EPProfile:
+        """Materialize one respondent as an EPProfile"""
+        trait_scores = {}
+        for t, trait_name in enumerate(self.trait_names):
+            physical = int(self.physical_scores[t, index])
+            emotional = int(self.emotional_scores[t, index])
+            total = physical + emotional
+            trait_scores[trait_name] = TraitScore(
+                trait_name=trait_name,
+                physical_score=physical,
+                emotional_score=emotional,
+                total_questions=total,
+                physical_percentage=(physical / total) * 100 if total else 0,
+                emotional_percentage=(emotional / total) * 100 if total else 0,
+                dominant_type='Physical' if physical > emotional else 'Emotional'
+            )
+        
+        primary = 'Physical' if self.primary_physical[index] else 'Emotional'
+        secondary = 'Physical' if self.secondary_physical[index] else 'Emotional'
+        
+        return EPProfile(
+            ep_type=primary[0] + secondary[0],
+            primary_type=primary,
+            secondary_type=secondary,
+            trait_scores=trait_scores,
+            overall_physical_percentage=float(self.overall_physical_percentage[index]),
+            overall_emotional_percentage=float(self.overall_emotional_percentage[index]),
+            confidence_score=float(self.confidence_score[index])
+        )
+    
+    def to_profiles(self) -> List[EPProfile]:
+        """Materialize every respondent"""
+        return [self.profile(i) for i in range(len(self))]
+
 class EPScoringEngine:
     """Calculates E&P scores from assessment responses"""
     
+    # Question ranges for each of the Four Core Traits
+    TRAIT_RANGES = {
+        'logical': range(1, 11),      # Questions 1-10
+        'physical': range(11, 23),    # Questions 11-22
+        'emotional': range(23, 35),   # Questions 23-34
+        'communication': range(35, 46) # Questions 35-45
+    }
+    TOTAL_QUESTIONS = 45
+    
+    # Response codes used by encode_responses / score_batch
+    RESPONSE_EMOTIONAL = 0
+    RESPONSE_PHYSICAL = 1
+    RESPONSE_MISSING = -1
+    
     def __init__(self):
         self.trait_weights = {
             'logical': 1.0,
@@ -77,17 +236,9 @@ class EPScoringEngine:
     def _calculate_trait_scores(self, responses: Dict[int, str]) -> Dict[str, TraitScore]:
         """Calculate scores for each of the Four Core Traits"""
         
-        # Question ranges for each trait
-        trait_ranges = {
-            'logical': range(1, 11),      # Questions 1-10
-            'physical': range(11, 23),    # Questions 11-22
-            'emotional': range(23, 35),   # Questions 23-34
-            'communication': range(35, 46) # Questions 35-45
-        }
-        
         trait_scores = {}
         
-        for trait_name, question_range in trait_ranges.items():
+        for trait_name, question_range in self.TRAIT_RANGES.items():
             physical_score = 0
             emotional_score = 0
             total_questions = 0
@@ -204,9 +355,113 @@ class EPScoringEngine:
         
         return min(100, max(0, confidence))
     
-    def export_results(self, profile: EPProfile, filepath: str):
-        """Export scoring results to JSON"""
-        results = {
+    # ------------------------------------------------------------------
+    # Batch scoring (cohort analytics)
+    # ------------------------------------------------------------------
+    
+    def encode_responses(self, responses_list: Iterable[Dict[int, str]]) -> np.ndarray:
+        """
+        Encode respondents as an int8 matrix (questions x respondents)
+        
+        Cells hold RESPONSE_PHYSICAL, RESPONSE_EMOTIONAL or RESPONSE_MISSING.
+        As in score_responses, any answered value other than 'physical'
+        counts as emotional.
+        """
+        responses_list = list(responses_list)
+        matrix = np.full(
+            (self.TOTAL_QUESTIONS, len(responses_list)),
+            self.RESPONSE_MISSING,
+            dtype=np.int8
+        )
+        for column, responses in enumerate(responses_list):
+            for q_id, response in responses.items():
+                if 1 <= q_id <= self.TOTAL_QUESTIONS:
+                    matrix[q_id - 1, column] = (
+                        self.RESPONSE_PHYSICAL
+                        if response.lower() == 'physical'
+                        else self.RESPONSE_EMOTIONAL
+                    )
+        return matrix
+    
+    def score_batch(self, matrix: np.ndarray) -> EPProfileBatch:
+        """
+        Score many respondents in one vectorized pass
+        
+        Produces the same results as score_responses for each column.
+        
+        Args:
+            matrix: int8 (questions x respondents) from encode_responses
+        
+        Returns:
+            EPProfileBatch with columnar scores
+        """
+        matrix = np.asarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[0] != self.TOTAL_QUESTIONS:
+            raise ValueError(
+                f"Expected a ({self.TOTAL_QUESTIONS}, N) response matrix, "
+                f"got shape {matrix.shape}"
+            )
+        
+        physical = matrix == self.RESPONSE_PHYSICAL
+        emotional = matrix == self.RESPONSE_EMOTIONAL
+        
+        # Per-trait counts: (T, N)
+        trait_names = tuple(self.TRAIT_RANGES)
+        physical_scores = np.stack([
+            physical[r.start - 1:r.stop - 1].sum(axis=0, dtype=np.int16)
+            for r in self.TRAIT_RANGES.values()
+        ])
+        emotional_scores = np.stack([
+            emotional[r.start - 1:r.stop - 1].sum(axis=0, dtype=np.int16)
+            for r in self.TRAIT_RANGES.values()
+        ])
+        
+        # Weighted primary type
+        weights = np.array(
+            [self.trait_weights.get(name, 1.0) for name in trait_names]
+        )[:, None]
+        weighted_physical = (physical_scores * weights).sum(axis=0)
+        weighted_emotional = (emotional_scores * weights).sum(axis=0)
+        primary_physical = weighted_physical > weighted_emotional
+        
+        # Secondary type: opposite of primary when trait dominance is mixed
+        dominant_physical = physical_scores > emotional_scores
+        physical_traits = dominant_physical.sum(axis=0)
+        emotional_traits = len(trait_names) - physical_traits
+        mixed = (physical_traits > 0) & (emotional_traits > 0)
+        secondary_physical = np.where(mixed, ~primary_physical, primary_physical)
+        
+        # Overall percentages
+        total_physical = physical_scores.sum(axis=0, dtype=np.int64)
+        total_emotional = emotional_scores.sum(axis=0, dtype=np.int64)
+        total_responses = total_physical + total_emotional
+        safe_total = np.where(total_responses > 0, total_responses, 1)
+        overall_physical = np.where(
+            total_responses > 0, (total_physical / safe_total) * 100, 0.0
+        )
+        overall_emotional = np.where(
+            total_responses > 0, (total_emotional / safe_total) * 100, 0.0
+        )
+        
+        # Confidence: distance from 50/50 plus cross-trait consistency
+        difference = np.abs(overall_physical - overall_emotional)
+        consistency = np.abs(physical_traits - emotional_traits) / len(trait_names)
+        confidence = np.clip((difference + (consistency * 100)) / 2, 0, 100)
+        
+        return EPProfileBatch(
+            trait_names=trait_names,
+            physical_scores=physical_scores,
+            emotional_scores=emotional_scores,
+            primary_physical=primary_physical,
+            secondary_physical=secondary_physical,
+            overall_physical_percentage=overall_physical,
+            overall_emotional_percentage=overall_emotional,
+            confidence_score=confidence
+        )
+    
+    def profile_to_dict(self, profile: EPProfile) -> Dict:
+        """JSON-ready dict for a profile (shared by the file exporters)"""
+        return {
             'ep_type': profile.ep_type,
             'primary_type': profile.primary_type,
             'secondary_type': profile.secondary_type,
@@ -224,9 +479,26 @@ class EPScoringEngine:
                 for trait_name, score in profile.trait_scores.items()
             }
         }
+    
+    def export_results(self, profile: EPProfile, filepath: str):
+        """Export scoring results to JSON"""
+        results = self.profile_to_dict(profile)
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(results, f, indent=2, ensure_ascii=False)
+    
+    def export_results_jsonl(self, profiles: Iterable[EPProfile], filepath: str,
+                             **options) -> 'ExportSummary':
+        """
+        Stream many profiles to one newline-delimited JSON file
+        
+        See ep_profile_exporter.EPProfileJSONLExporter for options
+        (compress, serializer, resume).
+        """
+        from ep_profile_exporter import EPProfileJSONLExporter
+        
+        exporter = EPProfileJSONLExporter(filepath, engine=self, **options)
+        return exporter.export(profiles)
 
 if __name__ == '__main__':
     # Test with sample responses
@@ -2,17 +2,28 @@
 E&P Assessment API Routes
 Complete REST API for E&P Suggestibility Assessment System
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
+import json
 import logging
 
-from database import get_db
+from database import SessionLocal, get_request_db
 from auth.dependencies import get_current_user, require_role
 from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+from services.async_services import AsyncEPAssessmentService
+from utils.preference_cache import communication_preferences_cache
+from utils.pool_telemetry import pool_metrics
 from schemas.assessment import (
     SubmitAssessmentRequest,
     AssessmentResponse,
+    BulkAssessmentItem,
+    BulkSubmitAssessmentRequest,
+    BulkAssessmentItemResult,
+    BulkSubmitAssessmentResponse,
     CommunicationPreferences,
     AssessmentHistory,
     FlagAssessmentRequest,
@@ -36,6 +47,19 @@ router = APIRouter(
 )
 
 
+def _assessment_response(item: dict) -> AssessmentResponse:
+    """AssessmentResponse from a service item (see save_assessments_bulk)"""
+    return AssessmentResponse(
+        assessment_id=str(item["assessment_id"]),
+        user_id=str(item["user_id"]),
+        session_id=str(item["session_id"]) if item["session_id"] else None,
+        questionnaire_version_id=str(item["questionnaire_version_id"]),
+        scores=item["scores"],
+        quality_metrics=item["quality_metrics"],
+        completed_at=item["completed_at"]
+    )
+
+
 # ============================================================================
 # CORE ASSESSMENT ENDPOINTS
 # ============================================================================
@@ -63,30 +87,22 @@ router = APIRouter(
 async def submit_assessment(
     request: SubmitAssessmentRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """Submit new E&P assessment"""
     try:
-        service = EPAssessmentServiceEnhanced(db)
+        service = AsyncEPAssessmentService(db)
         
-        result = service.save_assessment(
+        result = await service.save_assessment(
             user_id=current_user["id"],
             answers=request.answers,
             session_id=request.session_id,
             time_to_complete=request.time_to_complete
         )
         
-        logger.info(f"Assessment submitted: user={current_user['id']}, profile={result.scores.suggestibility_type}")
+        logger.info(f"Assessment submitted: user={current_user['id']}, profile={result['scores']['suggestibility_type']}")
         
-        return AssessmentResponse(
-            assessment_id=str(result.assessment_id),
-            user_id=str(result.user_id),
-            session_id=str(result.session_id) if result.session_id else None,
-            questionnaire_version_id=str(result.questionnaire_version_id),
-            scores=result.scores,
-            quality_metrics=result.quality_metrics,
-            completed_at=result.completed_at
-        )
+        return _assessment_response(result)
         
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -102,6 +118,94 @@ async def submit_assessment(
         )
 
 
+@router.post(
+    "/ep/submit/bulk",
+    response_model=BulkSubmitAssessmentResponse,
+    summary="Submit E&P Assessments in Bulk",
+    description="""
+    Submit many E&P assessments at once (group onboarding, paper imports).
+    
+    Each item carries the client's user_id plus the fields of /ep/submit.
+    Items are validated individually; invalid ones are reported in
+    `results` with an error and do not block the rest. Valid items are
+    scored, quality-checked and auto-flagged exactly like /ep/submit, and
+    saved together in one transaction.
+    
+    **Required role:** clinician or admin. Up to 5000 items per request.
+    """
+)
+async def submit_assessments_bulk(
+    request: BulkSubmitAssessmentRequest,
+    current_user: dict = Depends(require_role("clinician")),
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
+):
+    """Submit many E&P assessments (clinicians only)"""
+    results: List[Optional[BulkAssessmentItemResult]] = [None] * len(request.submissions)
+    valid = []
+    positions = []
+    for index, raw in enumerate(request.submissions):
+        try:
+            item = BulkAssessmentItem(**raw)
+        except ValidationError as e:
+            results[index] = BulkAssessmentItemResult(
+                index=index,
+                status="error",
+                error="; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                )
+            )
+            continue
+        valid.append({
+            "user_id": item.user_id,
+            "answers": item.answers,
+            "session_id": item.session_id,
+            "time_to_complete": item.time_to_complete,
+            "completed_at": item.completed_at
+        })
+        positions.append(index)
+    
+    try:
+        service = AsyncEPAssessmentService(db)
+        saved = await service.save_assessments_bulk(valid)
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error submitting assessments in bulk: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error processing assessments"
+        )
+    
+    for index, result in zip(positions, saved):
+        results[index] = BulkAssessmentItemResult(
+            index=index,
+            status="created",
+            assessment_id=str(result["assessment_id"]),
+            user_id=str(result["user_id"]),
+            scores=result["scores"],
+            quality_metrics=result["quality_metrics"],
+            completed_at=result["completed_at"]
+        )
+    
+    flagged = sum(result["quality_metrics"]["needs_review"] for result in saved)
+    logger.info(
+        f"Bulk assessments submitted by {current_user['id']}: "
+        f"{len(saved)} created, {len(results) - len(saved)} rejected, {flagged} flagged"
+    )
+    
+    return BulkSubmitAssessmentResponse(
+        created=len(saved),
+        failed=len(results) - len(saved),
+        flagged_for_review=flagged,
+        results=results
+    )
+
+
 @router.get(
     "/ep/results/latest",
     response_model=AssessmentResponse,
@@ -110,12 +214,12 @@ async def submit_assessment(
 )
 async def get_latest_assessment(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """Get user's most recent assessment"""
     try:
-        service = EPAssessmentServiceEnhanced(db)
-        assessments = service.get_user_assessment_history(current_user["id"], limit=1)
+        service = AsyncEPAssessmentService(db)
+        assessments = await service.get_user_assessment_history(current_user["id"], limit=1)
         
         if not assessments:
             raise HTTPException(
@@ -123,17 +227,7 @@ async def get_latest_assessment(
                 detail="No assessments found for this user"
             )
         
-        result = assessments[0]
-        
-        return AssessmentResponse(
-            assessment_id=str(result.assessment_id),
-            user_id=str(result.user_id),
-            session_id=str(result.session_id) if result.session_id else None,
-            questionnaire_version_id=str(result.questionnaire_version_id),
-            scores=result.scores,
-            quality_metrics=result.quality_metrics,
-            completed_at=result.completed_at
-        )
+        return _assessment_response(assessments[0])
         
     except HTTPException:
         raise
@@ -149,29 +243,42 @@ async def get_latest_assessment(
     "/ep/history",
     response_model=List[AssessmentHistory],
     summary="Get Assessment History",
-    description="Retrieve user's complete assessment history with quality metrics."
+    description=(
+        "Retrieve user's complete assessment history with quality metrics. "
+        "Pass the X-Next-Cursor response header as `cursor` to get the next page."
+    )
 )
 async def get_assessment_history(
+    response: Response,
     limit: int = Query(10, ge=1, le=50, description="Number of assessments to retrieve"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """Get user's assessment history"""
     try:
-        service = EPAssessmentServiceEnhanced(db)
-        assessments = service.get_user_assessment_history(current_user["id"], limit)
+        service = AsyncEPAssessmentService(db)
+        page = await service.get_assessment_history_page(current_user["id"], limit, cursor)
+        
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
         
         return [
             AssessmentHistory(
-                assessment_id=str(a.assessment_id),
-                completed_at=a.completed_at,
-                suggestibility_type=a.scores.suggestibility_type,
-                confidence_score=a.quality_metrics.confidence_score,
-                needs_review=a.quality_metrics.needs_review
+                assessment_id=item["assessment_id"],
+                completed_at=item["completed_at"],
+                suggestibility_type=item["suggestibility_type"],
+                confidence_score=item["confidence_score"],
+                needs_review=item["needs_review"]
             )
-            for a in assessments
+            for item in page["items"]
         ]
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error retrieving history: {str(e)}")
         raise HTTPException(
@@ -180,6 +287,32 @@ async def get_assessment_history(
         )
 
 
+def _ndjson_history(user_id: Optional[str]) -> Iterator[bytes]:
+    """Stream history items as NDJSON from a session owned by the stream"""
+    db = SessionLocal()
+    try:
+        service = EPAssessmentServiceEnhanced(db)
+        for item in service.iter_assessment_history(user_id):
+            yield json.dumps(item, default=str).encode("utf-8") + b"\n"
+    finally:
+        db.close()
+
+
+@router.get(
+    "/ep/history/export",
+    summary="Export Assessment History",
+    description="Stream the user's full assessment history as NDJSON."
+)
+async def export_assessment_history(
+    current_user: dict = Depends(get_current_user)
+):
+    """Export user's assessment history (one JSON object per line)"""
+    return StreamingResponse(
+        _ndjson_history(current_user["id"]),
+        media_type="application/x-ndjson"
+    )
+
+
 # ============================================================================
 # AI INTEGRATION ENDPOINT (CRITICAL FOR MULTI-AGENT SYSTEM)
 # ============================================================================
@@ -203,7 +336,7 @@ async def get_assessment_history(
 )
 async def get_communication_preferences(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """
     Get AI communication preferences
@@ -215,8 +348,8 @@ async def get_communication_preferences(
     - All agents in SessionGenerationCrew
     """
     try:
-        service = EPAssessmentServiceEnhanced(db)
-        prefs = service.get_communication_preferences(current_user["id"])
+        service = AsyncEPAssessmentService(db)
+        prefs = await service.get_communication_preferences(current_user["id"])
         
         if prefs.get("confidence", 0) == 0:
             logger.warning(f"No assessment found for user {current_user['id']}")
@@ -245,13 +378,13 @@ async def flag_assessment(
     assessment_id: str,
     request: FlagAssessmentRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """Flag assessment for clinical review"""
     try:
-        service = EPAssessmentServiceEnhanced(db)
+        service = AsyncEPAssessmentService(db)
         
-        success = service.flag_for_review(
+        success = await service.flag_for_review(
             assessment_id=assessment_id,
             flagged_by=current_user["id"],
             reason=request.reason
@@ -291,13 +424,13 @@ async def review_assessment(
     assessment_id: str,
     request: ReviewAssessmentRequest,
     current_user: dict = Depends(require_role("clinician")),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """Mark assessment as reviewed (clinicians only)"""
     try:
-        service = EPAssessmentServiceEnhanced(db)
+        service = AsyncEPAssessmentService(db)
         
-        success = service.mark_reviewed(
+        success = await service.mark_reviewed(
             assessment_id=assessment_id,
             reviewer_id=current_user["id"],
             notes=request.notes,
@@ -339,25 +472,14 @@ async def review_assessment(
 async def get_pending_reviews(
     limit: int = Query(50, ge=1, le=100, description="Maximum number of assessments to return"),
     current_user: dict = Depends(require_role("clinician")),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """Get assessments pending clinical review"""
     try:
-        service = EPAssessmentServiceEnhanced(db)
-        assessments = service.get_pending_reviews(limit)
+        service = AsyncEPAssessmentService(db)
+        assessments = await service.get_pending_reviews(limit)
         
-        return [
-            AssessmentResponse(
-                assessment_id=str(a.assessment_id),
-                user_id=str(a.user_id),
-                session_id=str(a.session_id) if a.session_id else None,
-                questionnaire_version_id=str(a.questionnaire_version_id),
-                scores=a.scores,
-                quality_metrics=a.quality_metrics,
-                completed_at=a.completed_at
-            )
-            for a in assessments
-        ]
+        return [_assessment_response(a) for a in assessments]
         
     except Exception as e:
         logger.error(f"Error retrieving pending reviews: {str(e)}")
@@ -371,6 +493,48 @@ async def get_pending_reviews(
 # ANALYTICS ENDPOINTS
 # ============================================================================
 
+@router.get(
+    "/analytics/cache",
+    summary="Preference Cache Statistics",
+    description="Hit/miss counters of the communication preferences cache in this worker (admins only)."
+)
+async def get_preference_cache_stats(
+    current_user: dict = Depends(require_role("admin"))
+):
+    """Get communication preferences cache counters (admins only)"""
+    return communication_preferences_cache.stats()
+
+
+@router.get(
+    "/analytics/db-pool",
+    summary="Database Pool Metrics",
+    description=(
+        "Connection pool telemetry per engine in this worker: checked-out "
+        "connections, overflow events, timeouts and a checkout wait histogram (admins only)."
+    )
+)
+async def get_db_pool_metrics(
+    current_user: dict = Depends(require_role("admin"))
+):
+    """Get connection pool telemetry (admins only)"""
+    return pool_metrics()
+
+
+@router.get(
+    "/analytics/export",
+    summary="Export All Assessments",
+    description="Stream every assessment (newest first) as NDJSON (admins only)."
+)
+async def export_all_assessments(
+    current_user: dict = Depends(require_role("admin"))
+):
+    """Export all assessments (admins only)"""
+    return StreamingResponse(
+        _ndjson_history(None),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.get(
     "/analytics/quality",
     response_model=QualityStatistics,
@@ -380,12 +544,12 @@ async def get_pending_reviews(
 async def get_quality_statistics(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
     current_user: dict = Depends(require_role("admin")),
-    db: Session = Depends(get_db)
+    db: Union[AsyncSession, Session] = Depends(get_request_db)
 ):
     """Get quality statistics (admins only)"""
     try:
-        service = EPAssessmentServiceEnhanced(db)
-        stats = service.get_quality_statistics(days)
+        service = AsyncEPAssessmentService(db)
+        stats = await service.get_quality_statistics(days)
         
         return QualityStatistics(**stats)
         
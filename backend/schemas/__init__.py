@@ -5,19 +5,19 @@ Pydantic Schemas Package
 from .assessment import (
     SubmitAssessmentRequest,
     AssessmentResponse,
-    CommunicationPreferencesResponse,
-    AssessmentHistoryResponse,
+    CommunicationPreferences,
+    AssessmentHistory,
     FlagAssessmentRequest,
     ReviewAssessmentRequest,
-    QualityStatisticsResponse
+    QualityStatistics
 )
 
 __all__ = [
     'SubmitAssessmentRequest',
     'AssessmentResponse',
-    'CommunicationPreferencesResponse',
-    'AssessmentHistoryResponse',
+    'CommunicationPreferences',
+    'AssessmentHistory',
     'FlagAssessmentRequest',
     'ReviewAssessmentRequest',
-    'QualityStatisticsResponse'
+    'QualityStatistics'
 ]
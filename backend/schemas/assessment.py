@@ -3,7 +3,7 @@ E&P Assessment Pydantic Schemas
 Request/Response models for API validation
 """
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
 
@@ -67,6 +67,39 @@ class SubmitAssessmentRequest(BaseModel):
         }
 
 
+class BulkAssessmentItem(SubmitAssessmentRequest):
+    """One submission of a bulk import (validated per item)"""
+    user_id: UUID = Field(..., description="Client the assessment belongs to")
+    session_id: Optional[UUID] = Field(None, description="Optional VR session ID")
+    completed_at: Optional[datetime] = Field(
+        None,
+        description="When the questionnaire was completed (e.g. paper date); defaults to now"
+    )
+
+
+class BulkSubmitAssessmentRequest(BaseModel):
+    """Request model for submitting many E&P assessments at once"""
+    submissions: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=5000,
+        description="BulkAssessmentItem objects; invalid items are reported, not fatal"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "submissions": [
+                    {
+                        "user_id": "660e8400-e29b-41d4-a716-446655440001",
+                        "answers": {str(i): i % 2 == 0 for i in range(1, 37)},
+                        "time_to_complete": 240
+                    }
+                ]
+            }
+        }
+
+
 class FlagAssessmentRequest(BaseModel):
     """Request to flag assessment for clinical review"""
     reason: str = Field(
@@ -113,7 +146,7 @@ class ScoreBreakdown(BaseModel):
     """Assessment scores breakdown"""
     q1_score: int = Field(..., ge=0, le=100, description="Physical Suggestibility score (0-100)")
     q2_score: int = Field(..., ge=0, le=100, description="Emotional Suggestibility score (0-100)")
-    combined_score: int = Field(..., ge=0, le=100, description="Combined score (0-100)")
+    combined_score: int = Field(..., ge=0, le=200, description="Combined score (0-200)")
     physical_percentage: int = Field(..., ge=0, le=100, description="Physical percentage")
     emotional_percentage: int = Field(..., ge=0, le=100, description="Emotional percentage")
     suggestibility_type: str = Field(..., description="Classification type")
@@ -191,6 +224,26 @@ class AssessmentResponse(BaseModel):
         }
 
 
+class BulkAssessmentItemResult(BaseModel):
+    """Outcome of one bulk submission item"""
+    index: int = Field(..., description="Position in the submitted list")
+    status: str = Field(..., description="created or error")
+    assessment_id: Optional[str] = None
+    user_id: Optional[str] = None
+    scores: Optional[ScoreBreakdown] = None
+    quality_metrics: Optional[QualityMetrics] = None
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = Field(None, description="Validation error for rejected items")
+
+
+class BulkSubmitAssessmentResponse(BaseModel):
+    """Bulk submission summary with per-item results"""
+    created: int
+    failed: int
+    flagged_for_review: int
+    results: List[BulkAssessmentItemResult]
+
+
 class CommunicationPreferences(BaseModel):
     """AI communication preferences based on E&P profile"""
     style: str = Field(..., description="Communication style (physical_suggestible/emotional_suggestible/balanced)")
@@ -222,7 +275,7 @@ class AssessmentHistory(BaseModel):
     assessment_id: str
     completed_at: datetime
     suggestibility_type: str
-    confidence_score: float
+    confidence_score: Optional[float] = None
     needs_review: bool
     
     class Config:
@@ -244,6 +297,8 @@ class QualityStatistics(BaseModel):
     pattern_distribution: Dict[str, int]
     flagged_for_review: int
     flagged_percentage: float
+    missing_metrics: int = Field(0, description="Assessments without stored quality metrics (pending backfill)")
+    reviewed: int = Field(0, description="Assessments that received a clinical review")
     period_days: int
     
     class Config:
@@ -259,6 +314,8 @@ class QualityStatistics(BaseModel):
                 },
                 "flagged_for_review": 30,
                 "flagged_percentage": 20.0,
+                "missing_metrics": 0,
+                "reviewed": 12,
                 "period_days": 30
             }
         }
@@ -0,0 +1,70 @@
+"""
+Quality Metrics Backfill - fill confidence/pattern/completion for old assessments
+
+Usage (from backend/):
+    python scripts/backfill_quality_metrics.py --checkpoint backfill.json
+    python scripts/backfill_quality_metrics.py --checkpoint backfill.json --pause 0.2
+
+Re-running with the same checkpoint file resumes after the last committed batch.
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine, SessionLocal
+from services.quality_backfill import (
+    QualityBackfillJob,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_PAGE_SIZE
+)
+from services.quality_rollup import rebuild_quality_rollups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backfill assessment quality metrics")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--checkpoint", help="Checkpoint file (enables resume)")
+    parser.add_argument("--reset", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--max-rows", type=int, help="Stop after reading this many rows")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Seconds to sleep between batches (throttle on a live DB)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.reset and args.checkpoint and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    job = QualityBackfillJob(
+        engine,
+        batch_size=args.batch_size,
+        page_size=args.page_size,
+        checkpoint_path=args.checkpoint,
+        pause_seconds=args.pause
+    )
+    checkpoint = job.run(max_rows=args.max_rows)
+
+    print(
+        f"Done: {checkpoint.processed} read, {checkpoint.updated} updated, "
+        f"{checkpoint.skipped} skipped in {checkpoint.elapsed_seconds:.1f}s "
+        f"({checkpoint.rows_per_second:.0f} rows/s)"
+    )
+
+    # Backfilled rows change per-day confidence/pattern counts; only the
+    # days they fall on (this run's and, with a checkpoint, earlier ones')
+    if job.updated_days:
+        db = SessionLocal()
+        try:
+            days = rebuild_quality_rollups(db, days=job.updated_days)
+        finally:
+            db.close()
+        print(f"Rebuilt {days} daily quality rollup rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Biometric Ingest Benchmark - per-sample frames vs 1 s batches (JSON and binary)
+
+Measures server-side CPU per sample for each message shape through
+SessionManager (parse, validate, buffer, safety rules) and the number of
+4 Hz sessions one worker core could sustain at that cost.
+
+Usage (from backend/):
+    python scripts/benchmark_biometric_ingest.py
+    python scripts/benchmark_biometric_ingest.py --sessions 50 --seconds 120 --batch-seconds 1
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SESSION_SERVICE_DIR = os.path.join(BACKEND_DIR, "services", "session-service")
+sys.path.insert(0, SESSION_SERVICE_DIR)
+# The service builds its default store on import; keep it out of the tree
+os.environ.setdefault(
+    "SESSION_STORE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_sessions.db')}"
+)
+
+from biometric_batch import BiometricBatch
+from session_store import InMemorySessionStore, SessionShards
+
+_spec = importlib.util.spec_from_file_location("session_service_main", os.path.join(SESSION_SERVICE_DIR, "main.py"))
+service = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(service)
+
+HZ = 4
+
+
+def _readings(index: int):
+    return 72 + index % 5, 55.0 + index % 3, 0.3, 0.25
+
+
+async def _run(mode: str, sessions: int, seconds: int, batch_seconds: int, safety: bool) -> float:
+    manager = service.SessionManager(InMemorySessionStore(), SessionShards(0, 1))
+    session_ids = []
+    for n in range(sessions):
+        session = await manager.create_session(service.CreateSessionRequest(
+            user_id=f"user-{n}",
+            therapeutic_plan_id="plan",
+            session_config=service.SessionConfig(
+                protocol_id="p", ep_type="Physical", safety_checks_enabled=safety
+            )
+        ))
+        await manager.start_session(session.session_id)
+        session_ids.append(session.session_id)
+
+    start = datetime.utcnow()
+    per_batch = HZ * batch_seconds
+    # Pre-encode the frames clients would send, so only server work is timed
+    frames = []
+    for first in range(0, seconds * HZ, per_batch if mode != "sample" else 1):
+        if mode == "sample":
+            hr, hrv, stress, arousal = _readings(first)
+            frames.append(json.dumps({"type": "biometric", "data": {
+                "timestamp": (start + timedelta(seconds=first / HZ)).isoformat(),
+                "heart_rate": hr, "hrv": hrv, "stress_level": stress, "arousal_level": arousal
+            }}))
+            continue
+        indices = range(first, first + per_batch)
+        timestamps = [start.timestamp() + i / HZ for i in indices]
+        rows = [_readings(i) for i in indices]
+        batch = BiometricBatch.from_samples(timestamps, rows)
+        if mode == "binary":
+            frames.append(batch.to_bytes())
+        else:
+            frames.append(json.dumps({"type": "biometric_batch", "data": {
+                "timestamps": timestamps,
+                **{channel: [row[c] for row in rows] for c, channel in enumerate(service.CHANNELS)}
+            }}))
+
+    started = time.perf_counter()
+    for frame in frames:
+        for session_id in session_ids:
+            if mode == "sample":
+                message = json.loads(frame)
+                await manager.add_biometric_data(session_id, service.BiometricData(**message["data"]))
+            elif mode == "json":
+                message = json.loads(frame)
+                await manager.add_biometric_batch(session_id, BiometricBatch.from_columns(message["data"]))
+            else:
+                await manager.add_biometric_batch(session_id, BiometricBatch.from_bytes(frame))
+    elapsed = time.perf_counter() - started
+    return elapsed / (sessions * seconds * HZ) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark biometric ingestion message shapes")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--seconds", type=int, default=60, help="Seconds of 4 Hz data per session")
+    parser.add_argument("--batch-seconds", type=int, default=1)
+    parser.add_argument("--no-safety", action="store_true", help="Ingestion only, without safety rules")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'us/sample':>10} {'sessions/core @4Hz':>20}")
+    baseline = None
+    for mode in ("sample", "json", "binary"):
+        micros = min(
+            asyncio.run(_run(mode, args.sessions, args.seconds, args.batch_seconds, not args.no_safety))
+            for _ in range(args.repeat)
+        )
+        baseline = baseline or micros
+        print(f"{mode:<8} {micros:>10.1f} {1e6 / (micros * HZ):>20,.0f}  x{baseline / micros:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
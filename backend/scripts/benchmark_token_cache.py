@@ -0,0 +1,53 @@
+"""
+Token Cache Benchmark - JWT decode per request vs the verified-token cache
+
+Usage (from backend/):
+    python scripts/benchmark_token_cache.py
+    python scripts/benchmark_token_cache.py --iterations 50000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth.dependencies import ALGORITHM, SECRET_KEY, create_access_token
+from auth.token_cache import VERIFIERS, VerifiedTokenCache, create_verifier
+
+
+def _per_call_microseconds(function, iterations: int) -> float:
+    best = min(timeit.repeat(function, number=iterations, repeat=5))
+    return best / iterations * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark JWT verification with and without the cache")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({
+        "sub": "550e8400-e29b-41d4-a716-446655440000",
+        "email": "user@example.com",
+        "role": "clinician",
+        "username": "benchmark"
+    })
+
+    print(f"{'verifier':<10} {'decode us/op':>14} {'cached us/op':>14} {'speedup':>9}")
+    for name in VERIFIERS:
+        try:
+            verifier = create_verifier(name, SECRET_KEY, ALGORITHM)
+        except ImportError as e:
+            print(f"{name:<10} skipped ({e})")
+            continue
+        cache = VerifiedTokenCache(verifier)
+        cache.verify(token)
+
+        decode = _per_call_microseconds(lambda: verifier.decode(token), args.iterations)
+        cached = _per_call_microseconds(lambda: cache.verify(token), args.iterations)
+        print(f"{name:<10} {decode:>14.2f} {cached:>14.2f} {decode / cached:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Correct HMI Chart Cells - update scoring_lookup_tables and drop the cached chart
+
+The CSV holds one corrected cell per line: q1_score,combined_score,physical_percentage
+
+Usage (from backend/):
+    python scripts/correct_hmi_chart.py <questionnaire_version_id> corrections.csv
+
+Running services keep their own cached chart; restart them (or call
+invalidate_lookup_tables in-process) to pick up the correction.
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from utils.scoring_calculator import correct_lookup_table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Correct HMI chart cells")
+    parser.add_argument("version_id", help="Questionnaire version UUID")
+    parser.add_argument("csv_file", help="q1_score,combined_score,physical_percentage rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    with open(args.csv_file, newline="") as handle:
+        cells = [
+            tuple(int(value) for value in row)
+            for row in csv.reader(handle)
+            if row and row[0].strip().isdigit()
+        ]
+
+    db = SessionLocal()
+    try:
+        updated = correct_lookup_table(db, args.version_id, cells)
+    finally:
+        db.close()
+
+    print(f"Corrected {updated} of {len(cells)} chart cells")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Async DB Load Test - concurrent assessment work against the async engine
+
+Runs the same number of concurrent tasks at several pool sizes and prints
+throughput, so scaling with pool size is visible. Needs a reachable
+database and asyncpg.
+
+Usage (from backend/):
+    python scripts/load_test_async_db.py                          # pg_sleep probe
+    python scripts/load_test_async_db.py --workload submit        # single-item submissions
+    python scripts/load_test_async_db.py --pool-sizes 1 2 4 8 16 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database import ASYNC_DATABASE_URL, create_async_db_engine
+from services.async_services import AsyncEPAssessmentService
+from utils.pool_telemetry import pool_metrics
+
+
+def _submission(user_id):
+    return {
+        "user_id": user_id,
+        "answers": {str(q): q % 3 != 0 for q in range(1, 37)},
+        "session_id": None,
+        "time_to_complete": 300,
+        "completed_at": None
+    }
+
+
+async def _one_request(factory, workload: str, user_id, sleep_seconds: float) -> None:
+    async with factory() as db:
+        if workload == "sleep":
+            await db.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": sleep_seconds})
+        elif workload == "history":
+            await AsyncEPAssessmentService(db).get_assessment_history_page(user_id, 10)
+        else:
+            await AsyncEPAssessmentService(db).save_assessments_bulk([_submission(user_id)])
+
+
+async def _run(pool_size: int, args) -> float:
+    engine = create_async_db_engine(
+        ASYNC_DATABASE_URL,
+        name=f"load-test-{pool_size}",
+        pool_size=pool_size,
+        max_overflow=0
+    )
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = uuid4()
+    queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            await _one_request(factory, args.workload, user_id, args.sleep)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - started
+    finally:
+        await engine.dispose()
+    return args.requests / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent load against the async DB path")
+    parser.add_argument("--workload", choices=["sleep", "history", "submit"], default="sleep")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent tasks")
+    parser.add_argument("--requests", type=int, default=320, help="Requests per pool size")
+    parser.add_argument("--sleep", type=float, default=0.02, help="pg_sleep seconds (sleep workload)")
+    args = parser.parse_args()
+
+    print(f"workload={args.workload} concurrency={args.concurrency} requests={args.requests}")
+    baseline = None
+    for pool_size in args.pool_sizes:
+        throughput = asyncio.run(_run(pool_size, args))
+        baseline = baseline or throughput
+        wait = pool_metrics()[f"load-test-{pool_size}"]["wait"]
+        print(
+            f"pool_size={pool_size:>3}  {throughput:8.1f} req/s  x{throughput / baseline:.1f}  "
+            f"avg checkout wait {wait['sum_ms'] / max(wait['count'], 1):.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Rebuild Daily Quality Rollups - recompute assessment_quality_daily from user_assessments
+
+Usage (from backend/):
+    python scripts/rebuild_quality_rollups.py            # all history
+    python scripts/rebuild_quality_rollups.py --days 30  # last 30 days only
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from services.quality_rollup import rebuild_quality_rollups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild daily assessment quality rollups")
+    parser.add_argument("--days", type=int, help="Only rebuild this many recent days")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    since = None
+    if args.days is not None:
+        since = (datetime.utcnow() - timedelta(days=args.days)).date()
+
+    db = SessionLocal()
+    try:
+        written = rebuild_quality_rollups(db, since)
+    finally:
+        db.close()
+
+    print(f"Rebuilt {written} daily quality rollup rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Rebuild Trend Aggregates - recompute assessment_trend_aggregates from user_assessments
+
+Usage (from backend/):
+    python scripts/rebuild_trend_aggregates.py               # every user
+    python scripts/rebuild_trend_aggregates.py --user <uuid> # one user
+"""
+import argparse
+import logging
+import os
+import sys
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from services.trend_aggregate import rebuild_trend_aggregates
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild per-user assessment trend aggregates")
+    parser.add_argument("--user", type=UUID, help="Only rebuild this user")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    db = SessionLocal()
+    try:
+        written = rebuild_trend_aggregates(db, args.user)
+    finally:
+        db.close()
+
+    print(f"Rebuilt trend aggregates for {written} users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
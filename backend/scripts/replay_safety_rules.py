@@ -0,0 +1,110 @@
+"""
+Safety Rule Replay - feed recorded biometric streams through the rule engine
+
+Sources: a session exported from GET /api/v1/sessions/{id} (uses its
+biometric_archive, else biometric_data), a JSONL file with one sample per
+line ({"timestamp": ..., "heart_rate": ...}), or a synthetic session.
+
+Usage (from backend/):
+    python scripts/replay_safety_rules.py --synthetic 90
+    python scripts/replay_safety_rules.py --session session.json --rules rules.json
+    python scripts/replay_safety_rules.py --samples stream.jsonl --speed 60
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import sys
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "services", "session-service"))
+
+from biometric_buffer import CHANNELS, BiometricBuffer
+from safety_rules import load_rule_specs, replay
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _sample(record):
+    return _timestamp(record["timestamp"]), {channel: record.get(channel) for channel in CHANNELS}
+
+
+def _session_samples(path):
+    with open(path, encoding="utf-8") as handle:
+        session = json.load(handle)
+    if session.get("biometric_archive"):
+        buffer = BiometricBuffer.from_bytes(base64.b64decode(session["biometric_archive"]))
+        timestamps, values = buffer.to_arrays()
+        for timestamp, row in zip(timestamps.tolist(), values.tolist()):
+            yield timestamp, {
+                channel: None if math.isnan(value) else value
+                for channel, value in zip(buffer.channels, row)
+            }
+    else:
+        for record in session.get("biometric_data", []):
+            yield _sample(record)
+
+
+def _jsonl_samples(path):
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield _sample(json.loads(line))
+
+
+def _synthetic_samples(minutes: float, hz: float = 4.0):
+    """Calm session with a stress episode (HR up, HRV down) two thirds in."""
+    episode_start = minutes * 60 * 2 / 3
+    for index in range(int(minutes * 60 * hz)):
+        t = index / hz
+        in_episode = episode_start <= t < episode_start + 60
+        heart_rate = 72 + 3 * math.sin(t / 7) + (75 if in_episode else 0)
+        hrv = 55 + 4 * math.sin(t / 11) - (30 if in_episode else 0)
+        stress = 0.3 + (0.6 if in_episode else 0)
+        yield 1_700_000_000 + t, {
+            "heart_rate": heart_rate,
+            "hrv": hrv,
+            "stress_level": min(stress, 1.0),
+            "arousal_level": min(stress, 1.0)
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay biometric streams through the safety rules")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--session", help="Session JSON (as returned by the session API)")
+    source.add_argument("--samples", help="JSONL file, one sample per line")
+    source.add_argument("--synthetic", type=float, metavar="MINUTES", help="Synthetic 4 Hz session")
+    parser.add_argument("--rules", help="JSON file with rule specs (default: built-in rules)")
+    parser.add_argument("--speed", type=float, default=0.0, help="Times real time (0 = as fast as possible)")
+    args = parser.parse_args()
+
+    if args.session:
+        samples = _session_samples(args.session)
+    elif args.samples:
+        samples = _jsonl_samples(args.samples)
+    else:
+        samples = _synthetic_samples(args.synthetic)
+
+    result = replay(samples, load_rule_specs(args.rules), speed=args.speed)
+    for alert in result["alerts"]:
+        details = ", ".join(
+            f"{key}={value:.3g}" for key, value in alert.details.items() if value is not None
+        )
+        print(f"{datetime.utcfromtimestamp(alert.timestamp).isoformat()}  {alert.rule:<20} {details}")
+    print(
+        f"{result['samples']} samples, {result['recorded_seconds'] / 60:.1f} recorded minutes "
+        f"in {result['elapsed_seconds']:.3f}s: {result['samples_per_second']:,.0f} samples/s, "
+        f"{result['speedup']:,.0f}x real time, {len(result['alerts'])} alerts"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
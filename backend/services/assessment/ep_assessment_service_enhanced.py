@@ -3,17 +3,21 @@ Enhanced E&P Assessment Service
 Handles scoring, quality metrics, fraud detection, and clinical validation
 """
 
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple, Union
 from datetime import datetime
 from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, tuple_
 
 from models.questionnaire_models import (
     UserAssessment,
     QuestionnaireVersion,
     QuestionnaireQuestion
 )
+from utils.answer_pattern import AnswerPatternProfile
+from services.quality_rollup import record_assessment, record_flag, record_review
+from services.trend_aggregate import record_trend
+from utils.pagination import decode_cursor, encode_cursor
 
 
 class EPAssessmentServiceEnhanced:
@@ -76,11 +80,12 @@ class EPAssessmentServiceEnhanced:
             q1_score, q2_score
         )
         
-        # Quality metrics
+        # Quality metrics (one pass over the answers)
+        answer_profile = AnswerPatternProfile.from_answers(answers, key_prefix="q")
+        pattern_signature = self._detect_answer_pattern(answer_profile)
         confidence_score = self._calculate_confidence_score(
-            answers, time_to_complete
+            answer_profile, time_to_complete, pattern_signature
         )
-        pattern_signature = self._detect_answer_pattern(answers)
         
         # Create assessment
         assessment = UserAssessment(
@@ -105,6 +110,13 @@ class EPAssessmentServiceEnhanced:
         )
         
         self.db.add(assessment)
+        record_assessment(
+            self.db, assessment.completed_at, confidence_score, pattern_signature
+        )
+        record_trend(
+            self.db, user_id, physical_percentage, emotional_percentage,
+            assessment.completed_at
+        )
         self.db.commit()
         self.db.refresh(assessment)
         
@@ -194,8 +206,9 @@ class EPAssessmentServiceEnhanced:
     
     def _calculate_confidence_score(
         self,
-        answers: Dict[str, bool],
-        time_to_complete: Optional[int]
+        answers: Union[Dict[str, bool], AnswerPatternProfile],
+        time_to_complete: Optional[int],
+        pattern: Optional[str] = None
     ) -> float:
         """
         Calculate confidence score (0-100) based on quality indicators
@@ -208,7 +221,8 @@ class EPAssessmentServiceEnhanced:
         score = 100.0
         
         # Pattern detection
-        pattern = self._detect_answer_pattern(answers)
+        if pattern is None:
+            pattern = self._detect_answer_pattern(answers)
         if pattern in ["all_yes", "all_no"]:
             score -= 50
         elif pattern == "alternating":
@@ -228,7 +242,10 @@ class EPAssessmentServiceEnhanced:
         return max(0.0, min(100.0, score))
     
     
-    def _detect_answer_pattern(self, answers: Dict[str, bool]) -> str:
+    def _detect_answer_pattern(
+        self,
+        answers: Union[Dict[str, bool], AnswerPatternProfile]
+    ) -> str:
         """
         Detect suspicious answer patterns
         
@@ -240,8 +257,8 @@ class EPAssessmentServiceEnhanced:
         - 'mostly_no': >80% False
         - 'balanced': Normal distribution
         """
-        values = [answers.get(f"q{i}", False) for i in range(1, 37)]
-        true_count = sum(values)
+        profile = AnswerPatternProfile.coerce(answers, key_prefix="q")
+        true_count = profile.yes_count
         
         # Check for uniform answers
         if true_count == 36:
@@ -250,10 +267,7 @@ class EPAssessmentServiceEnhanced:
             return "all_no"
         
         # Check for alternating pattern
-        alternating = all(
-            values[i] != values[i + 1] for i in range(len(values) - 1)
-        )
-        if alternating:
+        if profile.transitions == 35:
             return "alternating"
         
         # Check for skewed distribution
@@ -389,17 +403,41 @@ class EPAssessmentServiceEnhanced:
         self,
         user_id: UUID,
         limit: int = 10,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[UserAssessment]:
-        """Get assessment history with pagination"""
-        return (
+        """
+        Get assessment history with pagination
+        
+        Ordered by (completed_at, id), newest first. Pass cursor (see
+        history_cursor) instead of offset for constant-cost deep pages.
+        """
+        query = (
             self.db.query(UserAssessment)
             .filter(UserAssessment.user_id == user_id)
-            .order_by(desc(UserAssessment.created_at))
-            .limit(limit)
-            .offset(offset)
-            .all()
         )
+        if cursor:
+            position = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(UserAssessment.completed_at, UserAssessment.id)
+                < tuple_(position.completed_at, UUID(position.id))
+            )
+        query = query.order_by(
+            desc(UserAssessment.completed_at),
+            desc(UserAssessment.id)
+        )
+        if offset and not cursor:
+            query = query.offset(offset)
+        return query.limit(limit).all()
+    
+    
+    @staticmethod
+    def history_cursor(assessments: List[UserAssessment]) -> Optional[str]:
+        """Cursor for the page after `assessments` (None if empty)"""
+        if not assessments:
+            return None
+        last = assessments[-1]
+        return encode_cursor(last.completed_at, last.id)
     
     
     # ========================================================================
@@ -417,7 +455,10 @@ class EPAssessmentServiceEnhanced:
         if not assessment:
             raise ValueError(f"Assessment {assessment_id} not found")
         
+        if not assessment.flagged_for_review:
+            record_flag(self.db, assessment.completed_at)
         assessment.clinical_notes = f"FLAGGED: {reason}"
+        assessment.flagged_for_review = True
         assessment.updated_at = datetime.utcnow()
         
         self.db.commit()
@@ -438,6 +479,8 @@ class EPAssessmentServiceEnhanced:
         if not assessment:
             raise ValueError(f"Assessment {assessment_id} not found")
         
+        if assessment.reviewed_at is None:
+            record_review(self.db, assessment.completed_at)
         assessment.reviewed_by = reviewer_id
         assessment.reviewed_at = datetime.utcnow()
         assessment.clinical_notes = notes or ""
@@ -454,7 +497,7 @@ class EPAssessmentServiceEnhanced:
         return (
             self.db.query(UserAssessment)
             .filter(
-                UserAssessment.clinical_notes.like("FLAGGED:%"),
+                UserAssessment.flagged_for_review.is_(True),
                 UserAssessment.reviewed_at.is_(None)
             )
             .order_by(desc(UserAssessment.created_at))
@@ -0,0 +1,66 @@
+"""
+Async Service Variants
+Awaitable E&P services for async routes, over an AsyncSession or a sync Session
+"""
+from typing import Any, Callable, Type, Union
+import asyncio
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+from services.suggestibility_service import SuggestibilityService
+
+
+class AsyncServiceAdapter:
+    """
+    Awaitable facade over a synchronous service class.
+
+    Every public method of service_class is available as a coroutine with
+    the same arguments. With an AsyncSession the call runs through
+    AsyncSession.run_sync, so its queries go over the async driver
+    (asyncpg) without blocking the event loop. With a sync Session
+    (DATABASE_ASYNC unset, scripts, tests) the call runs in a worker
+    thread. Either way the loop keeps serving other requests while a
+    query is in flight, and concurrency is bounded by the pool size.
+
+    Calls on one adapter must be awaited one at a time (a session is not
+    safe for concurrent use); concurrent requests each get their own
+    session from the dependency.
+    """
+
+    service_class: Type = None
+
+    def __init__(self, db: Union[AsyncSession, Session]):
+        self.db = db
+
+    async def run(self, method: str, *args, **kwargs) -> Any:
+        """Run service_class(session).<method>(*args, **kwargs)."""
+        def call(session: Session) -> Any:
+            return getattr(self.service_class(session), method)(*args, **kwargs)
+
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(call)
+        return await asyncio.to_thread(call, self.db)
+
+    def __getattr__(self, name: str) -> Callable:
+        if name.startswith("_") or not callable(getattr(self.service_class, name, None)):
+            raise AttributeError(
+                f"{type(self).__name__!r} has no attribute {name!r}"
+            )
+
+        async def method(*args, **kwargs):
+            return await self.run(name, *args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+
+class AsyncEPAssessmentService(AsyncServiceAdapter):
+    """Async variant of EPAssessmentServiceEnhanced"""
+    service_class = EPAssessmentServiceEnhanced
+
+
+class AsyncSuggestibilityService(AsyncServiceAdapter):
+    """Async variant of SuggestibilityService"""
+    service_class = SuggestibilityService
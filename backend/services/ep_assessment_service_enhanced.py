@@ -3,10 +3,13 @@ E&P Suggestibility Assessment Service - Enhanced Edition
 FIXED: Uses your existing models from questionnaire_models
 """
 import uuid
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Union
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy import text
+import json
 import logging
+import numpy as np
 
 # Use YOUR existing models
 from models.questionnaire_models import (
@@ -18,10 +21,116 @@ from models.questionnaire_models import (
     QuestionnaireQuestion,
     TherapeuticApproach
 )
+from utils.answer_pattern import AnswerPatternProfile, AnswerPatternBatch, QUESTION_COUNT
+from utils.pagination import HistoryCursor, decode_cursor, encode_cursor
+from utils.preference_cache import PreferenceCache, communication_preferences_cache
+from utils.question_catalogue import question_catalogue_cache
+from utils.scoring_calculator import SuggestibilityScorer
+from services.quality_backfill import QualityBackfillJob
+from services.quality_rollup import (
+    get_quality_rollup,
+    rebuild_quality_rollups,
+    record_assessments,
+    record_flag,
+    record_review
+)
+from services.trend_aggregate import record_trends
 
 logger = logging.getLogger(__name__)
 
 
+# Largest batch accepted by save_assessments_bulk
+BULK_SUBMIT_LIMIT = 5000
+
+# One statement for the whole batch: 18 array parameters, whatever its size
+_BULK_INSERT = text("""
+    INSERT INTO user_assessments (
+        id, user_id, session_id, questionnaire_version_id,
+        q1_score, q2_score, combined_score,
+        physical_percentage, emotional_percentage, suggestibility_type,
+        answers, completed_at,
+        confidence_score, answer_pattern_signature, completion_percentage,
+        time_to_complete_seconds, clinical_notes, flagged_for_review
+    )
+    SELECT
+        v.id, v.user_id, v.session_id, CAST(:questionnaire_version_id AS uuid),
+        v.q1_score, v.q2_score, v.combined_score,
+        v.physical_percentage, v.emotional_percentage, v.suggestibility_type,
+        CAST(v.answers AS jsonb), v.completed_at,
+        v.confidence_score, v.answer_pattern, v.completion_percentage,
+        v.time_to_complete, v.clinical_notes, v.flagged
+    FROM unnest(
+        CAST(:ids AS uuid[]), CAST(:user_ids AS uuid[]), CAST(:session_ids AS uuid[]),
+        CAST(:q1_scores AS integer[]), CAST(:q2_scores AS integer[]),
+        CAST(:combined_scores AS integer[]), CAST(:physical_percentages AS integer[]),
+        CAST(:emotional_percentages AS integer[]), CAST(:suggestibility_types AS text[]),
+        CAST(:answers AS text[]), CAST(:completed_ats AS timestamp[]),
+        CAST(:confidence_scores AS double precision[]), CAST(:answer_patterns AS text[]),
+        CAST(:completion_percentages AS double precision[]),
+        CAST(:times_to_complete AS integer[]), CAST(:clinical_notes AS text[]),
+        CAST(:flagged AS boolean[])
+    ) AS v(
+        id, user_id, session_id,
+        q1_score, q2_score, combined_score,
+        physical_percentage, emotional_percentage, suggestibility_type,
+        answers, completed_at,
+        confidence_score, answer_pattern, completion_percentage,
+        time_to_complete, clinical_notes, flagged
+    )
+""")
+
+# Stored columns behind the AssessmentResponse-shaped items (_assessment_item)
+_ASSESSMENT_COLUMNS = """
+    id, user_id, session_id, questionnaire_version_id,
+    q1_score, q2_score, combined_score,
+    physical_percentage, emotional_percentage, suggestibility_type,
+    answers, completed_at,
+    confidence_score, answer_pattern_signature, completion_percentage,
+    time_to_complete_seconds, flagged_for_review
+"""
+
+# Records the review and reports whether it was the assessment's first
+_MARK_REVIEWED = text("""
+    WITH previous AS (
+        SELECT id, reviewed_at
+        FROM user_assessments
+        WHERE id = CAST(:assessment_id AS uuid)
+        FOR UPDATE
+    )
+    UPDATE user_assessments AS ua
+    SET
+        reviewed_by = CAST(:reviewer_id AS uuid),
+        reviewed_at = :reviewed_at,
+        clinical_notes = CASE
+            WHEN COALESCE(ua.clinical_notes, '') = '' THEN :note
+            ELSE ua.clinical_notes || E'\\n' || :note
+        END
+    FROM previous
+    WHERE ua.id = previous.id
+    RETURNING ua.completed_at, previous.reviewed_at IS NULL AS first_review
+""")
+
+# Flags the assessment and reports whether it was flagged already
+_FLAG_FOR_REVIEW = text("""
+    WITH previous AS (
+        SELECT id, flagged_for_review
+        FROM user_assessments
+        WHERE id = CAST(:assessment_id AS uuid)
+        FOR UPDATE
+    )
+    UPDATE user_assessments AS ua
+    SET
+        flagged_for_review = TRUE,
+        clinical_notes = CASE
+            WHEN COALESCE(ua.clinical_notes, '') = '' THEN :note
+            ELSE ua.clinical_notes || E'\\n' || :note
+        END
+    FROM previous
+    WHERE ua.id = previous.id
+    RETURNING ua.completed_at, NOT COALESCE(previous.flagged_for_review, FALSE) AS first_flag
+""")
+
+
 class QualityMetrics:
     """Quality metrics for assessment (lightweight class)"""
     def __init__(
@@ -47,8 +156,13 @@ class EPAssessmentServiceEnhanced:
     Uses your existing models with added quality features
     """
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        preferences_cache: Optional[PreferenceCache] = None
+    ):
         self.db = db
+        self.preferences_cache = preferences_cache or communication_preferences_cache
     
     def calculate_quality_metrics(
         self, 
@@ -56,10 +170,12 @@ class EPAssessmentServiceEnhanced:
         time_to_complete: Optional[int] = None
     ) -> QualityMetrics:
         """Calculate quality metrics for the assessment"""
-        pattern = self._detect_answer_pattern(answers)
-        confidence = self._calculate_confidence_score(answers, time_to_complete)
-        consistency = self._calculate_consistency(answers)
-        completion_pct = (len(answers) / 36) * 100
+        # One pass over the answers; every metric reads the same profile
+        profile = AnswerPatternProfile.from_answers(answers)
+        pattern = self._detect_answer_pattern(profile)
+        confidence = self._calculate_confidence_score(profile, time_to_complete, pattern)
+        consistency = self._calculate_consistency(profile, pattern)
+        completion_pct = (profile.answer_count / 36) * 100
         needs_review = self._needs_clinical_review(pattern, confidence, time_to_complete)
         
         return QualityMetrics(
@@ -71,15 +187,18 @@ class EPAssessmentServiceEnhanced:
             review_reasons=self._get_review_reasons(pattern, confidence, time_to_complete)
         )
     
-    def _detect_answer_pattern(self, answers: Dict[str, bool]) -> str:
+    def _detect_answer_pattern(
+        self,
+        answers: Union[Dict[str, bool], AnswerPatternProfile]
+    ) -> str:
         """Detect suspicious answer patterns"""
-        if not answers:
+        profile = AnswerPatternProfile.coerce(answers)
+        if not profile.answer_count:
             return "empty"
         
-        values = [answers.get(str(i), False) for i in range(1, 37)]
-        yes_count = sum(values)
-        total = len(values)
-        yes_ratio = yes_count / total if total > 0 else 0
+        yes_count = profile.yes_count
+        total = 36
+        yes_ratio = profile.yes_ratio
         
         if yes_count == total:
             return "all_yes"
@@ -90,12 +209,10 @@ class EPAssessmentServiceEnhanced:
         elif yes_ratio < 0.15:
             return "mostly_no"
         
-        alternations = sum(1 for i in range(len(values)-1) if values[i] != values[i+1])
-        if alternations >= len(values) * 0.9:
+        if profile.transitions >= total * 0.9:
             return "alternating"
         
-        max_streak = self._get_max_streak(values)
-        if max_streak >= 10:
+        if profile.max_streak >= 10:
             return "suspicious"
         
         return "balanced"
@@ -105,28 +222,35 @@ class EPAssessmentServiceEnhanced:
         if not values:
             return 0
         
-        max_streak = 1
-        current_streak = 1
+        mask = 0
+        for i, value in enumerate(values):
+            if value:
+                mask |= 1 << i
         
-        for i in range(1, len(values)):
-            if values[i] == values[i-1]:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 1
-        
-        return max_streak
+        ones = zeros = 0
+        remaining, inverse = mask, ~mask & ((1 << len(values)) - 1)
+        while remaining:
+            remaining &= remaining << 1
+            ones += 1
+        while inverse:
+            inverse &= inverse << 1
+            zeros += 1
+        return max(ones, zeros)
     
     def _calculate_confidence_score(
         self, 
-        answers: Dict[str, bool],
-        time_to_complete: Optional[int] = None
+        answers: Union[Dict[str, bool], AnswerPatternProfile],
+        time_to_complete: Optional[int] = None,
+        pattern: Optional[str] = None
     ) -> float:
         """Calculate confidence score (0-100)"""
+        profile = AnswerPatternProfile.coerce(answers)
         score = 100.0
         
-        yes_count = sum(1 for v in answers.values() if v)
-        yes_ratio = yes_count / len(answers) if answers else 0
+        yes_ratio = (
+            profile.value_yes_count / profile.answer_count
+            if profile.answer_count else 0
+        )
         
         if yes_ratio > 0.9 or yes_ratio < 0.1:
             score -= 40
@@ -141,7 +265,8 @@ class EPAssessmentServiceEnhanced:
             elif 180 <= time_to_complete <= 600:
                 score += 10
         
-        pattern = self._detect_answer_pattern(answers)
+        if pattern is None:
+            pattern = self._detect_answer_pattern(profile)
         if pattern in ['all_yes', 'all_no', 'alternating']:
             score -= 50
         elif pattern in ['suspicious']:
@@ -149,9 +274,14 @@ class EPAssessmentServiceEnhanced:
         
         return max(0.0, min(100.0, score))
     
-    def _calculate_consistency(self, answers: Dict[str, bool]) -> float:
+    def _calculate_consistency(
+        self,
+        answers: Union[Dict[str, bool], AnswerPatternProfile],
+        pattern: Optional[str] = None
+    ) -> float:
         """Calculate response consistency (0-100)"""
-        pattern = self._detect_answer_pattern(answers)
+        if pattern is None:
+            pattern = self._detect_answer_pattern(answers)
         
         if pattern == "balanced":
             return 85.0
@@ -160,6 +290,86 @@ class EPAssessmentServiceEnhanced:
         else:
             return 50.0
     
+    def calculate_quality_metrics_batch(
+        self,
+        batch: AnswerPatternBatch,
+        time_to_complete: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_quality_metrics for backfills
+        
+        Args:
+            batch: Answer pattern features for N assessments
+            time_to_complete: Optional (N,) seconds; NaN or 0 = unknown
+            
+        Returns:
+            Dict of (N,) arrays: answer_pattern, confidence_score,
+            consistency_score, completion_percentage, needs_review
+        """
+        n = len(batch)
+        answer_count = batch.answer_count.astype(np.float64)
+        yes_ratio = batch.yes_count / 36
+        
+        pattern = np.select(
+            [
+                batch.answer_count == 0,
+                batch.yes_count == 36,
+                batch.yes_count == 0,
+                yes_ratio > 0.85,
+                yes_ratio < 0.15,
+                batch.transitions >= 36 * 0.9,
+                batch.max_streak >= 10
+            ],
+            ["empty", "all_yes", "all_no", "mostly_yes", "mostly_no",
+             "alternating", "suspicious"],
+            default="balanced"
+        ).astype(object)
+        
+        # Confidence (same rules as _calculate_confidence_score)
+        value_ratio = np.divide(
+            batch.value_yes_count, answer_count,
+            out=np.zeros(n), where=answer_count > 0
+        )
+        score = np.full(n, 100.0)
+        extreme = (value_ratio > 0.9) | (value_ratio < 0.1)
+        skewed = ~extreme & ((value_ratio > 0.8) | (value_ratio < 0.2))
+        score -= np.where(extreme, 40, np.where(skewed, 20, 0))
+        
+        if time_to_complete is None:
+            time_to_complete = np.full(n, np.nan)
+        times = np.nan_to_num(np.asarray(time_to_complete, dtype=np.float64), nan=0.0)
+        timed = times != 0
+        score += np.select(
+            [timed & (times < 120), timed & (times > 1200),
+             timed & (times >= 180) & (times <= 600)],
+            [-30, -10, 10],
+            default=0
+        )
+        
+        fraud = np.isin(pattern, ['all_yes', 'all_no', 'alternating'])
+        score -= np.where(fraud, 50, np.where(pattern == 'suspicious', 30, 0))
+        confidence = np.clip(score, 0.0, 100.0)
+        
+        consistency = np.select(
+            [pattern == 'balanced', np.isin(pattern, ['mostly_yes', 'mostly_no'])],
+            [85.0, 70.0],
+            default=50.0
+        )
+        
+        needs_review = (
+            (confidence < 60)
+            | np.isin(pattern, ['all_yes', 'all_no', 'alternating', 'suspicious'])
+            | (timed & (times < 90))
+        )
+        
+        return {
+            "answer_pattern": pattern,
+            "confidence_score": confidence,
+            "consistency_score": consistency,
+            "completion_percentage": (answer_count / 36) * 100,
+            "needs_review": needs_review
+        }
+    
     def _needs_clinical_review(
         self,
         pattern: str,
@@ -216,40 +426,192 @@ class EPAssessmentServiceEnhanced:
             time_to_complete: Optional time in seconds
             
         Returns:
-            tuple: (AssessmentResult, QualityMetrics)
+            tuple: (saved item (see save_assessments_bulk), QualityMetrics)
+        """
+        if submission.user_id is None:
+            raise ValueError("submission.user_id is required")
+        
+        answers = {str(number): answer for number, answer in submission.answers.items()}
+        saved = self.save_assessment(
+            submission.user_id,
+            answers,
+            session_id=submission.session_id,
+            time_to_complete=time_to_complete
+        )
+        quality = self.calculate_quality_metrics(answers, time_to_complete)
+        return saved, quality
+    
+    def save_assessments_bulk(
+        self,
+        submissions: List[Dict],
+        questionnaire_version: str = "1.0"
+    ) -> List[Dict]:
         """
-        # Calculate quality metrics
-        quality = self.calculate_quality_metrics(
-            submission.answers,
-            time_to_complete
+        Score and save many assessments in one transaction
+        
+        Scoring (SuggestibilityScorer.score_batch) and quality metrics
+        (calculate_quality_metrics_batch) run once over the whole batch
+        from a single fold of the answers; rows are written with one
+        INSERT ... SELECT FROM unnest(...), and the daily rollups and trend
+        aggregates with one batched statement each. Auto-flagging follows
+        save_assessment_with_quality: flagged rows get an "AUTO-FLAGGED"
+        clinical note and flagged_for_review.
+        
+        Args:
+            submissions: Validated dicts with user_id, answers ("1"-"36"),
+                and optional session_id, time_to_complete, completed_at
+            questionnaire_version: HMI questionnaire version to score with
+            
+        Returns:
+            One dict per submission, in order: assessment_id, user_id,
+            session_id, questionnaire_version_id, scores, quality_metrics,
+            completed_at
+        """
+        if not submissions:
+            return []
+        if len(submissions) > BULK_SUBMIT_LIMIT:
+            raise ValueError(
+                f"At most {BULK_SUBMIT_LIMIT} submissions per batch, got {len(submissions)}"
+            )
+        
+        version = question_catalogue_cache.get_version(self.db, questionnaire_version)
+        if not version:
+            raise ValueError(f"Questionnaire version {questionnaire_version} not found")
+        version_id = str(version.id)
+        
+        # One pass over every answer dict; scoring reads the same masks
+        batch = AnswerPatternBatch.from_answers(s["answers"] for s in submissions)
+        bits = np.arange(QUESTION_COUNT, dtype=np.uint64)
+        answer_matrix = ((batch.masks[:, None] >> bits) & np.uint64(1)).astype(bool)
+        scores = SuggestibilityScorer(self.db).score_batch(answer_matrix, version_id)
+        
+        times = np.array(
+            [s.get("time_to_complete") or np.nan for s in submissions],
+            dtype=np.float64
         )
+        quality = self.calculate_quality_metrics_batch(batch, times)
         
-        # Update submission with quality data if fields exist
-        if hasattr(submission, 'confidence_score'):
-            submission.confidence_score = quality.confidence_score
+        now = datetime.utcnow()
+        results = []
+        for index, submission in enumerate(submissions):
+            pattern = str(quality["answer_pattern"][index])
+            confidence = float(quality["confidence_score"][index])
+            needs_review = bool(quality["needs_review"][index])
+            reasons = []
+            if needs_review:
+                reasons = self._get_review_reasons(
+                    pattern, confidence, submission.get("time_to_complete")
+                )
+            results.append({
+                "assessment_id": uuid.uuid4(),
+                "user_id": submission["user_id"],
+                "session_id": submission.get("session_id"),
+                "questionnaire_version_id": version_id,
+                "scores": {
+                    "q1_score": int(scores["q1_score"][index]),
+                    "q2_score": int(scores["q2_score"][index]),
+                    "combined_score": int(scores["combined_score"][index]),
+                    "physical_percentage": int(scores["physical_percentage"][index]),
+                    "emotional_percentage": int(scores["emotional_percentage"][index]),
+                    "suggestibility_type": str(scores["suggestibility_type"][index])
+                },
+                "quality_metrics": {
+                    "confidence_score": confidence,
+                    "answer_pattern": pattern,
+                    "consistency_score": float(quality["consistency_score"][index]),
+                    "completion_percentage": float(quality["completion_percentage"][index]),
+                    "needs_review": needs_review,
+                    "review_reasons": reasons
+                },
+                "completed_at": submission.get("completed_at") or now
+            })
         
-        if hasattr(submission, 'answer_pattern_signature'):
-            submission.answer_pattern_signature = quality.answer_pattern
+        flagged = sum(result["quality_metrics"]["needs_review"] for result in results)
+        if flagged:
+            logger.warning(f"{flagged} of {len(results)} assessments auto-flagged")
         
-        if hasattr(submission, 'completion_percentage'):
-            submission.completion_percentage = quality.completion_percentage
+        try:
+            self.db.execute(_BULK_INSERT, {
+                "questionnaire_version_id": version_id,
+                "ids": [str(r["assessment_id"]) for r in results],
+                "user_ids": [str(r["user_id"]) for r in results],
+                "session_ids": [
+                    str(r["session_id"]) if r["session_id"] else None for r in results
+                ],
+                "q1_scores": [r["scores"]["q1_score"] for r in results],
+                "q2_scores": [r["scores"]["q2_score"] for r in results],
+                "combined_scores": [r["scores"]["combined_score"] for r in results],
+                "physical_percentages": [r["scores"]["physical_percentage"] for r in results],
+                "emotional_percentages": [r["scores"]["emotional_percentage"] for r in results],
+                "suggestibility_types": [r["scores"]["suggestibility_type"] for r in results],
+                "answers": [json.dumps(s["answers"]) for s in submissions],
+                "completed_ats": [r["completed_at"] for r in results],
+                "confidence_scores": [r["quality_metrics"]["confidence_score"] for r in results],
+                "answer_patterns": [r["quality_metrics"]["answer_pattern"] for r in results],
+                "completion_percentages": [
+                    r["quality_metrics"]["completion_percentage"] for r in results
+                ],
+                "times_to_complete": [s.get("time_to_complete") for s in submissions],
+                "clinical_notes": [
+                    f"AUTO-FLAGGED: {', '.join(r['quality_metrics']['review_reasons'])}"
+                    if r["quality_metrics"]["needs_review"] else None
+                    for r in results
+                ],
+                "flagged": [r["quality_metrics"]["needs_review"] for r in results]
+            })
+            record_assessments(self.db, (
+                (
+                    r["completed_at"],
+                    r["quality_metrics"]["confidence_score"],
+                    r["quality_metrics"]["answer_pattern"],
+                    r["quality_metrics"]["needs_review"]
+                )
+                for r in results
+            ))
+            record_trends(self.db, (
+                (
+                    r["user_id"],
+                    r["completed_at"],
+                    r["scores"]["physical_percentage"],
+                    r["scores"]["emotional_percentage"]
+                )
+                for r in results
+            ))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         
-        if hasattr(submission, 'time_to_complete_seconds'):
-            submission.time_to_complete_seconds = time_to_complete
+        for user_id in {str(r["user_id"]) for r in results}:
+            self.preferences_cache.invalidate(user_id)
         
-        # Auto-flag if needed
-        if quality.needs_review and hasattr(submission, 'clinical_notes'):
-            note = f"AUTO-FLAGGED: {', '.join(quality.review_reasons)}"
-            submission.clinical_notes = note
-            logger.warning(f"Assessment auto-flagged: {quality.review_reasons}")
+        logger.info(f"Saved {len(results)} assessments")
+        return results
+    
+    def save_assessment(
+        self,
+        user_id: Union[str, uuid.UUID],
+        answers: Dict[str, bool],
+        session_id: Optional[str] = None,
+        time_to_complete: Optional[int] = None,
+        questionnaire_version: str = "1.0"
+    ) -> Dict:
+        """
+        Score, quality-check and save one assessment
         
-        # Save to database (your existing logic handles this)
-        self.db.add(submission)
-        self.db.commit()
-        self.db.refresh(submission)
+        A batch of one through save_assessments_bulk, so single and bulk
+        submissions share scoring, auto-flagging, rollup/trend upkeep and
+        cache invalidation.
         
-        # Return submission and quality metrics
-        return submission, quality
+        Returns:
+            The saved item (see save_assessments_bulk)
+        """
+        return self.save_assessments_bulk([{
+            "user_id": user_id,
+            "answers": answers,
+            "session_id": session_id,
+            "time_to_complete": time_to_complete
+        }], questionnaire_version)[0]
     
     def get_quality_for_existing_assessment(
         self,
@@ -259,98 +621,406 @@ class EPAssessmentServiceEnhanced:
         Get quality metrics for an existing assessment
         Useful for backfilling quality data
         """
-        assessment = self.db.query(AssessmentSubmission).filter(
-            AssessmentSubmission.id == assessment_id
-        ).first()
+        row = self.db.execute(text("""
+            SELECT answers, time_to_complete_seconds
+            FROM user_assessments
+            WHERE id = CAST(:assessment_id AS uuid)
+        """), {"assessment_id": str(assessment_id)}).fetchone()
         
-        if not assessment or not assessment.answers:
+        if row is None or not row[0]:
             return None
         
-        time = None
-        if hasattr(assessment, 'time_to_complete_seconds'):
-            time = assessment.time_to_complete_seconds
+        answers, time_to_complete = row
+        return self.calculate_quality_metrics(answers, time_to_complete)
+    
+    def get_assessment_history_page(
+        self,
+        user_id: uuid.UUID,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """
+        Get one page of a user's history, newest first
+        
+        Keyset pagination on (completed_at, id): every page costs one
+        index range scan however deep it is. Pass the returned next_cursor
+        to get the following page; it is None on the last page.
+        
+        Raises:
+            InvalidCursorError: cursor is not a token from a previous page
+        """
+        position = decode_cursor(cursor) if cursor else None
+        rows = self._fetch_history_rows(user_id, limit + 1, position)
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+        
+        return {
+            "items": [self._history_item(row) for row in rows],
+            "next_cursor": next_cursor
+        }
+    
+    def iter_assessment_history(
+        self,
+        user_id: Optional[uuid.UUID] = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict]:
+        """
+        Stream history items for export (one user, or all users if None)
+        
+        Walks the same keyset pages as get_assessment_history_page, so
+        memory stays at one batch and deep batches are as cheap as the first.
+        """
+        position = None
+        while True:
+            rows = self._fetch_history_rows(user_id, batch_size, position)
+            for row in rows:
+                yield self._history_item(row)
+            if len(rows) < batch_size:
+                return
+            position = HistoryCursor(rows[-1][1], str(rows[-1][0]))
+    
+    def _fetch_history_rows(
+        self,
+        user_id: Optional[uuid.UUID],
+        limit: int,
+        position: Optional[HistoryCursor]
+    ) -> List:
+        """One keyset page ordered by (completed_at DESC, id DESC)"""
+        conditions = ["completed_at IS NOT NULL"]
+        params = {"limit": limit}
+        if user_id is not None:
+            conditions.append("user_id = :user_id")
+            params["user_id"] = str(user_id)
+        if position is not None:
+            conditions.append(
+                "(completed_at, id) < (:cursor_completed_at, CAST(:cursor_id AS uuid))"
+            )
+            params["cursor_completed_at"] = position.completed_at
+            params["cursor_id"] = position.id
+        
+        query = text(f"""
+            SELECT
+                id,
+                completed_at,
+                user_id,
+                suggestibility_type,
+                physical_percentage,
+                emotional_percentage,
+                confidence_score,
+                answer_pattern_signature,
+                time_to_complete_seconds,
+                flagged_for_review
+            FROM user_assessments
+            WHERE {' AND '.join(conditions)}
+            ORDER BY completed_at DESC, id DESC
+            LIMIT :limit
+        """)
+        return self.db.execute(query, params).fetchall()
+    
+    def _history_item(self, row) -> Dict:
+        """History item from a stored row (metrics are not recomputed)"""
+        (
+            assessment_id, completed_at, user_id, suggestibility_type,
+            physical_percentage, emotional_percentage, confidence,
+            pattern, time_to_complete, flagged
+        ) = row
+        
+        needs_review = bool(flagged)
+        if confidence is not None and pattern is not None:
+            needs_review = needs_review or self._needs_clinical_review(
+                pattern, confidence, time_to_complete
+            )
         
-        return self.calculate_quality_metrics(assessment.answers, time)
+        return {
+            "assessment_id": str(assessment_id),
+            "user_id": str(user_id) if user_id else None,
+            "completed_at": completed_at,
+            "suggestibility_type": suggestibility_type,
+            "physical_percentage": physical_percentage,
+            "emotional_percentage": emotional_percentage,
+            "confidence_score": confidence,
+            "answer_pattern": pattern,
+            "needs_review": needs_review
+        }
+    
+    def get_user_assessment_history(
+        self,
+        user_id: Union[str, uuid.UUID],
+        limit: int = 10
+    ) -> List[Dict]:
+        """Full items (scores and quality metrics) of a user's latest assessments"""
+        rows = self.db.execute(text(f"""
+            SELECT {_ASSESSMENT_COLUMNS}
+            FROM user_assessments
+            WHERE user_id = :user_id AND completed_at IS NOT NULL
+            ORDER BY completed_at DESC, id DESC
+            LIMIT :limit
+        """), {"user_id": str(user_id), "limit": limit}).fetchall()
+        return [self._assessment_item(row) for row in rows]
+    
+    def _assessment_item(self, row) -> Dict:
+        """
+        Item in the save_assessments_bulk shape from a stored row
+        
+        Stored metrics are used as they are; rows saved before quality
+        metrics existed get them computed from their answers.
+        """
+        (
+            assessment_id, user_id, session_id, questionnaire_version_id,
+            q1_score, q2_score, combined_score,
+            physical_percentage, emotional_percentage, suggestibility_type,
+            answers, completed_at,
+            confidence, pattern, completion, time_to_complete, flagged
+        ) = row
+        
+        if confidence is None or pattern is None:
+            if isinstance(answers, str):
+                answers = json.loads(answers)
+            quality = self.calculate_quality_metrics(answers or {}, time_to_complete)
+            confidence, pattern = quality.confidence_score, quality.answer_pattern
+            completion = quality.completion_percentage
+        
+        reasons = self._get_review_reasons(pattern, confidence, time_to_complete)
+        return {
+            "assessment_id": str(assessment_id),
+            "user_id": str(user_id) if user_id else None,
+            "session_id": str(session_id) if session_id else None,
+            "questionnaire_version_id": str(questionnaire_version_id),
+            "scores": {
+                "q1_score": q1_score,
+                "q2_score": q2_score,
+                "combined_score": combined_score,
+                "physical_percentage": physical_percentage,
+                "emotional_percentage": emotional_percentage,
+                "suggestibility_type": suggestibility_type
+            },
+            "quality_metrics": {
+                "confidence_score": confidence,
+                "answer_pattern": pattern,
+                "consistency_score": self._calculate_consistency(answers, pattern),
+                "completion_percentage": completion if completion is not None else 100.0,
+                "needs_review": bool(flagged) or self._needs_clinical_review(
+                    pattern, confidence, time_to_complete
+                ),
+                "review_reasons": reasons
+            },
+            "completed_at": completed_at
+        }
+    
+    def get_communication_preferences(self, user_id: Union[str, uuid.UUID]) -> Dict:
+        """
+        Get AI communication preferences based on the latest assessment
+        
+        Served from the per-user preferences cache; saving an assessment
+        invalidates it. Users without an assessment get the balanced
+        style with confidence 0.
+        """
+        found, latest = self.preferences_cache.get(user_id)
+        if not found:
+            row = self.db.execute(text("""
+                SELECT suggestibility_type, confidence_score, completed_at
+                FROM user_assessments
+                WHERE user_id = :user_id AND completed_at IS NOT NULL
+                ORDER BY completed_at DESC, id DESC
+                LIMIT 1
+            """), {"user_id": str(user_id)}).fetchone()
+            latest = None
+            if row is not None:
+                latest = {
+                    "suggestibility_type": row[0],
+                    "confidence": float(row[1] or 0),
+                    "assessment_date": row[2].isoformat()
+                }
+            self.preferences_cache.set(user_id, latest)
+        
+        if latest is None:
+            preferences = self._get_communication_style(None)
+            preferences["confidence"] = 0
+            preferences["warning"] = "No assessment completed"
+            return preferences
+        
+        preferences = self._get_communication_style(latest["suggestibility_type"])
+        preferences["confidence"] = latest["confidence"]
+        preferences["assessment_date"] = latest["assessment_date"]
+        if latest["confidence"] < 60:
+            preferences["warning"] = "Low confidence assessment - use with caution"
+        return preferences
+    
+    def _get_communication_style(self, suggestibility_type: Optional[str]) -> Dict:
+        """Communication style guidelines for a suggestibility type"""
+        if suggestibility_type and "Physical" in suggestibility_type:
+            return {
+                "style": "physical_suggestible",
+                "tone": "direct and clear",
+                "use_metaphors": False,
+                "use_literal": True,
+                "language_pattern": "literal and step-by-step"
+            }
+        elif suggestibility_type and "Emotional" in suggestibility_type:
+            return {
+                "style": "emotional_suggestible",
+                "tone": "indirect and flowing",
+                "use_metaphors": True,
+                "use_literal": False,
+                "language_pattern": "inferential and metaphorical"
+            }
+        return {
+            "style": "balanced",
+            "tone": "flexible - adaptive mix",
+            "use_metaphors": True,
+            "use_literal": True,
+            "language_pattern": "combine literal and metaphorical"
+        }
     
     def flag_for_review(
         self,
-        assessment_id: uuid.UUID,
+        assessment_id: Union[str, uuid.UUID],
         flagged_by: str,
         reason: str
     ) -> bool:
-        """Manually flag assessment for clinical review"""
-        assessment = self.db.query(AssessmentSubmission).filter(
-            AssessmentSubmission.id == assessment_id
-        ).first()
-        
-        if not assessment:
-            return False
+        """
+        Manually flag assessment for clinical review
         
-        if not hasattr(assessment, 'clinical_notes'):
-            logger.warning("Assessment model doesn't have clinical_notes field")
+        The reason is appended to the clinical notes; only the flag that
+        moves an assessment into review is counted in the daily rollup.
+        Returns False if the assessment does not exist.
+        """
+        try:
+            assessment_id = uuid.UUID(str(assessment_id))
+        except ValueError:
             return False
         
         timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
         note = f"[{timestamp}] FLAGGED by {flagged_by}: {reason}"
         
-        if assessment.clinical_notes:
-            assessment.clinical_notes += f"\n{note}"
-        else:
-            assessment.clinical_notes = note
+        try:
+            row = self.db.execute(_FLAG_FOR_REVIEW, {
+                "assessment_id": str(assessment_id),
+                "note": note
+            }).fetchone()
+            if row is None:
+                self.db.rollback()
+                return False
+            completed_at, first_flag = row
+            if first_flag:
+                record_flag(self.db, completed_at)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return True
+    
+    def mark_reviewed(
+        self,
+        assessment_id: Union[str, uuid.UUID],
+        reviewer_id: Union[str, uuid.UUID],
+        notes: Optional[str] = None,
+        approved: bool = True
+    ) -> bool:
+        """
+        Record a clinician's review (appended to the clinical notes)
+        
+        Only an assessment's first review is counted in the daily rollup.
+        Returns False if the assessment does not exist.
+        """
+        try:
+            assessment_id = uuid.UUID(str(assessment_id))
+        except ValueError:
+            return False
         
-        if hasattr(assessment, 'updated_at'):
-            assessment.updated_at = datetime.utcnow()
+        reviewed_at = datetime.utcnow()
+        note = (
+            f"[{reviewed_at.strftime('%Y-%m-%d %H:%M:%S')}] "
+            f"{'APPROVED' if approved else 'REJECTED'} by {reviewer_id}"
+        )
+        if notes:
+            note += f": {notes}"
         
-        self.db.commit()
+        try:
+            row = self.db.execute(_MARK_REVIEWED, {
+                "assessment_id": str(assessment_id),
+                "reviewer_id": str(reviewer_id),
+                "reviewed_at": reviewed_at,
+                "note": note
+            }).fetchone()
+            if row is None:
+                self.db.rollback()
+                return False
+            completed_at, first_review = row
+            if first_review:
+                record_review(self.db, completed_at)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         return True
     
-    def get_quality_statistics(self, days: int = 30) -> Dict:
-        """Get quality statistics for assessments"""
-        cutoff = datetime.utcnow() - timedelta(days=days)
+    def get_pending_reviews(self, limit: int = 50) -> List[Dict]:
+        """Flagged assessments not reviewed yet, newest first"""
+        rows = self.db.execute(text(f"""
+            SELECT {_ASSESSMENT_COLUMNS}
+            FROM user_assessments
+            WHERE flagged_for_review AND reviewed_at IS NULL
+            ORDER BY completed_at DESC, id DESC
+            LIMIT :limit
+        """), {"limit": limit}).fetchall()
+        return [self._assessment_item(row) for row in rows]
+    
+    def get_quality_statistics(self, days: int = 30, source: str = "rollup") -> Dict:
+        """
+        Get quality statistics for assessments
         
-        assessments = self.db.query(AssessmentSubmission).filter(
-            AssessmentSubmission.completed_at >= cutoff
-        ).all()
+        source="rollup" (default) sums the daily rollup rows (whole days).
+        source="live" runs one grouped aggregate over user_assessments for
+        the exact window. Rows still missing metrics are counted in
+        missing_metrics (see backfill_quality_metrics), not recomputed.
+        """
+        if source == "rollup":
+            return get_quality_rollup(self.db, days)
+        if source != "live":
+            raise ValueError(f"source must be 'rollup' or 'live', got '{source}'")
         
-        if not assessments:
-            return {
-                "total_assessments": 0,
-                "avg_confidence": 0,
-                "period_days": days
-            }
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        
+        query = text("""
+            SELECT
+                answer_pattern_signature,
+                COUNT(*) AS total,
+                COUNT(confidence_score) AS scored,
+                COALESCE(SUM(confidence_score), 0) AS confidence_sum,
+                COUNT(*) FILTER (WHERE flagged_for_review) AS flagged,
+                COUNT(*) FILTER (
+                    WHERE confidence_score IS NULL OR answer_pattern_signature IS NULL
+                ) AS missing
+            FROM user_assessments
+            WHERE completed_at >= :cutoff
+            GROUP BY answer_pattern_signature
+        """)
         
+        total = scored = flagged = missing = 0
+        confidence_sum = 0.0
         patterns = {}
-        total_confidence = 0
-        flagged_count = 0
-        
-        for a in assessments:
-            # Calculate quality on the fly if not stored
-            if hasattr(a, 'confidence_score') and a.confidence_score:
-                confidence = a.confidence_score
-            else:
-                quality = self.calculate_quality_metrics(a.answers, None)
-                confidence = quality.confidence_score
-            
-            total_confidence += confidence
-            
-            # Count patterns
-            if hasattr(a, 'answer_pattern_signature') and a.answer_pattern_signature:
-                pattern = a.answer_pattern_signature
-            else:
-                pattern = self._detect_answer_pattern(a.answers)
-            
-            patterns[pattern] = patterns.get(pattern, 0) + 1
-            
-            # Count flagged
-            if hasattr(a, 'clinical_notes') and a.clinical_notes and "FLAGGED" in a.clinical_notes:
-                flagged_count += 1
+        for pattern, count, scored_count, pattern_confidence, flagged_count, missing_count in (
+            self.db.execute(query, {"cutoff": cutoff}).fetchall()
+        ):
+            total += count
+            scored += scored_count
+            confidence_sum += float(pattern_confidence)
+            flagged += flagged_count
+            missing += missing_count
+            if pattern is not None:
+                patterns[pattern] = count
         
         return {
-            "total_assessments": len(assessments),
-            "avg_confidence": total_confidence / len(assessments) if assessments else 0,
+            "total_assessments": total,
+            "avg_confidence": confidence_sum / scored if scored else 0,
             "pattern_distribution": patterns,
-            "flagged_for_review": flagged_count,
-            "flagged_percentage": (flagged_count / len(assessments)) * 100 if assessments else 0,
+            "flagged_for_review": flagged,
+            "flagged_percentage": (flagged / total) * 100 if total else 0,
+            "missing_metrics": missing,
             "period_days": days
         }
     
@@ -358,34 +1028,21 @@ class EPAssessmentServiceEnhanced:
         """
         Backfill quality metrics for existing assessments
         Returns number of assessments updated
+        
+        Processes up to `limit` pending rows; for the full table use
+        scripts/backfill_quality_metrics.py (resumable, checkpointed).
         """
-        assessments = self.db.query(AssessmentSubmission).filter(
-            AssessmentSubmission.confidence_score.is_(None)
-        ).limit(limit).all()
-        
-        count = 0
-        for assessment in assessments:
-            if not assessment.answers:
-                continue
-            
-            time = None
-            if hasattr(assessment, 'time_to_complete_seconds'):
-                time = assessment.time_to_complete_seconds
-            
-            quality = self.calculate_quality_metrics(assessment.answers, time)
-            
-            if hasattr(assessment, 'confidence_score'):
-                assessment.confidence_score = quality.confidence_score
-            
-            if hasattr(assessment, 'answer_pattern_signature'):
-                assessment.answer_pattern_signature = quality.answer_pattern
-            
-            if hasattr(assessment, 'completion_percentage'):
-                assessment.completion_percentage = quality.completion_percentage
-            
-            count += 1
+        job = QualityBackfillJob(
+            self.db.get_bind(),
+            service=self,
+            batch_size=min(limit, 1000),
+            page_size=limit
+        )
+        checkpoint = job.run(max_rows=limit)
+        logger.info(f"Backfilled quality metrics for {checkpoint.updated} assessments")
         
-        self.db.commit()
-        logger.info(f"Backfilled quality metrics for {count} assessments")
+        # Only the days holding backfilled rows changed
+        if job.updated_days:
+            rebuild_quality_rollups(self.db, days=job.updated_days)
         
-        return count
+        return checkpoint.updated
@@ -0,0 +1,306 @@
+"""
+Quality Metrics Backfill Job
+Resumable, keyset-paginated backfill of user_assessments quality columns
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, asdict, field
+from datetime import date
+import json
+import logging
+import os
+import time
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from utils.answer_pattern import AnswerPatternBatch
+
+logger = logging.getLogger(__name__)
+
+
+# Rows read per keyset page (one short read transaction per page)
+DEFAULT_PAGE_SIZE = 20000
+# Rows per vectorized compute + UPDATE ... FROM (VALUES ...) statement
+DEFAULT_BATCH_SIZE = 1000
+# A batch that cannot get its row locks in time is retried, not waited on
+LOCK_TIMEOUT = "2s"
+MAX_BATCH_RETRIES = 3
+
+
+@dataclass
+class BackfillCheckpoint:
+    """Progress of a backfill run; last_id is the keyset position"""
+    last_id: Optional[str] = None
+    processed: int = 0  # rows read
+    updated: int = 0  # rows written
+    skipped: int = 0  # rows without answers
+    elapsed_seconds: float = 0.0
+    updated_days: List[str] = field(default_factory=list)  # ISO days written so far
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @classmethod
+    def load(cls, path: str) -> "BackfillCheckpoint":
+        """Read a checkpoint file; a missing file starts from scratch"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls(**json.load(f))
+
+    def save(self, path: str) -> None:
+        """Atomically replace the checkpoint file"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+
+
+def compute_quality_rows(
+    service,
+    rows: Sequence[Tuple[object, object, Optional[int]]]
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Vectorized quality metrics for (id, answers, time_to_complete) rows
+
+    Returns:
+        (update rows for build_update_statement, ids of rows without answers)
+    """
+    ids = []
+    answer_sets = []
+    times = []
+    skipped = []
+    for assessment_id, answers, time_to_complete in rows:
+        if isinstance(answers, str):
+            answers = json.loads(answers)
+        if not answers:
+            skipped.append(str(assessment_id))
+            continue
+        ids.append(str(assessment_id))
+        answer_sets.append(answers)
+        times.append(np.nan if time_to_complete is None else time_to_complete)
+
+    if not ids:
+        return [], skipped
+
+    batch = AnswerPatternBatch.from_answers(answer_sets)
+    metrics = service.calculate_quality_metrics_batch(
+        batch, np.array(times, dtype=np.float64)
+    )
+    updates = [
+        {
+            "id": assessment_id,
+            "confidence_score": float(confidence),
+            "answer_pattern": pattern,
+            "completion_percentage": float(completion)
+        }
+        for assessment_id, confidence, pattern, completion in zip(
+            ids,
+            metrics["confidence_score"],
+            metrics["answer_pattern"],
+            metrics["completion_percentage"]
+        )
+    ]
+    return updates, skipped
+
+
+def build_update_statement(updates: Sequence[Dict]):
+    """
+    One UPDATE ... FROM (VALUES ...) for a batch
+
+    Rows that gained metrics since they were read (e.g. a live
+    re-submission) are left alone by the IS NULL guard. Returns the
+    completed_at day of every updated row (the rollup days to rebuild).
+    """
+    values = []
+    params = {}
+    for index, row in enumerate(updates):
+        values.append(f"(:id_{index}, :confidence_{index}, :pattern_{index}, :completion_{index})")
+        params[f"id_{index}"] = row["id"]
+        params[f"confidence_{index}"] = row["confidence_score"]
+        params[f"pattern_{index}"] = row["answer_pattern"]
+        params[f"completion_{index}"] = row["completion_percentage"]
+
+    statement = text(f"""
+        UPDATE user_assessments AS ua
+        SET
+            confidence_score = CAST(v.confidence_score AS double precision),
+            answer_pattern_signature = v.answer_pattern,
+            completion_percentage = CAST(v.completion_percentage AS double precision)
+        FROM (VALUES {', '.join(values)})
+            AS v(id, confidence_score, answer_pattern, completion_percentage)
+        WHERE ua.id = CAST(v.id AS uuid)
+            AND ua.confidence_score IS NULL
+        RETURNING CAST(ua.completed_at AS date)
+    """)
+    return statement, params
+
+
+# Rows without answers cannot be scored; completion 0 marks them as done so
+# later runs (which start from the first pending id) move past them
+_MARK_UNSCORABLE = text("""
+    UPDATE user_assessments
+    SET completion_percentage = 0
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+        AND confidence_score IS NULL
+        AND completion_percentage IS NULL
+""")
+
+
+class QualityBackfillJob:
+    """
+    Backfill confidence_score / answer_pattern_signature / completion_percentage
+
+    Pending rows (no confidence score or completion percentage yet) are
+    read in id order, one keyset page per short read transaction, streamed
+    from a server-side cursor. Each batch is scored with
+    calculate_quality_metrics_batch and written back in its own
+    transaction with one UPDATE ... FROM (VALUES ...); rows without answers
+    get completion_percentage 0 and stay unscored. The checkpoint (last id
+    + counters) is saved after every committed batch, so an interrupted
+    run resumes where it stopped. updated_days collects the completed_at
+    days this job changed, for a targeted rollup rebuild; it is kept in
+    the checkpoint, so a resumed run still covers the interrupted one's.
+
+    Safe while the API is live: no long transactions, a lock timeout per
+    batch (retried with backoff), an IS NULL guard on every update and an
+    optional pause between batches.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        service=None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        checkpoint_path: Optional[str] = None,
+        pause_seconds: float = 0.0,
+        report_every: int = 10,
+        on_progress: Optional[Callable[[BackfillCheckpoint], None]] = None
+    ):
+        if service is None:
+            from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+            service = EPAssessmentServiceEnhanced(db=None)
+
+        self.engine = engine
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.page_size = max(self.batch_size, page_size)
+        self.checkpoint_path = checkpoint_path
+        self.pause_seconds = pause_seconds
+        self.report_every = max(1, report_every)
+        self.on_progress = on_progress
+        self.updated_days: Set[date] = set()
+
+    def run(self, max_rows: Optional[int] = None) -> BackfillCheckpoint:
+        """Backfill until no pending rows remain (or max_rows were read)"""
+        checkpoint = (
+            BackfillCheckpoint.load(self.checkpoint_path)
+            if self.checkpoint_path else BackfillCheckpoint()
+        )
+        self.updated_days.update(date.fromisoformat(day) for day in checkpoint.updated_days)
+        started = time.monotonic()
+        elapsed_before = checkpoint.elapsed_seconds
+        read_this_run = 0
+        batches = 0
+
+        while max_rows is None or read_this_run < max_rows:
+            limit = self.page_size
+            if max_rows is not None:
+                limit = min(limit, max_rows - read_this_run)
+
+            page_rows = 0
+            for rows in self.fetch_page(checkpoint.last_id, limit):
+                updates, skipped = compute_quality_rows(self.service, rows)
+                updated = self.write_batch(updates) if updates else 0
+                if skipped:
+                    self.mark_unscorable(skipped)
+
+                page_rows += len(rows)
+                read_this_run += len(rows)
+                checkpoint.last_id = str(rows[-1][0])
+                checkpoint.processed += len(rows)
+                checkpoint.updated += updated
+                checkpoint.skipped += len(skipped)
+                checkpoint.elapsed_seconds = elapsed_before + time.monotonic() - started
+                checkpoint.updated_days = sorted(day.isoformat() for day in self.updated_days)
+                if self.checkpoint_path:
+                    checkpoint.save(self.checkpoint_path)
+
+                batches += 1
+                if batches % self.report_every == 0:
+                    self._report(checkpoint)
+                if self.on_progress:
+                    self.on_progress(checkpoint)
+                if self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+
+            if page_rows < limit:
+                break
+
+        self._report(checkpoint)
+        return checkpoint
+
+    def fetch_page(
+        self,
+        after_id: Optional[str],
+        limit: int
+    ) -> Iterator[List[Tuple[object, object, Optional[int]]]]:
+        """Stream one keyset page of pending rows in batch_size chunks"""
+        query = text(f"""
+            SELECT id, answers, time_to_complete_seconds
+            FROM user_assessments
+            WHERE confidence_score IS NULL
+                AND completion_percentage IS NULL
+                {'AND id > CAST(:after_id AS uuid)' if after_id else ''}
+            ORDER BY id
+            LIMIT :limit
+        """)
+        params = {"limit": limit}
+        if after_id:
+            params["after_id"] = after_id
+
+        with self.engine.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True,
+                max_row_buffer=self.batch_size
+            ).execute(query, params)
+            for rows in result.partitions(self.batch_size):
+                yield [tuple(row) for row in rows]
+
+    def write_batch(self, updates: Sequence[Dict]) -> int:
+        """Apply one batch in its own short transaction"""
+        statement, params = build_update_statement(updates)
+        days = self._execute_with_retry(
+            lambda conn: conn.execute(statement, params).fetchall()
+        )
+        self.updated_days.update(day for (day,) in days if day is not None)
+        return len(days)
+
+    def mark_unscorable(self, ids: Sequence[str]) -> int:
+        """Mark rows without answers so they are no longer pending"""
+        return self._execute_with_retry(
+            lambda conn: conn.execute(_MARK_UNSCORABLE, {"ids": list(ids)}).rowcount
+        )
+
+    def _execute_with_retry(self, work: Callable):
+        for attempt in range(1, MAX_BATCH_RETRIES + 1):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                    return work(conn)
+            except OperationalError:
+                if attempt == MAX_BATCH_RETRIES:
+                    raise
+                logger.warning(f"Backfill batch hit lock timeout, retry {attempt}")
+                time.sleep(0.5 * 2 ** attempt)
+
+    def _report(self, checkpoint: BackfillCheckpoint) -> None:
+        logger.info(
+            f"Quality backfill: {checkpoint.processed} read, {checkpoint.updated} updated, "
+            f"{checkpoint.skipped} skipped, {checkpoint.rows_per_second:.0f} rows/s "
+            f"(last id {checkpoint.last_id})"
+        )
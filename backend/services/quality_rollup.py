@@ -0,0 +1,263 @@
+"""
+Daily Assessment Quality Rollups
+Incrementally maintained per-day quality counters for the analytics endpoint
+"""
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import date, datetime, timedelta
+import json
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+ROLLUP_TABLE = "assessment_quality_daily"
+
+# One statement per event; runs inside the caller's transaction so the
+# rollup commits (or rolls back) together with the assessment row.
+_RECORD_ASSESSMENT = text(f"""
+    INSERT INTO {ROLLUP_TABLE} AS r
+        (day, total, scored, confidence_sum, missing, flagged, reviewed, pattern_counts)
+    VALUES (
+        :day, 1, :scored, :confidence, :missing, :flagged, 0,
+        CASE WHEN CAST(:pattern AS text) IS NULL THEN '{{}}'::jsonb
+             ELSE jsonb_build_object(CAST(:pattern AS text), 1) END
+    )
+    ON CONFLICT (day) DO UPDATE SET
+        total = r.total + 1,
+        scored = r.scored + EXCLUDED.scored,
+        confidence_sum = r.confidence_sum + EXCLUDED.confidence_sum,
+        missing = r.missing + EXCLUDED.missing,
+        flagged = r.flagged + EXCLUDED.flagged,
+        pattern_counts = CASE
+            WHEN CAST(:pattern AS text) IS NULL THEN r.pattern_counts
+            ELSE r.pattern_counts || jsonb_build_object(
+                CAST(:pattern AS text),
+                COALESCE((r.pattern_counts ->> CAST(:pattern AS text))::int, 0) + 1
+            )
+        END
+""")
+
+_ADJUST_COUNTER = """
+    INSERT INTO {table} AS r
+        (day, total, scored, confidence_sum, missing, flagged, reviewed, pattern_counts)
+    VALUES (:day, 0, 0, 0, 0, {flagged}, {reviewed}, '{{}}'::jsonb)
+    ON CONFLICT (day) DO UPDATE SET {column} = r.{column} + 1
+"""
+_RECORD_FLAG = text(_ADJUST_COUNTER.format(
+    table=ROLLUP_TABLE, flagged=1, reviewed=0, column="flagged"
+))
+_RECORD_REVIEW = text(_ADJUST_COUNTER.format(
+    table=ROLLUP_TABLE, flagged=0, reviewed=1, column="reviewed"
+))
+
+_READ_WINDOW = text(f"""
+    SELECT total, scored, confidence_sum, missing, flagged, reviewed, pattern_counts
+    FROM {ROLLUP_TABLE}
+    WHERE day >= :since
+""")
+
+_DELETE_RANGE = f"DELETE FROM {ROLLUP_TABLE} WHERE day >= :since {{day_filter}}"
+
+_REBUILD_RANGE = f"""
+    INSERT INTO {ROLLUP_TABLE}
+        (day, total, scored, confidence_sum, missing, flagged, reviewed, pattern_counts)
+    SELECT
+        day,
+        SUM(total),
+        SUM(scored),
+        SUM(confidence_sum),
+        SUM(missing),
+        SUM(flagged),
+        SUM(reviewed),
+        COALESCE(
+            jsonb_object_agg(pattern, total) FILTER (WHERE pattern IS NOT NULL),
+            '{{{{}}}}'::jsonb
+        )
+    FROM (
+        SELECT
+            CAST(completed_at AS date) AS day,
+            answer_pattern_signature AS pattern,
+            COUNT(*) AS total,
+            COUNT(confidence_score) AS scored,
+            COALESCE(SUM(confidence_score), 0) AS confidence_sum,
+            COUNT(*) FILTER (
+                WHERE confidence_score IS NULL OR answer_pattern_signature IS NULL
+            ) AS missing,
+            COUNT(*) FILTER (WHERE flagged_for_review) AS flagged,
+            COUNT(reviewed_at) AS reviewed
+        FROM user_assessments
+        WHERE completed_at >= :since {{completed_filter}}
+        GROUP BY 1, 2
+    ) AS per_pattern
+    GROUP BY day
+"""
+
+
+def _day(completed_at: Optional[datetime]) -> date:
+    return (completed_at or datetime.utcnow()).date()
+
+
+def record_assessment(
+    db: Session,
+    completed_at: Optional[datetime],
+    confidence_score: Optional[float],
+    answer_pattern: Optional[str],
+    flagged: bool = False
+) -> None:
+    """Count a newly saved assessment in its day's rollup (caller commits)"""
+    scored = confidence_score is not None
+    db.execute(_RECORD_ASSESSMENT, {
+        "day": _day(completed_at),
+        "scored": int(scored),
+        "confidence": float(confidence_score) if scored else 0.0,
+        "missing": int(not scored or answer_pattern is None),
+        "flagged": int(flagged),
+        "pattern": answer_pattern
+    })
+
+
+def record_assessments(db: Session, rows: Iterable[Tuple]) -> None:
+    """
+    Count a batch of newly saved assessments (caller commits)
+
+    rows are (completed_at, confidence_score, answer_pattern, flagged).
+    Counters are summed per day in Python and applied with one multi-row
+    upsert; pattern counts are merged key by key into the stored object.
+    """
+    days: Dict[date, Dict] = {}
+    for completed_at, confidence_score, answer_pattern, flagged in rows:
+        counters = days.setdefault(_day(completed_at), {
+            "total": 0, "scored": 0, "confidence": 0.0,
+            "missing": 0, "flagged": 0, "patterns": {}
+        })
+        scored = confidence_score is not None
+        counters["total"] += 1
+        counters["scored"] += int(scored)
+        counters["confidence"] += float(confidence_score) if scored else 0.0
+        counters["missing"] += int(not scored or answer_pattern is None)
+        counters["flagged"] += int(bool(flagged))
+        if answer_pattern is not None:
+            patterns = counters["patterns"]
+            patterns[answer_pattern] = patterns.get(answer_pattern, 0) + 1
+    if not days:
+        return
+
+    values = []
+    params = {}
+    for index, (day, counters) in enumerate(days.items()):
+        values.append(
+            f"(CAST(:day_{index} AS date), :total_{index}, :scored_{index}, "
+            f":confidence_{index}, :missing_{index}, :flagged_{index}, 0, "
+            f"CAST(:patterns_{index} AS jsonb))"
+        )
+        params[f"day_{index}"] = day
+        params[f"total_{index}"] = counters["total"]
+        params[f"scored_{index}"] = counters["scored"]
+        params[f"confidence_{index}"] = counters["confidence"]
+        params[f"missing_{index}"] = counters["missing"]
+        params[f"flagged_{index}"] = counters["flagged"]
+        params[f"patterns_{index}"] = json.dumps(counters["patterns"])
+
+    db.execute(text(f"""
+        INSERT INTO {ROLLUP_TABLE} AS r
+            (day, total, scored, confidence_sum, missing, flagged, reviewed, pattern_counts)
+        VALUES {', '.join(values)}
+        ON CONFLICT (day) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            scored = r.scored + EXCLUDED.scored,
+            confidence_sum = r.confidence_sum + EXCLUDED.confidence_sum,
+            missing = r.missing + EXCLUDED.missing,
+            flagged = r.flagged + EXCLUDED.flagged,
+            pattern_counts = r.pattern_counts || COALESCE((
+                SELECT jsonb_object_agg(
+                    e.key,
+                    COALESCE((r.pattern_counts ->> e.key)::int, 0) + e.value::int
+                )
+                FROM jsonb_each_text(EXCLUDED.pattern_counts) AS e
+            ), '{{}}'::jsonb)
+    """), params)
+
+
+def record_flag(db: Session, completed_at: Optional[datetime]) -> None:
+    """Count an assessment newly flagged for review (caller commits)"""
+    db.execute(_RECORD_FLAG, {"day": _day(completed_at)})
+
+
+def record_review(db: Session, completed_at: Optional[datetime]) -> None:
+    """Count an assessment's first clinical review (caller commits)"""
+    db.execute(_RECORD_REVIEW, {"day": _day(completed_at)})
+
+
+def get_quality_rollup(db: Session, days: int = 30) -> Dict:
+    """
+    Quality statistics for the last `days` days from the rollup table
+
+    Sums at most one row per day. The window is whole days: today plus
+    the `days` previous calendar days (UTC).
+    """
+    since = (datetime.utcnow() - timedelta(days=days)).date()
+
+    total = scored = missing = flagged = reviewed = 0
+    confidence_sum = 0.0
+    patterns: Dict[str, int] = {}
+    for (day_total, day_scored, day_confidence, day_missing, day_flagged,
+         day_reviewed, pattern_counts) in db.execute(_READ_WINDOW, {"since": since}).fetchall():
+        total += day_total
+        scored += day_scored
+        confidence_sum += float(day_confidence)
+        missing += day_missing
+        flagged += day_flagged
+        reviewed += day_reviewed
+        if isinstance(pattern_counts, str):
+            pattern_counts = json.loads(pattern_counts)
+        for pattern, count in (pattern_counts or {}).items():
+            patterns[pattern] = patterns.get(pattern, 0) + count
+
+    return {
+        "total_assessments": total,
+        "avg_confidence": confidence_sum / scored if scored else 0,
+        "pattern_distribution": patterns,
+        "flagged_for_review": flagged,
+        "flagged_percentage": (flagged / total) * 100 if total else 0,
+        "missing_metrics": missing,
+        "reviewed": reviewed,
+        "period_days": days
+    }
+
+
+def rebuild_quality_rollups(
+    db: Session,
+    since: Optional[date] = None,
+    days: Optional[Iterable[date]] = None
+) -> int:
+    """
+    Recompute rollup rows from user_assessments (repair / after backfills)
+
+    Replaces every day from `since` (default: all history), or only the
+    given `days`, in one transaction. Returns the number of day rows written.
+    """
+    params = {"since": since or date(1970, 1, 1)}
+    day_filter = completed_filter = ""
+    if days is not None:
+        days = sorted(set(days))
+        if not days:
+            return 0
+        params.update(since=days[0], days=days)
+        day_filter = "AND day = ANY(CAST(:days AS date[]))"
+        completed_filter = "AND CAST(completed_at AS date) = ANY(CAST(:days AS date[]))"
+    try:
+        # Live increments wait for the rebuild instead of being lost to it
+        db.execute(text(f"LOCK TABLE {ROLLUP_TABLE} IN EXCLUSIVE MODE"))
+        db.execute(text(_DELETE_RANGE.format(day_filter=day_filter)), params)
+        written = db.execute(
+            text(_REBUILD_RANGE.format(completed_filter=completed_filter)), params
+        ).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Rebuilt {written} daily quality rollup rows since {params['since']}")
+    return written
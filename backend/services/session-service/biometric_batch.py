@@ -0,0 +1,133 @@
+"""
+Biometric Batches
+Columnar batches of biometric samples (JSON arrays or binary frames), validated once per batch
+
+Location: backend/services/session-service/biometric_batch.py
+"""
+
+from typing import Any, Dict, Optional, Sequence
+import os
+import struct
+
+import numpy as np
+
+from biometric_buffer import CHANNELS
+
+
+# Samples accepted in one batch (a 1 s batch at 4 Hz is 4; this allows minutes)
+BIOMETRIC_BATCH_LIMIT = int(os.getenv("BIOMETRIC_BATCH_LIMIT", "1024"))
+
+_FRAME_MAGIC = b"JBB1"
+# magic, channel count, reserved, sample count
+_FRAME_HEADER = struct.Struct("<4sBxxxI")
+
+
+class BiometricBatchError(ValueError):
+    """Malformed or out-of-range batch; the message is safe to return to clients."""
+
+
+class BiometricBatch:
+    """
+    n samples as float64 epoch-second timestamps plus an (n, channels)
+    float32 matrix in CHANNELS order, NaN for missing readings.
+
+    Construction validates the whole batch with array operations: equal
+    lengths, numeric values, finite timestamps, no infinities and no
+    negative readings. Timestamps are sorted if they arrive out of order.
+    """
+
+    __slots__ = ("timestamps", "values")
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray):
+        n = len(timestamps)
+        if timestamps.ndim != 1 or values.shape != (n, len(CHANNELS)):
+            raise BiometricBatchError("Timestamps and channel values must have the same length")
+        if n == 0:
+            raise BiometricBatchError("Empty biometric batch")
+        if n > BIOMETRIC_BATCH_LIMIT:
+            raise BiometricBatchError(f"Batch exceeds {BIOMETRIC_BATCH_LIMIT} samples")
+        if not np.isfinite(timestamps).all():
+            raise BiometricBatchError("Timestamps must be finite epoch seconds")
+        # NaN (missing) passes both comparisons
+        invalid = (values < 0) | (values == np.inf)
+        if invalid.any():
+            bad = [CHANNELS[i] for i in np.nonzero(invalid.any(axis=0))[0]]
+            raise BiometricBatchError(f"Negative or infinite values for {', '.join(bad)}")
+        if n > 1 and (timestamps[1:] < timestamps[:-1]).any():
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+        self.timestamps = timestamps
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, Any]) -> "BiometricBatch":
+        """
+        From a JSON message body:
+        {"timestamps": [epoch seconds...], "heart_rate": [...], "hrv": [...], ...}
+        Channels may be omitted or contain nulls.
+        """
+        if not isinstance(data, dict) or "timestamps" not in data:
+            raise BiometricBatchError("Batch needs a 'timestamps' array")
+        unknown = set(data) - set(CHANNELS) - {"timestamps"}
+        if unknown:
+            raise BiometricBatchError(f"Unknown channels: {', '.join(sorted(unknown))}")
+        try:
+            timestamps = np.asarray(data["timestamps"], dtype=np.float64)
+            n = len(timestamps)
+            columns = []
+            for channel in CHANNELS:
+                column = data.get(channel)
+                if column is None:
+                    column = [None] * n
+                elif len(column) != n:
+                    raise BiometricBatchError(f"'{channel}' has {len(column)} values for {n} timestamps")
+                columns.append(column)
+            # One conversion for the whole batch; None -> NaN
+            values = np.array(columns, dtype=np.float32).T
+        except BiometricBatchError:
+            raise
+        except (TypeError, ValueError) as e:
+            raise BiometricBatchError("Batch values must be numbers or null") from e
+        return cls(timestamps, values)
+
+    @classmethod
+    def from_samples(cls, timestamps: Sequence[float], rows: Sequence[Sequence[Optional[float]]]) -> "BiometricBatch":
+        """From per-sample rows in CHANNELS order (None = missing)."""
+        return cls(
+            np.asarray(timestamps, dtype=np.float64),
+            np.asarray(rows, dtype=np.float64).astype(np.float32).reshape(len(timestamps), len(CHANNELS))
+        )
+
+    @classmethod
+    def from_bytes(cls, frame: bytes) -> "BiometricBatch":
+        """
+        From a binary WebSocket frame: header (magic "JBB1", channel count,
+        sample count), then little-endian float64 timestamps and a
+        row-major float32 (n, channels) matrix, NaN for missing.
+        """
+        if len(frame) < _FRAME_HEADER.size:
+            raise BiometricBatchError("Truncated biometric frame")
+        magic, channel_count, n = _FRAME_HEADER.unpack_from(frame)
+        if magic != _FRAME_MAGIC:
+            raise BiometricBatchError("Not a biometric batch frame")
+        if channel_count != len(CHANNELS):
+            raise BiometricBatchError(f"Frame has {channel_count} channels, expected {len(CHANNELS)}")
+        expected = _FRAME_HEADER.size + n * 8 + n * channel_count * 4
+        if len(frame) != expected:
+            raise BiometricBatchError("Biometric frame length does not match its header")
+        timestamps = np.frombuffer(frame, dtype="<f8", count=n, offset=_FRAME_HEADER.size)
+        values = np.frombuffer(
+            frame, dtype="<f4", count=n * channel_count, offset=_FRAME_HEADER.size + n * 8
+        ).reshape(n, channel_count)
+        return cls(timestamps.astype(np.float64), values.astype(np.float32))
+
+    def to_bytes(self) -> bytes:
+        """Binary frame understood by from_bytes()."""
+        return (
+            _FRAME_HEADER.pack(_FRAME_MAGIC, len(CHANNELS), len(self))
+            + self.timestamps.astype("<f8").tobytes()
+            + self.values.astype("<f4").tobytes()
+        )
@@ -0,0 +1,339 @@
+"""
+Biometric Ring Buffer
+Fixed-capacity columnar time series per session with downsampled spill-over
+
+Location: backend/services/session-service/biometric_buffer.py
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import copy
+import os
+import struct
+import zlib
+
+import numpy as np
+
+
+CHANNELS: Tuple[str, ...] = ("heart_rate", "hrv", "stress_level", "arousal_level")
+
+# Full-resolution samples kept per session (~17 minutes at 4 Hz)
+BIOMETRIC_BUFFER_CAPACITY = int(os.getenv("BIOMETRIC_BUFFER_CAPACITY", "4096"))
+# Downsampled points kept once samples leave the full-resolution tier
+# (with the defaults a 180 minute session at 4 Hz fits without dropping data)
+BIOMETRIC_SPILL_CAPACITY = int(os.getenv("BIOMETRIC_SPILL_CAPACITY", "8192"))
+# Full-resolution samples averaged into one spill point
+BIOMETRIC_DOWNSAMPLE_FACTOR = int(os.getenv("BIOMETRIC_DOWNSAMPLE_FACTOR", "8"))
+# Minimum seconds between archive snapshots of a live buffer (write-behind)
+BIOMETRIC_SNAPSHOT_SECONDS = float(os.getenv("BIOMETRIC_SNAPSHOT_SECONDS", "30"))
+# Seconds without samples before a live buffer is archived and dropped from memory
+BIOMETRIC_IDLE_SECONDS = float(os.getenv("BIOMETRIC_IDLE_SECONDS", "300"))
+# Minimum seconds between biometric_stats messages published per session
+BIOMETRIC_STATS_SECONDS = float(os.getenv("BIOMETRIC_STATS_SECONDS", "1"))
+# Window of the rolling stats in biometric_stats messages
+BIOMETRIC_STATS_WINDOW_SECONDS = float(os.getenv("BIOMETRIC_STATS_WINDOW_SECONDS", "60"))
+
+_MAGIC = b"JBIO"
+_VERSION = 1
+# magic, version, channel count, downsample factor, spill count, raw count, total samples
+_HEADER = struct.Struct("<4sBBHIIQ")
+
+
+class _Ring:
+    """Timestamps (float64 epoch seconds) plus one float32 column per channel"""
+
+    def __init__(self, capacity: int, channel_count: int):
+        if capacity < 1:
+            raise ValueError("Ring capacity must be positive")
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.full((capacity, channel_count), np.nan, dtype=np.float32)
+        self.start = 0
+        self.count = 0
+
+    def push(self, timestamp: float, row) -> None:
+        """Append one sample, overwriting the oldest when full."""
+        index = (self.start + self.count) % self.capacity
+        self.timestamps[index] = timestamp
+        self.values[index] = row
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Append rows that fit in the free space (slice copies, wrap-aware)."""
+        n = len(timestamps)
+        if self.count + n > self.capacity:
+            raise ValueError("Not enough free space in ring")
+        first = (self.start + self.count) % self.capacity
+        head = min(n, self.capacity - first)
+        self.timestamps[first:first + head] = timestamps[:head]
+        self.values[first:first + head] = values[:head]
+        if head < n:
+            self.timestamps[:n - head] = timestamps[head:]
+            self.values[:n - head] = values[head:]
+        self.count += n
+
+    def drop_oldest(self, n: int) -> None:
+        self.start = (self.start + n) % self.capacity
+        self.count -= n
+
+    def oldest(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The n oldest samples (views unless they wrap around)."""
+        if self.start + n <= self.capacity:
+            return self.timestamps[self.start:self.start + n], self.values[self.start:self.start + n]
+        indices = (self.start + np.arange(n)) % self.capacity
+        return self.timestamps[indices], self.values[indices]
+
+    def segments(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Chronological (timestamps, values) views: one, or two when wrapped."""
+        end = self.start + self.count
+        if end <= self.capacity:
+            return [(self.timestamps[self.start:end], self.values[self.start:end])]
+        wrapped = end - self.capacity
+        return [
+            (self.timestamps[self.start:], self.values[self.start:]),
+            (self.timestamps[:wrapped], self.values[:wrapped])
+        ]
+
+    def ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Chronological copies of the contents."""
+        segments = self.segments()
+        return (
+            np.concatenate([timestamps for timestamps, _ in segments]),
+            np.concatenate([values for _, values in segments])
+        )
+
+
+class BiometricBuffer:
+    """
+    Per-session biometric time series.
+
+    Samples go into a full-resolution ring of `capacity` rows. When it is
+    full, the oldest `downsample_factor` samples are averaged (NaN-aware)
+    into one point of a second, coarse ring before the new sample is
+    written, so memory stays fixed while the whole session remains
+    represented. Missing channel values are stored as NaN.
+
+    Timestamps are expected in arrival order; a sample older than the
+    last one is recorded at the last timestamp so windows stay sorted.
+    """
+
+    def __init__(
+        self,
+        capacity: int = BIOMETRIC_BUFFER_CAPACITY,
+        spill_capacity: int = BIOMETRIC_SPILL_CAPACITY,
+        downsample_factor: int = BIOMETRIC_DOWNSAMPLE_FACTOR,
+        channels: Sequence[str] = CHANNELS
+    ):
+        if not 1 <= downsample_factor <= capacity:
+            raise ValueError("downsample_factor must be between 1 and capacity")
+        self.channels = tuple(channels)
+        self.downsample_factor = downsample_factor
+        self.raw = _Ring(capacity, len(self.channels))
+        self.spill = _Ring(spill_capacity, len(self.channels))
+        self.total_samples = 0
+        self.last_timestamp: Optional[float] = None
+
+    # -- writes --------------------------------------------------------------
+
+    def append(self, timestamp: float, values: Sequence[Optional[float]]) -> float:
+        """
+        Record one sample; values follow self.channels (None = missing).
+        Returns the timestamp it was recorded at.
+        """
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            timestamp = self.last_timestamp
+        if self.raw.count == self.raw.capacity:
+            self._spill_oldest()
+        self.raw.push(timestamp, [np.nan if value is None else value for value in values])
+        self.last_timestamp = timestamp
+        self.total_samples += 1
+        return timestamp
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Record a batch: sorted float64 timestamps (n,) and float32 values
+        (n, channels) with NaN for missing readings. Equivalent to append()
+        per sample, but copies whole slices into the ring. Returns the
+        timestamps the samples were recorded at.
+        """
+        n = len(timestamps)
+        if n == 0:
+            return timestamps
+        if self.last_timestamp is not None and timestamps[0] < self.last_timestamp:
+            timestamps = np.maximum(timestamps, self.last_timestamp)
+        written = 0
+        while written < n:
+            if self.raw.count == self.raw.capacity:
+                self._spill_oldest()
+            take = min(self.raw.capacity - self.raw.count, n - written)
+            self.raw.extend(timestamps[written:written + take], values[written:written + take])
+            written += take
+        self.last_timestamp = float(timestamps[-1])
+        self.total_samples += n
+        return timestamps
+
+    def _spill_oldest(self) -> None:
+        timestamps, values = self.raw.oldest(self.downsample_factor)
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        sums = np.where(present, values, 0).sum(axis=0)
+        means = np.full(len(self.channels), np.nan, dtype=np.float32)
+        np.divide(sums, counts, out=means, where=counts > 0)
+        self.spill.push(float(timestamps.mean()), means)
+        self.raw.drop_oldest(self.downsample_factor)
+
+    # -- reads ---------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.raw.count + self.spill.count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            ring.timestamps.nbytes + ring.values.nbytes
+            for ring in (self.raw, self.spill)
+        )
+
+    def window_stats(
+        self,
+        seconds: float,
+        now: Optional[float] = None
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Rolling stats per channel over the full-resolution samples of the
+        last `seconds` (ending at `now`, default the latest sample).
+
+        Works on views of the ring (no copy of the buffer); slope is the
+        least-squares trend in units per second.
+        """
+        if now is None:
+            now = self.last_timestamp if self.last_timestamp is not None else 0.0
+        cutoff = now - seconds
+        channel_count = len(self.channels)
+        n = np.zeros(channel_count)
+        sum_v = np.zeros(channel_count)
+        sum_t = np.zeros(channel_count)
+        sum_tt = np.zeros(channel_count)
+        sum_tv = np.zeros(channel_count)
+        minimum = np.full(channel_count, np.inf)
+        maximum = np.full(channel_count, -np.inf)
+
+        for timestamps, values in self.raw.segments():
+            lo = np.searchsorted(timestamps, cutoff, side="left")
+            hi = np.searchsorted(timestamps, now, side="right")
+            if lo >= hi:
+                continue
+            # Times relative to the cutoff keep the float64 sums well conditioned
+            t = (timestamps[lo:hi] - cutoff)[:, None]
+            block = values[lo:hi]
+            present = ~np.isnan(block)
+            v = np.where(present, block, 0).astype(np.float64)
+            tp = np.where(present, t, 0)
+            n += present.sum(axis=0)
+            sum_v += v.sum(axis=0)
+            sum_t += tp.sum(axis=0)
+            sum_tt += (tp * tp).sum(axis=0)
+            sum_tv += (tp * v).sum(axis=0)
+            minimum = np.minimum(minimum, np.where(present, block, np.inf).min(axis=0))
+            maximum = np.maximum(maximum, np.where(present, block, -np.inf).max(axis=0))
+
+        stats = {}
+        for index, channel in enumerate(self.channels):
+            count = int(n[index])
+            if count == 0:
+                stats[channel] = {"count": 0, "mean": None, "min": None, "max": None, "slope": None}
+                continue
+            denominator = count * sum_tt[index] - sum_t[index] ** 2
+            slope = None
+            if count > 1 and denominator > 1e-12:
+                slope = float(
+                    (count * sum_tv[index] - sum_t[index] * sum_v[index]) / denominator
+                )
+            stats[channel] = {
+                "count": count,
+                "mean": float(sum_v[index] / count),
+                "min": float(minimum[index]),
+                "max": float(maximum[index]),
+                "slope": slope
+            }
+        return stats
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Whole series, oldest first: spill points then full-resolution samples."""
+        spill_timestamps, spill_values = self.spill.ordered()
+        raw_timestamps, raw_values = self.raw.ordered()
+        return (
+            np.concatenate([spill_timestamps, raw_timestamps]),
+            np.concatenate([spill_values, raw_values])
+        )
+
+    # -- serialization -------------------------------------------------------
+
+    def copy(self) -> "BiometricBuffer":
+        """Independent copy, e.g. to serialize off the event loop while writes go on."""
+        return copy.deepcopy(self)
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact archive: fixed header, channel names, then both tiers as
+        little-endian float64 timestamps and float32 columns, zlib-compressed.
+        """
+        spill_timestamps, spill_values = self.spill.ordered()
+        raw_timestamps, raw_values = self.raw.ordered()
+        names = ",".join(self.channels).encode("utf-8")
+        parts = [
+            _HEADER.pack(
+                _MAGIC, _VERSION, len(self.channels), self.downsample_factor,
+                self.spill.count, self.raw.count, self.total_samples
+            ),
+            struct.pack("<H", len(names)),
+            names
+        ]
+        for timestamps, values in ((spill_timestamps, spill_values), (raw_timestamps, raw_values)):
+            parts.append(timestamps.astype("<f8").tobytes())
+            # Column-major: each channel contiguous, which compresses better
+            parts.append(np.ascontiguousarray(values.T).astype("<f4").tobytes())
+        return zlib.compress(b"".join(parts), 6)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        blob: bytes,
+        capacity: Optional[int] = None,
+        spill_capacity: Optional[int] = None
+    ) -> "BiometricBuffer":
+        """Rebuild a buffer from to_bytes() output."""
+        data = zlib.decompress(blob)
+        magic, version, channel_count, factor, spill_count, raw_count, total = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a biometric buffer archive")
+        offset = _HEADER.size
+        (names_length,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        channels = data[offset:offset + names_length].decode("utf-8").split(",")
+        offset += names_length
+        if len(channels) != channel_count:
+            raise ValueError("Corrupt biometric buffer archive")
+
+        buffer = cls(
+            capacity=max(capacity or BIOMETRIC_BUFFER_CAPACITY, raw_count, factor),
+            spill_capacity=max(spill_capacity or BIOMETRIC_SPILL_CAPACITY, spill_count, 1),
+            downsample_factor=factor,
+            channels=channels
+        )
+        for ring, count in ((buffer.spill, spill_count), (buffer.raw, raw_count)):
+            timestamps = np.frombuffer(data, dtype="<f8", count=count, offset=offset)
+            offset += timestamps.nbytes
+            columns = np.frombuffer(data, dtype="<f4", count=count * channel_count, offset=offset)
+            offset += columns.nbytes
+            ring.timestamps[:count] = timestamps
+            ring.values[:count] = columns.reshape(channel_count, count).T
+            ring.count = count
+        buffer.total_samples = total
+        if raw_count:
+            buffer.last_timestamp = float(buffer.raw.timestamps[raw_count - 1])
+        elif spill_count:
+            buffer.last_timestamp = float(buffer.spill.timestamps[spill_count - 1])
+        return buffer
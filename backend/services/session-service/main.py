@@ -4,14 +4,42 @@ File: backend/services/session-service/main.py
 Complete session management with VR integration
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
-from uuid import uuid4
+import base64
 import json
 import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from db_engine import create_db_engine
+from biometric_batch import BiometricBatch, BiometricBatchError
+from biometric_buffer import (
+    BIOMETRIC_IDLE_SECONDS,
+    BIOMETRIC_SNAPSHOT_SECONDS,
+    BIOMETRIC_STATS_SECONDS,
+    BIOMETRIC_STATS_WINDOW_SECONDS,
+    CHANNELS,
+    BiometricBuffer
+)
+from safety_rules import SafetyAlert, SafetyRuleEngine
+from session_bus import CommandForwardingError, SessionEventBus, default_event_bus
+from session_hub import SessionHub
+from session_store import (
+    SESSION_STORE_URL,
+    TERMINAL_STATUSES,
+    SessionRepository,
+    SessionShards,
+    SessionStore,
+    SQLSessionStore,
+    shards_from_env
+)
 
 app = FastAPI(
     title="Session Service",
@@ -75,8 +103,11 @@ class Session(BaseModel):
     environment_loaded: bool = False
     audio_tracks: List[str] = []
     
-    # Biometric Data
+    # Biometric Data (samples live in a BiometricBuffer while the session
+    # runs; biometric_data is no longer filled per sample)
     biometric_data: List[Dict] = []
+    biometric_samples: int = 0
+    biometric_archive: Optional[str] = None  # base64 BiometricBuffer.to_bytes(), set on end
     safety_checks: List[Dict] = []
     
     # Events
@@ -107,12 +138,83 @@ class SessionEvent(BaseModel):
 # SESSION MANAGER
 # =============================================================================
 
+# Session commands a worker runs on behalf of another (see run_on_owner)
+FORWARDED_COMMANDS = (
+    "start_session",
+    "pause_session",
+    "resume_session",
+    "end_session",
+    "change_phase",
+    "add_event"
+)
+
+
 class SessionManager:
-    """Manage active sessions"""
+    """
+    Manage active sessions.
+
+    Sessions live in a SessionRepository: an in-memory LRU in front of a
+    persistent store, written behind by a background flush. Each worker
+    owns the sessions of its shard (by session id) and only mutates those;
+    run_on_owner() forwards lifecycle commands for other shards over the
+    event bus. Biometric samples are not forwarded: streams must reach
+    the owning worker (421 with X-Session-Shard otherwise).
+
+    Live biometric buffers and safety rules are kept per session until the
+    session ends or receives no samples for biometric_idle_seconds. The
+    write-behind flush archives changed buffers into their sessions (at
+    most every biometric_snapshot_seconds), so an evicted or lost buffer
+    is restored from the archive on the next sample. Subscribers get the
+    rolling window stats as a biometric_stats message at most every
+    biometric_stats_seconds per session.
+    """
+    
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        shards: Optional[SessionShards] = None,
+        hub: Optional[SessionHub] = None,
+        bus: Optional[SessionEventBus] = None
+    ):
+        if store is None:
+            store = SQLSessionStore(create_db_engine(SESSION_STORE_URL, name="live-sessions"))
+        self.sessions: SessionRepository[Session] = SessionRepository(
+            Session, store, before_flush=self._snapshot_biometrics
+        )
+        self.shards = shards or shards_from_env()
+        self.biometrics: Dict[str, BiometricBuffer] = {}
+        self.safety_engines: Dict[str, SafetyRuleEngine] = {}
+        self.biometric_snapshot_seconds = BIOMETRIC_SNAPSHOT_SECONDS
+        self.biometric_idle_seconds = BIOMETRIC_IDLE_SECONDS
+        self.biometric_stats_seconds = BIOMETRIC_STATS_SECONDS
+        self.biometric_stats_window_seconds = BIOMETRIC_STATS_WINDOW_SECONDS
+        # Monotonic time of each live buffer's latest sample
+        self._biometrics_seen: Dict[str, float] = {}
+        self._biometrics_snapshot_at = 0.0
+        # Monotonic time of each session's latest biometric_stats message
+        self._biometric_stats_at: Dict[str, float] = {}
+        self.hub = hub or SessionHub()
+        # Events reach this worker's sockets through the bus, wherever they were published
+        self.bus = bus or default_event_bus()
+        self.bus.on_event(self.hub.publish)
+        self.bus.on_command(self.shards.worker_index, self._run_command)
     
-    def __init__(self):
-        self.sessions: Dict[str, Session] = {}
-        self.websocket_connections: Dict[str, WebSocket] = {}
+    async def _load(self, session_id: str) -> Session:
+        """Session owned by this worker, for mutation"""
+        
+        if not self.shards.owns(session_id):
+            # Misrouted request: tell the balancer which worker owns it
+            raise HTTPException(
+                421,
+                f"Session {session_id} is owned by another worker",
+                headers={"X-Session-Shard": str(self.shards.shard_for(session_id))}
+            )
+        
+        session = await self.sessions.get(session_id)
+        if session is None:
+            raise HTTPException(404, f"Session {session_id} not found")
+        
+        return session
     
     async def create_session(
         self,
@@ -120,7 +222,7 @@ class SessionManager:
     ) -> Session:
         """Create new therapy session"""
         
-        session_id = str(uuid4())
+        session_id = self.shards.new_session_id()
         
         session = Session(
             session_id=session_id,
@@ -136,7 +238,7 @@ class SessionManager:
             duration_actual=None
         )
         
-        self.sessions[session_id] = session
+        self.sessions.save(session)
         
         print(f"✅ Created session: {session_id}")
         
@@ -145,10 +247,7 @@ class SessionManager:
     async def start_session(self, session_id: str) -> Session:
         """Start therapy session"""
         
-        if session_id not in self.sessions:
-            raise HTTPException(404, f"Session {session_id} not found")
-        
-        session = self.sessions[session_id]
+        session = await self._load(session_id)
         
         if session.status != "pending":
             raise HTTPException(400, f"Session {session_id} already started")
@@ -170,6 +269,8 @@ class SessionManager:
             }
         })
         
+        self.sessions.save(session)
+        
         print(f"▶️  Started session: {session_id}")
         
         # Broadcast to connected clients
@@ -184,10 +285,7 @@ class SessionManager:
     async def pause_session(self, session_id: str) -> Session:
         """Pause active session"""
         
-        if session_id not in self.sessions:
-            raise HTTPException(404, f"Session {session_id} not found")
-        
-        session = self.sessions[session_id]
+        session = await self._load(session_id)
         
         if session.status != "active":
             raise HTTPException(400, f"Session {session_id} not active")
@@ -200,6 +298,8 @@ class SessionManager:
             "data": {"phase": session.phase}
         })
         
+        self.sessions.save(session)
+        
         print(f"⏸️  Paused session: {session_id}")
         
         await self._broadcast(session_id, {
@@ -212,10 +312,7 @@ class SessionManager:
     async def resume_session(self, session_id: str) -> Session:
         """Resume paused session"""
         
-        if session_id not in self.sessions:
-            raise HTTPException(404, f"Session {session_id} not found")
-        
-        session = self.sessions[session_id]
+        session = await self._load(session_id)
         
         if session.status != "paused":
             raise HTTPException(400, f"Session {session_id} not paused")
@@ -228,6 +325,8 @@ class SessionManager:
             "data": {"phase": session.phase}
         })
         
+        self.sessions.save(session)
+        
         print(f"▶️  Resumed session: {session_id}")
         
         await self._broadcast(session_id, {
@@ -245,10 +344,7 @@ class SessionManager:
     ) -> Session:
         """End therapy session"""
         
-        if session_id not in self.sessions:
-            raise HTTPException(404, f"Session {session_id} not found")
-        
-        session = self.sessions[session_id]
+        session = await self._load(session_id)
         
         session.status = "completed"
         session.phase = "integration"
@@ -260,6 +356,11 @@ class SessionManager:
             duration = (session.ended_at - session.started_at).total_seconds()
             session.duration_actual = int(duration)
         
+        buffer = self._drop_biometrics(session_id)
+        if buffer is not None:
+            session.biometric_samples = buffer.total_samples
+            session.biometric_archive = base64.b64encode(buffer.to_bytes()).decode("ascii")
+        
         session.events.append({
             "event_type": "session_ended",
             "timestamp": datetime.utcnow().isoformat(),
@@ -269,6 +370,8 @@ class SessionManager:
             }
         })
         
+        self.sessions.save(session)
+        
         print(f"⏹️  Ended session: {session_id} ({completion_percentage}% complete)")
         
         await self._broadcast(session_id, {
@@ -286,10 +389,7 @@ class SessionManager:
     ) -> Session:
         """Change session phase"""
         
-        if session_id not in self.sessions:
-            raise HTTPException(404, f"Session {session_id} not found")
-        
-        session = self.sessions[session_id]
+        session = await self._load(session_id)
         old_phase = session.phase
         session.phase = new_phase
         
@@ -302,6 +402,8 @@ class SessionManager:
             }
         })
         
+        self.sessions.save(session)
+        
         print(f"🔄 Phase change in {session_id}: {old_phase} → {new_phase}")
         
         await self._broadcast(session_id, {
@@ -319,79 +421,294 @@ class SessionManager:
     ) -> None:
         """Add biometric data point"""
         
-        if session_id not in self.sessions:
-            raise HTTPException(404, f"Session {session_id} not found")
+        session = await self._load(session_id)
+        values = (data.heart_rate, data.hrv, data.stress_level, data.arousal_level)
         
-        session = self.sessions[session_id]
-        session.biometric_data.append(data.dict())
+        # Rules see the (clamped) time the buffer records, so their windows
+        # never run backwards on a late sample
+        buffer = self._buffer(session)
+        timestamp = buffer.append(data.timestamp.timestamp(), values)
         
         # Check for safety concerns
-        if data.heart_rate and data.heart_rate > 140:
-            await self._trigger_safety_check(session_id, "High heart rate detected")
+        if session.config.safety_checks_enabled:
+            for alert in self._safety_engine(session_id).evaluate(timestamp, dict(zip(CHANNELS, values))):
+                await self._trigger_safety_check(session_id, alert.reason, alert)
+        
+        await self._publish_biometric_stats(session_id, buffer)
+    
+    async def add_biometric_batch(
+        self,
+        session_id: str,
+        batch: BiometricBatch
+    ) -> int:
+        """Add a validated batch of biometric samples; returns the sample count"""
+        
+        session = await self._load(session_id)
+        
+        buffer = self._buffer(session)
+        timestamps = buffer.extend(batch.timestamps, batch.values)
+        
+        # Rules still see every sample, in order, at the recorded times
+        if session.config.safety_checks_enabled:
+            alerts = self._safety_engine(session_id).evaluate_many(
+                timestamps.tolist(), batch.values.tolist(), CHANNELS
+            )
+            for alert in alerts:
+                await self._trigger_safety_check(session_id, alert.reason, alert)
+        
+        await self._publish_biometric_stats(session_id, buffer)
+        return len(batch)
+    
+    async def _publish_biometric_stats(self, session_id: str, buffer: BiometricBuffer) -> None:
+        """Broadcast the buffer's rolling stats, throttled per session"""
+        
+        now = time.monotonic()
+        published_at = self._biometric_stats_at.get(session_id)
+        if published_at is not None and now - published_at < self.biometric_stats_seconds:
+            return
+        self._biometric_stats_at[session_id] = now
+        
+        # Telemetry: the hub coalesces it per subscriber and drops it first
+        await self._broadcast(session_id, {
+            "type": "biometric_stats",
+            "session_id": session_id,
+            "samples": buffer.total_samples,
+            "window_seconds": self.biometric_stats_window_seconds,
+            "channels": buffer.window_stats(self.biometric_stats_window_seconds)
+        })
+    
+    def _buffer(self, session: Session) -> BiometricBuffer:
+        """The session's live buffer, restored from its archive after eviction"""
+        
+        session_id = session.session_id
+        buffer = self.biometrics.get(session_id)
+        if buffer is None:
+            if session.biometric_archive:
+                buffer = BiometricBuffer.from_bytes(base64.b64decode(session.biometric_archive))
+            else:
+                buffer = BiometricBuffer()
+            self.biometrics[session_id] = buffer
+        self._biometrics_seen[session_id] = time.monotonic()
+        return buffer
+    
+    def _drop_biometrics(self, session_id: str) -> Optional[BiometricBuffer]:
+        """Forget a session's live buffer and safety rules; returns the buffer"""
+        
+        self.safety_engines.pop(session_id, None)
+        self._biometrics_seen.pop(session_id, None)
+        self._biometric_stats_at.pop(session_id, None)
+        return self.biometrics.pop(session_id, None)
+    
+    async def _snapshot_biometrics(self) -> None:
+        """
+        Archive changed live buffers into their sessions and drop idle ones
+        (runs before every write-behind flush).
+        
+        Buffers are copied on the event loop and compressed in a worker
+        thread; samples arriving meanwhile go out with the next snapshot.
+        """
+        
+        now = time.monotonic()
+        idle = {
+            session_id for session_id, seen in self._biometrics_seen.items()
+            if now - seen >= self.biometric_idle_seconds
+        }
+        if not idle and now - self._biometrics_snapshot_at < self.biometric_snapshot_seconds:
+            return
+        self._biometrics_snapshot_at = now
+        
+        snapshots = {}
+        for session_id, buffer in list(self.biometrics.items()):
+            session = await self.sessions.get(session_id)
+            if session is None:
+                self._drop_biometrics(session_id)
+            elif buffer.total_samples != session.biometric_samples:
+                snapshots[session_id] = (buffer, buffer.copy())
+        
+        if snapshots:
+            archives = await asyncio.to_thread(lambda: {
+                session_id: base64.b64encode(snapshot.to_bytes()).decode("ascii")
+                for session_id, (_, snapshot) in snapshots.items()
+            })
+            for session_id, (buffer, snapshot) in snapshots.items():
+                # Ended (and archived in full) while compressing
+                if self.biometrics.get(session_id) is not buffer:
+                    continue
+                session = await self.sessions.get(session_id)
+                if session is None or session.status in TERMINAL_STATUSES:
+                    continue
+                session.biometric_samples = snapshot.total_samples
+                session.biometric_archive = archives[session_id]
+                self.sessions.save(session)
+        
+        # Only buffers whose every sample is archived are dropped
+        for session_id in idle:
+            buffer = self.biometrics.get(session_id)
+            seen = self._biometrics_seen.get(session_id)
+            if buffer is None or seen is None or now - seen < self.biometric_idle_seconds:
+                continue
+            session = await self.sessions.get(session_id)
+            if session is None or session.biometric_samples == buffer.total_samples:
+                self._drop_biometrics(session_id)
+    
+    def _safety_engine(self, session_id: str) -> SafetyRuleEngine:
+        engine = self.safety_engines.get(session_id)
+        if engine is None:
+            engine = self.safety_engines[session_id] = SafetyRuleEngine()
+        return engine
+    
+    async def get_biometric_stats(
+        self,
+        session_id: str,
+        window_seconds: float = 60.0
+    ) -> Dict[str, Any]:
+        """Rolling per-channel stats over the latest window_seconds of samples"""
+        
+        session = await self.get_session(session_id)
+        buffer = self.biometrics.get(session_id)
+        if buffer is None and session.biometric_archive:
+            buffer = BiometricBuffer.from_bytes(base64.b64decode(session.biometric_archive))
+        
+        if buffer is None:
+            return {
+                "session_id": session_id,
+                "samples": 0,
+                "window_seconds": window_seconds,
+                "channels": {channel: {"count": 0} for channel in CHANNELS}
+            }
+        
+        return {
+            "session_id": session_id,
+            "samples": buffer.total_samples,
+            "window_seconds": window_seconds,
+            "channels": buffer.window_stats(window_seconds)
+        }
+    
+    async def add_event(
+        self,
+        session_id: str,
+        event_type: str,
+        data: Dict[str, Any]
+    ) -> None:
+        """Log a session event"""
+        
+        session = await self._load(session_id)
+        event = {
+            "event_type": event_type,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": data
+        }
+        session.events.append(event)
+        self.sessions.save(session)
+        
+        await self._broadcast(session_id, {
+            "type": "session_event",
+            "session_id": session_id,
+            **event
+        })
     
     async def _trigger_safety_check(
         self,
         session_id: str,
-        reason: str
+        reason: str,
+        alert: Optional[SafetyAlert] = None
     ) -> None:
         """Trigger safety check"""
         
-        if session_id not in self.sessions:
+        session = await self.sessions.get(session_id)
+        if session is None:
             return
         
-        session = self.sessions[session_id]
-        
+        pause = session.status == "active"
         safety_check = {
             "timestamp": datetime.utcnow().isoformat(),
             "reason": reason,
-            "action": "Paused for safety check"
+            "action": "Paused for safety check" if pause else "Logged (session not active)"
         }
+        if alert is not None:
+            safety_check["rule"] = alert.rule
+            safety_check["details"] = alert.details
         
         session.safety_checks.append(safety_check)
         
+        self.sessions.save(session)
+        
         print(f"⚠️  Safety check triggered in {session_id}: {reason}")
         
         # Auto-pause session
-        await self.pause_session(session_id)
+        if pause:
+            await self.pause_session(session_id)
         
         # Broadcast alert
         await self._broadcast(session_id, {
             "type": "safety_alert",
             "session_id": session_id,
-            "reason": reason
+            "reason": reason,
+            "rule": alert.rule if alert is not None else None
         })
     
     async def _broadcast(self, session_id: str, message: Dict) -> None:
-        """Broadcast message to connected clients"""
+        """Broadcast message to connected clients on every worker (never waits on a socket)"""
         
-        if session_id in self.websocket_connections:
-            try:
-                await self.websocket_connections[session_id].send_json(message)
-            except Exception as e:
-                print(f"❌ Broadcast error for {session_id}: {e}")
+        await self.bus.publish(session_id, message)
     
-    def get_session(self, session_id: str) -> Session:
-        """Get session by ID"""
+    async def run_on_owner(self, command: str, session_id: str, **args) -> Optional[Session]:
+        """
+        Run one of FORWARDED_COMMANDS on the worker owning the session:
+        here when this worker owns it, else over the bus. Without a bus
+        that reaches other workers this is a plain call (421 when not
+        owned); 504 when the owner does not answer.
+        """
+        
+        if command not in FORWARDED_COMMANDS:
+            raise ValueError(f"Unknown session command {command}")
+        if self.shards.owns(session_id) or not self.bus.forwards_commands:
+            return await getattr(self, command)(session_id, **args)
+        
+        try:
+            reply = await self.bus.forward(
+                self.shards.shard_for(session_id), command, session_id, args
+            )
+        except CommandForwardingError as e:
+            raise HTTPException(504, str(e))
+        
+        if "error" in reply:
+            raise HTTPException(reply["error"]["status_code"], reply["error"]["detail"])
+        if reply.get("session") is None:
+            return None
+        return Session.model_validate(reply["session"])
+    
+    async def _run_command(self, command: str, session_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a command forwarded by another worker; failures go in the reply"""
+        
+        if command not in FORWARDED_COMMANDS:
+            return {"error": {"status_code": 400, "detail": f"Unknown session command {command}"}}
+        try:
+            session = await getattr(self, command)(session_id, **args)
+        except HTTPException as e:
+            return {"error": {"status_code": e.status_code, "detail": e.detail}}
+        except Exception as e:
+            return {"error": {"status_code": 500, "detail": f"{command} failed: {e}"}}
+        
+        return {"session": session.model_dump(mode="json") if session is not None else None}
+    
+    async def get_session(self, session_id: str) -> Session:
+        """Get session by ID (any worker; only owned sessions are cached)"""
         
-        if session_id not in self.sessions:
+        session = await self.sessions.get(session_id, cache=self.shards.owns(session_id))
+        if session is None:
             raise HTTPException(404, f"Session {session_id} not found")
         
-        return self.sessions[session_id]
+        return session
     
-    def get_user_sessions(
+    async def get_user_sessions(
         self,
         user_id: str,
         status: Optional[str] = None
     ) -> List[Session]:
         """Get user's sessions"""
         
-        sessions = [
-            s for s in self.sessions.values()
-            if s.user_id == user_id
-        ]
-        
-        if status:
-            sessions = [s for s in sessions if s.status == status]
+        sessions = await self.sessions.user_sessions(user_id, status or None)
         
         return sorted(sessions, key=lambda s: s.created_at, reverse=True)
 
@@ -403,6 +720,19 @@ class SessionManager:
 session_manager = SessionManager()
 
 
+@app.on_event("startup")
+async def start_session_flush():
+    session_manager.sessions.start()
+    await session_manager.bus.start()
+
+
+@app.on_event("shutdown")
+async def stop_session_flush():
+    await session_manager.bus.stop()
+    # Write every pending change before the worker exits
+    await session_manager.sessions.stop()
+
+
 # =============================================================================
 # API ENDPOINTS
 # =============================================================================
@@ -420,19 +750,19 @@ async def create_session(request: CreateSessionRequest):
 @app.post("/api/v1/sessions/{session_id}/start", response_model=Session)
 async def start_session(session_id: str):
     """Start therapy session"""
-    return await session_manager.start_session(session_id)
+    return await session_manager.run_on_owner("start_session", session_id)
 
 
 @app.post("/api/v1/sessions/{session_id}/pause", response_model=Session)
 async def pause_session(session_id: str):
     """Pause active session"""
-    return await session_manager.pause_session(session_id)
+    return await session_manager.run_on_owner("pause_session", session_id)
 
 
 @app.post("/api/v1/sessions/{session_id}/resume", response_model=Session)
 async def resume_session(session_id: str):
     """Resume paused session"""
-    return await session_manager.resume_session(session_id)
+    return await session_manager.run_on_owner("resume_session", session_id)
 
 
 @app.post("/api/v1/sessions/{session_id}/end", response_model=Session)
@@ -442,13 +772,15 @@ async def end_session(
     notes: Optional[str] = None
 ):
     """End therapy session"""
-    return await session_manager.end_session(session_id, completion, notes)
+    return await session_manager.run_on_owner(
+        "end_session", session_id, completion_percentage=completion, notes=notes
+    )
 
 
 @app.get("/api/v1/sessions/{session_id}", response_model=Session)
 async def get_session(session_id: str):
     """Get session details"""
-    return session_manager.get_session(session_id)
+    return await session_manager.get_session(session_id)
 
 
 @app.get("/api/v1/sessions/user/{user_id}", response_model=List[Session])
@@ -457,13 +789,21 @@ async def get_user_sessions(
     status: Optional[str] = None
 ):
     """Get user's sessions"""
-    return session_manager.get_user_sessions(user_id, status)
+    return await session_manager.get_user_sessions(user_id, status)
 
 
 @app.post("/api/v1/sessions/{session_id}/phase")
 async def change_phase(session_id: str, phase: str):
     """Change session phase"""
-    return await session_manager.change_phase(session_id, phase)
+    return await session_manager.run_on_owner("change_phase", session_id, new_phase=phase)
+
+
+@app.get("/api/v1/sessions/{session_id}/biometric/stats")
+async def get_biometric_stats(session_id: str, window_seconds: float = 60.0):
+    """Rolling biometric stats (mean/min/max/slope per channel)"""
+    if window_seconds <= 0:
+        raise HTTPException(400, "window_seconds must be positive")
+    return await session_manager.get_biometric_stats(session_id, window_seconds)
 
 
 @app.post("/api/v1/sessions/{session_id}/biometric")
@@ -473,46 +813,98 @@ async def add_biometric_data(session_id: str, data: BiometricData):
     return {"success": True}
 
 
+@app.post("/api/v1/sessions/{session_id}/biometric/batch")
+async def add_biometric_batch(session_id: str, request: Request):
+    """
+    Add a batch of biometric samples: JSON columns
+    ({"timestamps": [...], "heart_rate": [...], ...}) or a binary frame
+    (Content-Type: application/octet-stream)
+    """
+    try:
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            batch = BiometricBatch.from_bytes(await request.body())
+        else:
+            batch = BiometricBatch.from_columns(await request.json())
+    except (BiometricBatchError, json.JSONDecodeError) as e:
+        raise HTTPException(422, f"Invalid biometric batch: {e}")
+    
+    accepted = await session_manager.add_biometric_batch(session_id, batch)
+    return {"success": True, "accepted": accepted}
+
+
 # =============================================================================
 # WEBSOCKET ENDPOINT
 # =============================================================================
 
 @app.websocket("/ws/{session_id}")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    """WebSocket connection for real-time session updates"""
+async def websocket_endpoint(websocket: WebSocket, session_id: str, role: str = "client"):
+    """WebSocket connection for real-time session updates (any number per session)"""
     
     await websocket.accept()
-    session_manager.websocket_connections[session_id] = websocket
+    subscriber = session_manager.hub.subscribe(
+        session_id,
+        websocket.send_json,
+        close=lambda: websocket.close(code=1013),
+        label=role
+    )
     
-    print(f"🔌 WebSocket connected: {session_id}")
+    print(f"🔌 WebSocket connected: {session_id} ({role})")
     
     try:
         while True:
-            # Receive messages from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Receive messages from client: JSON text, or binary biometric batches
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
             
-            # Handle different message types
-            if message["type"] == "ping":
-                await websocket.send_json({"type": "pong"})
-            
-            elif message["type"] == "biometric":
-                biometric_data = BiometricData(**message["data"])
-                await session_manager.add_biometric_data(session_id, biometric_data)
-            
-            elif message["type"] == "event":
-                # Log custom event
-                session = session_manager.get_session(session_id)
-                session.events.append({
-                    "event_type": "custom",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "data": message["data"]
-                })
+            try:
+                if frame.get("bytes") is not None:
+                    try:
+                        batch = BiometricBatch.from_bytes(frame["bytes"])
+                    except BiometricBatchError as e:
+                        subscriber.enqueue({"type": "error", "detail": str(e)})
+                        continue
+                    await session_manager.add_biometric_batch(session_id, batch)
+                    continue
+                
+                message = json.loads(frame["text"])
+                
+                # Handle different message types
+                if message["type"] == "ping":
+                    # Replies share the subscriber's queue: one writer per socket
+                    subscriber.enqueue({"type": "pong"})
+                
+                elif message["type"] == "biometric":
+                    biometric_data = BiometricData(**message["data"])
+                    await session_manager.add_biometric_data(session_id, biometric_data)
+                
+                elif message["type"] == "biometric_batch":
+                    try:
+                        batch = BiometricBatch.from_columns(message["data"])
+                    except BiometricBatchError as e:
+                        subscriber.enqueue({"type": "error", "detail": str(e)})
+                        continue
+                    await session_manager.add_biometric_batch(session_id, batch)
+                
+                elif message["type"] == "event":
+                    # Log custom event
+                    await session_manager.run_on_owner(
+                        "add_event", session_id, event_type="custom", data=message["data"]
+                    )
+            except HTTPException as e:
+                # e.g. 421 when the session is owned by another worker
+                subscriber.enqueue({"type": "error", "status": e.status_code, "detail": e.detail})
             
     except WebSocketDisconnect:
-        print(f"🔌 WebSocket disconnected: {session_id}")
-        if session_id in session_manager.websocket_connections:
-            del session_manager.websocket_connections[session_id]
+        print(f"🔌 WebSocket disconnected: {session_id} ({role})")
+    finally:
+        await session_manager.hub.unsubscribe(subscriber)
+
+
+@app.get("/metrics/websockets")
+async def websocket_metrics():
+    """Subscriber queue depth, sent, dropped and coalesced messages"""
+    return session_manager.hub.metrics()
 
 
 @app.get("/health")
@@ -521,7 +913,10 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Session Service",
-        "active_sessions": len([s for s in session_manager.sessions.values() if s.status == "active"])
+        "active_sessions": len([s for s in session_manager.sessions.in_memory() if s.status == "active"]),
+        "shard": session_manager.shards.worker_index,
+        "session_store": session_manager.sessions.stats(),
+        "event_bus": session_manager.bus.stats()
     }
 
 
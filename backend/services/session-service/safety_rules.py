@@ -0,0 +1,556 @@
+"""
+Streaming Safety Rules
+Declarative, incrementally evaluated safety rules over the biometric stream
+
+Location: backend/services/session-service/safety_rules.py
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import deque
+import json
+import os
+import time
+
+
+# Optional JSON file with a list of rule specs replacing the defaults
+SAFETY_RULES_FILE = os.getenv("SAFETY_RULES_FILE")
+
+# Rule specs: "when" is a condition (see CONDITIONS), evaluated per sample.
+# A rule fires once its condition has held for sustain_seconds, then re-arms
+# after the condition clears (thresholds clear at their clear_* level) and
+# cooldown_seconds have passed. A condition with no value to judge (sensor
+# dropout emptied its window) does not hold: the rule's sustain timer and
+# hysteresis restart when readings return, and cooldown still applies.
+DEFAULT_SAFETY_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "high_heart_rate",
+        "reason": "High heart rate detected",
+        "when": {
+            "kind": "window", "channel": "heart_rate", "window_seconds": 10,
+            "stat": "mean", "above": 140, "clear_below": 130
+        },
+        "sustain_seconds": 5,
+        "cooldown_seconds": 60
+    },
+    {
+        "name": "heart_rate_surge",
+        "reason": "Rapid heart rate increase",
+        "when": {
+            "kind": "rate_of_change", "channel": "heart_rate", "window_seconds": 30,
+            "above": 1.0, "min_samples": 10
+        },
+        "sustain_seconds": 3,
+        "cooldown_seconds": 120
+    },
+    {
+        "name": "hrv_drop",
+        "reason": "Heart rate variability dropped sharply",
+        "when": {
+            "kind": "drop", "channel": "hrv", "baseline_seconds": 180,
+            "window_seconds": 20, "fraction": 0.4, "clear_fraction": 0.25
+        },
+        "sustain_seconds": 10,
+        "cooldown_seconds": 180
+    },
+    {
+        "name": "stress_and_arousal",
+        "reason": "High stress with high arousal",
+        "when": {
+            "kind": "all",
+            "conditions": [
+                {
+                    "kind": "window", "channel": "stress_level", "window_seconds": 15,
+                    "stat": "mean", "above": 0.85, "clear_below": 0.75
+                },
+                {
+                    "kind": "window", "channel": "arousal_level", "window_seconds": 15,
+                    "stat": "mean", "above": 0.85, "clear_below": 0.75
+                }
+            ]
+        },
+        "sustain_seconds": 10,
+        "cooldown_seconds": 120
+    }
+]
+
+
+# =============================================================================
+# SLIDING WINDOW
+# =============================================================================
+
+class SlidingWindow:
+    """
+    Time-based window with running sums and monotonic min/max deques.
+
+    push() is amortized O(1): every sample enters and leaves each deque
+    once. Times are kept relative to the first sample so the least-squares
+    sums stay well conditioned. Min/max (extremes) and slope (trend)
+    bookkeeping can be switched off when a condition does not need them.
+    """
+
+    def __init__(self, seconds: float, extremes: bool = True, trend: bool = True):
+        if seconds <= 0:
+            raise ValueError("Window length must be positive")
+        self.seconds = seconds
+        self.extremes = extremes
+        self.trend = trend
+        self._origin: Optional[float] = None
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._min: Deque[Tuple[float, float]] = deque()
+        self._max: Deque[Tuple[float, float]] = deque()
+        self.count = 0
+        self._sum_t = 0.0
+        self._sum_v = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+
+    def push(self, timestamp: float, value: float) -> None:
+        origin = self._origin
+        if origin is None:
+            origin = self._origin = timestamp
+        t = timestamp - origin
+        samples = self._samples
+        samples.append((t, value))
+        self.count += 1
+        self._sum_v += value
+        if self.trend:
+            self._sum_t += t
+            self._sum_tt += t * t
+            self._sum_tv += t * value
+        if self.extremes:
+            minimum = self._min
+            while minimum and minimum[-1][1] >= value:
+                minimum.pop()
+            minimum.append((t, value))
+            maximum = self._max
+            while maximum and maximum[-1][1] <= value:
+                maximum.pop()
+            maximum.append((t, value))
+        cutoff = t - self.seconds
+        if samples[0][0] < cutoff:
+            self._evict(cutoff)
+
+    def expire(self, timestamp: float) -> None:
+        """Drop samples older than the window ending at timestamp."""
+        if self._origin is not None:
+            self._evict(timestamp - self._origin - self.seconds)
+
+    def _evict(self, cutoff: float) -> None:
+        samples = self._samples
+        trend = self.trend
+        while samples and samples[0][0] < cutoff:
+            t, value = samples.popleft()
+            self.count -= 1
+            self._sum_v -= value
+            if trend:
+                self._sum_t -= t
+                self._sum_tt -= t * t
+                self._sum_tv -= t * value
+        if self.extremes:
+            while self._min and self._min[0][0] < cutoff:
+                self._min.popleft()
+            while self._max and self._max[0][0] < cutoff:
+                self._max.popleft()
+
+    def mean(self) -> Optional[float]:
+        return self._sum_v / self.count if self.count else None
+
+    def minimum(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    def maximum(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def slope(self) -> Optional[float]:
+        """Least-squares trend in units per second."""
+        if self.count < 2:
+            return None
+        denominator = self.count * self._sum_tt - self._sum_t ** 2
+        if denominator <= 1e-9:
+            return None
+        return (self.count * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+
+# =============================================================================
+# CONDITIONS
+# =============================================================================
+
+class Condition(ABC):
+    """
+    Stateful predicate over the stream. update() feeds one sample and
+    returns whether the condition currently holds; details() describes the
+    values behind the last decision.
+    """
+
+    @abstractmethod
+    def update(self, timestamp: float, sample: Dict[str, Optional[float]]) -> bool:
+        """Feed one sample; True while the condition holds"""
+
+    def details(self) -> Dict[str, Any]:
+        return {}
+
+
+class _Threshold:
+    """
+    above/below with hysteresis: once tripped, holds until the clear level.
+    A missing value (nothing left to judge) clears it.
+    """
+
+    def __init__(
+        self,
+        above: Optional[float] = None,
+        below: Optional[float] = None,
+        clear_above: Optional[float] = None,
+        clear_below: Optional[float] = None
+    ):
+        if above is None and below is None:
+            raise ValueError("Threshold needs 'above' or 'below'")
+        self.above = above
+        self.below = below
+        self.clear_below = above if clear_below is None else clear_below
+        self.clear_above = below if clear_above is None else clear_above
+        self.active = False
+
+    def check(self, value: Optional[float]) -> bool:
+        if value is None:
+            self.active = False
+            return False
+        if self.active:
+            self.active = (
+                (self.above is not None and value >= self.clear_below)
+                or (self.below is not None and value <= self.clear_above)
+            )
+        else:
+            self.active = (
+                (self.above is not None and value > self.above)
+                or (self.below is not None and value < self.below)
+            )
+        return self.active
+
+
+class WindowThreshold(Condition):
+    """Windowed mean/min/max of a channel beyond a threshold"""
+
+    STATS = ("mean", "min", "max")
+
+    def __init__(
+        self,
+        channel: str,
+        window_seconds: float,
+        stat: str = "mean",
+        min_samples: int = 1,
+        **threshold
+    ):
+        if stat not in self.STATS:
+            raise ValueError(f"Unknown window stat {stat!r}; choose from {self.STATS}")
+        self.channel = channel
+        self.stat = stat
+        self.min_samples = min_samples
+        self.window = SlidingWindow(window_seconds, extremes=stat != "mean", trend=False)
+        self.threshold = _Threshold(**threshold)
+        self.value: Optional[float] = None
+
+    def _stat(self) -> Optional[float]:
+        if self.window.count < self.min_samples:
+            return None
+        if self.stat == "mean":
+            return self.window.mean()
+        if self.stat == "min":
+            return self.window.minimum()
+        return self.window.maximum()
+
+    def update(self, timestamp: float, sample: Dict[str, Optional[float]]) -> bool:
+        value = sample.get(self.channel)
+        if value is None:
+            self.window.expire(timestamp)
+        else:
+            self.window.push(timestamp, value)
+        self.value = self._stat()
+        return self.threshold.check(self.value)
+
+    def details(self) -> Dict[str, Any]:
+        return {f"{self.channel}_{self.stat}": self.value}
+
+
+class RateOfChange(Condition):
+    """Least-squares slope (units per second) of a channel over a window"""
+
+    def __init__(
+        self,
+        channel: str,
+        window_seconds: float,
+        min_samples: int = 2,
+        **threshold
+    ):
+        self.channel = channel
+        self.min_samples = max(min_samples, 2)
+        self.window = SlidingWindow(window_seconds, extremes=False)
+        self.threshold = _Threshold(**threshold)
+        self.value: Optional[float] = None
+
+    def update(self, timestamp: float, sample: Dict[str, Optional[float]]) -> bool:
+        value = sample.get(self.channel)
+        if value is None:
+            self.window.expire(timestamp)
+        else:
+            self.window.push(timestamp, value)
+        self.value = self.window.slope() if self.window.count >= self.min_samples else None
+        return self.threshold.check(self.value)
+
+    def details(self) -> Dict[str, Any]:
+        return {f"{self.channel}_slope": self.value}
+
+
+class DropFromBaseline(Condition):
+    """
+    Recent mean fallen by at least `fraction` below a longer baseline mean
+    (e.g. an HRV drop). Clears once the drop is back under clear_fraction.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        baseline_seconds: float,
+        window_seconds: float,
+        fraction: float,
+        clear_fraction: Optional[float] = None,
+        min_samples: int = 5
+    ):
+        if window_seconds >= baseline_seconds:
+            raise ValueError("Drop window must be shorter than the baseline")
+        self.channel = channel
+        self.min_samples = min_samples
+        self.baseline = SlidingWindow(baseline_seconds, extremes=False, trend=False)
+        self.recent = SlidingWindow(window_seconds, extremes=False, trend=False)
+        self.threshold = _Threshold(above=fraction, clear_below=clear_fraction)
+        self.value: Optional[float] = None
+
+    def update(self, timestamp: float, sample: Dict[str, Optional[float]]) -> bool:
+        value = sample.get(self.channel)
+        if value is None:
+            self.baseline.expire(timestamp)
+            self.recent.expire(timestamp)
+        else:
+            self.baseline.push(timestamp, value)
+            self.recent.push(timestamp, value)
+        self.value = None
+        if self.baseline.count >= self.min_samples and self.recent.count:
+            baseline = self.baseline.mean()
+            if baseline and baseline > 0:
+                self.value = (baseline - self.recent.mean()) / baseline
+        return self.threshold.check(self.value)
+
+    def details(self) -> Dict[str, Any]:
+        return {f"{self.channel}_drop": self.value}
+
+
+class AllOf(Condition):
+    """Every sub-condition holds (multi-channel rules)"""
+
+    def __init__(self, conditions: List[Dict[str, Any]]):
+        if not conditions:
+            raise ValueError("'all' needs at least one condition")
+        self.conditions = [compile_condition(spec) for spec in conditions]
+
+    def update(self, timestamp: float, sample: Dict[str, Optional[float]]) -> bool:
+        # Every sub-condition sees every sample so its window stays current
+        results = [condition.update(timestamp, sample) for condition in self.conditions]
+        return all(results)
+
+    def details(self) -> Dict[str, Any]:
+        details = {}
+        for condition in self.conditions:
+            details.update(condition.details())
+        return details
+
+
+class AnyOf(AllOf):
+    """At least one sub-condition holds"""
+
+    def update(self, timestamp: float, sample: Dict[str, Optional[float]]) -> bool:
+        results = [condition.update(timestamp, sample) for condition in self.conditions]
+        return any(results)
+
+
+CONDITIONS: Dict[str, Callable[..., Condition]] = {
+    "window": WindowThreshold,
+    "rate_of_change": RateOfChange,
+    "drop": DropFromBaseline,
+    "all": AllOf,
+    "any": AnyOf
+}
+
+
+def compile_condition(spec: Dict[str, Any]) -> Condition:
+    """Build a fresh (stateful) condition from its spec."""
+    spec = dict(spec)
+    kind = spec.pop("kind", None)
+    try:
+        condition_class = CONDITIONS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown condition kind {kind!r}; choose from {sorted(CONDITIONS)}")
+    return condition_class(**spec)
+
+
+# =============================================================================
+# RULES AND ENGINE
+# =============================================================================
+
+class SafetyAlert:
+    """A rule firing at one sample"""
+
+    __slots__ = ("rule", "reason", "timestamp", "details")
+
+    def __init__(self, rule: str, reason: str, timestamp: float, details: Dict[str, Any]):
+        self.rule = rule
+        self.reason = reason
+        self.timestamp = timestamp
+        self.details = details
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rule": self.rule,
+            "reason": self.reason,
+            "timestamp": self.timestamp,
+            "details": self.details
+        }
+
+
+class SafetyRule:
+    """A condition plus debounce (sustain), re-arm and cooldown"""
+
+    def __init__(
+        self,
+        name: str,
+        when: Dict[str, Any],
+        reason: Optional[str] = None,
+        sustain_seconds: float = 0.0,
+        cooldown_seconds: float = 0.0
+    ):
+        self.name = name
+        self.reason = reason or name
+        self.condition = compile_condition(when)
+        self.sustain_seconds = sustain_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._holding_since: Optional[float] = None
+        self._armed = True
+        self._last_fired: Optional[float] = None
+
+    def update(self, timestamp: float, sample: Dict[str, Optional[float]]) -> Optional[SafetyAlert]:
+        if not self.condition.update(timestamp, sample):
+            self._holding_since = None
+            self._armed = True
+            return None
+        if self._holding_since is None:
+            self._holding_since = timestamp
+        if not self._armed or timestamp - self._holding_since < self.sustain_seconds:
+            return None
+        if self._last_fired is not None and timestamp - self._last_fired < self.cooldown_seconds:
+            return None
+        self._armed = False
+        self._last_fired = timestamp
+        return SafetyAlert(self.name, self.reason, timestamp, self.condition.details())
+
+
+def validate_rule_specs(specs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    The specs as a list, after compiling each once.
+
+    Raises:
+        ValueError: a spec that does not compile (named by position and name)
+    """
+    specs = list(specs)
+    for position, spec in enumerate(specs):
+        try:
+            SafetyRule(**spec)
+        except (TypeError, ValueError) as e:
+            name = spec.get("name") if isinstance(spec, dict) else None
+            raise ValueError(f"Invalid safety rule #{position} ({name!r}): {e}") from e
+    return specs
+
+
+def load_rule_specs(path: Optional[str] = SAFETY_RULES_FILE) -> List[Dict[str, Any]]:
+    """Validated rule specs from a JSON file, or the defaults."""
+    if not path:
+        return DEFAULT_SAFETY_RULES
+    with open(path, encoding="utf-8") as handle:
+        return validate_rule_specs(json.load(handle))
+
+
+# Specs every engine compiles by default: read and validated once, at
+# import, so a bad SAFETY_RULES_FILE stops the service from starting
+SAFETY_RULES: List[Dict[str, Any]] = load_rule_specs()
+
+
+class SafetyRuleEngine:
+    """
+    Per-session evaluator: compiles the rule specs (default SAFETY_RULES)
+    into fresh stateful rules and feeds each sample to every rule. Cost
+    per sample is O(1) amortized per rule (sliding windows with running sums).
+    """
+
+    def __init__(self, specs: Optional[Iterable[Dict[str, Any]]] = None):
+        self.rules = [SafetyRule(**spec) for spec in (SAFETY_RULES if specs is None else specs)]
+        self.samples = 0
+
+    def evaluate(self, timestamp: float, sample: Dict[str, Optional[float]]) -> List[SafetyAlert]:
+        self.samples += 1
+        alerts = []
+        for rule in self.rules:
+            alert = rule.update(timestamp, sample)
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def evaluate_many(
+        self,
+        timestamps: Iterable[float],
+        rows: Iterable[Sequence[float]],
+        channels: Sequence[str]
+    ) -> List[SafetyAlert]:
+        """Evaluate a batch of samples in order; NaN readings count as missing."""
+        alerts = []
+        for timestamp, row in zip(timestamps, rows):
+            sample = {
+                channel: None if value != value else value
+                for channel, value in zip(channels, row)
+            }
+            alerts.extend(self.evaluate(timestamp, sample))
+        return alerts
+
+
+def replay(
+    samples: Iterable[Tuple[float, Dict[str, Optional[float]]]],
+    specs: Optional[Iterable[Dict[str, Any]]] = None,
+    speed: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Feed recorded (timestamp, sample) pairs through a fresh engine.
+
+    speed=0 runs as fast as possible; speed=N paces the replay at N times
+    real time. Returns the alerts plus throughput figures.
+    """
+    engine = SafetyRuleEngine(specs)
+    alerts: List[SafetyAlert] = []
+    first = last = None
+    started = time.perf_counter()
+    for timestamp, sample in samples:
+        if first is None:
+            first = timestamp
+        last = timestamp
+        if speed > 0:
+            delay = (timestamp - first) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        alerts.extend(engine.evaluate(timestamp, sample))
+    elapsed = time.perf_counter() - started
+    recorded = (last - first) if first is not None else 0.0
+    return {
+        "samples": engine.samples,
+        "recorded_seconds": recorded,
+        "elapsed_seconds": elapsed,
+        "samples_per_second": engine.samples / elapsed if elapsed else 0.0,
+        "speedup": recorded / elapsed if elapsed else 0.0,
+        "alerts": alerts
+    }
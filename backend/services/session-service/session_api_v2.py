@@ -14,16 +14,24 @@ from uuid import uuid4
 import httpx
 import json
 import os
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, JSON, Text
+import sys
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
+# Shared engine factory from backend/db_engine.py (importing backend
+# database.py would also build the main API's default engine)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from auth.dependencies import require_role
+from db_engine import create_db_engine
+from utils.pool_telemetry import pool_metrics
+
 # =============================================================================
 # DATABASE SETUP
 # =============================================================================
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/jeeth_sessions")
-engine = create_engine(DATABASE_URL)
+engine = create_db_engine(DATABASE_URL, name="sessions")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -782,6 +790,11 @@ async def get_user_stats(user_id: str, db: Session = Depends(get_db)):
         "progressPercentage": (completed / total * 100) if total > 0 else 0
     }
 
+@app.get("/metrics/db-pool")
+async def db_pool_metrics(current_user: dict = Depends(require_role("admin"))):
+    """Connection pool telemetry for this service's engines (admins only)"""
+    return pool_metrics()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,495 @@
+"""
+Session Event Bus
+Cross-worker delivery of session events (lifecycle, phase changes, safety alerts,
+custom events) and forwarding of session commands to the owning worker
+
+Location: backend/services/session-service/session_bus.py
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+import asyncio
+import json
+import logging
+import os
+import socket
+
+logger = logging.getLogger(__name__)
+
+
+# Broker URL; unset = single-process bus
+SESSION_BUS_REDIS_URL = os.getenv("SESSION_BUS_REDIS_URL")
+SESSION_BUS_CHANNEL = os.getenv("SESSION_BUS_CHANNEL", "jeeth:session-events")
+# Seconds between reconnect attempts after the broker subscription fails
+SESSION_BUS_RETRY_SECONDS = float(os.getenv("SESSION_BUS_RETRY_SECONDS", "1.0"))
+# Events waiting for the broker before new ones are dropped
+SESSION_BUS_OUTBOUND_SIZE = int(os.getenv("SESSION_BUS_OUTBOUND_SIZE", "1024"))
+# Seconds one broker publish may take before it counts as failed
+SESSION_BUS_PUBLISH_TIMEOUT_SECONDS = float(os.getenv("SESSION_BUS_PUBLISH_TIMEOUT_SECONDS", "2.0"))
+# Seconds a forwarded command waits for the owning worker's reply
+SESSION_BUS_COMMAND_TIMEOUT_SECONDS = float(os.getenv("SESSION_BUS_COMMAND_TIMEOUT_SECONDS", "5.0"))
+
+Handler = Callable[[str, Dict[str, Any]], Any]
+# (command, session_id, args) -> reply; must not raise
+CommandHandler = Callable[[str, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class CommandForwardingError(Exception):
+    """A command could not be handed to the owning worker, or it did not reply in time"""
+
+
+# =============================================================================
+# BROKERS
+# =============================================================================
+
+class BrokerSubscription(ABC):
+    """An open subscription: async-iterate for payloads, then close()."""
+
+    @abstractmethod
+    def __aiter__(self) -> AsyncIterator[str]:
+        """Payloads in arrival order"""
+
+    async def close(self) -> None:
+        pass
+
+
+class MessageBroker(ABC):
+    """
+    Pub/sub transport between workers.
+
+    Payloads are strings; subscribe() returns once the subscription is
+    active, so nothing published afterwards is missed.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, payload: str) -> None:
+        """Send payload to every current subscriber of channel"""
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> BrokerSubscription:
+        """Open a subscription to channel"""
+
+    async def close(self) -> None:
+        pass
+
+
+class _LocalSubscription(BrokerSubscription):
+    def __init__(self, broker: "LocalBroker", channel: str):
+        self._broker = broker
+        self._channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def __aiter__(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self) -> None:
+        subscriptions = self._broker._subscriptions.get(self._channel, [])
+        if self in subscriptions:
+            subscriptions.remove(self)
+
+
+class LocalBroker(MessageBroker):
+    """
+    In-process stand-in for a networked broker (tests, development).
+
+    Several BrokerEventBus instances sharing one LocalBroker behave like
+    workers sharing Redis: every subscriber of a channel gets every payload.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, List[_LocalSubscription]] = {}
+        self.published = 0
+
+    async def publish(self, channel: str, payload: str) -> None:
+        self.published += 1
+        for subscription in list(self._subscriptions.get(channel, ())):
+            subscription.queue.put_nowait(payload)
+
+    async def subscribe(self, channel: str) -> BrokerSubscription:
+        subscription = _LocalSubscription(self, channel)
+        self._subscriptions.setdefault(channel, []).append(subscription)
+        return subscription
+
+
+class _RedisSubscription(BrokerSubscription):
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def __aiter__(self):
+        async for message in self._pubsub.listen():
+            if message["type"] == "message":
+                yield message["data"]
+
+    async def close(self) -> None:
+        await self._pubsub.unsubscribe()
+        await self._pubsub.close()
+
+
+class RedisBroker(MessageBroker):
+    """Redis pub/sub (pip install redis)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("redis is not installed; pip install redis") from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    async def publish(self, channel: str, payload: str) -> None:
+        await self._client.publish(channel, payload)
+
+    async def subscribe(self, channel: str) -> BrokerSubscription:
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(channel)
+        return _RedisSubscription(pubsub)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+# =============================================================================
+# EVENT BUSES
+# =============================================================================
+
+class SessionEventBus(ABC):
+    """
+    Fan-out of session messages to the sockets on every worker.
+
+    publish() hands a session's message to the bus; the handler registered
+    with on_event() (the worker's SessionHub) is called with every message
+    for delivery to the sockets this worker holds.
+
+    Buses that connect workers also carry commands: on_command() registers
+    the worker's handler for the sessions of its shard, and forward()
+    sends a command to the worker owning another shard and returns its
+    reply (forwards_commands tells whether the bus can).
+    """
+
+    forwards_commands = False
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+        self._command_shard: Optional[int] = None
+        self._command_handler: Optional[CommandHandler] = None
+        self.published = 0
+        self.delivered = 0
+
+    def on_event(self, handler: Handler) -> None:
+        self._handler = handler
+
+    def on_command(self, shard: int, handler: CommandHandler) -> None:
+        """Serve commands for sessions of shard (call before start())."""
+        self._command_shard = shard
+        self._command_handler = handler
+
+    def _deliver(self, session_id: str, message: Dict[str, Any]) -> None:
+        if self._handler is not None:
+            self._handler(session_id, message)
+            self.delivered += 1
+
+    @abstractmethod
+    async def publish(self, session_id: str, message: Dict[str, Any]) -> None:
+        """Deliver message to the session's sockets on every worker"""
+
+    async def forward(
+        self,
+        shard: int,
+        command: str,
+        session_id: str,
+        args: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run a command on the worker owning shard; returns its handler's reply."""
+        raise CommandForwardingError(f"{type(self).__name__} cannot reach other workers")
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bus": type(self).__name__,
+            "published": self.published,
+            "delivered": self.delivered
+        }
+
+
+class InProcessEventBus(SessionEventBus):
+    """Single worker: messages go straight to the local handler"""
+
+    async def publish(self, session_id: str, message: Dict[str, Any]) -> None:
+        self.published += 1
+        self._deliver(session_id, message)
+
+
+class BrokerEventBus(SessionEventBus):
+    """
+    Multi-worker bus over a MessageBroker.
+
+    publish() delivers to this worker's sockets immediately and queues an
+    envelope {origin, session_id, message} for the broker; a sender task
+    drains the bounded queue with a timeout per publish, so a slow or
+    unreachable broker never blocks the session operation (overflow and
+    failed publishes are logged and counted). Each worker's listener
+    delivers envelopes from other workers (its own are skipped, so local
+    clients get a message once).
+
+    Commands travel on one channel per shard ("<channel>:commands:<shard>")
+    and replies on one channel per worker ("<channel>:replies:<worker_id>").
+    Listeners resubscribe every SESSION_BUS_RETRY_SECONDS when their
+    subscription fails or ends.
+    """
+
+    forwards_commands = True
+
+    def __init__(
+        self,
+        broker: MessageBroker,
+        channel: str = SESSION_BUS_CHANNEL,
+        worker_id: Optional[str] = None,
+        retry_seconds: float = SESSION_BUS_RETRY_SECONDS,
+        outbound_size: int = SESSION_BUS_OUTBOUND_SIZE,
+        publish_timeout: float = SESSION_BUS_PUBLISH_TIMEOUT_SECONDS,
+        command_timeout: float = SESSION_BUS_COMMAND_TIMEOUT_SECONDS
+    ):
+        super().__init__()
+        self.broker = broker
+        self.channel = channel
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.retry_seconds = retry_seconds
+        self.publish_timeout = publish_timeout
+        self.command_timeout = command_timeout
+        self._outbound: asyncio.Queue = asyncio.Queue(maxsize=outbound_size)
+        self._subscriptions: Dict[str, BrokerSubscription] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._replies: Dict[str, asyncio.Future] = {}
+        self._commands: set = set()
+        self.received = 0
+        self.publish_dropped = 0
+        self.publish_failures = 0
+        self.listen_failures = 0
+        self.commands_forwarded = 0
+        self.commands_served = 0
+
+    def _command_channel(self, shard: int) -> str:
+        return f"{self.channel}:commands:{shard}"
+
+    @property
+    def _reply_channel(self) -> str:
+        return f"{self.channel}:replies:{self.worker_id}"
+
+    # -- events --------------------------------------------------------------
+
+    async def publish(self, session_id: str, message: Dict[str, Any]) -> None:
+        self.published += 1
+        self._deliver(session_id, message)
+        self._send(self.channel, {
+            "origin": self.worker_id,
+            "session_id": session_id,
+            "message": message
+        })
+
+    def _send(self, channel: str, envelope: Dict[str, Any]) -> None:
+        try:
+            self._outbound.put_nowait((channel, json.dumps(envelope, default=str)))
+        except asyncio.QueueFull:
+            self.publish_dropped += 1
+            logger.error(f"Session bus outbound queue full, dropped a message for {channel}")
+
+    async def _drain(self) -> None:
+        while True:
+            channel, payload = await self._outbound.get()
+            # asyncio.wait rather than wait_for: stop() must always be able
+            # to cancel this task, even as a publish completes
+            publish = asyncio.ensure_future(self.broker.publish(channel, payload))
+            try:
+                done, _ = await asyncio.wait({publish}, timeout=self.publish_timeout)
+                if not done:
+                    publish.cancel()
+                    raise TimeoutError(f"no answer within {self.publish_timeout}s")
+                publish.result()
+            except asyncio.CancelledError:
+                publish.cancel()
+                raise
+            except Exception as e:
+                self.publish_failures += 1
+                logger.error(f"Session bus publish to {channel} failed: {e!r}")
+            finally:
+                self._outbound.task_done()
+
+    def _receive(self, payload: str) -> None:
+        try:
+            envelope = json.loads(payload)
+            if envelope.get("origin") == self.worker_id:
+                return
+            session_id, message = envelope["session_id"], envelope["message"]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring malformed session bus payload: {e}")
+            return
+        self.received += 1
+        self._deliver(session_id, message)
+
+    # -- commands ------------------------------------------------------------
+
+    async def forward(
+        self,
+        shard: int,
+        command: str,
+        session_id: str,
+        args: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        request_id = uuid4().hex
+        reply = asyncio.get_running_loop().create_future()
+        self._replies[request_id] = reply
+        try:
+            self._send(self._command_channel(shard), {
+                "id": request_id,
+                "reply_to": self._reply_channel,
+                "command": command,
+                "session_id": session_id,
+                "args": args
+            })
+            self.commands_forwarded += 1
+            done, _ = await asyncio.wait({reply}, timeout=self.command_timeout)
+            if not done:
+                raise CommandForwardingError(
+                    f"No reply from the worker owning shard {shard} within {self.command_timeout}s"
+                )
+            return reply.result()
+        finally:
+            self._replies.pop(request_id, None)
+
+    def _receive_command(self, payload: str) -> None:
+        try:
+            envelope = json.loads(payload)
+            request = (
+                envelope["id"], envelope["reply_to"], envelope["command"],
+                envelope["session_id"], dict(envelope["args"])
+            )
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring malformed session bus command: {e}")
+            return
+        # Handled in its own task so a slow command does not hold up the listener
+        task = asyncio.get_running_loop().create_task(self._serve_command(*request))
+        self._commands.add(task)
+        task.add_done_callback(self._commands.discard)
+
+    async def _serve_command(
+        self,
+        request_id: str,
+        reply_to: str,
+        command: str,
+        session_id: str,
+        args: Dict[str, Any]
+    ) -> None:
+        if self._command_handler is None:
+            return
+        try:
+            reply = await self._command_handler(command, session_id, args)
+        except Exception as e:
+            # Handlers report failures in their reply; the caller times out instead
+            logger.error(f"Session bus command {command} for {session_id} failed: {e!r}")
+            return
+        self.commands_served += 1
+        self._send(reply_to, {"id": request_id, "reply": reply})
+
+    def _receive_reply(self, payload: str) -> None:
+        try:
+            envelope = json.loads(payload)
+            request_id, reply = envelope["id"], envelope["reply"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed session bus reply: {e}")
+            return
+        future = self._replies.get(request_id)
+        # Late replies (after the timeout) are ignored
+        if future is not None and not future.done():
+            future.set_result(reply)
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def _channels(self) -> Dict[str, Callable[[str], None]]:
+        channels = {self.channel: self._receive, self._reply_channel: self._receive_reply}
+        if self._command_handler is not None:
+            channels[self._command_channel(self._command_shard)] = self._receive_command
+        return channels
+
+    async def _listen(self, channel: str, receive: Callable[[str], None]) -> None:
+        while True:
+            try:
+                if channel not in self._subscriptions:
+                    self._subscriptions[channel] = await self.broker.subscribe(channel)
+                async for payload in self._subscriptions[channel]:
+                    receive(payload)
+                # The broker ended the subscription (e.g. connection closed)
+                logger.warning(f"Session bus subscription to {channel} ended, resubscribing")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.listen_failures += 1
+                logger.error(f"Session bus subscription to {channel} lost, retrying: {e}")
+            subscription = self._subscriptions.pop(channel, None)
+            if subscription is not None:
+                try:
+                    await subscription.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(self.retry_seconds)
+
+    async def start(self) -> None:
+        """Subscribe (so nothing published from now on is missed) and start listening."""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        for channel, receive in self._channels().items():
+            try:
+                self._subscriptions[channel] = await self.broker.subscribe(channel)
+            except Exception as e:
+                # The listener keeps retrying; startup does not depend on the broker
+                self.listen_failures += 1
+                logger.error(f"Session bus subscribe to {channel} failed, retrying in background: {e}")
+            self._tasks.append(loop.create_task(self._listen(channel, receive)))
+        self._tasks.append(loop.create_task(self._drain()))
+
+    async def stop(self) -> None:
+        if self._tasks:
+            # Give queued events one publish timeout to reach the broker
+            try:
+                await asyncio.wait_for(self._outbound.join(), self.publish_timeout)
+            except asyncio.TimeoutError:
+                pass
+        for task in self._tasks + list(self._commands):
+            task.cancel()
+        for task in self._tasks + list(self._commands):
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        for subscription in self._subscriptions.values():
+            await subscription.close()
+        self._subscriptions = {}
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "worker_id": self.worker_id,
+            "channel": self.channel,
+            "received": self.received,
+            "outbound_depth": self._outbound.qsize(),
+            "publish_dropped": self.publish_dropped,
+            "publish_failures": self.publish_failures,
+            "listen_failures": self.listen_failures,
+            "commands_forwarded": self.commands_forwarded,
+            "commands_served": self.commands_served
+        })
+        return stats
+
+
+def default_event_bus() -> SessionEventBus:
+    """Redis-backed bus when SESSION_BUS_REDIS_URL is set, else in-process."""
+    if SESSION_BUS_REDIS_URL:
+        return BrokerEventBus(RedisBroker(SESSION_BUS_REDIS_URL))
+    return InProcessEventBus()
@@ -0,0 +1,281 @@
+"""
+Session Hub
+Per-session pub/sub fan-out to WebSocket subscribers with bounded queues
+
+Location: backend/services/session-service/session_hub.py
+"""
+
+from typing import Any, Awaitable, Callable, Deque, Dict, FrozenSet, List, Optional, Set
+from collections import deque
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+# Messages queued per subscriber before the oldest telemetry is dropped
+HUB_QUEUE_SIZE = int(os.getenv("HUB_QUEUE_SIZE", "256"))
+# Undelivered guaranteed messages after which a subscriber is disconnected
+HUB_GUARANTEED_LIMIT = int(os.getenv("HUB_GUARANTEED_LIMIT", "64"))
+
+# Never dropped: delivered in order ahead of everything else
+GUARANTEED_TYPES: FrozenSet[str] = frozenset({"safety_alert"})
+# Telemetry: a pending message of the same type is replaced by the newer one
+COALESCED_TYPES: FrozenSet[str] = frozenset({"biometric", "biometric_stats"})
+# The only messages a full queue may drop; anything else (lifecycle changes,
+# pong, error) is delivered in order or the subscriber is disconnected
+DROPPABLE_TYPES: FrozenSet[str] = frozenset({"biometric", "biometric_stats"})
+
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+Close = Callable[[], Awaitable[None]]
+
+
+class Subscriber:
+    """
+    One connected client of a session.
+
+    publish() only touches in-memory queues; a dedicated task drains them
+    into the socket, so a slow client never blocks the publisher or the
+    other subscribers. Guaranteed messages go to their own lane and are
+    sent first; other messages share a bounded, ordered queue. When it is
+    full the oldest telemetry message gives way; with no telemetry left to
+    drop, new telemetry is dropped and anything else disconnects the
+    subscriber (the client reconnects and resynchronizes).
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        send: Send,
+        close: Optional[Close] = None,
+        label: str = "client",
+        queue_size: int = HUB_QUEUE_SIZE,
+        guaranteed_limit: int = HUB_GUARANTEED_LIMIT,
+        guaranteed_types: FrozenSet[str] = GUARANTEED_TYPES,
+        coalesced_types: FrozenSet[str] = COALESCED_TYPES,
+        droppable_types: FrozenSet[str] = DROPPABLE_TYPES
+    ):
+        self.session_id = session_id
+        self.label = label
+        self._send = send
+        self._close = close
+        self.queue_size = queue_size
+        self.guaranteed_limit = guaranteed_limit
+        self.guaranteed_types = guaranteed_types
+        self.coalesced_types = coalesced_types
+        self.droppable_types = droppable_types
+        self._guaranteed: Deque[Dict[str, Any]] = deque()
+        # Entries are one-element lists so a coalesced message can be swapped in place
+        self._queue: Deque[List[Dict[str, Any]]] = deque()
+        self._pending_coalesced: Dict[str, List[Dict[str, Any]]] = {}
+        self._droppable = 0  # droppable entries in _queue
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._guaranteed) + len(self._queue)
+
+    def enqueue(self, message: Dict[str, Any]) -> bool:
+        """Queue a message without blocking; False if it was dropped."""
+        if self.closed:
+            return False
+        message_type = message.get("type")
+
+        if message_type in self.guaranteed_types:
+            if len(self._guaranteed) >= self.guaranteed_limit:
+                # Cannot keep up even with the must-deliver lane
+                self._disconnect()
+                return False
+            self._guaranteed.append(message)
+            self._wakeup.set()
+            return True
+
+        if message_type in self.coalesced_types:
+            pending = self._pending_coalesced.get(message_type)
+            if pending is not None:
+                pending[0] = message
+                self.coalesced += 1
+                return True
+
+        droppable = message_type in self.droppable_types
+        if len(self._queue) >= self.queue_size:
+            if self._droppable:
+                self._drop_oldest_droppable()
+            elif droppable:
+                self.dropped += 1
+                return False
+            else:
+                # A lifecycle message cannot be dropped and there is no room
+                self._disconnect()
+                return False
+
+        entry = [message]
+        self._queue.append(entry)
+        if droppable:
+            self._droppable += 1
+        if message_type in self.coalesced_types:
+            self._pending_coalesced[message_type] = entry
+        self._wakeup.set()
+        return True
+
+    def _drop_oldest_droppable(self) -> None:
+        for index, entry in enumerate(self._queue):
+            if entry[0].get("type") in self.droppable_types:
+                del self._queue[index]
+                self._forget(entry)
+                self.dropped += 1
+                return
+
+    def _forget(self, entry: List[Dict[str, Any]]) -> None:
+        message_type = entry[0].get("type")
+        if message_type in self.droppable_types:
+            self._droppable -= 1
+        if self._pending_coalesced.get(message_type) is entry:
+            del self._pending_coalesced[message_type]
+
+    def _disconnect(self) -> None:
+        """Give up on a subscriber that cannot keep up; its close() tells the client"""
+        logger.warning(f"Disconnecting slow subscriber {self.label} of {self.session_id}")
+        self._wakeup.set()
+        self._shutdown()
+
+    def _next(self) -> Optional[Dict[str, Any]]:
+        if self._guaranteed:
+            return self._guaranteed.popleft()
+        if self._queue:
+            entry = self._queue.popleft()
+            self._forget(entry)
+            return entry[0]
+        return None
+
+    async def run(self) -> None:
+        """Drain the queues into the socket until closed or a send fails."""
+        try:
+            while not self.closed:
+                message = self._next()
+                if message is None:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                await self._send(message)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Subscriber {self.label} of {self.session_id} send failed: {e}")
+        finally:
+            self.closed = True
+            if self._close is not None:
+                try:
+                    await self._close()
+                except Exception:
+                    pass
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def _shutdown(self) -> None:
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    async def stop(self) -> None:
+        self._shutdown()
+        if self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "depth": self.depth,
+            "guaranteed_depth": len(self._guaranteed),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "closed": self.closed
+        }
+
+
+class SessionHub:
+    """Subscribers per session; publish() fans a message out without awaiting sends"""
+
+    def __init__(self, **subscriber_options):
+        self.subscriber_options = subscriber_options
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self.published = 0
+        # Counters of subscribers that already left
+        self._retired = {"sent": 0, "dropped": 0, "coalesced": 0, "disconnected": 0}
+
+    def subscribe(
+        self,
+        session_id: str,
+        send: Send,
+        close: Optional[Close] = None,
+        label: str = "client"
+    ) -> Subscriber:
+        """Register a client and start its sender task (call from the event loop)."""
+        subscriber = Subscriber(session_id, send, close, label, **self.subscriber_options)
+        self._subscribers.setdefault(session_id, set()).add(subscriber)
+        subscriber.start()
+        return subscriber
+
+    async def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.session_id)
+        if subscribers is not None and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.session_id]
+            self._retire(subscriber)
+        await subscriber.stop()
+
+    def _retire(self, subscriber: Subscriber) -> None:
+        self._retired["sent"] += subscriber.sent
+        self._retired["dropped"] += subscriber.dropped
+        self._retired["coalesced"] += subscriber.coalesced
+
+    def publish(self, session_id: str, message: Dict[str, Any]) -> int:
+        """Queue message for every live subscriber of the session; returns how many."""
+        self.published += 1
+        delivered = 0
+        for subscriber in list(self._subscribers.get(session_id, ())):
+            if subscriber.enqueue(message):
+                delivered += 1
+            elif subscriber.closed:
+                self._subscribers[session_id].discard(subscriber)
+                self._retire(subscriber)
+                self._retired["disconnected"] += 1
+        if session_id in self._subscribers and not self._subscribers[session_id]:
+            del self._subscribers[session_id]
+        return delivered
+
+    def subscriber_count(self, session_id: str) -> int:
+        return len(self._subscribers.get(session_id, ()))
+
+    def metrics(self) -> Dict[str, Any]:
+        """Totals plus per-subscriber queue depth, sends and drops."""
+        sessions = {
+            session_id: [subscriber.metrics() for subscriber in subscribers]
+            for session_id, subscribers in self._subscribers.items()
+        }
+        live = [entry for entries in sessions.values() for entry in entries]
+        return {
+            "sessions": len(sessions),
+            "subscribers": len(live),
+            "published": self.published,
+            "sent": self._retired["sent"] + sum(entry["sent"] for entry in live),
+            "dropped": self._retired["dropped"] + sum(entry["dropped"] for entry in live),
+            "coalesced": self._retired["coalesced"] + sum(entry["coalesced"] for entry in live),
+            "disconnected": self._retired["disconnected"],
+            "max_depth": max((entry["depth"] for entry in live), default=0),
+            "by_session": sessions
+        }
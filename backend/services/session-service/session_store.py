@@ -0,0 +1,398 @@
+"""
+Live Session Store
+LRU-cached, write-behind persisted and session-id-sharded storage for SessionManager
+
+Location: backend/services/session-service/session_store.py
+"""
+
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Generic, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar
+from collections import OrderedDict
+from datetime import datetime
+from uuid import uuid4
+import asyncio
+import logging
+import os
+import sys
+import zlib
+
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Text, delete, select
+
+logger = logging.getLogger(__name__)
+
+
+# Persistent store (SQLAlchemy URL; Postgres in production)
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "sqlite:///./jeeth_live_sessions.db")
+# Sessions kept in memory per worker
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+# Seconds between write-behind flushes
+SESSION_FLUSH_INTERVAL_SECONDS = float(os.getenv("SESSION_FLUSH_INTERVAL_SECONDS", "1.0"))
+# This worker's shard and the number of workers sharing the store are
+# read by shards_from_env (SESSION_WORKER_INDEX, SESSION_WORKER_COUNT)
+
+# Sessions in these states are dropped from memory once persisted
+TERMINAL_STATUSES = ("completed", "cancelled")
+
+
+# =============================================================================
+# PERSISTENT STORES
+# =============================================================================
+
+# (session_id, user_id, status, created_at, data_json)
+SessionRow = Tuple[str, str, str, datetime, str]
+
+
+class SessionStore(ABC):
+    """
+    Persistent tier behind SessionRepository.
+
+    Rows hold the serialized session plus the columns used for lookups.
+    put_many() upserts a batch; implementations are synchronous and are
+    called from a worker thread by SessionRepository.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[str]:
+        """Serialized session, or None"""
+
+    @abstractmethod
+    def put_many(self, rows: List[SessionRow]) -> None:
+        """Insert or replace a batch of rows"""
+
+    @abstractmethod
+    def list_user(self, user_id: str, status: Optional[str] = None) -> List[str]:
+        """Serialized sessions of a user, optionally in one status"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store (tests, single-worker development)"""
+
+    def __init__(self):
+        self.rows: Dict[str, SessionRow] = {}
+
+    def get(self, session_id: str) -> Optional[str]:
+        row = self.rows.get(session_id)
+        return row[4] if row else None
+
+    def put_many(self, rows: List[SessionRow]) -> None:
+        for row in rows:
+            self.rows[row[0]] = row
+
+    def list_user(self, user_id: str, status: Optional[str] = None) -> List[str]:
+        return [
+            row[4] for row in self.rows.values()
+            if row[1] == user_id and (status is None or row[2] == status)
+        ]
+
+
+class SQLSessionStore(SessionStore):
+    """Postgres/SQLite store: one row per session in live_sessions"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        metadata = MetaData()
+        self.table = Table(
+            "live_sessions",
+            metadata,
+            Column("session_id", String, primary_key=True),
+            Column("user_id", String, nullable=False, index=True),
+            Column("status", String, nullable=False),
+            Column("created_at", DateTime, nullable=False),
+            Column("updated_at", DateTime, nullable=False),
+            Column("data", Text, nullable=False)
+        )
+        metadata.create_all(engine)
+
+    def get(self, session_id: str) -> Optional[str]:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(self.table.c.data).where(self.table.c.session_id == session_id)
+            ).scalar()
+
+    def put_many(self, rows: List[SessionRow]) -> None:
+        if not rows:
+            return
+        now = datetime.utcnow()
+        ids = [row[0] for row in rows]
+        # Portable upsert: replace the batch's rows in one transaction
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table).where(self.table.c.session_id.in_(ids)))
+            connection.execute(self.table.insert(), [
+                {
+                    "session_id": session_id,
+                    "user_id": user_id,
+                    "status": status,
+                    "created_at": created_at,
+                    "updated_at": now,
+                    "data": data
+                }
+                for session_id, user_id, status, created_at, data in rows
+            ])
+
+    def list_user(self, user_id: str, status: Optional[str] = None) -> List[str]:
+        query = select(self.table.c.data).where(self.table.c.user_id == user_id)
+        if status:
+            query = query.where(self.table.c.status == status)
+        with self.engine.connect() as connection:
+            return list(connection.execute(query).scalars())
+
+
+# =============================================================================
+# SHARDING
+# =============================================================================
+
+class SessionShards:
+    """
+    Session-id-based sharding across workers.
+
+    A session belongs to shard crc32(session_id) % worker_count. Workers
+    only mutate sessions of their own shard (the load balancer routes on
+    the session id); new session ids are drawn until they land on the
+    creating worker's shard.
+    """
+
+    def __init__(self, worker_index: int = 0, worker_count: int = 1):
+        if not 0 <= worker_index < worker_count:
+            raise ValueError(f"Worker index {worker_index} outside 0..{worker_count - 1}")
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+
+    def shard_for(self, session_id: str) -> int:
+        return zlib.crc32(session_id.encode("utf-8")) % self.worker_count
+
+    def owns(self, session_id: str) -> bool:
+        return self.shard_for(session_id) == self.worker_index
+
+    def new_session_id(self) -> str:
+        while True:
+            session_id = str(uuid4())
+            if self.owns(session_id):
+                return session_id
+
+
+def _server_worker_count(argv: Sequence[str]) -> int:
+    """Worker processes asked for on the server command line (--workers N / -w N)"""
+    for position, arg in enumerate(argv):
+        if arg in ("--workers", "-w") and position + 1 < len(argv):
+            value = argv[position + 1]
+        elif arg.startswith("--workers="):
+            value = arg.split("=", 1)[1]
+        elif arg.startswith("-w") and arg[2:].isdigit():
+            value = arg[2:]
+        else:
+            continue
+        try:
+            return int(value)
+        except ValueError:
+            return 1
+    return 1
+
+
+def shards_from_env(
+    environ: Mapping[str, str] = os.environ,
+    argv: Sequence[str] = sys.argv
+) -> SessionShards:
+    """
+    This process's shard from SESSION_WORKER_INDEX / SESSION_WORKER_COUNT.
+
+    Deployment is one server process per index, each started with its own
+    SESSION_WORKER_INDEX, behind a balancer that routes on the session id.
+    A multi-worker server (uvicorn or gunicorn --workers N, or
+    WEB_CONCURRENCY, which both read) is refused: its workers share one
+    environment, so each would claim the same index and every session of
+    that shard, and their write-behind flushes would overwrite each
+    other's changes. Its shared socket could not route biometric streams
+    to the owning worker either.
+    """
+    worker_count = int(environ.get("SESSION_WORKER_COUNT", "1"))
+    worker_index = environ.get("SESSION_WORKER_INDEX")
+    if worker_count > 1 and worker_index is None:
+        raise RuntimeError(
+            f"SESSION_WORKER_COUNT is {worker_count} but SESSION_WORKER_INDEX "
+            "is not set; give each worker process its own index"
+        )
+    server_workers = max(int(environ.get("WEB_CONCURRENCY", "1")), _server_worker_count(argv))
+    if server_workers > 1:
+        raise RuntimeError(
+            f"The server was started with {server_workers} workers, which would share "
+            "one SESSION_WORKER_INDEX; run one process per index instead"
+        )
+    return SessionShards(int(worker_index or 0), worker_count)
+
+
+# =============================================================================
+# REPOSITORY
+# =============================================================================
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class SessionRepository(Generic[ModelT]):
+    """
+    In-memory LRU front over a SessionStore with write-behind persistence.
+
+    save() marks a session dirty; flush() (every flush_interval seconds
+    once start() is called, and on stop()) serializes dirty sessions on
+    the event loop and writes them with one put_many in a worker thread.
+    Store reads (get, user_sessions) also run in a worker thread. The
+    optional before_flush coroutine runs ahead of every flush, so owners
+    can fold state kept outside the session into it first. Sessions
+    in a terminal status are dropped from memory once written. Only clean
+    sessions are evicted when the LRU is over capacity, so no unwritten
+    change is lost; get() reloads evicted sessions from the store.
+    """
+
+    def __init__(
+        self,
+        model_class: Type[ModelT],
+        store: SessionStore,
+        maxsize: int = SESSION_CACHE_SIZE,
+        flush_interval: float = SESSION_FLUSH_INTERVAL_SECONDS,
+        before_flush: Optional[Callable[[], Awaitable[None]]] = None
+    ):
+        self.model_class = model_class
+        self.store = store
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        self.before_flush = before_flush
+        self._sessions: "OrderedDict[str, ModelT]" = OrderedDict()
+        self._dirty: set = set()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.written = 0
+
+    # -- reads ---------------------------------------------------------------
+
+    async def get(self, session_id: str, cache: bool = True) -> Optional[ModelT]:
+        """
+        Session from memory, else from the store.
+
+        A loaded session is cached unless cache is False (sessions another
+        worker owns and mutates: a cached copy would go stale).
+        """
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+        data = await asyncio.to_thread(self.store.get, session_id)
+        # Saved by another coroutine during the read: memory is newer
+        session = self._sessions.get(session_id)
+        if session is not None:
+            return session
+        if data is None:
+            return None
+        session = self.model_class.model_validate_json(data)
+        if cache:
+            self._remember(session_id, session)
+        return session
+
+    async def user_sessions(self, user_id: str, status: Optional[str] = None) -> List[ModelT]:
+        """A user's sessions: persisted rows overlaid with in-memory state."""
+        sessions = {}
+        rows = await asyncio.to_thread(self.store.list_user, user_id, status)
+        for data in rows:
+            session = self.model_class.model_validate_json(data)
+            sessions[session.session_id] = session
+        for session_id, session in self._sessions.items():
+            if session.user_id == user_id:
+                if status is None or session.status == status:
+                    sessions[session_id] = session
+                else:
+                    sessions.pop(session_id, None)
+        return list(sessions.values())
+
+    def in_memory(self) -> Iterable[ModelT]:
+        return list(self._sessions.values())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # -- writes --------------------------------------------------------------
+
+    def save(self, session: ModelT) -> None:
+        """Record a new or changed session; persisted by the next flush."""
+        self._dirty.add(session.session_id)
+        self._remember(session.session_id, session)
+
+    def _remember(self, session_id: str, session: ModelT) -> None:
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        if len(self._sessions) > self.maxsize:
+            for candidate in list(self._sessions):
+                if len(self._sessions) <= self.maxsize:
+                    break
+                if candidate not in self._dirty and candidate != session_id:
+                    del self._sessions[candidate]
+
+    async def flush(self) -> int:
+        """Write dirty sessions; returns how many were written."""
+        if self.before_flush is not None:
+            await self.before_flush()
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            batch = list(self._dirty)
+            self._dirty.clear()
+            rows = []
+            for session_id in batch:
+                session = self._sessions[session_id]
+                rows.append((
+                    session_id,
+                    session.user_id,
+                    session.status,
+                    session.created_at,
+                    session.model_dump_json()
+                ))
+            try:
+                await asyncio.to_thread(self.store.put_many, rows)
+            except Exception:
+                self._dirty.update(batch)
+                raise
+
+            for session_id in batch:
+                session = self._sessions.get(session_id)
+                if (
+                    session is not None
+                    and session_id not in self._dirty
+                    and session.status in TERMINAL_STATUSES
+                ):
+                    del self._sessions[session_id]
+            self.flushes += 1
+            self.written += len(rows)
+            return len(rows)
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Session flush failed, will retry: {e}")
+
+    def start(self) -> None:
+        """Start the write-behind flush loop (call from app startup)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the loop and write everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "in_memory": len(self._sessions),
+            "dirty": len(self._dirty),
+            "flushes": self.flushes,
+            "written": self.written
+        }
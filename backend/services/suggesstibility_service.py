@@ -3,9 +3,10 @@ Business logic for E&P Suggestibility Assessment
 """
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from uuid import UUID, uuid4
 from datetime import datetime
+import json
 
 from ..models.questionnaire_models import (
     AssessmentSubmission,
@@ -17,8 +18,13 @@ from ..models.questionnaire_models import (
 )
 from ..utils.scoring_calculator import (
     SuggestibilityScorer,
-    get_answer_breakdown
+    get_answer_breakdown,
+    get_outcome_for_percentage
 )
+from ..utils.preference_cache import communication_preferences_cache
+from ..utils.question_catalogue import question_catalogue_cache
+from .quality_rollup import record_assessment
+from .trend_aggregate import get_trend, record_trend
 
 
 class SuggestibilityService:
@@ -41,73 +47,30 @@ class SuggestibilityService:
         Returns:
             Complete questionnaire with questions
         """
-        # Get questionnaire version
-        query = text("""
-            SELECT id, name, version, methodology, source, description, is_active
-            FROM questionnaire_versions
-            WHERE name = 'HMI E&P Suggestibility Assessment'
-                AND version = :version
-                AND is_active = true
-            LIMIT 1
-        """)
-        
-        version_row = self.db.execute(
-            query,
-            {"version": version}
-        ).fetchone()
+        # Version header and questions come from the shared catalogue cache
+        version_row = question_catalogue_cache.get_version(self.db, version)
         
         if not version_row:
             raise ValueError(f"Questionnaire version {version} not found")
         
-        version_id = version_row[0]
-        
-        # Get all questions
-        questions_query = text("""
-            SELECT 
-                question_number,
-                question_text,
-                category,
-                subcategory,
-                weight,
-                tooltip,
-                example,
-                icon,
-                psychological_construct,
-                clinical_significance
-            FROM questionnaire_questions
-            WHERE questionnaire_version_id = :version_id
-            ORDER BY question_number
-        """)
-        
-        questions_rows = self.db.execute(
-            questions_query,
-            {"version_id": version_id}
-        ).fetchall()
+        catalogue = question_catalogue_cache.get_catalogue(
+            self.db,
+            version_row.id
+        )
         
         questions = [
-            QuestionnaireQuestion(
-                question_number=row[0],
-                question_text=row[1],
-                category=row[2],
-                subcategory=row[3],
-                weight=row[4],
-                tooltip=row[5],
-                example=row[6],
-                icon=row[7],
-                psychological_construct=row[8],
-                clinical_significance=row[9]
-            )
-            for row in questions_rows
+            QuestionnaireQuestion(**question._asdict())
+            for question in catalogue.questions
         ]
         
         return QuestionnaireVersion(
-            id=version_id,
-            name=version_row[1],
-            version=version_row[2],
-            methodology=version_row[3],
-            source=version_row[4],
-            description=version_row[5],
-            is_active=version_row[6],
+            id=version_row.id,
+            name=version_row.name,
+            version=version_row.version,
+            methodology=version_row.methodology,
+            source=version_row.source,
+            description=version_row.description,
+            is_active=version_row.is_active,
             questions=questions
         )
     
@@ -142,6 +105,7 @@ class SuggestibilityService:
         
         # Generate assessment ID
         assessment_id = uuid4()
+        completed_at = datetime.utcnow()
         
         # Save to database
         self._save_assessment(
@@ -150,7 +114,8 @@ class SuggestibilityService:
             session_id=submission.session_id,
             questionnaire_version_id=questionnaire.id,
             answers=submission.answers,
-            scores=score_results
+            scores=score_results,
+            completed_at=completed_at
         )
         
         # Build result
@@ -165,7 +130,7 @@ class SuggestibilityService:
             scores=scores,
             interpretation=interpretation,
             answer_breakdown=breakdown,
-            completed_at=datetime.utcnow()
+            completed_at=completed_at
         )
         
         return result
@@ -177,7 +142,8 @@ class SuggestibilityService:
         session_id: Optional[str],
         questionnaire_version_id: UUID,
         answers: Dict[int, bool],
-        scores: Dict
+        scores: Dict,
+        completed_at: datetime
     ):
         """Save assessment results to database."""
         
@@ -208,7 +174,7 @@ class SuggestibilityService:
                 :emotional_percentage,
                 :suggestibility_type,
                 :answers_json,
-                NOW()
+                :completed_at
             )
         """)
         
@@ -225,11 +191,43 @@ class SuggestibilityService:
                 "physical_percentage": scores['physical_percentage'],
                 "emotional_percentage": scores['emotional_percentage'],
                 "suggestibility_type": scores['suggestibility_type'],
-                "answers_json": str(answers).replace("'", '"')  # Convert to JSON string
+                "answers_json": str(answers).replace("'", '"'),  # Convert to JSON string
+                "completed_at": completed_at
             }
         )
         
+        # Same transaction as the insert; quality metrics are not
+        # computed here, so the row counts as missing them
+        record_assessment(self.db, completed_at, None, None)
+        record_trend(
+            self.db,
+            user_id,
+            scores['physical_percentage'],
+            scores['emotional_percentage'],
+            completed_at
+        )
+        
         self.db.commit()
+        
+        # Preferences follow the latest assessment (as in save_assessments_bulk)
+        if user_id:
+            communication_preferences_cache.invalidate(user_id)
+    
+    # Columns shared by single and paged assessment reads
+    ASSESSMENT_COLUMNS = """
+        id,
+        user_id,
+        session_id,
+        questionnaire_version_id,
+        q1_score,
+        q2_score,
+        combined_score,
+        physical_percentage,
+        emotional_percentage,
+        suggestibility_type,
+        answers,
+        completed_at
+    """
     
     def get_assessment(
         self,
@@ -244,217 +242,203 @@ class SuggestibilityService:
         Returns:
             Complete AssessmentResult or None if not found
         """
-        query = text("""
-        SELECT 
-            id,
-            user_id,
-            session_id,
-            questionnaire_version_id,
-            q1_score,
-            q2_score,
-            combined_score,
-            physical_percentage,
-            emotional_percentage,
-            suggestibility_type,
-            answers,
-            completed_at
-        FROM user_assessments
-        WHERE id = :assessment_id
-        LIMIT 1
+        query = text(f"""
+            SELECT {self.ASSESSMENT_COLUMNS}
+            FROM user_assessments
+            WHERE id = :assessment_id
+            LIMIT 1
         """)
     
         row = self.db.execute(
-        query,
-        {"assessment_id": str(assessment_id)}
+            query,
+            {"assessment_id": str(assessment_id)}
         ).fetchone()
     
         if not row:
             return None
+        
+        return self._build_result(row)
     
-    # Extract data from row
+    def _build_result(self, row) -> AssessmentResult:
+        """
+        Hydrate an AssessmentResult from a stored user_assessments row.
+        
+        Scores come from the stored columns; the interpretation is the
+        shared outcome for the stored physical percentage (not the current
+        chart cell, which a chart correction may have changed) and the
+        breakdown reads the cached question catalogue, so no per-row
+        scoring or queries.
+        """
         (
-        id_str,
-        user_id_str,
-        session_id,
-        questionnaire_version_id_str,
-        q1_score,
-        q2_score,
-        combined_score,
-        physical_percentage,
-        emotional_percentage,
-        suggestibility_type,
-        answers_json,
-        completed_at
+            id_str,
+            user_id_str,
+            session_id,
+            questionnaire_version_id_str,
+            q1_score,
+            q2_score,
+            combined_score,
+            physical_percentage,
+            emotional_percentage,
+            suggestibility_type,
+            answers_json,
+            completed_at
         ) = row
-    
-    # Parse answers JSON
-        import json
+        questionnaire_version_id_str = str(questionnaire_version_id_str)
+        
+        # Parse answers JSON and convert string keys to integers
         answers_dict = json.loads(answers_json) if isinstance(answers_json, str) else answers_json
-    
-    # Convert string keys to integers
         answers = {int(k): v for k, v in answers_dict.items()}
-    
-    # Recalculate full interpretation (including therapeutic approach, etc.)
-        score_results = self.scorer.calculate_scores(
-        answers,
-        questionnaire_version_id_str
-        )
-    
-    # Get answer breakdown
+        
+        q1_lookup = self.scorer._round_to_nearest_5(q1_score)
+        combined_lookup = self.scorer._round_to_nearest_5(combined_score)
+        outcome = get_outcome_for_percentage(physical_percentage)
+        
         breakdown = get_answer_breakdown(
-        answers,
-        self.db,
-        questionnaire_version_id_str
+            answers,
+            self.db,
+            questionnaire_version_id_str
         )
-    
-    # Build SuggestibilityScores object
+        
         scores = SuggestibilityScores(
-        q1_score=q1_score,
-        q2_score=q2_score,
-        combined_score=combined_score,
-        q1_lookup=score_results['q1_lookup'],
-        combined_lookup=score_results['combined_lookup'],
-        physical_percentage=physical_percentage,
-        emotional_percentage=emotional_percentage,
-        suggestibility_type=suggestibility_type
+            q1_score=q1_score,
+            q2_score=q2_score,
+            combined_score=combined_score,
+            q1_lookup=q1_lookup,
+            combined_lookup=combined_lookup,
+            physical_percentage=physical_percentage,
+            emotional_percentage=emotional_percentage,
+            suggestibility_type=suggestibility_type
         )
-    
-    # Build Interpretation object
-        interpretation = Interpretation(**score_results['interpretation'])
-    
-    # Build complete result
-        result = AssessmentResult(
-        assessment_id=UUID(id_str),
-        user_id=UUID(user_id_str) if user_id_str else None,
-        session_id=session_id,
-        questionnaire_version_id=UUID(questionnaire_version_id_str),
-        scores=scores,
-        interpretation=interpretation,
-        answer_breakdown=breakdown,
-        completed_at=completed_at
+        
+        return AssessmentResult(
+            assessment_id=UUID(str(id_str)),
+            user_id=UUID(str(user_id_str)) if user_id_str else None,
+            session_id=session_id,
+            questionnaire_version_id=UUID(questionnaire_version_id_str),
+            scores=scores,
+            interpretation=Interpretation(**outcome.interpretation),
+            answer_breakdown=breakdown,
+            completed_at=completed_at
         )
     
-        return result
-
-
-def get_user_assessments(
-    self,
-    user_id: UUID,
-    limit: int = 10,
-    offset: int = 0
-) -> Dict:
-    """
-    Get all assessments for a user.
-    
-    Args:
-        user_id: User's UUID
-        limit: Max number of results
-        offset: Pagination offset
+    def get_user_assessments(
+        self,
+        user_id: UUID,
+        limit: int = 10,
+        offset: int = 0
+    ) -> Dict:
+        """
+        Get all assessments for a user.
         
-    Returns:
-        Dict with assessments list and metadata
-    """
-    # Get total count
-    count_query = text("""
-        SELECT COUNT(*)
-        FROM user_assessments
-        WHERE user_id = :user_id
-    """)
-    
-    total_count = self.db.execute(
-        count_query,
-        {"user_id": str(user_id)}
-    ).scalar()
-    
-    # Get assessments
-    query = text("""
-        SELECT id
-        FROM user_assessments
-        WHERE user_id = :user_id
-        ORDER BY completed_at DESC
-        LIMIT :limit
-        OFFSET :offset
-    """)
-    
-    rows = self.db.execute(
-        query,
-        {
-            "user_id": str(user_id),
-            "limit": limit,
-            "offset": offset
+        The page and the total come back in one statement; each row is
+        hydrated from its stored columns (see _build_result).
+        
+        Args:
+            user_id: User's UUID
+            limit: Max number of results
+            offset: Pagination offset
+            
+        Returns:
+            Dict with assessments list and metadata
+        """
+        query = text(f"""
+            SELECT {self.ASSESSMENT_COLUMNS},
+                COUNT(*) OVER () AS total_count
+            FROM user_assessments
+            WHERE user_id = :user_id
+            ORDER BY completed_at DESC
+            LIMIT :limit
+            OFFSET :offset
+        """)
+        
+        rows = self.db.execute(
+            query,
+            {
+                "user_id": str(user_id),
+                "limit": limit,
+                "offset": offset
+            }
+        ).fetchall()
+        
+        if rows:
+            total_count = rows[0][-1]
+        else:
+            # Past the last page: the window count has no row to ride on
+            count_query = text("""
+                SELECT COUNT(*)
+                FROM user_assessments
+                WHERE user_id = :user_id
+            """)
+            total_count = self.db.execute(
+                count_query,
+                {"user_id": str(user_id)}
+            ).scalar() if offset else 0
+        
+        assessments = [self._build_result(tuple(row)[:-1]) for row in rows]
+        
+        # Get latest assessment
+        latest = assessments[0] if assessments else None
+        
+        # Full-history trend from the running aggregate; users without an
+        # aggregate row yet fall back to the page-based calculation
+        trend_analysis = get_trend(self.db, user_id)
+        if trend_analysis is None and len(assessments) > 1:
+            trend_analysis = self._calculate_trend(assessments)
+        
+        return {
+            "assessments": assessments,
+            "total_count": total_count,
+            "latest_assessment": latest,
+            "trend_analysis": trend_analysis
         }
-    ).fetchall()
-    
-    # Fetch full details for each
-    assessments = []
-    for (assessment_id_str,) in rows:
-        assessment = self.get_assessment(UUID(assessment_id_str))
-        if assessment:
-            assessments.append(assessment)
     
-    # Get latest assessment
-    latest = assessments[0] if assessments else None
-    
-    # Calculate trend if multiple assessments exist
-    trend_analysis = None
-    if len(assessments) > 1:
-        trend_analysis = self._calculate_trend(assessments)
-    
-    return {
-        "assessments": assessments,
-        "total_count": total_count,
-        "latest_assessment": latest,
-        "trend_analysis": trend_analysis
-    }
+    def _calculate_trend(self, assessments: List[AssessmentResult]) -> Dict:
+        """
+        Calculate trend analysis across multiple assessments.
 
+        Tracks changes in physical/emotional percentages over time.
+        """
+        if len(assessments) < 2:
+            return None
 
-def _calculate_trend(self, assessments: List[AssessmentResult]) -> Dict:
-    """
-    Calculate trend analysis across multiple assessments.
-    
-    Tracks changes in physical/emotional percentages over time.
-    """
-    if len(assessments) < 2:
-        return None
-    
-    # Sort by date (oldest first)
-    sorted_assessments = sorted(assessments, key=lambda a: a.completed_at)
-    
-    first = sorted_assessments[0]
-    latest = sorted_assessments[-1]
-    
-    physical_change = (
-        latest.scores.physical_percentage - 
-        first.scores.physical_percentage
-    )
-    
-    emotional_change = (
-        latest.scores.emotional_percentage - 
-        first.scores.emotional_percentage
-    )
-    
-    # Determine trend direction
-    if abs(physical_change) < 5:
-        trend_direction = "stable"
-    elif physical_change > 0:
-        trend_direction = "more_physical"
-    else:
-        trend_direction = "more_emotional"
-    
-    return {
-        "total_assessments": len(assessments),
-        "first_assessment_date": first.completed_at.isoformat(),
-        "latest_assessment_date": latest.completed_at.isoformat(),
-        "physical_change": physical_change,
-        "emotional_change": emotional_change,
-        "trend_direction": trend_direction,
-        "average_physical": sum(
-            a.scores.physical_percentage for a in sorted_assessments
-        ) / len(sorted_assessments),
-        "average_emotional": sum(
-            a.scores.emotional_percentage for a in sorted_assessments
-        ) / len(sorted_assessments)
-    }
+        # Sort by date (oldest first)
+        sorted_assessments = sorted(assessments, key=lambda a: a.completed_at)
+
+        first = sorted_assessments[0]
+        latest = sorted_assessments[-1]
+
+        physical_change = (
+            latest.scores.physical_percentage - 
+            first.scores.physical_percentage
+        )
+
+        emotional_change = (
+            latest.scores.emotional_percentage - 
+            first.scores.emotional_percentage
+        )
+
+        # Determine trend direction
+        if abs(physical_change) < 5:
+            trend_direction = "stable"
+        elif physical_change > 0:
+            trend_direction = "more_physical"
+        else:
+            trend_direction = "more_emotional"
+
+        return {
+            "total_assessments": len(assessments),
+            "first_assessment_date": first.completed_at.isoformat(),
+            "latest_assessment_date": latest.completed_at.isoformat(),
+            "physical_change": physical_change,
+            "emotional_change": emotional_change,
+            "trend_direction": trend_direction,
+            "average_physical": sum(
+                a.scores.physical_percentage for a in sorted_assessments
+            ) / len(sorted_assessments),
+            "average_emotional": sum(
+                a.scores.emotional_percentage for a in sorted_assessments
+            ) / len(sorted_assessments)
+        }
 
 
 def main():
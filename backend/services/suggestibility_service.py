@@ -21,6 +21,10 @@ from utils.scoring_calculator import (
     SuggestibilityScorer,
     get_answer_breakdown
 )
+from utils.preference_cache import communication_preferences_cache
+from utils.question_catalogue import question_catalogue_cache
+from services.quality_rollup import record_assessment
+from services.trend_aggregate import record_trend
 
 
 class SuggestibilityService:
@@ -37,72 +41,30 @@ class SuggestibilityService:
         """
         Get active questionnaire with all questions.
         """
-        query = text("""
-            SELECT id, name, version, methodology, source, description, is_active
-            FROM questionnaire_versions
-            WHERE name = 'HMI E&P Suggestibility Assessment'
-                AND version = :version
-                AND is_active = true
-            LIMIT 1
-        """)
-        
-        version_row = self.db.execute(
-            query,
-            {"version": version}
-        ).fetchone()
+        # Version header and questions come from the shared catalogue cache
+        version_row = question_catalogue_cache.get_version(self.db, version)
         
         if not version_row:
             raise ValueError(f"Questionnaire version {version} not found")
         
-        version_id = version_row[0]
-        
-        # Get all questions
-        questions_query = text("""
-            SELECT 
-                question_number,
-                question_text,
-                category,
-                subcategory,
-                weight,
-                tooltip,
-                example,
-                icon,
-                psychological_construct,
-                clinical_significance
-            FROM questionnaire_questions
-            WHERE questionnaire_version_id = :version_id
-            ORDER BY question_number
-        """)
-        
-        questions_rows = self.db.execute(
-            questions_query,
-            {"version_id": version_id}
-        ).fetchall()
+        catalogue = question_catalogue_cache.get_catalogue(
+            self.db,
+            version_row.id
+        )
         
         questions = [
-            QuestionnaireQuestion(
-                question_number=row[0],
-                question_text=row[1],
-                category=row[2],
-                subcategory=row[3],
-                weight=row[4],
-                tooltip=row[5],
-                example=row[6],
-                icon=row[7],
-                psychological_construct=row[8],
-                clinical_significance=row[9]
-            )
-            for row in questions_rows
+            QuestionnaireQuestion(**question._asdict())
+            for question in catalogue.questions
         ]
         
         return QuestionnaireVersion(
-            id=version_id,
-            name=version_row[1],
-            version=version_row[2],
-            methodology=version_row[3],
-            source=version_row[4],
-            description=version_row[5],
-            is_active=version_row[6],
+            id=version_row.id,
+            name=version_row.name,
+            version=version_row.version,
+            methodology=version_row.methodology,
+            source=version_row.source,
+            description=version_row.description,
+            is_active=version_row.is_active,
             questions=questions
         )
     
@@ -131,6 +93,7 @@ class SuggestibilityService:
         
         # Generate assessment ID
         assessment_id = uuid4()
+        completed_at = datetime.utcnow()
         
         # Save to database
         self._save_assessment(
@@ -139,7 +102,8 @@ class SuggestibilityService:
             session_id=submission.session_id,
             questionnaire_version_id=questionnaire.id,
             answers=submission.answers,
-            scores=score_results
+            scores=score_results,
+            completed_at=completed_at
         )
         
         # Build result
@@ -162,7 +126,7 @@ class SuggestibilityService:
             scores=scores,
             interpretation=interpretation,
             answer_breakdown=breakdown,
-            completed_at=datetime.utcnow()
+            completed_at=completed_at
         )
         
         return result
@@ -174,7 +138,8 @@ class SuggestibilityService:
         session_id: Optional[str],
         questionnaire_version_id: UUID,
         answers: Dict[int, bool],
-        scores: Dict
+        scores: Dict,
+        completed_at: datetime
     ):
         """Save assessment results to database."""
         
@@ -206,7 +171,7 @@ class SuggestibilityService:
                 :suggestibility_type,
                 :profile,
                 :answers_json,
-                NOW()
+                :completed_at
             )
         """)
         
@@ -227,11 +192,27 @@ class SuggestibilityService:
                 "emotional_percentage": scores['emotional_percentage'],
                 "suggestibility_type": scores['suggestibility_type'],
                 "profile": scores['suggestibility_type'],
-                "answers_json": answers_json
+                "answers_json": answers_json,
+                "completed_at": completed_at
             }
         )
         
+        # Same transaction as the insert; quality metrics are not
+        # computed here, so the row counts as missing them
+        record_assessment(self.db, completed_at, None, None)
+        record_trend(
+            self.db,
+            user_id,
+            scores['physical_percentage'],
+            scores['emotional_percentage'],
+            completed_at
+        )
+        
         self.db.commit()
+        
+        # Preferences follow the latest assessment (as in save_assessments_bulk)
+        if user_id:
+            communication_preferences_cache.invalidate(user_id)
     
     def get_assessment(
         self,
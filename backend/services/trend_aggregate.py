@@ -0,0 +1,398 @@
+"""
+Per-User Assessment Trend Aggregates
+Running count/sums/EWMA of physical and emotional percentages per user
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from uuid import UUID
+import logging
+import os
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+TREND_TABLE = "assessment_trend_aggregates"
+
+# Weight of the newest assessment in the moving average
+EWMA_ALPHA = float(os.getenv("TREND_EWMA_ALPHA", "0.3"))
+
+# Physical change (percentage points) below which a trend is "stable"
+STABLE_THRESHOLD = 5
+
+# Runs inside the caller's transaction. An assessment at or after the
+# stored latest one advances "latest" and the EWMA; an older one (e.g. a
+# backdated import) fails the WHERE guard, returns no row and the user's
+# aggregate is refolded from user_assessments instead (see record_trend).
+# The conflicting row stays locked either way.
+_RECORD_TREND = text(f"""
+    INSERT INTO {TREND_TABLE} AS t (
+        user_id, assessment_count,
+        first_assessment_at, first_physical, first_emotional,
+        latest_assessment_at, latest_physical, latest_emotional,
+        physical_sum, emotional_sum, ewma_physical, ewma_emotional
+    ) VALUES (
+        CAST(:user_id AS uuid), 1,
+        COALESCE(CAST(:completed_at AS timestamp), NOW()), :physical, :emotional,
+        COALESCE(CAST(:completed_at AS timestamp), NOW()), :physical, :emotional,
+        :physical, :emotional, :physical, :emotional
+    )
+    ON CONFLICT (user_id) DO UPDATE SET
+        assessment_count = t.assessment_count + 1,
+        latest_assessment_at = EXCLUDED.latest_assessment_at,
+        latest_physical = EXCLUDED.latest_physical,
+        latest_emotional = EXCLUDED.latest_emotional,
+        physical_sum = t.physical_sum + EXCLUDED.physical_sum,
+        emotional_sum = t.emotional_sum + EXCLUDED.emotional_sum,
+        ewma_physical = :alpha * EXCLUDED.ewma_physical + (1 - :alpha) * t.ewma_physical,
+        ewma_emotional = :alpha * EXCLUDED.ewma_emotional + (1 - :alpha) * t.ewma_emotional
+    WHERE EXCLUDED.latest_assessment_at >= t.latest_assessment_at
+    RETURNING user_id
+""")
+
+_READ_TREND = text(f"""
+    SELECT
+        assessment_count,
+        first_assessment_at, first_physical, first_emotional,
+        latest_assessment_at, latest_physical, latest_emotional,
+        physical_sum, emotional_sum, ewma_physical, ewma_emotional
+    FROM {TREND_TABLE}
+    WHERE user_id = CAST(:user_id AS uuid)
+""")
+
+
+# Parameters of the batch insert / update in record_trends
+_INSERT_KEYS = (
+    "user_id", "count", "first_at", "first_physical", "first_emotional",
+    "latest_at", "latest_physical", "latest_emotional",
+    "physical_sum", "emotional_sum", "ewma_physical", "ewma_emotional"
+)
+_UPDATE_KEYS = (
+    "user_id", "count", "first_at", "latest_at", "latest_physical", "latest_emotional",
+    "physical_sum", "emotional_sum", "decay", "partial_physical", "partial_emotional"
+)
+
+
+def record_trend(
+    db: Session,
+    user_id: Optional[UUID],
+    physical_percentage: int,
+    emotional_percentage: int,
+    completed_at: Optional[datetime] = None
+) -> None:
+    """
+    Fold one new assessment into the user's running aggregate
+
+    completed_at defaults to the database NOW() (matching the insert).
+    An assessment older than the user's latest one cannot be folded into
+    the EWMA incrementally, so the user's aggregate is recomputed from
+    user_assessments (the new row must already be inserted). Anonymous
+    submissions are not tracked. The caller commits.
+    """
+    if user_id is None:
+        return
+    folded = db.execute(_RECORD_TREND, {
+        "user_id": str(user_id),
+        "completed_at": completed_at,
+        "physical": physical_percentage,
+        "emotional": emotional_percentage,
+        "alpha": EWMA_ALPHA
+    }).fetchone()
+    if folded is None:
+        refold_trends(db, [user_id])
+
+
+def _fold_user_trends(rows: Iterable[Tuple]) -> List[Dict]:
+    """
+    Per-user summary of a batch of (user_id, completed_at, physical, emotional)
+
+    Besides the insert values (EWMA seeded with the first assessment) each
+    summary carries what an existing aggregate needs to absorb the batch
+    in one step: ewma' = decay * ewma + partial, with decay = (1 - a)^k
+    and partial = sum of a * (1 - a)^(k - i) * v_i.
+    """
+    by_user: Dict[str, List[Tuple]] = {}
+    for user_id, completed_at, physical, emotional in rows:
+        if user_id is None:
+            continue
+        by_user.setdefault(str(user_id), []).append((completed_at, physical, emotional))
+
+    summaries = []
+    for user_id, history in by_user.items():
+        history.sort(key=lambda entry: entry[0])
+        first_at, first_physical, first_emotional = history[0]
+        latest_at, latest_physical, latest_emotional = history[-1]
+        ewma_physical, ewma_emotional = float(first_physical), float(first_emotional)
+        partial_physical = partial_emotional = 0.0
+        for index, (_, physical, emotional) in enumerate(history):
+            partial_physical = EWMA_ALPHA * physical + (1 - EWMA_ALPHA) * partial_physical
+            partial_emotional = EWMA_ALPHA * emotional + (1 - EWMA_ALPHA) * partial_emotional
+            if index:
+                ewma_physical = EWMA_ALPHA * physical + (1 - EWMA_ALPHA) * ewma_physical
+                ewma_emotional = EWMA_ALPHA * emotional + (1 - EWMA_ALPHA) * ewma_emotional
+        summaries.append({
+            "user_id": user_id, "count": len(history),
+            "first_at": first_at, "first_physical": first_physical,
+            "first_emotional": first_emotional,
+            "latest_at": latest_at, "latest_physical": latest_physical,
+            "latest_emotional": latest_emotional,
+            "physical_sum": sum(entry[1] for entry in history),
+            "emotional_sum": sum(entry[2] for entry in history),
+            "ewma_physical": ewma_physical, "ewma_emotional": ewma_emotional,
+            "decay": (1 - EWMA_ALPHA) ** len(history),
+            "partial_physical": partial_physical,
+            "partial_emotional": partial_emotional
+        })
+    return summaries
+
+
+def record_trends(db: Session, rows: Iterable[Tuple]) -> None:
+    """
+    Fold a batch of new assessments into their users' aggregates
+
+    rows are (user_id, completed_at, physical, emotional); completed_at is
+    required. Equivalent to record_trend per row in completed_at order,
+    in two statements: a multi-row insert for users without an aggregate
+    (ON CONFLICT DO NOTHING ... RETURNING), then one UPDATE ... FROM
+    (VALUES ...) for the rest. As in record_trend, the update only folds
+    a user's batch when all of it is at or after the stored latest
+    assessment; users whose batch reaches further back are refolded from
+    user_assessments (the rows must already be inserted). The caller
+    commits.
+    """
+    summaries = _fold_user_trends(rows)
+    if not summaries:
+        return
+
+    values = []
+    params = {}
+    for index, summary in enumerate(summaries):
+        values.append(
+            f"(CAST(:user_id_{index} AS uuid), :count_{index}, "
+            f"CAST(:first_at_{index} AS timestamp), :first_physical_{index}, :first_emotional_{index}, "
+            f"CAST(:latest_at_{index} AS timestamp), :latest_physical_{index}, :latest_emotional_{index}, "
+            f":physical_sum_{index}, :emotional_sum_{index}, "
+            f":ewma_physical_{index}, :ewma_emotional_{index})"
+        )
+        for key in _INSERT_KEYS:
+            params[f"{key}_{index}"] = summary[key]
+    inserted = {
+        str(row[0]) for row in db.execute(text(f"""
+            INSERT INTO {TREND_TABLE} (
+                user_id, assessment_count,
+                first_assessment_at, first_physical, first_emotional,
+                latest_assessment_at, latest_physical, latest_emotional,
+                physical_sum, emotional_sum, ewma_physical, ewma_emotional
+            ) VALUES {', '.join(values)}
+            ON CONFLICT (user_id) DO NOTHING
+            RETURNING user_id
+        """), params).fetchall()
+    }
+
+    existing = [summary for summary in summaries if summary["user_id"] not in inserted]
+    if not existing:
+        return
+
+    values = []
+    params = {}
+    for index, summary in enumerate(existing):
+        values.append(
+            f"(CAST(:user_id_{index} AS uuid), CAST(:count_{index} AS integer), "
+            f"CAST(:first_at_{index} AS timestamp), CAST(:latest_at_{index} AS timestamp), "
+            f"CAST(:latest_physical_{index} AS integer), CAST(:latest_emotional_{index} AS integer), "
+            f"CAST(:physical_sum_{index} AS bigint), CAST(:emotional_sum_{index} AS bigint), "
+            f"CAST(:decay_{index} AS double precision), "
+            f"CAST(:partial_physical_{index} AS double precision), "
+            f"CAST(:partial_emotional_{index} AS double precision))"
+        )
+        for key in _UPDATE_KEYS:
+            params[f"{key}_{index}"] = summary[key]
+    folded = {
+        str(row[0]) for row in db.execute(text(f"""
+            UPDATE {TREND_TABLE} AS t
+            SET
+                assessment_count = t.assessment_count + v.count,
+                latest_assessment_at = v.latest_at,
+                latest_physical = v.latest_physical,
+                latest_emotional = v.latest_emotional,
+                physical_sum = t.physical_sum + v.physical_sum,
+                emotional_sum = t.emotional_sum + v.emotional_sum,
+                ewma_physical = v.decay * t.ewma_physical + v.partial_physical,
+                ewma_emotional = v.decay * t.ewma_emotional + v.partial_emotional
+            FROM (VALUES {', '.join(values)}) AS v(
+                user_id, count, first_at, latest_at, latest_physical, latest_emotional,
+                physical_sum, emotional_sum, decay, partial_physical, partial_emotional
+            )
+            WHERE t.user_id = v.user_id AND v.first_at >= t.latest_assessment_at
+            RETURNING t.user_id
+        """), params).fetchall()
+    }
+
+    backdated = [summary["user_id"] for summary in existing if summary["user_id"] not in folded]
+    if backdated:
+        refold_trends(db, backdated)
+
+
+def trend_from_aggregate(row) -> Optional[Dict]:
+    """Trend analysis (SuggestibilityService format) from an aggregate row"""
+    if row is None:
+        return None
+    (
+        count,
+        first_at, first_physical, first_emotional,
+        latest_at, latest_physical, latest_emotional,
+        physical_sum, emotional_sum, ewma_physical, ewma_emotional
+    ) = row
+    if count < 2:
+        return None
+
+    physical_change = latest_physical - first_physical
+    if abs(physical_change) < STABLE_THRESHOLD:
+        trend_direction = "stable"
+    elif physical_change > 0:
+        trend_direction = "more_physical"
+    else:
+        trend_direction = "more_emotional"
+
+    return {
+        "total_assessments": count,
+        "first_assessment_date": first_at.isoformat(),
+        "latest_assessment_date": latest_at.isoformat(),
+        "physical_change": physical_change,
+        "emotional_change": latest_emotional - first_emotional,
+        "trend_direction": trend_direction,
+        "average_physical": physical_sum / count,
+        "average_emotional": emotional_sum / count,
+        "ewma_physical": float(ewma_physical),
+        "ewma_emotional": float(ewma_emotional)
+    }
+
+
+def get_trend(db: Session, user_id: UUID) -> Optional[Dict]:
+    """
+    O(1) trend over the user's full history
+
+    Returns None with fewer than two assessments, or when the user has
+    no aggregate row yet (see rebuild_trend_aggregates).
+    """
+    row = db.execute(_READ_TREND, {"user_id": str(user_id)}).fetchone()
+    return trend_from_aggregate(row)
+
+
+def rebuild_trend_aggregates(
+    db: Session,
+    user_id: Optional[UUID] = None,
+    batch_size: int = 5000
+) -> int:
+    """
+    Recompute aggregates from user_assessments (seeding / repair)
+
+    Streams assessments in (user_id, completed_at) order and folds each
+    user's history with the same EWMA as record_trend. Returns the number
+    of users written.
+    """
+    try:
+        written = refold_trends(
+            db, None if user_id is None else [user_id], batch_size
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(f"Rebuilt trend aggregates for {written} users")
+    return written
+
+
+def refold_trends(
+    db: Session,
+    user_ids: Optional[Iterable[UUID]] = None,
+    batch_size: int = 5000
+) -> int:
+    """
+    Overwrite the aggregates of user_ids (all users if None) with a fold
+    of their stored assessments; runs in the caller's transaction.
+    """
+    params = {}
+    user_filter = ""
+    if user_ids is not None:
+        user_filter = "AND user_id = ANY(CAST(:user_ids AS uuid[]))"
+        params["user_ids"] = sorted({str(user_id) for user_id in user_ids})
+
+    query = text(f"""
+        SELECT user_id, completed_at, physical_percentage, emotional_percentage
+        FROM user_assessments
+        WHERE user_id IS NOT NULL AND completed_at IS NOT NULL {user_filter}
+        ORDER BY user_id, completed_at, id
+    """)
+    upsert = text(f"""
+        INSERT INTO {TREND_TABLE} (
+            user_id, assessment_count,
+            first_assessment_at, first_physical, first_emotional,
+            latest_assessment_at, latest_physical, latest_emotional,
+            physical_sum, emotional_sum, ewma_physical, ewma_emotional
+        ) VALUES (
+            CAST(:user_id AS uuid), :count,
+            :first_at, :first_physical, :first_emotional,
+            :latest_at, :latest_physical, :latest_emotional,
+            :physical_sum, :emotional_sum, :ewma_physical, :ewma_emotional
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            assessment_count = EXCLUDED.assessment_count,
+            first_assessment_at = EXCLUDED.first_assessment_at,
+            first_physical = EXCLUDED.first_physical,
+            first_emotional = EXCLUDED.first_emotional,
+            latest_assessment_at = EXCLUDED.latest_assessment_at,
+            latest_physical = EXCLUDED.latest_physical,
+            latest_emotional = EXCLUDED.latest_emotional,
+            physical_sum = EXCLUDED.physical_sum,
+            emotional_sum = EXCLUDED.emotional_sum,
+            ewma_physical = EXCLUDED.ewma_physical,
+            ewma_emotional = EXCLUDED.ewma_emotional
+    """)
+
+    written = 0
+    pending = []
+    current = None
+    rows = db.execute(
+        query.execution_options(stream_results=True, yield_per=batch_size),
+        params
+    )
+    for row_user_id, completed_at, physical, emotional in rows:
+        if current is None or current["user_id"] != str(row_user_id):
+            if current is not None:
+                pending.append(current)
+            current = {
+                "user_id": str(row_user_id), "count": 0,
+                "first_at": completed_at, "first_physical": physical,
+                "first_emotional": emotional,
+                "physical_sum": 0, "emotional_sum": 0,
+                "ewma_physical": float(physical), "ewma_emotional": float(emotional)
+            }
+        else:
+            current["ewma_physical"] = (
+                EWMA_ALPHA * physical + (1 - EWMA_ALPHA) * current["ewma_physical"]
+            )
+            current["ewma_emotional"] = (
+                EWMA_ALPHA * emotional + (1 - EWMA_ALPHA) * current["ewma_emotional"]
+            )
+        current["count"] += 1
+        current["latest_at"] = completed_at
+        current["latest_physical"] = physical
+        current["latest_emotional"] = emotional
+        current["physical_sum"] += physical
+        current["emotional_sum"] += emotional
+
+        if len(pending) >= batch_size:
+            db.execute(upsert, pending)
+            written += len(pending)
+            pending = []
+
+    if current is not None:
+        pending.append(current)
+    if pending:
+        db.execute(upsert, pending)
+        written += len(pending)
+    return written
@@ -96,7 +96,8 @@ def setup_test_environment():
 
 def pytest_collection_modifyitems(config, items):
     """
-    Add skip marker to tests if FastAPI app is not available
+    Add skip marker to tests that need the FastAPI app (test_client)
+    if it is not available; other tests run regardless
     """
     try:
         from main import app
@@ -107,4 +108,5 @@ def pytest_collection_modifyitems(config, items):
     if not app_available:
         skip_no_app = pytest.mark.skip(reason="FastAPI app not available")
         for item in items:
-            item.add_marker(skip_no_app)
+            if "test_client" in getattr(item, "fixturenames", ()):
+                item.add_marker(skip_no_app)
@@ -0,0 +1,147 @@
+"""
+Answer Pattern Tests
+Checks the bitmask features and quality metrics against the list-based rules
+"""
+import numpy as np
+import pytest
+
+from utils.answer_pattern import AnswerPatternProfile, AnswerPatternBatch
+from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+
+
+# ============================================================================
+# REFERENCE IMPLEMENTATION
+# ============================================================================
+
+def _legacy_pattern(answers):
+    """List-based pattern detection the profile replaces"""
+    if not answers:
+        return "empty"
+    values = [answers.get(str(i), False) for i in range(1, 37)]
+    yes_count = sum(values)
+    yes_ratio = yes_count / 36
+    if yes_count == 36:
+        return "all_yes"
+    if yes_count == 0:
+        return "all_no"
+    if yes_ratio > 0.85:
+        return "mostly_yes"
+    if yes_ratio < 0.15:
+        return "mostly_no"
+    alternations = sum(1 for i in range(35) if values[i] != values[i + 1])
+    if alternations >= 36 * 0.9:
+        return "alternating"
+    streak = max_streak = 1
+    for i in range(1, 36):
+        streak = streak + 1 if values[i] == values[i - 1] else 1
+        max_streak = max(max_streak, streak)
+    if max_streak >= 10:
+        return "suspicious"
+    return "balanced"
+
+
+def _answer_sets():
+    rng = np.random.default_rng(8)
+    sets = [
+        {},
+        {str(i): True for i in range(1, 37)},
+        {str(i): False for i in range(1, 37)},
+        {str(i): i % 2 == 0 for i in range(1, 37)},
+        {str(i): i <= 12 for i in range(1, 37)},
+        {str(i): True for i in range(1, 20)},
+    ]
+    for _ in range(300):
+        density = rng.random()
+        answered = rng.random(36) < 0.95
+        sets.append({
+            str(i): bool(rng.random() < density)
+            for i in range(1, 37) if answered[i - 1]
+        })
+    return sets
+
+
+@pytest.fixture
+def service():
+    return EPAssessmentServiceEnhanced(db=None)
+
+
+# ============================================================================
+# PROFILE TESTS
+# ============================================================================
+
+def test_profile_features():
+    """Mask, popcount and run features for a known answer set"""
+    answers = {str(i): i <= 12 or i == 20 for i in range(1, 37)}
+    profile = AnswerPatternProfile.from_answers(answers)
+
+    assert profile.yes_count == 13
+    assert profile.transitions == 3
+    assert profile.max_streak == 16
+    assert profile.answer_count == 36
+
+
+def test_profile_key_prefix_and_extra_keys():
+    """q-prefixed keys map to the same bits; stray keys only count as raw"""
+    plain = AnswerPatternProfile.from_answers({"1": True, "36": True})
+    prefixed = AnswerPatternProfile.from_answers(
+        {"q1": True, "q36": True, "q37": True, "note": True}, key_prefix="q"
+    )
+
+    assert prefixed.mask == plain.mask == (1 | 1 << 35)
+    assert prefixed.yes_count == 2
+    assert prefixed.value_yes_count == 4
+    assert prefixed.answer_count == 4
+
+
+def test_pattern_matches_list_based_rules(service):
+    """Profile-backed detection agrees with the list-based original"""
+    for answers in _answer_sets():
+        assert service._detect_answer_pattern(answers) == _legacy_pattern(answers)
+
+
+def test_quality_metrics_single_profile(service):
+    """Dict and profile inputs give identical metrics"""
+    for answers in _answer_sets()[:50]:
+        profile = AnswerPatternProfile.from_answers(answers)
+        assert service._calculate_confidence_score(answers, 300) == \
+            service._calculate_confidence_score(profile, 300)
+        assert service._calculate_consistency(answers) == \
+            service._calculate_consistency(profile)
+
+
+# ============================================================================
+# BATCH TESTS
+# ============================================================================
+
+def test_batch_matches_profiles():
+    """Vectorized features equal the per-profile features"""
+    profiles = [AnswerPatternProfile.from_answers(a) for a in _answer_sets()]
+    batch = AnswerPatternBatch.from_profiles(profiles)
+
+    assert len(batch) == len(profiles)
+    for index, profile in enumerate(profiles):
+        view = batch.profile(index)
+        for field in AnswerPatternProfile.__slots__:
+            assert getattr(view, field) == getattr(profile, field), field
+
+
+def test_quality_metrics_batch_matches_per_row(service):
+    """calculate_quality_metrics_batch agrees with calculate_quality_metrics"""
+    answer_sets = _answer_sets()
+    times = np.array([
+        [None, 60, 100, 150, 300, 900, 1500][i % 7] for i in range(len(answer_sets))
+    ], dtype=np.float64)
+    batch = AnswerPatternBatch.from_profiles(
+        AnswerPatternProfile.from_answers(a) for a in answer_sets
+    )
+
+    columns = service.calculate_quality_metrics_batch(batch, times)
+
+    for index, answers in enumerate(answer_sets):
+        time_to_complete = None if np.isnan(times[index]) else int(times[index])
+        metrics = service.calculate_quality_metrics(answers, time_to_complete)
+        assert columns["answer_pattern"][index] == metrics.answer_pattern
+        assert columns["confidence_score"][index] == metrics.confidence_score
+        assert columns["consistency_score"][index] == metrics.consistency_score
+        assert columns["completion_percentage"][index] == metrics.completion_percentage
+        assert columns["needs_review"][index] == metrics.needs_review
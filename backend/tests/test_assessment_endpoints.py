@@ -0,0 +1,486 @@
+"""
+Assessment Endpoint Tests
+Assessment routes over a real Session whose statements an in-memory table answers
+"""
+import json
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from auth.dependencies import get_current_user
+from database import get_request_db
+from routes import assessment as assessment_routes
+from routes.assessment import router
+from services import quality_rollup
+from models.questionnaire_models import AssessmentSubmission
+from services.ep_assessment_service_enhanced import (
+    EPAssessmentServiceEnhanced,
+    _FLAG_FOR_REVIEW
+)
+from tests.test_bulk_submission import VERSION_ID, _chart_rows
+from utils.preference_cache import communication_preferences_cache
+from utils.question_catalogue import invalidate_question_catalogue
+from utils.scoring_calculator import invalidate_lookup_tables
+
+
+USER_ID = str(uuid4())
+CLINICIAN_ID = str(uuid4())
+
+BALANCED = {str(q): q % 3 == 0 for q in range(1, 37)}
+ALL_YES = {str(q): True for q in range(1, 37)}
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class _AssessmentTable:
+    """Rows of user_assessments plus the writes the routes make"""
+
+    def __init__(self):
+        self.rows = {}
+        self.reviews = []
+        self.flags = []
+        self.commits = 0
+
+    def execute(self, query, params=None):
+        sql = " ".join(str(query).split())
+        if "questionnaire_versions" in sql:
+            return _Result([(
+                VERSION_ID, "HMI E&P Suggestibility Assessment", "1.0",
+                "HMI", None, None, True
+            )])
+        if "scoring_lookup_tables" in sql:
+            return _Result(_chart_rows())
+        if "INSERT INTO user_assessments" in sql:
+            self._insert(params)
+        elif "INSERT INTO assessment_trend_aggregates" in sql:
+            return _Result([
+                (value,) for key, value in params.items() if key.startswith("user_id_")
+            ])
+        elif query is quality_rollup._RECORD_REVIEW:
+            self.reviews.append(params["day"])
+        elif query is quality_rollup._RECORD_FLAG:
+            self.flags.append(params["day"])
+        elif query is quality_rollup._READ_WINDOW:
+            return _Result(self._rollup(params["since"]))
+        elif query is _FLAG_FOR_REVIEW:
+            return _Result(self._flag(params))
+        elif "WITH previous" in sql:
+            return _Result(self._review(params))
+        elif "SELECT answers, time_to_complete_seconds" in sql:
+            row = self.rows.get(params["assessment_id"])
+            return _Result([(row["answers"], row["time_to_complete"])] if row else [])
+        elif "FROM user_assessments" in sql:
+            return _Result(self._select(sql, params))
+        return _Result([])
+
+    def _select(self, sql, params):
+        rows = list(self.rows.values())
+        if "user_id" in params:
+            rows = [r for r in rows if r["user_id"] == params["user_id"]]
+        if "reviewed_at IS NULL" in sql:
+            rows = [r for r in rows if r["flagged_for_review"] and r["reviewed_at"] is None]
+        if "cursor_id" in params:
+            position = (params["cursor_completed_at"], params["cursor_id"])
+            rows = [r for r in rows if (r["completed_at"], r["id"]) < position]
+        rows.sort(key=lambda r: (r["completed_at"], r["id"]), reverse=True)
+        rows = rows[:params.get("limit", 1)]
+
+        columns = [r["columns"] + (r["flagged_for_review"],) for r in rows]
+        if sql.startswith("SELECT suggestibility_type, confidence_score, completed_at"):
+            return [(c[9], c[12], c[11]) for c in columns]
+        if sql.startswith("SELECT id, completed_at, user_id,"):
+            return [(c[0], c[11], c[1], c[9], c[7], c[8], c[12], c[13], c[15], c[16]) for c in columns]
+        return columns
+
+    def _rollup(self, since):
+        """Per-day rows of the rollup the recorded writes maintain"""
+        days = {}
+        for row in self.rows.values():
+            if row["completed_at"].date() < since:
+                continue
+            confidence, pattern = row["columns"][12], row["columns"][13]
+            day = days.setdefault(row["completed_at"].date(), [0, 0, 0.0, 0, 0, 0, {}])
+            day[0] += 1
+            day[1] += 1
+            day[2] += confidence
+            day[4] += row["flagged_for_review"]
+            day[5] += row["reviewed_at"] is not None
+            day[6][pattern] = day[6].get(pattern, 0) + 1
+        return [tuple(day) for day in days.values()]
+
+    def _insert(self, params):
+        for index, row_id in enumerate(params["ids"]):
+            column = lambda key: params[key][index]
+            completed_at = column("completed_ats")
+            self.rows[row_id] = {
+                "id": row_id,
+                "user_id": column("user_ids"),
+                "completed_at": completed_at,
+                "flagged_for_review": column("flagged"),
+                "reviewed_at": None,
+                "clinical_notes": column("clinical_notes"),
+                "answers": json.loads(column("answers")),
+                "time_to_complete": column("times_to_complete"),
+                "columns": (
+                    UUID(row_id), UUID(column("user_ids")), column("session_ids"),
+                    UUID(params["questionnaire_version_id"]),
+                    column("q1_scores"), column("q2_scores"), column("combined_scores"),
+                    column("physical_percentages"), column("emotional_percentages"),
+                    column("suggestibility_types"), column("answers"), completed_at,
+                    column("confidence_scores"), column("answer_patterns"),
+                    column("completion_percentages"), column("times_to_complete")
+                )
+            }
+
+    def _review(self, params):
+        row = self.rows.get(params["assessment_id"])
+        if row is None:
+            return []
+        first_review = row["reviewed_at"] is None
+        row["reviewed_at"] = params["reviewed_at"]
+        row["clinical_notes"] = "\n".join(
+            note for note in (row["clinical_notes"], params["note"]) if note
+        )
+        return [(row["completed_at"], first_review)]
+
+    def _flag(self, params):
+        row = self.rows.get(params["assessment_id"])
+        if row is None:
+            return []
+        first_flag = not row["flagged_for_review"]
+        row["flagged_for_review"] = True
+        row["clinical_notes"] = "\n".join(
+            note for note in (row["clinical_notes"], params["note"]) if note
+        )
+        return [(row["completed_at"], first_flag)]
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class _TableSession(Session):
+    """
+    A sqlalchemy Session whose SQL the table answers
+
+    The routes' statements are PostgreSQL-specific, so execute, commit
+    and rollback go to the table; everything else (db.query, db.add, ...)
+    is the real Session and fails the way it would in production.
+    """
+
+    def __init__(self, table):
+        super().__init__()
+        self.table = table
+
+    def execute(self, statement, params=None, **kwargs):
+        return self.table.execute(statement, params)
+
+    def commit(self):
+        self.table.commit()
+
+    def rollback(self):
+        self.table.rollback()
+
+
+@pytest.fixture
+def table():
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+    communication_preferences_cache.invalidate()
+    yield _AssessmentTable()
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+    communication_preferences_cache.invalidate()
+
+
+@pytest.fixture
+def client(table, monkeypatch):
+    app = FastAPI()
+    app.include_router(router)
+    user = {"id": USER_ID, "role": "user"}
+
+    async def request_db():
+        session = _TableSession(table)
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_request_db] = request_db
+    # The NDJSON exports open their own session for the stream
+    monkeypatch.setattr(assessment_routes, "SessionLocal", lambda: _TableSession(table))
+    app.dependency_overrides[get_current_user] = lambda: dict(user)
+    test_client = TestClient(app)
+    test_client.user = user
+    return test_client
+
+
+def _submit(client, answers, time_to_complete=300):
+    response = client.post("/api/v1/assessment/ep/submit", json={
+        "answers": answers,
+        "time_to_complete": time_to_complete
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_submit_then_latest_returns_the_saved_assessment(client, table):
+    """Submit scores and stores the assessment; latest reads it back"""
+    first = _submit(client, BALANCED)
+    second = _submit(client, ALL_YES, time_to_complete=45)
+
+    assert first["user_id"] == USER_ID
+    assert first["quality_metrics"]["needs_review"] is False
+    assert second["quality_metrics"]["needs_review"] is True
+    assert second["scores"]["physical_percentage"] + second["scores"]["emotional_percentage"] == 100
+    assert len(table.rows) == 2
+
+    response = client.get("/api/v1/assessment/ep/results/latest")
+
+    assert response.status_code == 200
+    latest = response.json()
+    assert latest["assessment_id"] == second["assessment_id"]
+    assert latest["scores"] == second["scores"]
+    assert latest["quality_metrics"] == second["quality_metrics"]
+
+
+def test_latest_without_assessments_is_404(client):
+    assert client.get("/api/v1/assessment/ep/results/latest").status_code == 404
+
+
+def test_pending_reviews_and_review_require_a_clinician(client):
+    flagged = _submit(client, ALL_YES, time_to_complete=45)
+
+    assert client.get("/api/v1/assessment/ep/pending-reviews").status_code == 403
+    response = client.post(
+        f"/api/v1/assessment/ep/{flagged['assessment_id']}/review",
+        json={"approved": True}
+    )
+    assert response.status_code == 403
+
+
+def test_review_clears_the_pending_queue_and_counts_once(client, table):
+    """Reviewed assessments leave the queue; only the first review is counted"""
+    _submit(client, BALANCED)
+    flagged = _submit(client, ALL_YES, time_to_complete=45)
+    client.user.update(id=CLINICIAN_ID, role="clinician")
+
+    pending = client.get("/api/v1/assessment/ep/pending-reviews")
+    assert pending.status_code == 200
+    assert [a["assessment_id"] for a in pending.json()] == [flagged["assessment_id"]]
+    assert pending.json()[0]["quality_metrics"]["review_reasons"]
+
+    for approved in (False, True):
+        response = client.post(
+            f"/api/v1/assessment/ep/{flagged['assessment_id']}/review",
+            json={"notes": "Discussed with patient", "approved": approved}
+        )
+        assert response.status_code == 200
+    assert response.json()["status"] == "approved"
+
+    row = table.rows[flagged["assessment_id"]]
+    assert row["clinical_notes"].startswith("AUTO-FLAGGED")
+    assert f"REJECTED by {CLINICIAN_ID}: Discussed with patient" in row["clinical_notes"]
+    assert f"APPROVED by {CLINICIAN_ID}" in row["clinical_notes"]
+    assert len(table.reviews) == 1
+    assert client.get("/api/v1/assessment/ep/pending-reviews").json() == []
+
+
+def test_review_of_unknown_assessment_is_404(client):
+    client.user.update(role="clinician")
+
+    for assessment_id in (str(uuid4()), "not-a-uuid"):
+        response = client.post(
+            f"/api/v1/assessment/ep/{assessment_id}/review",
+            json={"approved": True}
+        )
+        assert response.status_code == 404
+
+
+def test_flag_moves_an_assessment_into_review_and_counts_once(client, table):
+    """A manual flag appends its reason; only the first flag is counted"""
+    assessment = _submit(client, BALANCED)
+
+    for reason in ("Inconsistent with intake interview", "Second opinion"):
+        response = client.post(
+            f"/api/v1/assessment/ep/{assessment['assessment_id']}/flag",
+            json={"reason": reason}
+        )
+        assert response.status_code == 200, response.text
+    assert response.json()["success"] is True
+
+    row = table.rows[assessment["assessment_id"]]
+    assert row["flagged_for_review"] is True
+    assert row["clinical_notes"].count(f"FLAGGED by {USER_ID}") == 2
+    assert "Inconsistent with intake interview" in row["clinical_notes"]
+    assert len(table.flags) == 1
+
+    client.user.update(id=CLINICIAN_ID, role="clinician")
+    pending = client.get("/api/v1/assessment/ep/pending-reviews").json()
+    assert [a["assessment_id"] for a in pending] == [assessment["assessment_id"]]
+
+
+def test_flag_of_already_flagged_assessment_is_not_counted(client, table):
+    flagged = _submit(client, ALL_YES, time_to_complete=45)
+
+    response = client.post(
+        f"/api/v1/assessment/ep/{flagged['assessment_id']}/flag",
+        json={"reason": "Patient reported random answers"}
+    )
+
+    assert response.status_code == 200
+    assert table.flags == []
+
+
+def test_flag_of_unknown_assessment_is_404(client):
+    for assessment_id in (str(uuid4()), "not-a-uuid"):
+        response = client.post(
+            f"/api/v1/assessment/ep/{assessment_id}/flag",
+            json={"reason": "Check this one"}
+        )
+        assert response.status_code == 404
+
+
+def test_service_saves_submissions_and_rescores_stored_answers(table):
+    """The submission-object API and backfill lookup run over plain SQL"""
+    service = EPAssessmentServiceEnhanced(_TableSession(table))
+    submission = AssessmentSubmission(
+        user_id=USER_ID,
+        answers={q: True for q in range(1, 37)}
+    )
+
+    saved, quality = service.save_assessment_with_quality(submission, time_to_complete=45)
+
+    assert str(saved["user_id"]) == USER_ID
+    assert quality.needs_review is True
+    assert table.rows[str(saved["assessment_id"])]["flagged_for_review"] is True
+
+    stored = service.get_quality_for_existing_assessment(saved["assessment_id"])
+    assert stored.answer_pattern == quality.answer_pattern
+    assert stored.confidence_score == quality.confidence_score
+    assert service.get_quality_for_existing_assessment(uuid4()) is None
+
+
+def test_bulk_submit_saves_valid_items_and_reports_invalid_ones(client, table):
+    other_user = str(uuid4())
+    submissions = [
+        {"user_id": USER_ID, "answers": BALANCED, "time_to_complete": 300},
+        {"user_id": other_user, "answers": {"1": True}},
+        {"user_id": other_user, "answers": ALL_YES, "time_to_complete": 45}
+    ]
+
+    assert client.post(
+        "/api/v1/assessment/ep/submit/bulk", json={"submissions": submissions}
+    ).status_code == 403
+
+    client.user.update(id=CLINICIAN_ID, role="clinician")
+    response = client.post("/api/v1/assessment/ep/submit/bulk", json={"submissions": submissions})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["created"], body["failed"], body["flagged_for_review"]) == (2, 1, 1)
+    assert [r["status"] for r in body["results"]] == ["created", "error", "created"]
+    assert "answers" in body["results"][1]["error"]
+    assert {row["user_id"] for row in table.rows.values()} == {USER_ID, other_user}
+
+
+def test_history_pages_follow_the_next_cursor(client):
+    saved = [_submit(client, answers) for answers in (BALANCED, ALL_YES, BALANCED)]
+    newest_first = [a["assessment_id"] for a in reversed(saved)]
+
+    first = client.get("/api/v1/assessment/ep/history", params={"limit": 2})
+    assert first.status_code == 200
+    assert [a["assessment_id"] for a in first.json()] == newest_first[:2]
+    assert first.json()[1]["needs_review"] is True
+
+    last = client.get("/api/v1/assessment/ep/history", params={
+        "limit": 2, "cursor": first.headers["X-Next-Cursor"]
+    })
+    assert [a["assessment_id"] for a in last.json()] == newest_first[2:]
+    assert "X-Next-Cursor" not in last.headers
+
+    bad = client.get("/api/v1/assessment/ep/history", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_exports_stream_ndjson_from_their_own_session(client):
+    mine = [_submit(client, answers)["assessment_id"] for answers in (BALANCED, ALL_YES)]
+    client.user.update(id=str(uuid4()))
+    theirs = _submit(client, BALANCED)["assessment_id"]
+
+    response = client.get("/api/v1/assessment/ep/history/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["assessment_id"] for line in response.text.splitlines()] == [theirs]
+
+    assert client.get("/api/v1/assessment/analytics/export").status_code == 403
+    client.user.update(role="admin")
+    response = client.get("/api/v1/assessment/analytics/export")
+    exported = [json.loads(line)["assessment_id"] for line in response.text.splitlines()]
+    assert exported == [theirs] + mine[::-1]
+
+
+def test_communication_preferences_follow_the_latest_assessment(client):
+    response = client.get("/api/v1/assessment/ep/communication-preferences")
+    assert response.status_code == 200
+    assert response.json()["confidence"] == 0
+    assert response.json()["style"] == "balanced"
+
+    saved = _submit(client, BALANCED)
+    response = client.get("/api/v1/assessment/ep/communication-preferences")
+
+    preferences = response.json()
+    style = EPAssessmentServiceEnhanced(None)._get_communication_style(
+        saved["scores"]["suggestibility_type"]
+    )
+    assert preferences["style"] == style["style"]
+    assert preferences["confidence"] == saved["quality_metrics"]["confidence_score"]
+    assert preferences["assessment_date"]
+    assert communication_preferences_cache.stats()["size"] == 1
+
+
+def test_quality_statistics_cover_saved_flagged_and_reviewed(client, table):
+    _submit(client, BALANCED)
+    flagged = _submit(client, ALL_YES, time_to_complete=45)
+    client.user.update(id=CLINICIAN_ID, role="clinician")
+    client.post(f"/api/v1/assessment/ep/{flagged['assessment_id']}/review", json={"approved": True})
+
+    assert client.get("/api/v1/assessment/analytics/quality").status_code == 403
+    client.user.update(role="admin")
+    response = client.get("/api/v1/assessment/analytics/quality", params={"days": 7})
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total_assessments"] == 2
+    assert stats["flagged_for_review"] == 1
+    assert stats["reviewed"] == 1
+    assert stats["pattern_distribution"]["all_yes"] == 1
+    assert stats["period_days"] == 7
+
+
+def test_admin_telemetry_and_health(client):
+    for path in ("/api/v1/assessment/analytics/cache", "/api/v1/assessment/analytics/db-pool"):
+        assert client.get(path).status_code == 403
+
+    client.user.update(role="admin")
+    cache = client.get("/api/v1/assessment/analytics/cache")
+    assert cache.status_code == 200
+    assert {"hits", "misses", "size", "hit_rate"} <= set(cache.json())
+    assert client.get("/api/v1/assessment/analytics/db-pool").status_code == 200
+
+    health = client.get("/api/v1/assessment/health")
+    assert health.json()["status"] == "healthy"
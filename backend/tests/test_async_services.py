@@ -0,0 +1,87 @@
+"""
+Async Service Tests
+Async variants over sync and async sessions, and event-loop concurrency
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import to_async_url
+from services.async_services import AsyncEPAssessmentService, AsyncServiceAdapter
+
+
+class _SlowService:
+    """Stands in for a service whose method blocks on one query"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def lookup(self, value, delay=0.05):
+        time.sleep(delay)
+        return value, threading.get_ident(), type(self.db)
+
+
+class _AsyncSlowService(AsyncServiceAdapter):
+    service_class = _SlowService
+
+
+def test_methods_are_awaitable_and_leave_the_loop_thread():
+    """A sync session is used from a worker thread, not the event loop"""
+    async def main():
+        return threading.get_ident(), await _AsyncSlowService(object()).lookup(7, delay=0)
+
+    loop_thread, (value, worker_thread, _) = asyncio.run(main())
+
+    assert value == 7
+    assert worker_thread != loop_thread
+
+
+def test_concurrent_calls_overlap():
+    """Concurrent requests overlap instead of queueing behind one query"""
+    async def main():
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            _AsyncSlowService(object()).lookup(n) for n in range(8)
+        ])
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(main())
+
+    assert [value for value, _, _ in results] == list(range(8))
+    assert elapsed < 8 * 0.05 / 2
+
+
+def test_async_session_runs_service_on_its_sync_session():
+    """With an AsyncSession the service gets the session behind run_sync"""
+    async def main():
+        async with AsyncSession() as db:
+            return await _AsyncSlowService(db).lookup("x", delay=0)
+
+    value, _, session_type = asyncio.run(main())
+
+    assert value == "x"
+    assert issubclass(session_type, Session)
+
+
+def test_unknown_and_private_methods_are_not_forwarded():
+    """Only public methods of the wrapped service become coroutines"""
+    service = AsyncEPAssessmentService(object())
+
+    assert callable(service.get_assessment_history_page)
+    with pytest.raises(AttributeError):
+        service.no_such_method
+    with pytest.raises(AttributeError):
+        service._history_item
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://u:p@h:5432/db", "postgresql+asyncpg://u:p@h:5432/db"),
+    ("postgresql+psycopg2://u:p@h/db", "postgresql+asyncpg://u:p@h/db"),
+    ("postgresql+asyncpg://u:p@h/db", "postgresql+asyncpg://u:p@h/db"),
+])
+def test_async_url(url, expected):
+    assert to_async_url(url) == expected
@@ -0,0 +1,107 @@
+"""
+Biometric Batch Tests
+Vectorized batch validation, binary frames and batch-vs-sample equivalence
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SESSION_SERVICE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "services",
+    "session-service"
+)
+sys.path.insert(0, SESSION_SERVICE_DIR)
+try:
+    from biometric_batch import BiometricBatch, BiometricBatchError
+    from biometric_buffer import BiometricBuffer
+    from safety_rules import SafetyRuleEngine
+finally:
+    sys.path.remove(SESSION_SERVICE_DIR)
+
+
+def _columns(n=4, start=1_700_000_000.0):
+    return {
+        "timestamps": [start + i * 0.25 for i in range(n)],
+        "heart_rate": [72 + i for i in range(n)],
+        "hrv": [55.0 if i % 2 else None for i in range(n)]
+    }
+
+
+def test_columns_and_binary_frames_decode_to_the_same_batch():
+    batch = BiometricBatch.from_columns(_columns())
+
+    assert len(batch) == 4
+    assert batch.values.dtype == np.float32
+    assert np.isnan(batch.values[0, 1]) and batch.values[1, 1] == 55.0
+    assert np.isnan(batch.values[:, 2]).all()
+
+    decoded = BiometricBatch.from_bytes(batch.to_bytes())
+    np.testing.assert_array_equal(decoded.timestamps, batch.timestamps)
+    np.testing.assert_array_equal(decoded.values, batch.values)
+
+
+def test_out_of_order_samples_are_sorted():
+    columns = _columns()
+    columns["timestamps"] = columns["timestamps"][::-1]
+    batch = BiometricBatch.from_columns(columns)
+    assert list(np.diff(batch.timestamps) >= 0) == [True, True, True]
+    assert batch.values[0, 0] == 75
+
+
+@pytest.mark.parametrize("columns, message", [
+    ({"heart_rate": [70]}, "timestamps"),
+    ({**_columns(), "spo2": [98] * 4}, "Unknown channels: spo2"),
+    ({**_columns(), "hrv": [1.0]}, "'hrv' has 1 values"),
+    ({**_columns(), "heart_rate": ["fast"] * 4}, "numbers or null"),
+    ({**_columns(), "heart_rate": [70, -1, 70, 70]}, "heart_rate"),
+    ({**_columns(), "timestamps": [1.0, float("nan"), 2.0, 3.0]}, "finite"),
+    ({"timestamps": []}, "Empty"),
+])
+def test_invalid_batches_are_rejected_with_a_reason(columns, message):
+    with pytest.raises(BiometricBatchError, match=message):
+        BiometricBatch.from_columns(columns)
+
+
+def test_invalid_binary_frames_are_rejected():
+    frame = BiometricBatch.from_columns(_columns()).to_bytes()
+    with pytest.raises(BiometricBatchError):
+        BiometricBatch.from_bytes(frame[:-1])
+    with pytest.raises(BiometricBatchError):
+        BiometricBatch.from_bytes(b"XXXX" + frame[4:])
+
+
+def test_batched_ingest_matches_per_sample_ingest():
+    rng = np.random.default_rng(11)
+    n = 600
+    timestamps = 1_700_000_000.0 + np.arange(n) * 0.25
+    heart_rates = np.concatenate([np.full(300, 72.0), np.full(300, 150.0)]) + rng.normal(0, 2, n)
+    rows = [(float(hr), 50.0, None, None) for hr in heart_rates]
+
+    sample_buffer = BiometricBuffer(capacity=128, spill_capacity=64, downsample_factor=4)
+    sample_engine = SafetyRuleEngine()
+    sample_alerts = []
+    for timestamp, row in zip(timestamps.tolist(), rows):
+        sample_buffer.append(timestamp, row)
+        sample_alerts += sample_engine.evaluate(timestamp, dict(zip(
+            ("heart_rate", "hrv", "stress_level", "arousal_level"), row
+        )))
+
+    batch_buffer = BiometricBuffer(capacity=128, spill_capacity=64, downsample_factor=4)
+    batch_engine = SafetyRuleEngine()
+    batch_alerts = []
+    for first in range(0, n, 4):
+        batch = BiometricBatch.from_samples(timestamps[first:first + 4], rows[first:first + 4])
+        batch_buffer.extend(batch.timestamps, batch.values)
+        batch_alerts += batch_engine.evaluate_many(
+            batch.timestamps.tolist(), batch.values.tolist(),
+            ("heart_rate", "hrv", "stress_level", "arousal_level")
+        )
+
+    for expected, actual in zip(sample_buffer.to_arrays(), batch_buffer.to_arrays()):
+        np.testing.assert_array_equal(expected, actual)
+    assert batch_buffer.total_samples == n
+    assert [(a.rule, a.timestamp) for a in batch_alerts] == [(a.rule, a.timestamp) for a in sample_alerts]
+    assert "high_heart_rate" in [alert.rule for alert in batch_alerts]
@@ -0,0 +1,77 @@
+"""
+Biometric Ring Buffer Tests
+Windowed stats, downsampled spill-over and the compact archive format
+"""
+import os
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+SESSION_SERVICE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "services",
+    "session-service"
+)
+sys.path.insert(0, SESSION_SERVICE_DIR)
+try:
+    from biometric_buffer import CHANNELS, BiometricBuffer
+finally:
+    sys.path.remove(SESSION_SERVICE_DIR)
+
+
+def test_window_stats_match_numpy_across_wraparound():
+    buffer = BiometricBuffer(capacity=50, spill_capacity=10, downsample_factor=5)
+    rng = np.random.default_rng(7)
+    heart_rates = 70 + 0.5 * np.arange(120) + rng.normal(0, 1, 120)
+    for second, heart_rate in enumerate(heart_rates):
+        buffer.append(1000.0 + second, (heart_rate, 50.0, None, 0.3))
+
+    stats = buffer.window_stats(30)
+    expected = heart_rates[-31:].astype(np.float32).astype(np.float64)
+    assert stats["heart_rate"]["count"] == 31
+    assert stats["heart_rate"]["mean"] == pytest.approx(expected.mean(), rel=1e-6)
+    assert stats["heart_rate"]["min"] == pytest.approx(expected.min(), rel=1e-6)
+    assert stats["heart_rate"]["max"] == pytest.approx(expected.max(), rel=1e-6)
+    assert stats["heart_rate"]["slope"] == pytest.approx(
+        np.polyfit(np.arange(31), expected, 1)[0], rel=1e-4
+    )
+    assert stats["hrv"]["slope"] == pytest.approx(0.0, abs=1e-9)
+    assert stats["stress_level"] == {
+        "count": 0, "mean": None, "min": None, "max": None, "slope": None
+    }
+
+
+def test_overflow_is_downsampled_into_fixed_memory():
+    buffer = BiometricBuffer(capacity=20, spill_capacity=4, downsample_factor=5)
+    nbytes = buffer.nbytes
+    for second in range(40):
+        buffer.append(float(second), (float(second), None, None, None))
+
+    assert buffer.nbytes == nbytes
+    assert buffer.total_samples == 40
+    assert buffer.raw.count == 20
+    timestamps, values = buffer.to_arrays()
+    # Samples 0-19 became four 5-sample averages, 20-39 are full resolution
+    assert list(timestamps[:4]) == [2.0, 7.0, 12.0, 17.0]
+    assert list(values[:4, 0]) == [2.0, 7.0, 12.0, 17.0]
+    assert list(timestamps[4:]) == [float(second) for second in range(20, 40)]
+
+
+def test_archive_round_trip():
+    buffer = BiometricBuffer(capacity=16, spill_capacity=8, downsample_factor=4)
+    for second in range(30):
+        buffer.append(float(second), (60.0 + second, None if second % 3 else 45.0, 0.2, 0.1))
+
+    restored = BiometricBuffer.from_bytes(buffer.to_bytes())
+
+    assert restored.channels == CHANNELS
+    assert restored.total_samples == 30
+    assert restored.last_timestamp == 29.0
+    for original, copy in zip(buffer.to_arrays(), restored.to_arrays()):
+        np.testing.assert_array_equal(original, copy)
+    assert restored.window_stats(10) == buffer.window_stats(10)
+
+    with pytest.raises(ValueError):
+        BiometricBuffer.from_bytes(zlib.compress(b"not an archive" * 4))
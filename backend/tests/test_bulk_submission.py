@@ -0,0 +1,164 @@
+"""
+Bulk Assessment Submission Tests
+Batch scoring, auto-flagging and statement counts without a live database
+"""
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+from utils.question_catalogue import invalidate_question_catalogue
+from utils.scoring_calculator import SuggestibilityScorer, invalidate_lookup_tables
+
+
+VERSION_ID = "880e8400-e29b-41d4-a716-446655440003"
+
+
+def _chart_rows():
+    return [
+        (q1, combined, min(100, round(q1 * 100 / combined)))
+        for q1 in range(0, 101, 5)
+        for combined in range(50, 201, 5)
+    ]
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeDB:
+    """Answers the catalogue/chart reads and captures the batch writes"""
+
+    def __init__(self):
+        self.statements = []
+        self.inserted = None
+        self.commits = 0
+
+    def execute(self, query, params=None):
+        sql = str(query)
+        self.statements.append(sql)
+        if "questionnaire_versions" in sql:
+            return _Result([(
+                VERSION_ID, "HMI E&P Suggestibility Assessment", "1.0",
+                "HMI", None, None, True
+            )])
+        if "scoring_lookup_tables" in sql:
+            return _Result(_chart_rows())
+        if "INSERT INTO user_assessments" in sql:
+            self.inserted = params
+        if "INSERT INTO assessment_trend_aggregates" in sql:
+            # Every submission is by a new user, so every aggregate is inserted
+            return _Result([
+                (value,) for key, value in params.items() if key.startswith("user_id_")
+            ])
+        return _Result([])
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def _submissions(count):
+    submissions = []
+    for n in range(count):
+        if n % 7 == 0:
+            answers = {str(q): True for q in range(1, 37)}
+        else:
+            answers = {str(q): (q * (n + 3)) % 4 != 0 for q in range(1, 37)}
+        submissions.append({
+            "user_id": uuid4(),
+            "answers": answers,
+            "session_id": None,
+            "time_to_complete": [None, 60, 240, 1500][n % 4],
+            "completed_at": datetime(2026, 3, 1 + n % 3) if n % 2 else None
+        })
+    return submissions
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+    yield
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+
+
+def test_bulk_results_match_single_scoring():
+    """Scores, quality metrics and review reasons equal the per-row path"""
+    submissions = _submissions(40)
+    db = _FakeDB()
+    service = EPAssessmentServiceEnhanced(db)
+
+    results = service.save_assessments_bulk(submissions)
+
+    scorer = SuggestibilityScorer(db)
+    for submission, result in zip(submissions, results):
+        answers = {int(q): value for q, value in submission["answers"].items()}
+        scores = scorer.calculate_scores(answers, VERSION_ID)
+        quality = service.calculate_quality_metrics(
+            submission["answers"], submission["time_to_complete"]
+        )
+        for key in result["scores"]:
+            assert result["scores"][key] == scores[key]
+        assert result["quality_metrics"]["answer_pattern"] == quality.answer_pattern
+        assert result["quality_metrics"]["confidence_score"] == quality.confidence_score
+        assert result["quality_metrics"]["needs_review"] == quality.needs_review
+        assert result["quality_metrics"]["review_reasons"] == quality.review_reasons
+        assert result["user_id"] == submission["user_id"]
+    assert db.commits == 1
+
+
+def test_bulk_insert_auto_flags_like_single_save():
+    """Flagged rows carry the AUTO-FLAGGED note and flagged_for_review"""
+    submissions = _submissions(20)
+    db = _FakeDB()
+
+    results = EPAssessmentServiceEnhanced(db).save_assessments_bulk(submissions)
+
+    inserted = db.inserted
+    assert len(inserted["ids"]) == 20
+    assert any(inserted["flagged"]) and not all(inserted["flagged"])
+    for result, flagged, note in zip(results, inserted["flagged"], inserted["clinical_notes"]):
+        reasons = result["quality_metrics"]["review_reasons"]
+        assert flagged == result["quality_metrics"]["needs_review"]
+        if flagged:
+            assert note == f"AUTO-FLAGGED: {', '.join(reasons)}"
+        else:
+            assert note is None
+    assert inserted["completed_ats"][1] == datetime(2026, 3, 2)
+
+
+def test_bulk_statement_count_is_constant():
+    """Writes cost the same few statements for 10 or 1000 submissions"""
+    counts = []
+    for size in (10, 1000):
+        invalidate_lookup_tables()
+        invalidate_question_catalogue()
+        db = _FakeDB()
+        EPAssessmentServiceEnhanced(db).save_assessments_bulk(_submissions(size))
+        counts.append(len(db.statements))
+
+    assert counts[0] == counts[1]
+    assert counts[0] <= 6
+
+
+def test_bulk_rejects_oversized_batch_and_handles_empty():
+    """The batch limit is enforced before touching the database"""
+    db = _FakeDB()
+    service = EPAssessmentServiceEnhanced(db)
+
+    assert service.save_assessments_bulk([]) == []
+    with pytest.raises(ValueError):
+        service.save_assessments_bulk(_submissions(1) * 5001)
+    assert db.statements == []
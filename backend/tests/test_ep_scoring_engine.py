@@ -0,0 +1,180 @@
+"""
+E&P Scoring Engine Tests
+Tests batch scoring against the per-respondent engine and JSONL export
+"""
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "e6_f5_s2_assessment"))
+
+from ep_scoring_engine import EPScoringEngine, EPProfileBatch
+from ep_profile_exporter import EPProfileJSONLExporter
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def engine():
+    return EPScoringEngine()
+
+
+@pytest.fixture
+def cohort():
+    """Random respondents, including partial and one-sided answer sets"""
+    rng = np.random.default_rng(45)
+    respondents = []
+    for _ in range(300):
+        bias = rng.random()
+        answered = rng.random(45) < 0.95
+        respondents.append({
+            q_id: 'Physical' if rng.random() < bias else 'emotional'
+            for q_id in range(1, 46) if answered[q_id - 1]
+        })
+    respondents.append({i: 'physical' for i in range(1, 46)})
+    respondents.append({i: 'emotional' for i in range(1, 46)})
+    respondents.append({})
+    return respondents
+
+
+# ============================================================================
+# BATCH SCORING TESTS
+# ============================================================================
+
+def test_encode_responses_shape_and_codes(engine):
+    """Matrix is questions x respondents with missing cells marked"""
+    matrix = engine.encode_responses([{1: 'physical', 45: 'emotional'}, {}])
+
+    assert matrix.shape == (45, 2)
+    assert matrix.dtype == np.int8
+    assert matrix[0, 0] == EPScoringEngine.RESPONSE_PHYSICAL
+    assert matrix[44, 0] == EPScoringEngine.RESPONSE_EMOTIONAL
+    assert (matrix[:, 1] == EPScoringEngine.RESPONSE_MISSING).all()
+
+
+def test_score_batch_matches_score_responses(engine, cohort):
+    """Every batch column equals the per-respondent profile"""
+    batch = engine.score_batch(engine.encode_responses(cohort))
+
+    assert isinstance(batch, EPProfileBatch)
+    assert len(batch) == len(cohort)
+
+    for index, responses in enumerate(cohort):
+        expected = engine.score_responses(responses)
+        actual = batch.profile(index)
+
+        assert actual.ep_type == expected.ep_type
+        assert batch.ep_type[index] == expected.ep_type
+        assert actual.primary_type == expected.primary_type
+        assert actual.secondary_type == expected.secondary_type
+        assert actual.overall_physical_percentage == pytest.approx(
+            expected.overall_physical_percentage
+        )
+        assert actual.confidence_score == pytest.approx(expected.confidence_score)
+        for trait_name, score in expected.trait_scores.items():
+            assert actual.trait_scores[trait_name] == score
+
+
+def test_score_batch_rejects_bad_shape(engine):
+    """Respondent-major matrices are rejected"""
+    with pytest.raises(ValueError):
+        engine.score_batch(np.zeros((10, 45), dtype=np.int8))
+
+
+# ============================================================================
+# REPRESENTATION TESTS
+# ============================================================================
+
+def test_profiles_are_slotted(engine):
+    """TraitScore and EPProfile carry no per-instance __dict__"""
+    profile = engine.score_responses({i: 'physical' for i in range(1, 46)})
+
+    assert not hasattr(profile, '__dict__')
+    assert not hasattr(profile.trait_scores['logical'], '__dict__')
+
+
+def test_batch_round_trips_profiles(engine, cohort):
+    """from_profiles packs profiles that index back out unchanged"""
+    profiles = [engine.score_responses(r) for r in cohort[:50]]
+    batch = EPProfileBatch.from_profiles(profiles)
+
+    assert len(batch) == 50
+    assert list(batch) == profiles
+    assert batch[-1] == profiles[-1]
+    with pytest.raises(IndexError):
+        batch[50]
+
+
+# ============================================================================
+# JSONL EXPORT TESTS
+# ============================================================================
+
+def _read_lines(path):
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return [json.loads(line) for line in f.read().splitlines()]
+
+
+@pytest.mark.parametrize("filename", ["profiles.jsonl", "profiles.jsonl.gz"])
+def test_export_jsonl_one_record_per_profile(engine, cohort, tmp_path, filename):
+    """Each profile becomes one line matching export_results' layout"""
+    batch = engine.score_batch(engine.encode_responses(cohort))
+    path = tmp_path / filename
+
+    summary = engine.export_results_jsonl(batch, str(path))
+
+    records = _read_lines(path)
+    assert summary.written == len(cohort) == len(records)
+    assert records[0] == engine.profile_to_dict(batch[0])
+
+
+def test_export_jsonl_resume_after_partial_write(engine, cohort, tmp_path):
+    """Resume drops a torn last line and skips already-written profiles"""
+    profiles = engine.score_batch(engine.encode_responses(cohort)).to_profiles()
+    path = tmp_path / "profiles.jsonl"
+
+    EPProfileJSONLExporter(str(path), engine=engine).export(profiles[:100])
+    with open(path, 'ab') as f:
+        f.write(b'{"ep_type": "P')
+
+    summary = EPProfileJSONLExporter(str(path), engine=engine, mode='resume').export(profiles)
+
+    assert summary.existing == 100
+    assert summary.skipped == 100
+    assert summary.total == len(profiles)
+    assert _read_lines(path) == [engine.profile_to_dict(p) for p in profiles]
+
+
+def test_export_jsonl_resume_truncated_gzip(engine, cohort, tmp_path):
+    """A gzip export cut off mid-stream is repaired and completed"""
+    profiles = engine.score_batch(engine.encode_responses(cohort)).to_profiles()
+    path = tmp_path / "profiles.jsonl.gz"
+
+    EPProfileJSONLExporter(str(path), engine=engine).export(profiles)
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+
+    summary = EPProfileJSONLExporter(str(path), engine=engine, mode='resume').export(profiles)
+
+    assert summary.existing < len(profiles)
+    assert _read_lines(path) == [engine.profile_to_dict(p) for p in profiles]
+
+
+def test_export_jsonl_append(engine, tmp_path):
+    """Append mode adds records after the existing ones"""
+    profile = engine.score_responses({i: 'physical' for i in range(1, 46)})
+    path = tmp_path / "profiles.jsonl"
+
+    EPProfileJSONLExporter(str(path), engine=engine).export([profile])
+    summary = EPProfileJSONLExporter(
+        str(path), engine=engine, mode='append', serializer=lambda r: json.dumps(r).encode()
+    ).export([profile, profile])
+
+    assert summary.total == 3
+    assert len(_read_lines(path)) == 3
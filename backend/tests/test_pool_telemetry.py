@@ -0,0 +1,109 @@
+"""
+Connection Pool Telemetry Tests
+Checkout waits, overflow events and timeouts on a small SQLite pool
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import exc, text
+
+from db_engine import create_db_engine, pool_options
+from utils.pool_telemetry import PoolTelemetry, pool_metrics
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        name="test-pool",
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+        pool_recycle=-1
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_checkouts_overflow_and_timeouts_are_counted(engine):
+    """Second connection overflows; the third times out"""
+    first = engine.connect()
+    second = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    metrics = pool_metrics()["test-pool"]
+    assert metrics["checkouts"] == 2
+    assert metrics["overflow_events"] == 1
+    assert metrics["timeouts"] == 1
+    assert metrics["checked_out"] == 2
+    assert metrics["pool_size"] == 1
+    assert metrics["wait"]["count"] == 3
+    assert metrics["wait"]["max_ms"] >= 50
+
+    first.close()
+    second.close()
+    assert pool_metrics()["test-pool"]["checked_out"] == 0
+
+
+def test_queries_run_and_telemetry_survives_dispose(engine):
+    """Counting continues into the same telemetry after engine.dispose()"""
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert pool_metrics()["test-pool"]["checkouts"] == 2
+
+
+def test_invalidated_connections_are_counted(engine):
+    """Invalidating a connection (e.g. failed pre-ping) is recorded"""
+    with engine.connect() as connection:
+        connection.invalidate()
+
+    assert pool_metrics()["test-pool"]["invalidations"] == 1
+
+
+def test_wait_histogram_is_cumulative():
+    """Buckets count checkouts at or below each bound; +Inf holds all"""
+    telemetry = PoolTelemetry("histogram")
+    for seconds in (0.0005, 0.003, 0.003, 0.2, 20):
+        telemetry.record_checkout(seconds, overflowed=False)
+
+    buckets = telemetry.snapshot()["wait"]["buckets"]
+
+    assert buckets["1"] == 1
+    assert buckets["5"] == 3
+    assert buckets["250"] == 4
+    assert buckets["10000"] == 4
+    assert buckets["+Inf"] == 5
+
+
+def test_pool_options_apply_overrides():
+    options = pool_options(pool_size=3)
+
+    assert options["pool_size"] == 3
+    assert options["pool_pre_ping"] in (True, False)
+    assert set(options) == {
+        "pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"
+    }
+
+
+def test_engine_factory_import_builds_no_engine():
+    """Services importing the factory do not create the main API's default engine"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys, db_engine; from utils.pool_telemetry import pool_metrics; "
+            "assert 'database' not in sys.modules; assert pool_metrics() == {}"
+        ],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True
+    )
+
+    assert probe.returncode == 0, probe.stderr
@@ -0,0 +1,145 @@
+"""
+Communication Preferences Cache Tests
+LRU/TTL behaviour, shared tier and counters
+"""
+import pytest
+
+from utils.preference_cache import LocalSharedBackend, PreferenceCache, SharedCacheBackend
+
+
+PREFS = {"suggestibility_type": "Physical Suggestible", "communication_style": "Direct and Literal"}
+
+
+def test_read_through_counts_hits_and_misses():
+    """First lookup misses, later lookups hit until invalidated"""
+    cache = PreferenceCache(maxsize=10, ttl_seconds=60)
+
+    assert cache.get("u1") == (False, None)
+    cache.set("u1", PREFS)
+    for _ in range(5):
+        assert cache.get("u1") == (True, PREFS)
+    cache.invalidate("u1")
+    assert cache.get("u1") == (False, None)
+
+    stats = cache.stats()
+    assert stats["hits"] == 5
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == 5 / 7
+
+
+def test_users_without_assessment_are_cached():
+    """A cached None is a hit, not another database round trip"""
+    cache = PreferenceCache(maxsize=10, ttl_seconds=60, backend=LocalSharedBackend())
+
+    cache.set("new-user", None)
+
+    assert cache.get("new-user") == (True, None)
+    other_worker = PreferenceCache(maxsize=10, ttl_seconds=60, backend=cache.backend)
+    assert other_worker.get("new-user") == (True, None)
+
+
+def test_lru_eviction_and_ttl_expiry():
+    """Least recently used entries go first; expired entries miss"""
+    cache = PreferenceCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", PREFS)
+    cache.set("b", PREFS)
+    cache.get("a")
+    cache.set("c", PREFS)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert cache.stats()["evictions"] == 1
+
+    expired = PreferenceCache(maxsize=2, ttl_seconds=0)
+    expired.set("a", PREFS)
+    assert expired.get("a") == (False, None)
+
+
+def test_shared_tier_warms_other_workers_and_invalidates():
+    """Workers share entries through the backend; invalidation clears it"""
+    backend = LocalSharedBackend()
+    writer = PreferenceCache(maxsize=10, ttl_seconds=60, backend=backend)
+    reader = PreferenceCache(maxsize=10, ttl_seconds=60, backend=backend)
+
+    writer.set("u1", PREFS)
+    assert reader.get("u1") == (True, PREFS)
+    assert reader.get("u1") == (True, PREFS)
+    assert reader.stats()["shared_hits"] == 2
+
+    writer.invalidate("u1")
+    assert backend.get(PreferenceCache.KEY_PREFIX + "u1") is None
+    assert writer.get("u1") == (False, None)
+
+
+def test_invalidation_on_one_worker_is_seen_by_the_others():
+    """A worker that read an entry must not keep serving it after another worker invalidates"""
+    backend = LocalSharedBackend()
+    worker_a = PreferenceCache(maxsize=10, ttl_seconds=60, backend=backend)
+    worker_b = PreferenceCache(maxsize=10, ttl_seconds=60, backend=backend)
+
+    worker_a.set("u1", PREFS)
+    assert worker_b.get("u1") == (True, PREFS)
+
+    worker_a.invalidate("u1")
+
+    assert worker_b.get("u1") == (False, None)
+    assert worker_b.stats()["size"] == 0
+
+
+def test_shared_backend_is_abstract():
+    """Backends must implement the whole interface"""
+    class _Partial(SharedCacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        _Partial()
+
+
+class _Row:
+    def __init__(self, row):
+        self._row = row
+
+    def fetchone(self):
+        return self._row
+
+
+class _PreferencesDB:
+    """Answers the latest-assessment lookup and counts round trips"""
+
+    def __init__(self, latest=None):
+        self.latest = latest
+        self.queries = 0
+
+    def execute(self, query, params=None):
+        self.queries += 1
+        return _Row(self.latest)
+
+
+def test_service_serves_preferences_through_the_cache():
+    """The service the routes use reads through the cache and returns the schema's shape"""
+    from datetime import datetime
+
+    from schemas.assessment import CommunicationPreferences
+    from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+
+    db = _PreferencesDB(("Primarily Physical", 82.5, datetime(2026, 3, 1, 9, 0)))
+    cache = PreferenceCache(maxsize=10, ttl_seconds=60, backend=LocalSharedBackend())
+    service = EPAssessmentServiceEnhanced(db, preferences_cache=cache)
+
+    first = service.get_communication_preferences("u1")
+    second = service.get_communication_preferences("u1")
+
+    assert first == second
+    assert db.queries == 1
+    assert CommunicationPreferences(**first).style == "physical_suggestible"
+    assert first["confidence"] == 82.5
+    assert first["assessment_date"] == "2026-03-01T09:00:00"
+    assert cache.stats()["shared_hits"] == 1
+
+    cache.invalidate("u1")
+    db.latest = None
+    none = service.get_communication_preferences("u1")
+    assert db.queries == 2
+    assert none["confidence"] == 0
+    assert CommunicationPreferences(**none).style == "balanced"
@@ -0,0 +1,203 @@
+"""
+Quality Backfill Tests
+Keyset paging, checkpoint/resume and batch metrics against an in-memory table
+"""
+import uuid
+from datetime import date
+
+import pytest
+
+from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+from services.quality_backfill import (
+    BackfillCheckpoint,
+    QualityBackfillJob,
+    build_update_statement,
+    compute_quality_rows
+)
+
+
+# ============================================================================
+# IN-MEMORY TABLE
+# ============================================================================
+
+def _table(count=250):
+    """user_assessments rows keyed by id; every 7th row has no answers"""
+    rows = {}
+    for n in range(count):
+        assessment_id = str(uuid.UUID(int=n + 1))
+        answers = {} if n % 7 == 0 else {str(i): (i * n) % 3 == 0 for i in range(1, 37)}
+        rows[assessment_id] = {
+            "answers": answers,
+            "time_to_complete_seconds": [None, 60, 300, 1500][n % 4],
+            "confidence_score": None,
+            "answer_pattern_signature": None,
+            "completion_percentage": None,
+            "day": date(2026, 1, 1 + n // 10)
+        }
+    return rows
+
+
+class InMemoryBackfillJob(QualityBackfillJob):
+    """Serves pages from a dict instead of Postgres"""
+
+    def __init__(self, table, fail_after_batches=None, **kwargs):
+        super().__init__(engine=None, **kwargs)
+        self.table = table
+        self.fail_after_batches = fail_after_batches
+        self.pages = 0
+        self.batches_written = 0
+
+    def fetch_page(self, after_id, limit):
+        self.pages += 1
+        pending = sorted(
+            (assessment_id, row) for assessment_id, row in self.table.items()
+            if row["confidence_score"] is None and row["completion_percentage"] is None
+            and (after_id is None or assessment_id > after_id)
+        )[:limit]
+        for start in range(0, len(pending), self.batch_size):
+            yield [
+                (assessment_id, row["answers"], row["time_to_complete_seconds"])
+                for assessment_id, row in pending[start:start + self.batch_size]
+            ]
+
+    def write_batch(self, updates):
+        if self.fail_after_batches is not None and \
+                self.batches_written >= self.fail_after_batches:
+            raise RuntimeError("connection lost")
+        written = 0
+        for update in updates:
+            row = self.table[update["id"]]
+            if row["confidence_score"] is None:
+                row["confidence_score"] = update["confidence_score"]
+                row["answer_pattern_signature"] = update["answer_pattern"]
+                row["completion_percentage"] = update["completion_percentage"]
+                self.updated_days.add(row["day"])
+                written += 1
+        self.batches_written += 1
+        return written
+
+    def mark_unscorable(self, ids):
+        for assessment_id in ids:
+            self.table[assessment_id]["completion_percentage"] = 0.0
+        return len(ids)
+
+
+@pytest.fixture
+def service():
+    return EPAssessmentServiceEnhanced(db=None)
+
+
+# ============================================================================
+# TESTS
+# ============================================================================
+
+def test_backfill_matches_per_row_metrics(service):
+    """Every answered row gets the same metrics calculate_quality_metrics gives"""
+    table = _table()
+    job = InMemoryBackfillJob(table, service=service, batch_size=40, page_size=100)
+
+    checkpoint = job.run()
+
+    assert checkpoint.processed == 250
+    assert checkpoint.skipped == 36
+    assert checkpoint.updated == 214
+    assert job.pages == 3
+    for row in table.values():
+        if not row["answers"]:
+            assert row["confidence_score"] is None
+            continue
+        expected = service.calculate_quality_metrics(
+            row["answers"], row["time_to_complete_seconds"]
+        )
+        assert row["confidence_score"] == expected.confidence_score
+        assert row["answer_pattern_signature"] == expected.answer_pattern
+        assert row["completion_percentage"] == expected.completion_percentage
+
+
+def test_backfill_resumes_from_checkpoint(service, tmp_path):
+    """An interrupted run continues after the last committed batch"""
+    table = _table()
+    path = str(tmp_path / "backfill.json")
+
+    interrupted = InMemoryBackfillJob(
+        table, service=service, batch_size=50, checkpoint_path=path,
+        fail_after_batches=2
+    )
+    with pytest.raises(RuntimeError):
+        interrupted.run()
+
+    saved = BackfillCheckpoint.load(path)
+    assert saved.processed == 100
+    assert saved.last_id == str(uuid.UUID(int=100))
+
+    resumed = InMemoryBackfillJob(
+        table, service=service, batch_size=50, checkpoint_path=path
+    )
+    checkpoint = resumed.run()
+
+    assert checkpoint.processed == 250
+    assert checkpoint.updated == 214
+    assert all(row["confidence_score"] is not None for row in table.values() if row["answers"])
+    # The rollup rebuild after the resumed run covers the interrupted run's days too
+    assert resumed.updated_days == {row["day"] for row in table.values() if row["answers"]}
+
+
+def test_backfill_max_rows(service):
+    """max_rows bounds a single run (used by the API endpoint)"""
+    table = _table()
+    job = InMemoryBackfillJob(table, service=service, batch_size=30, page_size=1000)
+
+    checkpoint = job.run(max_rows=100)
+
+    assert checkpoint.processed == 100
+
+
+def test_repeated_bounded_runs_move_past_unanswered_rows(service):
+    """Runs without a checkpoint (the API endpoint) never re-read unscorable rows"""
+    table = _table()
+    for row in list(table.values())[:120]:
+        row["answers"] = {}
+
+    first = InMemoryBackfillJob(table, service=service, batch_size=50).run(max_rows=100)
+    second = InMemoryBackfillJob(table, service=service, batch_size=50).run(max_rows=100)
+
+    assert (first.updated, first.skipped) == (0, 100)
+    assert second.skipped == 20 + sum(1 for n in range(120, 200) if n % 7 == 0)
+    assert second.updated == 100 - second.skipped
+    unanswered = [row for row in table.values() if not row["answers"]][:120]
+    assert all(row["confidence_score"] is None for row in unanswered)
+    assert all(row["completion_percentage"] == 0.0 for row in unanswered)
+
+
+def test_compute_quality_rows_skips_empty_and_parses_json(service):
+    """JSON text answers are decoded; rows without answers are counted"""
+    rows = [
+        ("a", '{"1": true, "2": false}', None),
+        ("b", {}, 300),
+        ("c", None, 300)
+    ]
+
+    updates, skipped = compute_quality_rows(service, rows)
+
+    assert skipped == ["b", "c"]
+    assert [u["id"] for u in updates] == ["a"]
+    assert updates[0]["completion_percentage"] == pytest.approx(2 / 36 * 100)
+
+
+def test_update_statement_binds_every_row():
+    """One VALUES tuple per row with matching bind parameters"""
+    updates = [
+        {"id": "a", "confidence_score": 90.0, "answer_pattern": "balanced",
+         "completion_percentage": 100.0},
+        {"id": "b", "confidence_score": 10.0, "answer_pattern": "all_yes",
+         "completion_percentage": 100.0}
+    ]
+
+    statement, params = build_update_statement(updates)
+
+    assert "FROM (VALUES" in str(statement)
+    assert "ua.confidence_score IS NULL" in str(statement)
+    assert "RETURNING CAST(ua.completed_at AS date)" in str(statement)
+    assert params["id_1"] == "b"
+    assert params["pattern_0"] == "balanced"
+    assert len(params) == 8
@@ -0,0 +1,122 @@
+"""
+Quality Statistics Tests
+Live aggregate and daily rollups without a live database
+"""
+from datetime import date
+
+from services.ep_assessment_service_enhanced import EPAssessmentServiceEnhanced
+from services.quality_rollup import get_quality_rollup, rebuild_quality_rollups
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+        self.rowcount = len(rows)
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeDB:
+    """Serves canned GROUP BY rows and records the statements"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, query, params=None):
+        self.statements.append((str(query), params))
+        return _Result(self.rows)
+
+    def rollback(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_quality_statistics_from_grouped_rows():
+    """Totals, averages and histogram come from one grouped query"""
+    # pattern, total, scored, confidence_sum, flagged, missing
+    db = FakeDB([
+        ("balanced", 8, 8, 720.0, 0, 0),
+        ("all_yes", 2, 2, 20.0, 2, 0),
+        (None, 5, 0, 0, 1, 5)
+    ])
+
+    stats = EPAssessmentServiceEnhanced(db).get_quality_statistics(days=365, source="live")
+
+    assert len(db.statements) == 1
+    assert "GROUP BY answer_pattern_signature" in db.statements[0][0]
+    assert stats["total_assessments"] == 15
+    assert stats["avg_confidence"] == 74.0
+    assert stats["pattern_distribution"] == {"balanced": 8, "all_yes": 2}
+    assert stats["flagged_for_review"] == 3
+    assert stats["flagged_percentage"] == 20.0
+    assert stats["missing_metrics"] == 5
+    assert stats["period_days"] == 365
+
+
+def test_quality_statistics_empty_window():
+    """An empty window reports zeros with the full response shape"""
+    stats = EPAssessmentServiceEnhanced(FakeDB([])).get_quality_statistics(days=7, source="live")
+
+    assert stats["total_assessments"] == 0
+    assert stats["avg_confidence"] == 0
+    assert stats["pattern_distribution"] == {}
+    assert stats["missing_metrics"] == 0
+
+
+# ============================================================================
+# DAILY ROLLUP TESTS
+# ============================================================================
+
+def test_rollup_window_sums_day_rows():
+    """The endpoint sums per-day rows, merging pattern histograms"""
+    # total, scored, confidence_sum, missing, flagged, reviewed, pattern_counts
+    db = FakeDB([
+        (10, 10, 800.0, 0, 1, 1, {"balanced": 9, "all_yes": 1}),
+        (5, 4, 360.0, 1, 0, 0, '{"balanced": 4}')
+    ])
+
+    stats = EPAssessmentServiceEnhanced(db).get_quality_statistics(days=365)
+
+    assert len(db.statements) == 1
+    assert "assessment_quality_daily" in db.statements[0][0]
+    assert stats["total_assessments"] == 15
+    assert stats["avg_confidence"] == 1160.0 / 14
+    assert stats["pattern_distribution"] == {"balanced": 13, "all_yes": 1}
+    assert stats["missing_metrics"] == 1
+    assert stats["flagged_for_review"] == 1
+    assert stats["reviewed"] == 1
+
+
+def test_rollup_empty_window():
+    """No rollup rows gives the zeroed response"""
+    stats = get_quality_rollup(FakeDB(), days=30)
+
+    assert stats["total_assessments"] == 0
+    assert stats["avg_confidence"] == 0
+    assert stats["period_days"] == 30
+
+
+def test_rebuild_limited_to_given_days():
+    """A targeted rebuild replaces only the listed days"""
+    db = FakeDB()
+    days = [date(2026, 3, 4), date(2026, 3, 1), date(2026, 3, 4)]
+
+    rebuild_quality_rollups(db, days=days)
+
+    (lock, _), (delete, delete_params), (rebuild, rebuild_params) = db.statements
+    assert "LOCK TABLE" in lock
+    assert "day = ANY" in delete and "CAST(completed_at AS date) = ANY" in rebuild
+    assert delete_params["days"] == [date(2026, 3, 1), date(2026, 3, 4)]
+    assert rebuild_params["since"] == date(2026, 3, 1)
+    assert db.commits == 1
+
+
+def test_rebuild_with_no_days_is_a_no_op():
+    db = FakeDB()
+    assert rebuild_quality_rollups(db, days=set()) == 0
+    assert db.statements == []
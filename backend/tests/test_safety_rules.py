@@ -0,0 +1,148 @@
+"""
+Streaming Safety Rule Tests
+Sliding windows, debounce/hysteresis, multi-channel rules and replay
+"""
+import json
+import os
+import random
+import sys
+
+import pytest
+
+SESSION_SERVICE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "services",
+    "session-service"
+)
+sys.path.insert(0, SESSION_SERVICE_DIR)
+try:
+    from safety_rules import (
+        DEFAULT_SAFETY_RULES,
+        SAFETY_RULES,
+        Condition,
+        SafetyRuleEngine,
+        SlidingWindow,
+        compile_condition,
+        load_rule_specs,
+        replay
+    )
+finally:
+    sys.path.remove(SESSION_SERVICE_DIR)
+
+
+HIGH_HEART_RATE = [rule for rule in DEFAULT_SAFETY_RULES if rule["name"] == "high_heart_rate"]
+
+
+def _stream(heart_rates, hz=1.0, **channels):
+    for index, heart_rate in enumerate(heart_rates):
+        sample = {"heart_rate": heart_rate, "hrv": None, "stress_level": None, "arousal_level": None}
+        sample.update({name: values[index] for name, values in channels.items()})
+        yield 1000.0 + index / hz, sample
+
+
+def test_sliding_window_matches_brute_force():
+    rng = random.Random(3)
+    window = SlidingWindow(10)
+    history = []
+    t = 0.0
+    for _ in range(500):
+        t += rng.uniform(0.1, 1.5)
+        value = rng.uniform(50, 150)
+        window.push(t, value)
+        history.append((t, value))
+        inside = [v for ts, v in history if ts >= t - 10]
+        assert window.count == len(inside)
+        assert window.mean() == pytest.approx(sum(inside) / len(inside))
+        assert window.minimum() == min(inside)
+        assert window.maximum() == max(inside)
+
+
+def test_single_spike_does_not_fire_but_sustained_high_rate_does():
+    spike = [75] * 30 + [190] + [75] * 30
+    assert replay(_stream(spike), HIGH_HEART_RATE)["alerts"] == []
+
+    sustained = [75] * 30 + [160] * 30
+    alerts = replay(_stream(sustained), HIGH_HEART_RATE)["alerts"]
+    assert [alert.rule for alert in alerts] == ["high_heart_rate"]
+    assert alerts[0].details["heart_rate_mean"] > 140
+
+
+def test_hysteresis_and_cooldown_prevent_flapping():
+    # Mean hovers between the clear level (130) and the trip level (140)
+    flapping = [75] * 10 + [160] * 20 + [135, 145] * 40 + [75] * 30 + [160] * 30
+    alerts = replay(_stream(flapping), HIGH_HEART_RATE)["alerts"]
+    assert len(alerts) == 2
+    assert alerts[1].timestamp - alerts[0].timestamp >= 60
+
+
+def test_sensor_dropout_clears_the_condition():
+    """No readings left to judge: the sustain timer restarts when they return"""
+    rule = [{
+        "name": "fast_high_heart_rate",
+        "when": {"kind": "window", "channel": "heart_rate", "window_seconds": 2,
+                 "stat": "mean", "above": 140},
+        "sustain_seconds": 5
+    }]
+    dropout = [160] * 3 + [None] * 6 + [160] * 8
+    alerts = replay(_stream(dropout), rule)["alerts"]
+
+    # Readings return at 1009; the alert needs five more seconds of them
+    assert [alert.timestamp for alert in alerts] == [1014.0]
+
+
+def test_multi_channel_rule_needs_both_channels():
+    stress_only = replay(
+        _stream([70] * 60, stress_level=[0.95] * 60, arousal_level=[0.2] * 60)
+    )["alerts"]
+    assert "stress_and_arousal" not in [alert.rule for alert in stress_only]
+
+    both = replay(
+        _stream([70] * 60, stress_level=[0.95] * 60, arousal_level=[0.95] * 60)
+    )["alerts"]
+    assert "stress_and_arousal" in [alert.rule for alert in both]
+
+
+def test_hrv_drop_and_rate_of_change():
+    hrv = [55.0] * 200 + [25.0] * 40
+    alerts = replay(_stream([70] * 240, hrv=hrv))["alerts"]
+    assert [alert.rule for alert in alerts] == ["hrv_drop"]
+
+    surge = [70 + 2 * max(0, second - 60) for second in range(90)]
+    rules = [alert.rule for alert in replay(_stream(surge))["alerts"]]
+    assert "heart_rate_surge" in rules
+
+
+def test_conditions_must_implement_update():
+    class _Unfinished(Condition):
+        def details(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        _Unfinished()
+
+
+def test_invalid_specs_are_rejected():
+    with pytest.raises(ValueError):
+        compile_condition({"kind": "median", "channel": "hrv"})
+    with pytest.raises(ValueError):
+        compile_condition({"kind": "window", "channel": "hrv", "window_seconds": 10})
+    with pytest.raises(ValueError):
+        SafetyRuleEngine([{"name": "x", "when": {"kind": "window", "channel": "hrv",
+                                                 "window_seconds": 10, "stat": "p99", "above": 1}}])
+
+
+def test_rule_files_are_validated_when_loaded(tmp_path):
+    """A bad SAFETY_RULES_FILE fails on load (at import), not per session"""
+    good = tmp_path / "rules.json"
+    good.write_text(json.dumps(HIGH_HEART_RATE))
+    bad = tmp_path / "bad_rules.json"
+    bad.write_text(json.dumps(HIGH_HEART_RATE + [
+        {"name": "typo", "when": {"kind": "window", "channel": "hrv", "window_seconds": 10,
+                                  "stat": "mean", "abve": 1}}
+    ]))
+
+    assert load_rule_specs(str(good)) == HIGH_HEART_RATE
+    with pytest.raises(ValueError, match="#1 \\('typo'\\)"):
+        load_rule_specs(str(bad))
+    assert load_rule_specs(None) is DEFAULT_SAFETY_RULES
+    assert SafetyRuleEngine().rules[0].name == SAFETY_RULES[0]["name"]
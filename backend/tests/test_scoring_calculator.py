@@ -0,0 +1,317 @@
+"""
+HMI Scoring Calculator Tests
+Tests chart caching and score calculation without a live database
+"""
+
+import numpy as np
+import pytest
+
+from utils.scoring_calculator import (
+    SuggestibilityScorer,
+    HMILookupTable,
+    correct_lookup_table,
+    get_answer_breakdown,
+    get_lookup_table,
+    get_outcome_table,
+    invalidate_lookup_tables
+)
+import utils.scoring_calculator as scoring_calculator
+from utils.question_catalogue import (
+    QuestionCatalogueCache,
+    invalidate_question_catalogue
+)
+
+
+VERSION_ID = "880e8400-e29b-41d4-a716-446655440003"
+
+
+# ============================================================================
+# FAKE DATABASE
+# ============================================================================
+
+def _chart_rows():
+    """Synthetic HMI chart: physical % tracks the Q1 share of Combined"""
+    rows = []
+    for q1 in range(0, 101, 5):
+        for combined in range(50, 201, 5):
+            rows.append((q1, combined, min(100, round(q1 * 100 / combined))))
+    return rows
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class FakeDB:
+    """Counts round trips and serves the synthetic chart"""
+
+    def __init__(self, rows=None):
+        self.rows = _chart_rows() if rows is None else rows
+        self.queries = 0
+
+    def execute(self, query, params=None):
+        self.queries += 1
+        return _Result(self.rows)
+
+
+def _question_rows():
+    """36 catalogue rows: 1-18 physical, 19-36 emotional"""
+    return [
+        (
+            q, f"Question {q}", "physical" if q <= 18 else "emotional",
+            "general", 10 if q in (1, 2, 19, 20) else 5,
+            None, None, None, None, None
+        )
+        for q in range(1, 37)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_lookup_cache():
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+    yield
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+
+
+# ============================================================================
+# LOOKUP TABLE TESTS
+# ============================================================================
+
+def test_lookup_table_dense_grid():
+    """Every seeded cell is addressable, off-grid cells return None"""
+    table = HMILookupTable(VERSION_ID, _chart_rows())
+
+    assert len(table) == HMILookupTable.Q1_SLOTS * HMILookupTable.COMBINED_SLOTS
+    assert table.get(50, 100) == 50
+    assert table.get(0, 50) == 0
+    assert table.get(100, 200) == 50
+    assert table.get(52, 100) is None
+    assert table.get(105, 100) is None
+    assert table.get(50, 45) is None
+
+
+def test_lookup_table_loaded_once_per_version():
+    """Repeated scoring does not go back to the database"""
+    db = FakeDB()
+    scorer = SuggestibilityScorer(db)
+    answers = {i: i % 2 == 0 for i in range(1, 37)}
+
+    for _ in range(10):
+        scorer.calculate_scores(answers, VERSION_ID)
+
+    assert db.queries == 1
+
+
+def test_invalidate_lookup_tables_forces_reload():
+    """Invalidation drops the cached chart for the version"""
+    db = FakeDB()
+    get_lookup_table(db, VERSION_ID)
+    invalidate_lookup_tables(VERSION_ID)
+    get_lookup_table(db, VERSION_ID)
+
+    assert db.queries == 2
+
+
+def test_missing_chart_raises():
+    """An unseeded version is reported, not cached"""
+    db = FakeDB(rows=[])
+
+    with pytest.raises(ValueError):
+        get_lookup_table(db, VERSION_ID)
+    with pytest.raises(ValueError):
+        get_lookup_table(db, VERSION_ID)
+
+    assert db.queries == 2
+
+
+class ChartDB(FakeDB):
+    """FakeDB that also applies chart corrections"""
+
+    def __init__(self, rows=None):
+        super().__init__(rows)
+        self.commits = 0
+
+    def execute(self, query, params=None):
+        if "UPDATE scoring_lookup_tables" not in str(query):
+            return super().execute(query, params)
+        cell = (params["q1_score"], params["combined_score"])
+        result = _Result([])
+        result.rowcount = 0
+        for index, row in enumerate(self.rows):
+            if row[:2] == cell:
+                self.rows[index] = (*cell, params["physical_percentage"])
+                result.rowcount = 1
+        return result
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def test_correct_lookup_table_invalidates_cache():
+    """A committed correction is served by the next lookup"""
+    db = ChartDB()
+    assert get_lookup_table(db, VERSION_ID).get(50, 100) == 50
+
+    updated = correct_lookup_table(db, VERSION_ID, [(50, 100, 45), (52, 100, 10)])
+
+    assert updated == 1
+    assert db.commits == 1
+    assert get_lookup_table(db, VERSION_ID).get(50, 100) == 45
+    assert get_outcome_table(db, VERSION_ID)[(50, 100)].physical_percentage == 45
+
+
+def test_outcome_table_not_cached_across_invalidation(monkeypatch):
+    """An outcome table compiled from an invalidated chart is not kept"""
+    db = FakeDB()
+    load_chart = scoring_calculator.get_lookup_table
+
+    def load_then_invalidate(db, version_id):
+        table = load_chart(db, version_id)
+        invalidate_lookup_tables(version_id)
+        return table
+
+    monkeypatch.setattr(scoring_calculator, "get_lookup_table", load_then_invalidate)
+    outcomes = get_outcome_table(db, VERSION_ID)
+    monkeypatch.undo()
+
+    assert outcomes[(50, 100)].physical_percentage == 50
+    assert get_outcome_table(db, VERSION_ID) is not outcomes
+    assert db.queries == 2
+
+
+# ============================================================================
+# BATCH SCORING TESTS
+# ============================================================================
+
+def test_score_batch_matches_per_row_scoring():
+    """score_batch agrees with calculate_scores row for row"""
+    rng = np.random.default_rng(36)
+    matrix = rng.random((500, 36)) < rng.random((500, 1))
+    matrix[0] = True
+    matrix[1] = False
+
+    scorer = SuggestibilityScorer(FakeDB())
+    batch = scorer.score_batch(matrix, VERSION_ID)
+
+    for row_index, row in enumerate(matrix):
+        answers = {q: bool(row[q - 1]) for q in range(1, 37)}
+        expected = scorer.calculate_scores(answers, VERSION_ID)
+        for column in (
+            "q1_score", "q2_score", "combined_score", "q1_lookup",
+            "combined_lookup", "physical_percentage", "emotional_percentage",
+            "suggestibility_type"
+        ):
+            assert batch[column][row_index] == expected[column], column
+
+
+def test_answers_to_matrix_accepts_stored_keys():
+    """String keys from user_assessments.answers map to the right columns"""
+    matrix = SuggestibilityScorer.answers_to_matrix([
+        {"1": True, "36": True},
+        {2: True, 3: False}
+    ])
+
+    assert matrix.shape == (2, 36)
+    assert matrix[0].nonzero()[0].tolist() == [0, 35]
+    assert matrix[1].nonzero()[0].tolist() == [1]
+
+
+def test_score_batch_rejects_bad_shape():
+    """Non (N, 36) input is rejected before touching the chart"""
+    db = FakeDB()
+    scorer = SuggestibilityScorer(db)
+
+    with pytest.raises(ValueError):
+        scorer.score_batch(np.zeros((3, 35), dtype=bool), VERSION_ID)
+    assert db.queries == 0
+
+
+# ============================================================================
+# COMPILED OUTCOME TESTS
+# ============================================================================
+
+def test_outcomes_shared_across_calls():
+    """Same chart cell returns the same interpretation object"""
+    scorer = SuggestibilityScorer(FakeDB())
+    answers = {i: i <= 18 for i in range(1, 37)}
+
+    first = scorer.calculate_scores(answers, VERSION_ID)
+    second = scorer.calculate_scores(dict(answers), VERSION_ID)
+
+    assert first["interpretation"] is second["interpretation"]
+
+
+def test_outcome_payload_is_immutable():
+    """Shared payloads cannot be mutated by a caller"""
+    scorer = SuggestibilityScorer(FakeDB())
+    outcome = scorer.get_outcome(100, 100, VERSION_ID)
+
+    with pytest.raises(TypeError):
+        outcome.interpretation["clinical_notes"] = ""
+    with pytest.raises(TypeError):
+        outcome.interpretation["therapeutic_approach"]["imagery"] = ""
+    with pytest.raises(AttributeError):
+        outcome.physical_percentage = 0
+
+
+def test_outcome_matches_generated_interpretation():
+    """Shared outcome carries the freshly generated interpretation"""
+    scorer = SuggestibilityScorer(FakeDB())
+    outcome = scorer.get_outcome(40, 120, VERSION_ID)
+    expected = scorer._generate_interpretation(
+        outcome.physical_percentage,
+        outcome.emotional_percentage,
+        scorer._determine_type(outcome.physical_percentage)
+    )
+
+    assert outcome.interpretation["clinical_notes"] == expected["clinical_notes"]
+    assert list(outcome.interpretation["physical_traits"]) == expected["physical_traits"]
+    assert dict(outcome.interpretation["therapeutic_approach"]) == expected["therapeutic_approach"]
+
+
+# ============================================================================
+# QUESTION CATALOGUE TESTS
+# ============================================================================
+
+def test_answer_breakdown_reads_catalogue_once():
+    """Rendering many breakdowns for one version issues one query"""
+    db = FakeDB(rows=_question_rows())
+    answers = {i: i % 3 == 0 for i in range(1, 37)}
+
+    for _ in range(50):
+        breakdown = get_answer_breakdown(answers, db, VERSION_ID)
+
+    assert db.queries == 1
+    assert breakdown["physical_indicators"]["yes_count"] == 6
+    assert breakdown["emotional_indicators"]["yes_count"] == 6
+
+
+def test_question_catalogue_ttl_and_bust():
+    """Catalogues expire after the TTL and on explicit invalidation"""
+    db = FakeDB(rows=_question_rows())
+    cache = QuestionCatalogueCache(ttl_seconds=3600)
+
+    cache.get_catalogue(db, VERSION_ID)
+    cache.get_catalogue(db, VERSION_ID)
+    assert db.queries == 1
+
+    cache.invalidate(VERSION_ID)
+    cache.get_catalogue(db, VERSION_ID)
+    assert db.queries == 2
+
+    expired = QuestionCatalogueCache(ttl_seconds=0)
+    expired.get_catalogue(db, VERSION_ID)
+    expired.get_catalogue(db, VERSION_ID)
+    assert db.queries == 4
@@ -0,0 +1,279 @@
+"""
+Session Event Bus Tests
+Cross-worker delivery and command forwarding over a local broker stand-in
+"""
+import asyncio
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+from tests.test_session_store import SESSION_SERVICE_DIR, _request, session_service  # noqa: F401
+
+sys.path.insert(0, SESSION_SERVICE_DIR)
+try:
+    import session_bus
+    from session_bus import (
+        BrokerEventBus,
+        BrokerSubscription,
+        InProcessEventBus,
+        LocalBroker,
+        MessageBroker,
+        SessionEventBus
+    )
+    from session_store import InMemorySessionStore, SessionShards
+finally:
+    sys.path.remove(SESSION_SERVICE_DIR)
+
+
+class _Client:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, message):
+        self.messages.append(message)
+
+
+async def _settle():
+    for _ in range(30):
+        await asyncio.sleep(0)
+
+
+def _worker(service, broker, name, shards=None, **bus_options):
+    return service.SessionManager(
+        InMemorySessionStore(),
+        shards or SessionShards(0, 1),
+        bus=BrokerEventBus(broker, worker_id=name, **bus_options)
+    )
+
+
+def test_events_reach_sockets_held_by_another_worker(session_service):
+    async def scenario():
+        broker = LocalBroker()
+        worker_a = _worker(session_service, broker, "a")
+        worker_b = _worker(session_service, broker, "b")
+        await worker_a.bus.start()
+        await worker_b.bus.start()
+
+        session = await worker_a.create_session(_request(session_service))
+        patient, dashboard = _Client(), _Client()
+        worker_a.hub.subscribe(session.session_id, patient.send)
+        worker_b.hub.subscribe(session.session_id, dashboard.send)
+
+        await worker_a.start_session(session.session_id)
+        await worker_a.change_phase(session.session_id, "induction")
+        await worker_a.add_event(session.session_id, "custom", {"marker": 1})
+        await worker_a._trigger_safety_check(session.session_id, "Manual check")
+        await _settle()
+
+        expected = ["session_started", "phase_changed", "session_event", "safety_alert", "session_paused"]
+        # Alerts jump each subscriber's queue, so order is not compared
+        assert sorted(m["type"] for m in dashboard.messages) == sorted(expected)
+        # The publishing worker's own clients get each message exactly once
+        assert sorted(m["type"] for m in patient.messages) == sorted(expected)
+        assert worker_b.bus.stats()["received"] == len(expected)
+        assert worker_a.bus.stats()["received"] == 0
+
+        await worker_a.bus.stop()
+        await worker_b.bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_broker_outage_does_not_fail_the_operation(session_service):
+    class _DownBroker(LocalBroker):
+        async def publish(self, channel, payload):
+            raise ConnectionError("broker down")
+
+    async def scenario():
+        worker = _worker(session_service, _DownBroker(), "a")
+        await worker.bus.start()
+        session = await worker.create_session(_request(session_service))
+        client = _Client()
+        worker.hub.subscribe(session.session_id, client.send)
+
+        started = await worker.start_session(session.session_id)
+        await _settle()
+
+        assert started.status == "active"
+        assert [m["type"] for m in client.messages] == ["session_started"]
+        assert worker.bus.stats()["publish_failures"] == 1
+        await worker.bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_in_process_bus_delivers_locally(session_service):
+    async def scenario():
+        manager = session_service.SessionManager(InMemorySessionStore(), SessionShards(0, 1))
+        assert isinstance(manager.bus, InProcessEventBus)
+        session = await manager.create_session(_request(session_service))
+        client = _Client()
+        manager.hub.subscribe(session.session_id, client.send)
+
+        await manager.start_session(session.session_id)
+        await _settle()
+
+        assert [m["type"] for m in client.messages] == ["session_started"]
+        assert manager.bus.stats() == {"bus": "InProcessEventBus", "published": 1, "delivered": 1}
+
+    asyncio.run(scenario())
+
+
+def test_malformed_payloads_are_ignored():
+    async def scenario():
+        broker = LocalBroker()
+        received = []
+        bus = BrokerEventBus(broker, worker_id="a")
+        bus.on_event(lambda session_id, message: received.append((session_id, message)))
+        await bus.start()
+
+        await broker.publish(bus.channel, "not json")
+        await broker.publish(bus.channel, '{"origin": "b"}')
+        await broker.publish(bus.channel, '{"origin": "b", "session_id": "s1", "message": {"type": "x"}}')
+        await _settle()
+
+        assert received == [("s1", {"type": "x"})]
+        await bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_default_bus_is_in_process_without_a_broker_url(monkeypatch):
+    monkeypatch.setattr(session_bus, "SESSION_BUS_REDIS_URL", None)
+    assert isinstance(session_bus.default_event_bus(), InProcessEventBus)
+
+
+def test_lifecycle_commands_are_forwarded_to_the_owning_worker(session_service):
+    async def scenario():
+        broker = LocalBroker()
+        owner = _worker(session_service, broker, "a", SessionShards(0, 2))
+        other = _worker(session_service, broker, "b", SessionShards(1, 2))
+        await owner.bus.start()
+        await other.bus.start()
+
+        session = await owner.create_session(_request(session_service))
+        dashboard = _Client()
+        other.hub.subscribe(session.session_id, dashboard.send)
+
+        started = await other.run_on_owner("start_session", session.session_id)
+        paused = await other.run_on_owner("pause_session", session.session_id)
+        await other.run_on_owner("add_event", session.session_id, event_type="custom", data={"n": 1})
+        await _settle()
+
+        assert (started.status, paused.status) == ("active", "paused")
+        # Applied by the owner, not by the worker that took the request
+        assert (await owner.get_session(session.session_id)).status == "paused"
+        assert len(other.sessions) == 0
+        assert [m["type"] for m in dashboard.messages] == [
+            "session_started", "session_paused", "session_event"
+        ]
+        assert other.bus.stats()["commands_forwarded"] == 3
+        assert owner.bus.stats()["commands_served"] == 3
+
+        # The owner's refusal comes back as the same HTTP error
+        with pytest.raises(HTTPException) as error:
+            await other.run_on_owner("pause_session", session.session_id)
+        assert error.value.status_code == 400
+
+        await owner.bus.stop()
+        await other.bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_forwarding_to_an_absent_owner_times_out(session_service):
+    async def scenario():
+        worker = _worker(
+            session_service, LocalBroker(), "b", SessionShards(1, 2), command_timeout=0.05
+        )
+        await worker.bus.start()
+        session_id = next(
+            str(candidate) for candidate in range(100)
+            if not worker.shards.owns(str(candidate))
+        )
+
+        with pytest.raises(HTTPException) as error:
+            await worker.run_on_owner("pause_session", session_id)
+        assert error.value.status_code == 504
+        await worker.bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_a_stalled_broker_never_blocks_publish():
+    class _StalledBroker(LocalBroker):
+        async def publish(self, channel, payload):
+            await asyncio.sleep(3600)
+
+    async def scenario():
+        bus = BrokerEventBus(_StalledBroker(), worker_id="a", outbound_size=2, publish_timeout=0.01)
+        delivered = []
+        bus.on_event(lambda session_id, message: delivered.append(message))
+        await bus.start()
+
+        for index in range(4):
+            await asyncio.wait_for(bus.publish("s1", {"type": "x", "index": index}), 0.01)
+        assert len(delivered) == 4
+        await asyncio.sleep(0.3)
+
+        stats = bus.stats()
+        assert stats["publish_dropped"] == 1
+        assert stats["publish_failures"] == 3
+        assert stats["outbound_depth"] == 0
+        await bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_listener_resubscribes_after_the_subscription_ends():
+    class _EndingBroker(LocalBroker):
+        def __init__(self):
+            super().__init__()
+            self.subscribes = 0
+
+        async def subscribe(self, channel):
+            self.subscribes += 1
+            if self.subscribes == 1:
+                return _Ended()
+            return await super().subscribe(channel)
+
+    class _Ended(BrokerSubscription):
+        async def __aiter__(self):
+            return
+            yield
+
+    async def scenario():
+        broker = _EndingBroker()
+        received = []
+        bus = BrokerEventBus(broker, channel="events", worker_id="a", retry_seconds=0.05)
+        bus.on_event(lambda session_id, message: received.append(message))
+        await bus.start()
+        await _settle()
+        # Waiting to resubscribe, not spinning on the ended iterator
+        assert broker.subscribes == 2  # events (ended) and replies
+
+        await asyncio.sleep(0.1)
+        assert broker.subscribes == 3
+        await broker.publish("events", '{"origin": "b", "session_id": "s1", "message": {"type": "x"}}')
+        await _settle()
+        assert received == [{"type": "x"}]
+        await bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_bus_interfaces_are_abstract():
+    class _NoSubscribe(MessageBroker):
+        async def publish(self, channel, payload):
+            pass
+
+    class _NoPublish(SessionEventBus):
+        pass
+
+    class _NoIterator(BrokerSubscription):
+        pass
+
+    for incomplete in (_NoSubscribe, _NoPublish, _NoIterator):
+        with pytest.raises(TypeError):
+            incomplete()
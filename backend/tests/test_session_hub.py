@@ -0,0 +1,169 @@
+"""
+Session Hub Tests
+Fan-out, bounded queues, coalescing, guaranteed delivery and metrics
+"""
+import asyncio
+import os
+import sys
+
+SESSION_SERVICE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "services",
+    "session-service"
+)
+sys.path.insert(0, SESSION_SERVICE_DIR)
+try:
+    from session_hub import SessionHub
+finally:
+    sys.path.remove(SESSION_SERVICE_DIR)
+
+
+class _Client:
+    """Records messages; blocks sends until released when gated"""
+
+    def __init__(self, gated: bool = False, fail: bool = False):
+        self.messages = []
+        self.gate = asyncio.Event()
+        if not gated:
+            self.gate.set()
+        self.fail = fail
+        self.closed = False
+
+    async def send(self, message):
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("socket gone")
+        self.messages.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_every_subscriber_gets_messages_and_a_slow_one_blocks_nobody():
+    async def scenario():
+        hub = SessionHub()
+        patient, dashboard, stuck = _Client(), _Client(), _Client(gated=True)
+        for label, client in (("patient", patient), ("clinician", dashboard), ("stuck", stuck)):
+            hub.subscribe("s1", client.send, client.close, label)
+        hub.subscribe("other", _Client().send)
+
+        for phase in ("induction", "depth", "emergence"):
+            assert hub.publish("s1", {"type": "phase_changed", "phase": phase}) == 3
+        await _settle()
+
+        phases = [message["phase"] for message in patient.messages]
+        assert phases == ["induction", "depth", "emergence"]
+        assert dashboard.messages == patient.messages
+        assert stuck.messages == []
+        assert hub.metrics()["max_depth"] == 2  # first message is in flight
+
+    asyncio.run(scenario())
+
+
+def test_bounded_queue_drops_oldest_telemetry_and_coalesces_but_keeps_alerts():
+    async def scenario():
+        hub = SessionHub(queue_size=3)
+        client = _Client(gated=True)
+        hub.subscribe("s1", client.send, client.close)
+        await _settle()
+
+        hub.publish("s1", {"type": "phase_changed", "phase": "induction"})
+        hub.publish("s1", {"type": "biometric", "heart_rate": 80})
+        hub.publish("s1", {"type": "biometric_stats", "samples": 10})
+        hub.publish("s1", {"type": "biometric", "heart_rate": 90})
+        # Full: the oldest telemetry gives way, never the phase change
+        hub.publish("s1", {"type": "phase_changed", "phase": "depth"})
+        hub.publish("s1", {"type": "biometric", "heart_rate": 100})
+        for index in range(10):
+            hub.publish("s1", {"type": "safety_alert", "index": index})
+
+        metrics = hub.metrics()
+        assert metrics["dropped"] == 2
+        assert metrics["coalesced"] == 1
+
+        client.gate.set()
+        await _settle()
+        alerts = [m["index"] for m in client.messages if m["type"] == "safety_alert"]
+        assert alerts == list(range(10))
+        # Alerts jump the queue; lifecycle and the newest telemetry follow in order
+        assert client.messages[1]["type"] == "safety_alert"
+        assert client.messages[10:] == [
+            {"type": "phase_changed", "phase": "induction"},
+            {"type": "phase_changed", "phase": "depth"},
+            {"type": "biometric", "heart_rate": 100}
+        ]
+        assert hub.metrics()["sent"] == len(client.messages)
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_of_lifecycle_messages_disconnects_instead_of_dropping():
+    async def scenario():
+        hub = SessionHub(queue_size=3)
+        stuck, healthy = _Client(gated=True), _Client()
+        hub.subscribe("s1", stuck.send, stuck.close, "stuck")
+        hub.subscribe("s1", healthy.send, healthy.close, "healthy")
+        await _settle()
+
+        for phase in ("pre_induction", "induction", "depth", "emergence"):
+            assert hub.publish("s1", {"type": "phase_changed", "phase": phase}) == 2
+            await _settle()
+        # The stuck client has one phase in flight and three queued
+        # Telemetry has nothing droppable to displace: only it is dropped
+        assert hub.publish("s1", {"type": "biometric", "heart_rate": 80}) == 1
+        assert hub.subscriber_count("s1") == 2
+        assert hub.publish("s1", {"type": "session_ended"}) == 1
+        await _settle()
+
+        assert stuck.closed
+        assert hub.subscriber_count("s1") == 1
+        assert [m["type"] for m in healthy.messages] == ["phase_changed"] * 4 + [
+            "biometric", "session_ended"
+        ]
+        metrics = hub.metrics()
+        assert metrics["disconnected"] == 1
+        assert metrics["dropped"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_subscriber_that_cannot_take_alerts_is_disconnected():
+    async def scenario():
+        hub = SessionHub(guaranteed_limit=2)
+        stuck, healthy = _Client(gated=True), _Client()
+        hub.subscribe("s1", stuck.send, stuck.close, "stuck")
+        hub.subscribe("s1", healthy.send, healthy.close, "healthy")
+        await _settle()
+
+        for index in range(5):
+            hub.publish("s1", {"type": "safety_alert", "index": index})
+            await _settle()
+
+        assert stuck.closed
+        assert hub.subscriber_count("s1") == 1
+        assert [m["index"] for m in healthy.messages] == list(range(5))
+        assert hub.metrics()["disconnected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_send_closes_subscriber_and_unsubscribe_is_idempotent():
+    async def scenario():
+        hub = SessionHub()
+        broken = _Client(fail=True)
+        subscriber = hub.subscribe("s1", broken.send, broken.close)
+        hub.publish("s1", {"type": "session_started"})
+        await _settle()
+
+        assert subscriber.closed and broken.closed
+        assert hub.publish("s1", {"type": "session_paused"}) == 0
+        await hub.unsubscribe(subscriber)
+        await hub.unsubscribe(subscriber)
+        assert hub.metrics()["subscribers"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,424 @@
+"""
+Live Session Store Tests
+Write-behind persistence, LRU eviction, reloads and session-id sharding
+"""
+import asyncio
+import importlib.util
+import os
+import sys
+import threading
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+SESSION_SERVICE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "services",
+    "session-service"
+)
+
+from db_engine import create_db_engine
+
+# The service directory only goes on sys.path while its modules are loaded
+# (it has its own main.py, which must not shadow the backend app)
+sys.path.insert(0, SESSION_SERVICE_DIR)
+try:
+    import session_store
+    from session_store import (
+        InMemorySessionStore,
+        SessionShards,
+        SessionStore,
+        SQLSessionStore,
+        shards_from_env
+    )
+finally:
+    sys.path.remove(SESSION_SERVICE_DIR)
+
+
+@pytest.fixture(scope="module")
+def session_service(tmp_path_factory):
+    """services/session-service/main.py, loaded under a non-clashing name"""
+    spec = importlib.util.spec_from_file_location(
+        "session_service_main", os.path.join(SESSION_SERVICE_DIR, "main.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    store_path = tmp_path_factory.mktemp("session-service") / "live_sessions.db"
+    with pytest.MonkeyPatch.context() as patch:
+        # Keep the service's default store out of the working directory
+        patch.setattr(session_store, "SESSION_STORE_URL", f"sqlite:///{store_path}")
+        for name in ("SESSION_WORKER_INDEX", "SESSION_WORKER_COUNT", "WEB_CONCURRENCY"):
+            patch.delenv(name, raising=False)
+        sys.path.insert(0, SESSION_SERVICE_DIR)
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            sys.path.remove(SESSION_SERVICE_DIR)
+    return module
+
+
+def _request(service, user_id="user-1"):
+    return service.CreateSessionRequest(
+        user_id=user_id,
+        therapeutic_plan_id="plan-1",
+        session_config=service.SessionConfig(protocol_id="p-1", ep_type="Physical")
+    )
+
+
+def test_changes_are_written_behind_and_completed_sessions_leave_memory(session_service):
+    async def scenario():
+        store = InMemorySessionStore()
+        manager = session_service.SessionManager(store, SessionShards(0, 1))
+        session = await manager.create_session(_request(session_service))
+        await manager.start_session(session.session_id)
+
+        assert store.get(session.session_id) is None
+        assert await manager.sessions.flush() == 1
+        assert '"status":"active"' in store.get(session.session_id)
+
+        await manager.end_session(session.session_id, 80.0)
+        await manager.sessions.flush()
+        assert '"status":"completed"' in store.get(session.session_id)
+        assert len(manager.sessions) == 0
+
+        # Reloaded from the store on demand
+        reloaded = await manager.get_session(session.session_id)
+        assert reloaded.completion_percentage == 80.0
+        assert [s.session_id for s in await manager.get_user_sessions("user-1", "completed")] == [
+            session.session_id
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_lru_only_evicts_persisted_sessions(session_service):
+    async def scenario():
+        store = InMemorySessionStore()
+        manager = session_service.SessionManager(store, SessionShards(0, 1))
+        manager.sessions.maxsize = 2
+        created = [await manager.create_session(_request(session_service)) for _ in range(3)]
+
+        # Nothing flushed yet: all three stay in memory despite maxsize
+        assert len(manager.sessions) == 3
+        await manager.sessions.flush()
+        await manager.create_session(_request(session_service))
+        assert len(manager.sessions) == 2
+        assert created[0].session_id not in [s.session_id for s in manager.sessions.in_memory()]
+        assert (await manager.get_session(created[0].session_id)).session_id == created[0].session_id
+        assert len(await manager.get_user_sessions("user-1")) == 4
+
+    asyncio.run(scenario())
+
+
+def test_sql_store_round_trip(session_service, tmp_path):
+    async def scenario():
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'sessions.db'}", name="test-live-sessions")
+        manager = session_service.SessionManager(SQLSessionStore(engine), SessionShards(0, 1))
+        session = await manager.create_session(_request(session_service, "user-2"))
+        await manager.add_event(session.session_id, "custom", {"note": "hello"})
+        await manager.sessions.stop()
+
+        # A fresh worker over the same database sees the persisted session
+        restarted = session_service.SessionManager(SQLSessionStore(engine), SessionShards(0, 1))
+        loaded = await restarted.get_session(session.session_id)
+        assert loaded.events[-1]["data"] == {"note": "hello"}
+        assert len(await restarted.get_user_sessions("user-2")) == 1
+        engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_biometrics_are_buffered_and_archived_on_end(session_service):
+    async def scenario():
+        manager = session_service.SessionManager(InMemorySessionStore(), SessionShards(0, 1))
+        session = await manager.create_session(_request(session_service))
+        await manager.start_session(session.session_id)
+        started = session.started_at
+        for second in range(90):
+            await manager.add_biometric_data(session.session_id, session_service.BiometricData(
+                timestamp=started + timedelta(seconds=second),
+                heart_rate=70 + second // 10,
+                hrv=55.0
+            ))
+
+        live = await manager.get_biometric_stats(session.session_id, 30)
+        assert live["samples"] == 90
+        assert live["channels"]["heart_rate"]["max"] == 78
+        assert session.biometric_data == []
+
+        ended = await manager.end_session(session.session_id)
+        assert ended.biometric_samples == 90
+        assert session.session_id not in manager.biometrics
+        assert await manager.get_biometric_stats(session.session_id, 30) == live
+
+    asyncio.run(scenario())
+
+
+def test_biometric_stats_are_published_to_subscribers_throttled(session_service):
+    """Samples publish the rolling stats as telemetry, at most once per interval"""
+    async def scenario():
+        manager = session_service.SessionManager(InMemorySessionStore(), SessionShards(0, 1))
+        manager.biometric_stats_seconds = 3600
+        session = await manager.create_session(_request(session_service))
+        await manager.start_session(session.session_id)
+        received = []
+
+        async def send(message):
+            received.append(message)
+
+        manager.hub.subscribe(session.session_id, send)
+        started = session.started_at.timestamp()
+        for second in range(5):
+            await manager.add_biometric_data(session.session_id, session_service.BiometricData(
+                timestamp=session.started_at + timedelta(seconds=second),
+                heart_rate=70 + second
+            ))
+        # Let the subscriber send it (a pending stats message is coalesced)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        manager.biometric_stats_seconds = 0
+        await manager.add_biometric_batch(session.session_id, session_service.BiometricBatch.from_samples(
+            [started + 5, started + 6], [(90, None, None, None)] * 2
+        ))
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        stats = [message for message in received if message["type"] == "biometric_stats"]
+        assert [message["samples"] for message in stats] == [1, 7]
+        assert stats[-1]["window_seconds"] == manager.biometric_stats_window_seconds
+        assert stats[-1]["channels"]["heart_rate"]["max"] == 90
+        assert stats[-1]["channels"]["hrv"]["count"] == 0
+
+        await manager.end_session(session.session_id)
+        assert session.session_id not in manager._biometric_stats_at
+
+    asyncio.run(scenario())
+
+
+def test_flush_archives_live_biometrics_and_evicts_idle_buffers(session_service):
+    """Idle buffers leave memory once archived and come back on the next sample"""
+    async def scenario():
+        store = InMemorySessionStore()
+        manager = session_service.SessionManager(store, SessionShards(0, 1))
+        manager.biometric_snapshot_seconds = 0
+        session = await manager.create_session(_request(session_service))
+        await manager.start_session(session.session_id)
+
+        def sample(second):
+            return session_service.BiometricData(
+                timestamp=session.started_at + timedelta(seconds=second),
+                heart_rate=70 + second
+            )
+
+        for second in range(10):
+            await manager.add_biometric_data(session.session_id, sample(second))
+        await manager.sessions.flush()
+        assert session.biometric_samples == 10
+        assert '"biometric_samples":10' in store.get(session.session_id)
+        assert session.session_id in manager.biometrics
+
+        manager.biometric_idle_seconds = 0
+        await manager.sessions.flush()
+        assert manager.biometrics == {}
+        assert manager.safety_engines == {}
+
+        manager.biometric_idle_seconds = 300
+        await manager.add_biometric_data(session.session_id, sample(10))
+        stats = await manager.get_biometric_stats(session.session_id, 60)
+        assert stats["samples"] == 11
+        assert stats["channels"]["heart_rate"]["min"] == 70
+
+        ended = await manager.end_session(session.session_id)
+        assert ended.biometric_samples == 11
+
+    asyncio.run(scenario())
+
+
+def test_safety_rules_pause_on_sustained_readings_only(session_service):
+    async def scenario():
+        manager = session_service.SessionManager(InMemorySessionStore(), SessionShards(0, 1))
+        session = await manager.create_session(_request(session_service))
+        await manager.start_session(session.session_id)
+        heart_rates = [75] * 20 + [190] + [75] * 20 + [160] * 20
+        for second, heart_rate in enumerate(heart_rates):
+            await manager.add_biometric_data(session.session_id, session_service.BiometricData(
+                timestamp=session.started_at + timedelta(seconds=second),
+                heart_rate=heart_rate
+            ))
+            if second == 40:
+                assert session.status == "active"
+
+        assert session.status == "paused"
+        assert "high_heart_rate" in [check["rule"] for check in session.safety_checks]
+
+    asyncio.run(scenario())
+
+
+def test_safety_rules_see_the_buffers_clamped_timestamps(session_service):
+    """Late samples reach the rules at the time the buffer recorded them"""
+    sys.path.insert(0, SESSION_SERVICE_DIR)
+    try:
+        from biometric_batch import BiometricBatch
+    finally:
+        sys.path.remove(SESSION_SERVICE_DIR)
+
+    async def scenario():
+        manager = session_service.SessionManager(InMemorySessionStore(), SessionShards(0, 1))
+        session = await manager.create_session(_request(session_service))
+        await manager.start_session(session.session_id)
+        started = session.started_at
+
+        await manager.add_biometric_data(session.session_id, session_service.BiometricData(
+            timestamp=started + timedelta(seconds=10), heart_rate=70
+        ))
+        engine = manager.safety_engines[session.session_id]
+        seen = []
+        evaluate = engine.evaluate
+        engine.evaluate = lambda timestamp, sample: seen.append(timestamp) or evaluate(timestamp, sample)
+
+        await manager.add_biometric_data(session.session_id, session_service.BiometricData(
+            timestamp=started + timedelta(seconds=5), heart_rate=71
+        ))
+        base = started.timestamp()
+        await manager.add_biometric_batch(session.session_id, BiometricBatch.from_samples(
+            [base + 8, base + 9, base + 11], [(72, None, None, None)] * 3
+        ))
+
+        buffer_timestamps, _ = manager.biometrics[session.session_id].to_arrays()
+        assert seen == buffer_timestamps[1:].tolist()
+        assert seen == [base + 10] * 3 + [base + 11]
+
+    asyncio.run(scenario())
+
+
+def test_biometric_batches_over_rest_and_websocket(session_service):
+    from fastapi.testclient import TestClient
+
+    sys.path.insert(0, SESSION_SERVICE_DIR)
+    try:
+        from biometric_batch import BiometricBatch
+    finally:
+        sys.path.remove(SESSION_SERVICE_DIR)
+
+    with TestClient(session_service.app) as client:
+        session_id = client.post("/api/v1/sessions/create", json={
+            "user_id": "user-3",
+            "therapeutic_plan_id": "plan-1",
+            "session_config": {"protocol_id": "p-1", "ep_type": "Physical"}
+        }).json()["session_id"]
+        client.post(f"/api/v1/sessions/{session_id}/start")
+
+        response = client.post(f"/api/v1/sessions/{session_id}/biometric/batch", json={
+            "timestamps": [1000.0, 1000.25, 1000.5, 1000.75],
+            "heart_rate": [70, 71, 72, 73]
+        })
+        assert response.json() == {"success": True, "accepted": 4}
+        rejected = client.post(f"/api/v1/sessions/{session_id}/biometric/batch", json={
+            "timestamps": [1001.0], "heart_rate": [-5]
+        })
+        assert rejected.status_code == 422
+
+        frame = BiometricBatch.from_samples([1001.0, 1001.25], [(74, 50.0, None, None)] * 2).to_bytes()
+        with client.websocket_connect(f"/ws/{session_id}") as websocket:
+            websocket.send_bytes(frame)
+            websocket.send_bytes(b"garbage")
+            message = websocket.receive_json()
+            while message["type"] == "biometric_stats":
+                message = websocket.receive_json()
+            assert message["type"] == "error"
+
+        stats = client.get(f"/api/v1/sessions/{session_id}/biometric/stats?window_seconds=60").json()
+        assert stats["samples"] == 6
+        assert stats["channels"]["heart_rate"]["max"] == 74
+
+
+def test_sessions_are_sharded_by_id(session_service):
+    async def scenario():
+        store = InMemorySessionStore()
+        first = session_service.SessionManager(store, SessionShards(0, 2))
+        second = session_service.SessionManager(store, SessionShards(1, 2))
+        session = await first.create_session(_request(session_service))
+        await first.sessions.flush()
+
+        assert first.shards.owns(session.session_id)
+        assert second.shards.shard_for(session.session_id) == 0
+        with pytest.raises(HTTPException) as error:
+            await second.start_session(session.session_id)
+        assert error.value.status_code == 421
+        assert error.value.headers["X-Session-Shard"] == "0"
+
+        # Reads are served by any worker, from the store when not owned
+        assert (await second.get_session(session.session_id)).status == "pending"
+        await first.start_session(session.session_id)
+        await first.sessions.flush()
+        assert (await second.get_session(session.session_id)).status == "active"
+        assert len(second.sessions) == 0
+
+    asyncio.run(scenario())
+
+    with pytest.raises(ValueError):
+        SessionShards(2, 2)
+
+
+def test_ambiguous_worker_configuration_is_refused():
+    """Processes that would share a shard index refuse to start"""
+    with pytest.raises(RuntimeError):
+        shards_from_env({"SESSION_WORKER_COUNT": "4"})
+    with pytest.raises(RuntimeError):
+        shards_from_env({"WEB_CONCURRENCY": "4"}, argv=[])
+    single = {"SESSION_WORKER_COUNT": "2", "SESSION_WORKER_INDEX": "1"}
+    for argv in (
+        ["uvicorn", "main:app", "--workers", "4"],
+        ["uvicorn", "main:app", "--workers=2"],
+        ["gunicorn", "-w", "3", "main:app"],
+        ["gunicorn", "-w2", "main:app"]
+    ):
+        with pytest.raises(RuntimeError):
+            shards_from_env(single, argv=argv)
+
+    shards = shards_from_env(single, argv=["uvicorn", "main:app", "--workers", "1", "--port", "8013"])
+    assert (shards.worker_index, shards.worker_count) == (1, 2)
+    shards = shards_from_env({"SESSION_WORKER_COUNT": "4", "SESSION_WORKER_INDEX": "3"}, argv=[])
+    assert (shards.worker_index, shards.worker_count) == (3, 4)
+    assert shards_from_env({}, argv=[]).worker_count == 1
+
+
+def test_store_reads_leave_the_event_loop(session_service):
+    """Store reads run in a worker thread, like the write-behind flush"""
+    class _ThreadRecordingStore(InMemorySessionStore):
+        def __init__(self):
+            super().__init__()
+            self.threads = set()
+
+        def get(self, session_id):
+            self.threads.add(threading.get_ident())
+            return super().get(session_id)
+
+        def list_user(self, user_id, status=None):
+            self.threads.add(threading.get_ident())
+            return super().list_user(user_id, status)
+
+    async def scenario():
+        store = _ThreadRecordingStore()
+        writer = session_service.SessionManager(store, SessionShards(0, 1))
+        session = await writer.create_session(_request(session_service))
+        await writer.sessions.flush()
+
+        reader = session_service.SessionManager(store, SessionShards(0, 1))
+        await reader.get_session(session.session_id)
+        await reader.get_user_sessions("user-1")
+        return store, threading.get_ident()
+
+    store, loop_thread = asyncio.run(scenario())
+
+    assert store.threads
+    assert loop_thread not in store.threads
+
+
+def test_stores_must_implement_the_interface():
+    class _ReadOnlyStore(SessionStore):
+        def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        _ReadOnlyStore()
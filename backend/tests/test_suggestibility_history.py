@@ -0,0 +1,223 @@
+"""
+Suggestibility History Tests
+Paged history hydration and statement counts without a live database
+"""
+import json
+import sys
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+
+from backend.services.suggesstibility_service import SuggestibilityService
+from services.suggestibility_service import SuggestibilityService as ExportedSuggestibilityService
+from utils.scoring_calculator import SuggestibilityScorer, invalidate_lookup_tables
+from utils.question_catalogue import invalidate_question_catalogue
+from models.questionnaire_models import AssessmentSubmission
+
+
+VERSION_ID = "880e8400-e29b-41d4-a716-446655440003"
+USER_ID = uuid4()
+
+
+def _chart_rows():
+    return [
+        (q1, combined, min(100, round(q1 * 100 / combined)))
+        for q1 in range(0, 101, 5)
+        for combined in range(50, 201, 5)
+    ]
+
+
+def _question_rows():
+    return [
+        (
+            q, f"Question {q}", "physical" if q <= 18 else "emotional",
+            "general", 10 if q in (1, 2, 19, 20) else 5,
+            None, None, None, None, None
+        )
+        for q in range(1, 37)
+    ]
+
+
+def _assessment_rows(count):
+    """Stored rows scored the way submit_assessment stores them"""
+    scorer = SuggestibilityScorer(_FakeDB([]))
+    rows = []
+    now = datetime(2026, 3, 1)
+    for n in range(count):
+        answers = {q: (q * (n + 2)) % 3 != 0 for q in range(1, 37)}
+        scores = scorer.calculate_scores(answers, VERSION_ID)
+        rows.append((
+            str(uuid4()), str(USER_ID), None, VERSION_ID,
+            scores["q1_score"], scores["q2_score"], scores["combined_score"],
+            scores["physical_percentage"], scores["emotional_percentage"],
+            scores["suggestibility_type"],
+            json.dumps({str(k): v for k, v in answers.items()}),
+            now - timedelta(days=n)
+        ))
+    return rows
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar(self):
+        return self._rows[0][0] if self._rows else None
+
+
+class _FakeDB:
+    """Routes statements by table and counts them"""
+
+    def __init__(self, assessments, total=None):
+        self.assessments = assessments
+        self.total = len(assessments) if total is None else total
+        self.statements = []
+        self.params = []
+        self.commits = 0
+
+    def execute(self, query, params=None):
+        sql = str(query)
+        self.statements.append(sql)
+        self.params.append(params)
+        if "questionnaire_versions" in sql:
+            return _Result([(
+                VERSION_ID, "HMI E&P Suggestibility Assessment", "1.0",
+                "HMI", "Kappas", None, True
+            )])
+        if "assessment_trend_aggregates" in sql and "RETURNING user_id" in sql:
+            return _Result([(params["user_id"],)])
+        if "scoring_lookup_tables" in sql:
+            return _Result(getattr(self, "chart", None) or _chart_rows())
+        if "questionnaire_questions" in sql:
+            return _Result(_question_rows())
+        if "COUNT(*) OVER ()" in sql:
+            offset, limit = params["offset"], params["limit"]
+            page = self.assessments[offset:offset + limit]
+            return _Result([row + (self.total,) for row in page])
+        if "COUNT(*)" in sql:
+            return _Result([(self.total,)])
+        if "SELECT" in sql and "user_assessments" in sql:
+            return _Result([
+                row for row in self.assessments if row[0] == params["assessment_id"]
+            ])
+        return _Result([])
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+    yield
+    invalidate_lookup_tables()
+    invalidate_question_catalogue()
+
+
+def test_history_page_issues_constant_statements():
+    """A page costs one query plus the trend read, plus one-off chart/catalogue loads"""
+    db = _FakeDB(_assessment_rows(25))
+    service = SuggestibilityService(db)
+
+    first = service.get_user_assessments(USER_ID, limit=10)
+    cold_statements = len(db.statements)
+    db.statements.clear()
+    second = service.get_user_assessments(USER_ID, limit=10, offset=10)
+
+    assert len(first["assessments"]) == 10
+    assert len(second["assessments"]) == 10
+    assert first["total_count"] == 25
+    assert cold_statements <= 4
+    assert len(db.statements) == 2
+    assert first["trend_analysis"]["total_assessments"] == 10
+
+
+def test_history_rows_match_single_fetch():
+    """Paged hydration equals get_assessment for the same row"""
+    rows = _assessment_rows(3)
+    db = _FakeDB(rows)
+    service = SuggestibilityService(db)
+
+    page = service.get_user_assessments(USER_ID, limit=3)["assessments"]
+    single = service.get_assessment(UUID(rows[1][0]))
+
+    assert page[1] == single
+    assert page[1].scores.q1_score == rows[1][4]
+    assert page[1].interpretation.suggestibility_type == rows[1][9]
+    assert page[1].answer_breakdown is not None
+
+
+def test_interpretation_follows_stored_percentage_after_chart_correction():
+    """A corrected chart cell does not contradict the stored physical percentage"""
+    rows = _assessment_rows(1)
+    stored_percentage = rows[0][7]
+    db = _FakeDB(rows)
+    # Every chart cell now maps elsewhere
+    db.chart = [(q1, combined, (percentage + 37) % 101) for q1, combined, percentage in _chart_rows()]
+    invalidate_lookup_tables()
+
+    result = SuggestibilityService(db).get_assessment(UUID(rows[0][0]))
+
+    assert result.scores.physical_percentage == stored_percentage
+    assert result.interpretation.physical_percentage == stored_percentage
+    assert result.interpretation.suggestibility_type == rows[0][9]
+
+
+def test_history_past_last_page_reports_total():
+    """An empty page still reports the user's total"""
+    db = _FakeDB(_assessment_rows(2))
+    service = SuggestibilityService(db)
+
+    history = service.get_user_assessments(USER_ID, limit=10, offset=20)
+
+    assert history["assessments"] == []
+    assert history["total_count"] == 2
+    assert history["latest_assessment"] is None
+
+
+@pytest.mark.parametrize("service_class", [SuggestibilityService, ExportedSuggestibilityService])
+def test_submit_updates_rollup_and_trend_in_its_transaction(service_class):
+    """Rollup and trend updates share the insert's transaction and completed_at"""
+    db = _FakeDB([])
+    submission = AssessmentSubmission(
+        user_id=USER_ID,
+        answers={q: q % 3 != 0 for q in range(1, 37)}
+    )
+
+    result = service_class(db).submit_assessment(submission)
+
+    insert = db.statements.index(next(s for s in db.statements if "INSERT INTO user_assessments" in s))
+    rollup = db.statements.index(next(s for s in db.statements if "assessment_quality_daily" in s))
+    assert insert < rollup
+    assert db.params[insert]["completed_at"] == result.completed_at
+    assert db.params[rollup]["day"] == result.completed_at.date()
+    assert db.params[rollup]["missing"] == 1 and db.params[rollup]["scored"] == 0
+    trend = db.statements.index(next(s for s in db.statements if "assessment_trend_aggregates" in s))
+    assert insert < trend
+    assert db.params[trend]["user_id"] == str(USER_ID)
+    assert db.params[trend]["completed_at"] == result.completed_at
+    assert db.params[trend]["physical"] == result.scores.physical_percentage
+    assert db.commits == 1
+
+
+@pytest.mark.parametrize("service_class", [SuggestibilityService, ExportedSuggestibilityService])
+def test_submit_invalidates_the_users_cached_preferences(service_class):
+    """A new assessment changes the preferences; the cached ones are dropped"""
+    cache = sys.modules[service_class.__module__].communication_preferences_cache
+    cache.set(USER_ID, {"suggestibility_type": "Physical Suggestible", "confidence": 90.0})
+    submission = AssessmentSubmission(
+        user_id=USER_ID,
+        answers={q: q % 3 != 0 for q in range(1, 37)}
+    )
+
+    service_class(_FakeDB([])).submit_assessment(submission)
+
+    assert cache.get(USER_ID) == (False, None)
@@ -0,0 +1,196 @@
+"""
+Verified Token Cache Tests
+Cache hits, exp handling, revocation and the stdlib HS256 verifier
+"""
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from auth.dependencies import (
+    ALGORITHM,
+    SECRET_KEY,
+    create_access_token,
+    revoke_user_tokens,
+    verify_token
+)
+from auth.token_cache import (
+    HS256Verifier,
+    JoseVerifier,
+    TokenVerificationError,
+    TokenVerifier,
+    VerifiedTokenCache
+)
+
+
+class _CountingVerifier(TokenVerifier):
+    """Returns fixed claims per token and counts decodes"""
+
+    def __init__(self, claims_by_token):
+        self.claims_by_token = claims_by_token
+        self.decodes = 0
+
+    def decode(self, token):
+        self.decodes += 1
+        if token not in self.claims_by_token:
+            raise TokenVerificationError("invalid")
+        return self.claims_by_token[token]
+
+
+def test_repeat_tokens_skip_decoding():
+    """Only the first use of a token is decoded"""
+    verifier = _CountingVerifier({"t1": {"sub": "u1", "exp": time.time() + 60}})
+    cache = VerifiedTokenCache(verifier)
+
+    for _ in range(100):
+        assert cache.verify("t1")["sub"] == "u1"
+
+    assert verifier.decodes == 1
+    assert cache.stats()["hits"] == 99
+
+
+def test_entries_expire_with_the_token_and_max_ttl():
+    """A cached token is re-verified once exp or max_ttl_seconds passes"""
+    verifier = _CountingVerifier({
+        "expired": {"sub": "u1", "exp": time.time() - 1},
+        "long": {"sub": "u2", "exp": time.time() + 3600}
+    })
+    cache = VerifiedTokenCache(verifier, max_ttl_seconds=0)
+
+    cache.verify("expired")
+    cache.verify("expired")
+    cache.verify("long")
+    cache.verify("long")
+
+    assert verifier.decodes == 4
+
+
+def test_invalid_tokens_are_not_cached():
+    verifier = _CountingVerifier({})
+    cache = VerifiedTokenCache(verifier)
+
+    for _ in range(2):
+        with pytest.raises(TokenVerificationError):
+            cache.verify("bad")
+
+    assert verifier.decodes == 2
+    assert cache.stats()["rejections"] == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_bound():
+    claims = {f"t{n}": {"sub": str(n)} for n in range(5)}
+    cache = VerifiedTokenCache(_CountingVerifier(claims), maxsize=3)
+
+    for token in claims:
+        cache.verify(token)
+
+    assert cache.stats()["size"] == 3
+    assert cache.stats()["evictions"] == 2
+
+
+def test_revoked_token_is_rejected_even_when_cached():
+    verifier = _CountingVerifier({"t1": {"sub": "u1"}, "t2": {"sub": "u1"}})
+    cache = VerifiedTokenCache(verifier)
+    cache.verify("t1")
+
+    cache.revoke_token("t1")
+
+    with pytest.raises(TokenVerificationError):
+        cache.verify("t1")
+    assert cache.verify("t2")["sub"] == "u1"
+
+
+def test_revoke_subject_rejects_tokens_issued_before():
+    now = time.time()
+    verifier = _CountingVerifier({
+        "old": {"sub": "u1", "iat": now - 10},
+        "other_user": {"sub": "u2", "iat": now - 10},
+        "new": {"sub": "u1", "iat": now + 10}
+    })
+    cache = VerifiedTokenCache(verifier)
+    cache.verify("old")
+
+    cache.revoke_subject("u1")
+
+    with pytest.raises(TokenVerificationError):
+        cache.verify("old")
+    assert cache.verify("other_user")["sub"] == "u2"
+    assert cache.verify("new")["sub"] == "u1"
+
+
+def test_token_issued_right_after_revoking_the_user_is_valid():
+    """iat has whole seconds; a new login in the revocation's second must work"""
+    revoke_user_tokens("u1")
+    token = create_access_token({"sub": "u1"})
+
+    assert verify_token(token)["sub"] == "u1"
+
+
+def test_user_revocations_are_forgotten_after_the_token_lifetime(monkeypatch):
+    now = time.time()
+    verifier = _CountingVerifier({"old": {"sub": "u1", "iat": now - 100}})
+    cache = VerifiedTokenCache(verifier, max_token_lifetime_seconds=60)
+    cache.revoke_subject("u1")
+    assert cache.stats()["revoked_subjects"] == 1
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    cache.revoke_subject("u2")
+
+    assert cache.stats()["revoked_subjects"] == 1
+    assert cache.verify("old")["sub"] == "u1"
+
+
+def test_revocation_hook_runs_on_misses():
+    verifier = _CountingVerifier({"t1": {"sub": "u1", "jti": "a"}, "t2": {"sub": "u1", "jti": "b"}})
+    cache = VerifiedTokenCache(verifier, revocation_check=lambda claims: claims["jti"] == "a")
+
+    with pytest.raises(TokenVerificationError):
+        cache.verify("t1")
+    assert cache.verify("t2")["jti"] == "b"
+
+
+def test_hs256_verifier_agrees_with_jose():
+    """The stdlib verifier accepts and rejects the same tokens as python-jose"""
+    hs256 = HS256Verifier(SECRET_KEY)
+    jose = JoseVerifier(SECRET_KEY, ALGORITHM)
+    valid = create_access_token({"sub": "u1", "role": "admin"})
+    header, payload, signature = valid.split(".")
+    tokens = [
+        valid,
+        create_access_token({"sub": "u1"}, expires_delta=timedelta(seconds=-5)),
+        f"{header}.{payload}.{signature[:-2]}AA",
+        jwt.encode({"sub": "u1"}, "other-secret", algorithm="HS256"),
+        jwt.encode({"sub": "u1", "aud": "x"}, SECRET_KEY, algorithm="HS256"),
+        jwt.encode({"sub": "u1"}, SECRET_KEY, algorithm="HS512"),
+        "not.a.token",
+        ""
+    ]
+
+    for token in tokens:
+        outcomes = []
+        for verifier in (jose, hs256):
+            try:
+                outcomes.append(verifier.decode(token))
+            except TokenVerificationError:
+                outcomes.append("rejected")
+        assert outcomes[0] == outcomes[1], token
+    assert hs256.decode(valid)["role"] == "admin"
+
+
+def test_verify_token_raises_401():
+    with pytest.raises(HTTPException) as error:
+        verify_token("garbage")
+
+    assert error.value.status_code == 401
+
+
+def test_verifiers_must_implement_decode():
+    """The verifier interface cannot be instantiated without decode()"""
+    class _Incomplete(TokenVerifier):
+        pass
+
+    with pytest.raises(TypeError):
+        _Incomplete()
@@ -0,0 +1,294 @@
+"""
+Trend Aggregate Tests
+Running aggregate and EWMA against the page-based trend calculation
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from services.trend_aggregate import (
+    EWMA_ALPHA,
+    rebuild_trend_aggregates,
+    record_trend,
+    record_trends,
+    trend_from_aggregate
+)
+
+
+def _history(count=12):
+    """(completed_at, physical, emotional) oldest first"""
+    start = datetime(2026, 1, 1)
+    return [
+        (start + timedelta(days=n), 40 + (n * 7) % 30, 60 - (n * 7) % 30)
+        for n in range(count)
+    ]
+
+
+def _aggregate_row(history):
+    """Fold a history the way record_trend's upsert does"""
+    first_at, first_physical, first_emotional = history[0]
+    ewma_physical, ewma_emotional = float(first_physical), float(first_emotional)
+    for _, physical, emotional in history[1:]:
+        ewma_physical = EWMA_ALPHA * physical + (1 - EWMA_ALPHA) * ewma_physical
+        ewma_emotional = EWMA_ALPHA * emotional + (1 - EWMA_ALPHA) * ewma_emotional
+    latest_at, latest_physical, latest_emotional = history[-1]
+    return (
+        len(history),
+        first_at, first_physical, first_emotional,
+        latest_at, latest_physical, latest_emotional,
+        sum(h[1] for h in history), sum(h[2] for h in history),
+        ewma_physical, ewma_emotional
+    )
+
+
+def _page_trend(history):
+    """The original sort-and-average calculation over a full history"""
+    first, latest = history[0], history[-1]
+    physical_change = latest[1] - first[1]
+    if abs(physical_change) < 5:
+        direction = "stable"
+    elif physical_change > 0:
+        direction = "more_physical"
+    else:
+        direction = "more_emotional"
+    return {
+        "total_assessments": len(history),
+        "first_assessment_date": first[0].isoformat(),
+        "latest_assessment_date": latest[0].isoformat(),
+        "physical_change": physical_change,
+        "emotional_change": latest[2] - first[2],
+        "trend_direction": direction,
+        "average_physical": sum(h[1] for h in history) / len(history),
+        "average_emotional": sum(h[2] for h in history) / len(history)
+    }
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeDB:
+    """
+    Records statements; serves assessment rows to the rebuild
+
+    record_trend's guarded upsert folds (returns the user) unless the
+    user is in `stale` (the stored latest assessment is newer).
+    """
+
+    def __init__(self, rows=(), stale=()):
+        self.rows = list(rows)
+        self.stale = {str(user_id) for user_id in stale}
+        self.executed = []
+        self.commits = 0
+
+    def execute(self, query, params=None):
+        self.executed.append((str(query), params))
+        if "RETURNING user_id" in str(query):
+            folded = params["user_id"] not in self.stale
+            return _Rows([(params["user_id"],)] if folded else [])
+        if "user_ids" in (params or {}):
+            return _Rows([r for r in self.rows if str(r[0]) in params["user_ids"]])
+        return _Rows(self.rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def test_aggregate_trend_matches_full_history_calculation():
+    """The O(1) trend equals recomputing over every assessment"""
+    history = _history()
+
+    trend = trend_from_aggregate(_aggregate_row(history))
+
+    expected = _page_trend(history)
+    for key, value in expected.items():
+        assert trend[key] == value, key
+    assert trend["ewma_physical"] == pytest.approx(_aggregate_row(history)[9])
+
+
+def test_single_assessment_has_no_trend():
+    """One assessment (or no aggregate row) gives no trend"""
+    assert trend_from_aggregate(None) is None
+    assert trend_from_aggregate(_aggregate_row(_history(1))) is None
+
+
+def test_record_trend_binds_values_and_skips_anonymous():
+    """Submissions add one upsert in the caller's transaction"""
+    db = FakeDB()
+    user_id = uuid4()
+
+    record_trend(db, user_id, 70, 30)
+    record_trend(db, None, 70, 30)
+
+    assert len(db.executed) == 1
+    statement, params = db.executed[0]
+    assert "ON CONFLICT (user_id)" in statement
+    assert params["user_id"] == str(user_id)
+    assert params["physical"] == 70
+    assert params["alpha"] == EWMA_ALPHA
+    assert "WHERE EXCLUDED.latest_assessment_at >= t.latest_assessment_at" in statement
+    assert db.commits == 0
+
+
+def test_backdated_assessment_refolds_the_user_history():
+    """An out-of-order row leaves latest_* alone and refolds the EWMA in date order"""
+    user_id, other_user = uuid4(), uuid4()
+    history = _history(6)
+    backdated = (datetime(2025, 12, 1), 90, 10)
+    # user_assessments already holds the backdated row (same transaction)
+    db = FakeDB(
+        [(user_id, *h) for h in [backdated] + history] + [(other_user, *history[0])],
+        stale=[user_id]
+    )
+
+    record_trend(db, user_id, backdated[1], backdated[2], backdated[0])
+
+    assert db.commits == 0
+    select_params, upsert = db.executed[1][1], db.executed[2][1]
+    assert select_params["user_ids"] == [str(user_id)]
+    expected = _aggregate_row([backdated] + history)
+    (folded,) = upsert
+    assert folded["count"] == expected[0]
+    assert (folded["first_at"], folded["first_physical"]) == (backdated[0], backdated[1])
+    assert (folded["latest_at"], folded["latest_physical"]) == (history[-1][0], history[-1][1])
+    assert folded["ewma_physical"] == pytest.approx(expected[9])
+    assert folded["ewma_emotional"] == pytest.approx(expected[10])
+
+
+def test_rebuild_folds_each_user_in_order():
+    """The rebuild produces the same aggregate as sequential submissions"""
+    first_user, second_user = uuid4(), uuid4()
+    first_history, second_history = _history(5), _history(3)
+    rows = (
+        [(first_user, *h) for h in first_history]
+        + [(second_user, *h) for h in second_history]
+    )
+    db = FakeDB(rows)
+
+    written = rebuild_trend_aggregates(db)
+
+    assert written == 2
+    assert db.commits == 1
+    upserts = db.executed[-1][1]
+    by_user = {u["user_id"]: u for u in upserts}
+    for user_id, history in ((first_user, first_history), (second_user, second_history)):
+        expected = _aggregate_row(history)
+        folded = by_user[str(user_id)]
+        assert folded["count"] == expected[0]
+        assert folded["first_physical"] == expected[2]
+        assert folded["latest_at"] == expected[4]
+        assert folded["physical_sum"] == expected[7]
+        assert folded["ewma_physical"] == pytest.approx(expected[9])
+        assert folded["ewma_emotional"] == pytest.approx(expected[10])
+
+
+class _TrendBatchDB:
+    """Existing aggregates for some users; captures the batch statements"""
+
+    def __init__(self, existing, stale=(), assessments=()):
+        self.existing = existing
+        self.stale = set(stale)
+        self.assessments = list(assessments)
+        self.calls = []
+
+    def execute(self, query, params=None):
+        self.calls.append((str(query), params))
+
+        class _Result:
+            def __init__(self, rows):
+                self._rows = rows
+
+            def fetchall(self):
+                return self._rows
+
+            def __iter__(self):
+                return iter(self._rows)
+
+        sql = str(query)
+        named = params if isinstance(params, dict) else {}
+        user_ids = [named[key] for key in named if key.startswith("user_id_")]
+        if sql.lstrip().startswith("INSERT") and "RETURNING" in sql:
+            return _Result([(u,) for u in user_ids if u not in self.existing])
+        if sql.lstrip().startswith("UPDATE"):
+            # The guard rejects batches reaching back past the stored latest
+            return _Result([(u,) for u in user_ids if u not in self.stale])
+        if "FROM user_assessments" in sql:
+            return _Result(sorted(
+                (row for row in self.assessments if row[0] in params["user_ids"]),
+                key=lambda row: (row[0], row[1])
+            ))
+        return _Result([])
+
+
+def test_record_trends_matches_sequential_record_trend():
+    """A batch lands on the same aggregate as one record_trend per row"""
+    old_history = _history(5)
+    new_history = _history(12)[5:]
+    known_user, new_user = str(uuid4()), str(uuid4())
+    old_row = _aggregate_row(old_history)
+    db = _TrendBatchDB({known_user})
+
+    record_trends(db, [
+        (user_id, completed_at, physical, emotional)
+        for completed_at, physical, emotional in reversed(new_history)
+        for user_id in (known_user, new_user)
+    ] + [(None, datetime(2026, 2, 1), 50, 50)])
+
+    assert len(db.calls) == 2
+    insert_params, update_params = db.calls[0][1], db.calls[1][1]
+    new_index = next(
+        key[len("user_id_"):] for key, value in insert_params.items()
+        if key.startswith("user_id_") and value == new_user
+    )
+    expected_new = _aggregate_row(new_history)
+    assert insert_params[f"count_{new_index}"] == len(new_history)
+    assert insert_params[f"ewma_physical_{new_index}"] == pytest.approx(expected_new[9])
+
+    expected = _aggregate_row(old_history + new_history)
+    assert update_params["user_id_0"] == known_user
+    assert old_row[0] + update_params["count_0"] == expected[0]
+    assert update_params["latest_at_0"] == expected[4]
+    assert (
+        update_params["decay_0"] * old_row[9] + update_params["partial_physical_0"]
+        == pytest.approx(expected[9])
+    )
+    assert (
+        update_params["decay_0"] * old_row[10] + update_params["partial_emotional_0"]
+        == pytest.approx(expected[10])
+    )
+
+
+def test_record_trends_refolds_users_with_backdated_batches():
+    """A batch older than the stored latest is refolded, not appended after it"""
+    history = _history(8)
+    known_user = str(uuid4())
+    stored, backdated = history[2:], history[:2]
+    db = _TrendBatchDB(
+        {known_user},
+        stale={known_user},
+        assessments=[(known_user, *entry) for entry in history]
+    )
+
+    record_trends(db, [(known_user, *entry) for entry in backdated])
+
+    update_sql = db.calls[1][0]
+    assert "v.first_at >= t.latest_assessment_at" in update_sql
+    assert db.calls[1][1]["first_at_0"] == backdated[0][0] < stored[-1][0]
+    upsert = db.calls[-1][1]
+    expected = _aggregate_row(history)
+    assert len(upsert) == 1
+    assert upsert[0]["count"] == expected[0]
+    assert upsert[0]["first_at"] == expected[1]
+    assert upsert[0]["latest_at"] == expected[4]
+    assert upsert[0]["ewma_physical"] == pytest.approx(expected[9])
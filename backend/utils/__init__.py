@@ -1,4 +1,62 @@
 ﻿"""Utility functions"""
-from .scoring_calculator import SuggestibilityScorer, get_answer_breakdown
+from .scoring_calculator import (
+    SuggestibilityScorer,
+    HMILookupTable,
+    InterpretationOutcome,
+    get_answer_breakdown,
+    correct_lookup_table,
+    get_lookup_table,
+    get_outcome_for_percentage,
+    get_outcome_table,
+    invalidate_lookup_tables
+)
+from .question_catalogue import (
+    QuestionCatalogue,
+    QuestionCatalogueCache,
+    get_question_catalogue,
+    invalidate_question_catalogue
+)
+from .answer_pattern import (
+    AnswerPatternProfile,
+    AnswerPatternBatch
+)
+from .pagination import (
+    InvalidCursorError,
+    encode_cursor,
+    decode_cursor
+)
+from .preference_cache import (
+    PreferenceCache,
+    LocalSharedBackend,
+    communication_preferences_cache
+)
+from .pool_telemetry import (
+    PoolTelemetry,
+    pool_metrics
+)
 
-__all__ = ['SuggestibilityScorer', 'get_answer_breakdown']
+__all__ = [
+    'SuggestibilityScorer',
+    'HMILookupTable',
+    'InterpretationOutcome',
+    'get_answer_breakdown',
+    'correct_lookup_table',
+    'get_lookup_table',
+    'get_outcome_for_percentage',
+    'get_outcome_table',
+    'invalidate_lookup_tables',
+    'QuestionCatalogue',
+    'QuestionCatalogueCache',
+    'get_question_catalogue',
+    'invalidate_question_catalogue',
+    'AnswerPatternProfile',
+    'AnswerPatternBatch',
+    'InvalidCursorError',
+    'encode_cursor',
+    'decode_cursor',
+    'PreferenceCache',
+    'LocalSharedBackend',
+    'communication_preferences_cache',
+    'PoolTelemetry',
+    'pool_metrics'
+]
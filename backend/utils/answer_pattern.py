@@ -0,0 +1,223 @@
+"""
+Answer Pattern Features for E&P Assessments
+Single-pass bitmask summary of the 36 yes/no answers used by quality metrics
+"""
+from typing import Dict, Iterable, Optional, Tuple, Union
+import numpy as np
+
+
+QUESTION_COUNT = 36
+FULL_MASK = (1 << QUESTION_COUNT) - 1
+# Adjacent-pair positions (q1/q2 ... q35/q36)
+PAIR_MASK = (1 << (QUESTION_COUNT - 1)) - 1
+
+
+def fold_answers(
+    answers: Dict[str, bool],
+    key_prefix: str = ""
+) -> Tuple[int, int, int]:
+    """
+    One pass over an answer dict.
+
+    Args:
+        answers: Answer dict keyed "<key_prefix><n>" for n in 1-36
+        key_prefix: "" for {"1": ...} keys, "q" for {"q1": ...} keys
+
+    Returns:
+        (mask, answer_count, value_yes_count)
+    """
+    mask = 0
+    value_yes_count = 0
+    prefix_length = len(key_prefix)
+    for key, value in answers.items():
+        if not value:
+            continue
+        value_yes_count += 1
+        key = str(key)
+        if key.startswith(key_prefix) and key[prefix_length:].isdigit():
+            number = int(key[prefix_length:])
+            if 1 <= number <= QUESTION_COUNT:
+                mask |= 1 << (number - 1)
+    return mask, len(answers), value_yes_count
+
+
+def _longest_run(mask: int) -> int:
+    """Length of the longest run of set bits."""
+    run = 0
+    while mask:
+        mask &= mask << 1
+        run += 1
+    return run
+
+
+class AnswerPatternProfile:
+    """
+    Everything the quality metrics need from an answer set, computed once.
+
+    Bit i - 1 of mask is set when question i was answered "yes". The
+    derived features (yes count, adjacent transitions, longest streak of
+    identical answers) are plain popcount / shift operations on the mask.
+
+    answer_count and value_yes_count describe the raw dict (every key),
+    for metrics that are defined over len(answers) rather than over the
+    36 expected questions.
+    """
+
+    __slots__ = (
+        "mask",
+        "answer_count",
+        "value_yes_count",
+        "yes_count",
+        "transitions",
+        "max_streak"
+    )
+
+    def __init__(self, mask: int, answer_count: int = QUESTION_COUNT,
+                 value_yes_count: Optional[int] = None):
+        mask &= FULL_MASK
+        self.mask = mask
+        self.answer_count = answer_count
+        self.yes_count = bin(mask).count("1")
+        self.value_yes_count = (
+            self.yes_count if value_yes_count is None else value_yes_count
+        )
+        self.transitions = bin((mask ^ (mask >> 1)) & PAIR_MASK).count("1")
+        self.max_streak = max(
+            _longest_run(mask),
+            _longest_run(~mask & FULL_MASK)
+        )
+
+    @classmethod
+    def from_answers(
+        cls,
+        answers: Dict[str, bool],
+        key_prefix: str = ""
+    ) -> "AnswerPatternProfile":
+        """Build a profile with one pass over the answer dict (see fold_answers)."""
+        return cls(*fold_answers(answers, key_prefix))
+
+    @classmethod
+    def coerce(
+        cls,
+        answers: Union[Dict[str, bool], "AnswerPatternProfile"],
+        key_prefix: str = ""
+    ) -> "AnswerPatternProfile":
+        """Return answers unchanged if already a profile, else build one."""
+        if isinstance(answers, cls):
+            return answers
+        return cls.from_answers(answers, key_prefix)
+
+    @property
+    def yes_ratio(self) -> float:
+        """Share of "yes" over the 36 questions."""
+        return self.yes_count / QUESTION_COUNT
+
+    def __repr__(self) -> str:
+        return (
+            f"AnswerPatternProfile(mask=0x{self.mask:09x}, "
+            f"yes_count={self.yes_count}, transitions={self.transitions}, "
+            f"max_streak={self.max_streak})"
+        )
+
+
+# ============================================================================
+# BATCH FORM
+# ============================================================================
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Per-element popcount of a uint64 array."""
+    as_bytes = np.ascontiguousarray(values, dtype=np.uint64).view(np.uint8)
+    return _POPCOUNT_TABLE[as_bytes].reshape(-1, 8).sum(axis=1, dtype=np.int16)
+
+
+def _longest_run_batch(masks: np.ndarray) -> np.ndarray:
+    """Per-element longest run of set bits."""
+    runs = np.zeros(masks.shape[0], dtype=np.int16)
+    remaining = masks.copy()
+    while True:
+        alive = remaining != 0
+        if not alive.any():
+            return runs
+        runs += alive
+        remaining &= remaining << np.uint64(1)
+
+
+class AnswerPatternBatch:
+    """
+    AnswerPatternProfile features for many assessments as arrays.
+
+    Built from a uint64 array of answer bitmasks (same bit layout as
+    AnswerPatternProfile.mask), e.g. for backfills.
+    """
+
+    __slots__ = (
+        "masks",
+        "answer_count",
+        "value_yes_count",
+        "yes_count",
+        "transitions",
+        "max_streak"
+    )
+
+    def __init__(self, masks: np.ndarray,
+                 answer_count: Optional[np.ndarray] = None,
+                 value_yes_count: Optional[np.ndarray] = None):
+        masks = np.asarray(masks, dtype=np.uint64) & np.uint64(FULL_MASK)
+        self.masks = masks
+        self.yes_count = _popcount(masks)
+        self.answer_count = (
+            np.full(masks.shape[0], QUESTION_COUNT, dtype=np.int16)
+            if answer_count is None else np.asarray(answer_count)
+        )
+        self.value_yes_count = (
+            self.yes_count if value_yes_count is None
+            else np.asarray(value_yes_count)
+        )
+        self.transitions = _popcount(
+            (masks ^ (masks >> np.uint64(1))) & np.uint64(PAIR_MASK)
+        )
+        self.max_streak = np.maximum(
+            _longest_run_batch(masks),
+            _longest_run_batch(~masks & np.uint64(FULL_MASK))
+        )
+
+    @classmethod
+    def from_profiles(cls, profiles) -> "AnswerPatternBatch":
+        """Pack already-built profiles."""
+        profiles = list(profiles)
+        return cls(
+            np.array([p.mask for p in profiles], dtype=np.uint64),
+            np.array([p.answer_count for p in profiles], dtype=np.int16),
+            np.array([p.value_yes_count for p in profiles], dtype=np.int16)
+        )
+
+    @classmethod
+    def from_answers(
+        cls,
+        answer_sets: Iterable[Dict[str, bool]],
+        key_prefix: str = ""
+    ) -> "AnswerPatternBatch":
+        """Fold answer dicts to masks, then derive the features vectorized."""
+        folded = [fold_answers(answers, key_prefix) for answers in answer_sets]
+        if not folded:
+            return cls(np.zeros(0, dtype=np.uint64))
+        masks, answer_count, value_yes_count = zip(*folded)
+        return cls(
+            np.array(masks, dtype=np.uint64),
+            np.array(answer_count, dtype=np.int16),
+            np.array(value_yes_count, dtype=np.int16)
+        )
+
+    def __len__(self) -> int:
+        return self.masks.shape[0]
+
+    def profile(self, index: int) -> AnswerPatternProfile:
+        """Single-assessment view."""
+        return AnswerPatternProfile(
+            int(self.masks[index]),
+            int(self.answer_count[index]),
+            int(self.value_yes_count[index])
+        )
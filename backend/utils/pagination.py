@@ -0,0 +1,42 @@
+"""
+Keyset Pagination Cursors
+Opaque cursor tokens for (completed_at, id) ordered listings
+"""
+from typing import NamedTuple
+from datetime import datetime
+from uuid import UUID
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+class HistoryCursor(NamedTuple):
+    """Position after the last row of a page (completed_at DESC, id DESC)."""
+    completed_at: datetime
+    id: str
+
+
+def encode_cursor(completed_at: datetime, row_id) -> str:
+    """Encode a keyset position as an opaque URL-safe token."""
+    payload = json.dumps(
+        {"t": completed_at.isoformat(), "id": str(row_id)},
+        separators=(",", ":")
+    ).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> HistoryCursor:
+    """Decode a token produced by encode_cursor."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return HistoryCursor(
+            completed_at=datetime.fromisoformat(payload["t"]),
+            id=str(UUID(payload["id"]))
+        )
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
@@ -0,0 +1,169 @@
+"""
+Connection Pool Telemetry
+Checkout wait-time histogram and overflow/timeout/invalidation counters per engine
+"""
+from typing import Dict, Optional, Tuple
+from threading import Lock
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+# Upper bounds (milliseconds) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS: Tuple[float, ...] = (
+    1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000
+)
+
+
+class PoolTelemetry:
+    """
+    Counters for one engine's pool.
+
+    Checkout waits (time spent obtaining a connection from the pool,
+    including opening a new one) go into a cumulative histogram, so
+    wait["buckets"]["50"] is the number of checkouts that waited at most
+    50 ms, as in a Prometheus histogram.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = Lock()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self._bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def _observe_wait(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        slot = len(WAIT_BUCKETS_MS)
+        for index, bound in enumerate(WAIT_BUCKETS_MS):
+            if milliseconds <= bound:
+                slot = index
+                break
+        self._bucket_counts[slot] += 1
+        self.wait_count += 1
+        self.wait_sum += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def record_checkout(self, wait_seconds: float, overflowed: bool) -> None:
+        """A connection was handed out after waiting wait_seconds."""
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_events += int(overflowed)
+            self._observe_wait(wait_seconds)
+
+    def record_timeout(self, wait_seconds: float) -> None:
+        """The pool was exhausted for the whole pool_timeout."""
+        with self._lock:
+            self.timeouts += 1
+            self._observe_wait(wait_seconds)
+
+    def record_invalidation(self) -> None:
+        """A connection was discarded (stale, failed pre-ping, error)."""
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool=None) -> Dict:
+        """Counters plus the live state of pool (if given)."""
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self._bucket_counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            metrics = {
+                "name": self.name,
+                "checkouts": self.checkouts,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait": {
+                    "count": self.wait_count,
+                    "sum_ms": self.wait_sum * 1000,
+                    "max_ms": self.wait_max * 1000,
+                    "buckets": buckets
+                }
+            }
+        if pool is not None and hasattr(pool, "checkedout"):
+            metrics.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "idle": pool.checkedin()
+            })
+        return metrics
+
+
+class _InstrumentedPoolMixin:
+    """Times QueuePool._do_get and reports to the attached telemetry."""
+
+    telemetry: Optional[PoolTelemetry] = None
+
+    def _do_get(self):
+        telemetry = self.telemetry
+        if telemetry is None:
+            return super()._do_get()
+        overflow = self.overflow()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            telemetry.record_timeout(time.perf_counter() - started)
+            raise
+        # overflow() starts at -pool_size; only connections past pool_size overflow
+        telemetry.record_checkout(
+            time.perf_counter() - started,
+            self.overflow() > max(overflow, 0)
+        )
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same telemetry
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with telemetry (sync engines)"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with telemetry (async engines)"""
+
+
+_registry: Dict[str, Tuple[object, PoolTelemetry]] = {}
+_registry_lock = Lock()
+
+
+def instrument_engine(engine, name: str) -> PoolTelemetry:
+    """
+    Attach telemetry to an engine built with an instrumented pool class
+    and register it for pool_metrics(). Accepts sync or async engines.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    telemetry = PoolTelemetry(name)
+    sync_engine.pool.telemetry = telemetry
+    event.listen(
+        sync_engine,
+        "invalidate",
+        lambda dbapi_connection, record, exception: telemetry.record_invalidation()
+    )
+    with _registry_lock:
+        _registry[name] = (sync_engine, telemetry)
+    return telemetry
+
+
+def pool_metrics() -> Dict[str, Dict]:
+    """Snapshot of every registered engine's pool, keyed by engine name."""
+    with _registry_lock:
+        entries = list(_registry.items())
+    return {
+        name: telemetry.snapshot(sync_engine.pool)
+        for name, (sync_engine, telemetry) in entries
+    }
@@ -0,0 +1,195 @@
+"""
+Communication Preferences Cache
+Per-user LRU + TTL cache, or one tier shared by all workers
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from threading import Lock
+import json
+import os
+import time
+
+
+DEFAULT_PREFERENCE_TTL_SECONDS = int(
+    os.getenv("PREFERENCE_CACHE_TTL_SECONDS", "300")
+)
+DEFAULT_PREFERENCE_MAXSIZE = int(
+    os.getenv("PREFERENCE_CACHE_MAXSIZE", "10000")
+)
+
+# Stored for users without an assessment so they are not re-queried
+_NO_PREFERENCES = "__none__"
+
+
+class SharedCacheBackend(ABC):
+    """
+    Shared (cross-process) tier of PreferenceCache.
+
+    Values are JSON strings; implementations own expiry.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Stored value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        """Store value for ttl_seconds"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Drop key (no error if missing)"""
+
+
+class LocalSharedBackend(SharedCacheBackend):
+    """
+    In-process stand-in for a shared cache (tests, single-worker setups).
+
+    Same contract as a networked backend: string values with a TTL.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, str]] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisSharedBackend(SharedCacheBackend):
+    """Redis-backed shared tier (pip install redis)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("redis is not installed; pip install redis") from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._client.set(key, value, ex=ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+class PreferenceCache:
+    """
+    Read-through cache of communication preferences keyed by user.
+
+    Without a backend, entries live in a per-worker LRU bounded by maxsize
+    that expire after ttl_seconds. With a shared backend, the backend is
+    the only tier: a per-worker copy could not see another worker's
+    invalidate() and would serve stale preferences until its TTL, so every
+    worker reads and invalidates the same entry. Counters (hits, misses,
+    shared_hits, evictions) show how often the database is actually
+    reached.
+    """
+
+    KEY_PREFIX = "ep:prefs:"
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_PREFERENCE_MAXSIZE,
+        ttl_seconds: int = DEFAULT_PREFERENCE_TTL_SECONDS,
+        backend: Optional[SharedCacheBackend] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id) -> Tuple[bool, Optional[Dict]]:
+        """
+        Look up a user's preferences.
+
+        Returns:
+            (found, preferences); preferences may be None when the user is
+            known to have no assessment.
+        """
+        key = str(user_id)
+        if self.backend is not None:
+            raw = self.backend.get(self.KEY_PREFIX + key)
+            with self._lock:
+                if raw is None:
+                    self.misses += 1
+                    return False, None
+                self.shared_hits += 1
+            return True, None if raw == _NO_PREFERENCES else json.loads(raw)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+            self.misses += 1
+        return False, None
+
+    def set(self, user_id, preferences: Optional[Dict]) -> None:
+        """Cache preferences (None = user has no assessment yet)."""
+        key = str(user_id)
+        if self.backend is not None:
+            raw = _NO_PREFERENCES if preferences is None else json.dumps(preferences)
+            self.backend.set(self.KEY_PREFIX + key, raw, self.ttl_seconds)
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, preferences)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id=None) -> None:
+        """Drop one user's entry (every worker sees it with a backend), or the whole local tier."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                return
+            self._entries.pop(str(user_id), None)
+        if self.backend is not None:
+            self.backend.delete(self.KEY_PREFIX + str(user_id))
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0
+            }
+
+
+def _default_backend() -> Optional[SharedCacheBackend]:
+    url = os.getenv("PREFERENCE_CACHE_REDIS_URL")
+    return RedisSharedBackend(url) if url else None
+
+
+# Shared cache instance
+communication_preferences_cache = PreferenceCache(backend=_default_backend())
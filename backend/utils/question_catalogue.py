@@ -0,0 +1,168 @@
+"""
+Questionnaire Question Catalogue Cache
+Version-scoped, TTL-bounded cache of questionnaire_questions rows
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+from threading import Lock
+import os
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+
+# Default lifetime of a cached catalogue (seconds)
+DEFAULT_CATALOGUE_TTL_SECONDS = int(
+    os.getenv("QUESTION_CATALOGUE_TTL_SECONDS", "3600")
+)
+
+
+class CatalogueQuestion(NamedTuple):
+    """One questionnaire_questions row."""
+    question_number: int
+    question_text: str
+    category: str
+    subcategory: str
+    weight: int
+    tooltip: Optional[str]
+    example: Optional[str]
+    icon: Optional[str]
+    psychological_construct: Optional[str]
+    clinical_significance: Optional[str]
+
+
+class VersionHeader(NamedTuple):
+    """One questionnaire_versions row."""
+    id: str
+    name: str
+    version: str
+    methodology: str
+    source: str
+    description: Optional[str]
+    is_active: bool
+
+
+class QuestionCatalogue(NamedTuple):
+    """All questions of a questionnaire version, ordered by number."""
+    questionnaire_version_id: str
+    questions: Tuple[CatalogueQuestion, ...]
+
+
+class QuestionCatalogueCache:
+    """
+    Process-local cache of question catalogues and version headers.
+
+    Question text is versioned and immutable, so a catalogue is read once
+    per questionnaire version and reused by the breakdown, questionnaire
+    and history paths. Entries expire after ttl_seconds; invalidate()
+    drops them explicitly (e.g. after seeding or deactivating a version).
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_CATALOGUE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._catalogues: Dict[str, Tuple[float, QuestionCatalogue]] = {}
+        self._versions: Dict[str, Tuple[float, VersionHeader]] = {}
+        self._lock = Lock()
+
+    def _fresh(self, entry: Optional[Tuple[float, object]]) -> bool:
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get_catalogue(
+        self,
+        db: Session,
+        questionnaire_version_id: str
+    ) -> QuestionCatalogue:
+        """Get all questions for a questionnaire version."""
+        version_key = str(questionnaire_version_id)
+        entry = self._catalogues.get(version_key)
+        if self._fresh(entry):
+            return entry[1]
+
+        query = text("""
+            SELECT
+                question_number,
+                question_text,
+                category,
+                subcategory,
+                weight,
+                tooltip,
+                example,
+                icon,
+                psychological_construct,
+                clinical_significance
+            FROM questionnaire_questions
+            WHERE questionnaire_version_id = :version_id
+            ORDER BY question_number
+        """)
+
+        rows = db.execute(query, {"version_id": version_key}).fetchall()
+        catalogue = QuestionCatalogue(
+            questionnaire_version_id=version_key,
+            questions=tuple(CatalogueQuestion(*row) for row in rows)
+        )
+
+        with self._lock:
+            self._catalogues[version_key] = (
+                time.monotonic() + self.ttl_seconds,
+                catalogue
+            )
+        return catalogue
+
+    def get_version(self, db: Session, version: str) -> Optional[VersionHeader]:
+        """Resolve an active HMI questionnaire version string to its row."""
+        entry = self._versions.get(version)
+        if self._fresh(entry):
+            return entry[1]
+
+        query = text("""
+            SELECT id, name, version, methodology, source, description, is_active
+            FROM questionnaire_versions
+            WHERE name = 'HMI E&P Suggestibility Assessment'
+                AND version = :version
+                AND is_active = true
+            LIMIT 1
+        """)
+
+        row = db.execute(query, {"version": version}).fetchone()
+        if not row:
+            return None
+
+        header = VersionHeader(*row)
+        with self._lock:
+            self._versions[version] = (
+                time.monotonic() + self.ttl_seconds,
+                header
+            )
+        return header
+
+    def invalidate(self, questionnaire_version_id: Optional[str] = None) -> None:
+        """
+        Drop cached entries.
+
+        With a version id only that catalogue is dropped; version headers
+        are always dropped since activation may have changed.
+        """
+        with self._lock:
+            if questionnaire_version_id is None:
+                self._catalogues.clear()
+            else:
+                self._catalogues.pop(str(questionnaire_version_id), None)
+            self._versions.clear()
+
+
+# Shared cache instance
+question_catalogue_cache = QuestionCatalogueCache()
+
+
+def get_question_catalogue(
+    db: Session,
+    questionnaire_version_id: str
+) -> QuestionCatalogue:
+    """Get the cached question catalogue for a questionnaire version."""
+    return question_catalogue_cache.get_catalogue(db, questionnaire_version_id)
+
+
+def invalidate_question_catalogue(
+    questionnaire_version_id: Optional[str] = None
+) -> None:
+    """Bust the question catalogue cache (all versions if none given)."""
+    question_catalogue_cache.invalidate(questionnaire_version_id)
@@ -2,10 +2,297 @@
 HMI E and P Suggestibility Scoring Calculator
 Implements official HMI scoring methodology from Panorama Publishing 2003
 """
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from threading import Lock
+from types import MappingProxyType
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from .question_catalogue import get_question_catalogue
+
+
+class HMILookupTable:
+    """
+    Dense in-memory copy of the HMI physical-percentage chart.
+    
+    The chart for a questionnaire version is immutable once seeded, so it is
+    read from scoring_lookup_tables once and then served from a flat grid:
+    Q1 0-100 x Combined 50-200, both in steps of 5 (21 x 31 cells).
+    """
+    
+    Q1_MIN = 0
+    Q1_MAX = 100
+    COMBINED_MIN = 50
+    COMBINED_MAX = 200
+    STEP = 5
+    
+    Q1_SLOTS = (Q1_MAX - Q1_MIN) // STEP + 1
+    COMBINED_SLOTS = (COMBINED_MAX - COMBINED_MIN) // STEP + 1
+    
+    # Sentinel for unseeded cells in the array form of the grid
+    MISSING = -1
+    
+    __slots__ = ("questionnaire_version_id", "_cells", "_grid")
+    
+    def __init__(
+        self,
+        questionnaire_version_id: str,
+        rows: List[Tuple[int, int, int]]
+    ):
+        """
+        Args:
+            questionnaire_version_id: UUID of questionnaire version
+            rows: (q1_score, combined_score, physical_percentage) chart rows
+        """
+        self.questionnaire_version_id = questionnaire_version_id
+        self._cells: List[Optional[int]] = [None] * (
+            self.Q1_SLOTS * self.COMBINED_SLOTS
+        )
+        for q1_score, combined_score, physical_percentage in rows:
+            index = self._index(q1_score, combined_score)
+            if index is not None:
+                self._cells[index] = physical_percentage
+        self._grid: Optional[np.ndarray] = None
+    
+    def _index(self, q1_score: int, combined_score: int) -> Optional[int]:
+        """Grid offset for a chart coordinate, or None if off-grid."""
+        if not (self.Q1_MIN <= q1_score <= self.Q1_MAX):
+            return None
+        if not (self.COMBINED_MIN <= combined_score <= self.COMBINED_MAX):
+            return None
+        q1_offset = q1_score - self.Q1_MIN
+        combined_offset = combined_score - self.COMBINED_MIN
+        if q1_offset % self.STEP or combined_offset % self.STEP:
+            return None
+        return (
+            (q1_offset // self.STEP) * self.COMBINED_SLOTS
+            + combined_offset // self.STEP
+        )
+    
+    def get(self, q1_score: int, combined_score: int) -> Optional[int]:
+        """Physical percentage for a (Q1, Combined) pair, or None if unseeded."""
+        index = self._index(q1_score, combined_score)
+        if index is None:
+            return None
+        return self._cells[index]
+    
+    def as_array(self) -> np.ndarray:
+        """
+        Read-only (Q1_SLOTS, COMBINED_SLOTS) int16 view of the chart.
+        
+        Unseeded cells hold MISSING. Built on first use and shared.
+        """
+        if self._grid is None:
+            grid = np.array(
+                [self.MISSING if cell is None else cell for cell in self._cells],
+                dtype=np.int16
+            ).reshape(self.Q1_SLOTS, self.COMBINED_SLOTS)
+            grid.flags.writeable = False
+            self._grid = grid
+        return self._grid
+    
+    def __len__(self) -> int:
+        return sum(1 for cell in self._cells if cell is not None)
+
+
+# Process-wide chart cache keyed by questionnaire_version_id
+_lookup_tables: Dict[str, HMILookupTable] = {}
+_lookup_tables_lock = Lock()
+
+
+def get_lookup_table(db: Session, questionnaire_version_id: str) -> HMILookupTable:
+    """
+    Get the HMI chart for a questionnaire version, loading it on first use.
+    
+    Only the first caller for a version touches the database; every later
+    lookup is served from memory until invalidate_lookup_tables() is called.
+    """
+    version_key = str(questionnaire_version_id)
+    table = _lookup_tables.get(version_key)
+    if table is not None:
+        return table
+    
+    with _lookup_tables_lock:
+        table = _lookup_tables.get(version_key)
+        if table is not None:
+            return table
+        
+        query = text("""
+            SELECT q1_score, combined_score, physical_percentage
+            FROM scoring_lookup_tables
+            WHERE questionnaire_version_id = :version_id
+                AND lookup_type = 'physical_percentage'
+        """)
+        
+        rows = db.execute(query, {"version_id": version_key}).fetchall()
+        if not rows:
+            raise ValueError(
+                f"No HMI lookup chart seeded for questionnaire version "
+                f"{version_key}"
+            )
+        
+        table = HMILookupTable(version_key, [tuple(row) for row in rows])
+        _lookup_tables[version_key] = table
+        return table
+
+
+def invalidate_lookup_tables(questionnaire_version_id: Optional[str] = None) -> None:
+    """
+    Drop cached HMI charts.
+    
+    Call after seeding or correcting scoring_lookup_tables (correct_lookup_table
+    does this itself). With no argument every cached version is dropped.
+    """
+    with _lookup_tables_lock:
+        if questionnaire_version_id is None:
+            _lookup_tables.clear()
+            _outcome_tables.clear()
+        else:
+            _lookup_tables.pop(str(questionnaire_version_id), None)
+            _outcome_tables.pop(str(questionnaire_version_id), None)
+
+
+def correct_lookup_table(
+    db: Session,
+    questionnaire_version_id: str,
+    cells: Iterable[Tuple[int, int, int]]
+) -> int:
+    """
+    Correct (q1_score, combined_score, physical_percentage) chart cells.
+    
+    Commits the update and then drops the cached chart for the version, so
+    the next score uses the corrected cells. Returns the rows updated.
+    """
+    version_key = str(questionnaire_version_id)
+    query = text("""
+        UPDATE scoring_lookup_tables
+        SET physical_percentage = :physical_percentage
+        WHERE questionnaire_version_id = :version_id
+            AND lookup_type = 'physical_percentage'
+            AND q1_score = :q1_score
+            AND combined_score = :combined_score
+    """)
+    
+    updated = 0
+    try:
+        for q1_score, combined_score, physical_percentage in cells:
+            result = db.execute(query, {
+                "version_id": version_key,
+                "q1_score": q1_score,
+                "combined_score": combined_score,
+                "physical_percentage": physical_percentage
+            })
+            updated += result.rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    invalidate_lookup_tables(version_key)
+    return updated
+
+
+class InterpretationOutcome:
+    """
+    Fully built, immutable scoring outcome for one physical percentage.
+    
+    The 2^36 possible answer vectors collapse to a few hundred
+    (Q1, Combined) chart cells and at most 101 distinct interpretations,
+    so these are built once and shared by every request that lands on
+    the same cell. interpretation is a read-only mapping (traits as
+    tuples).
+    """
+    
+    __slots__ = (
+        "physical_percentage",
+        "emotional_percentage",
+        "suggestibility_type",
+        "interpretation"
+    )
+    
+    def __init__(self, interpretation: Dict):
+        self.physical_percentage: int = interpretation["physical_percentage"]
+        self.emotional_percentage: int = interpretation["emotional_percentage"]
+        self.suggestibility_type: str = interpretation["suggestibility_type"]
+        self.interpretation: Mapping = MappingProxyType({
+            **interpretation,
+            "physical_traits": tuple(interpretation["physical_traits"]),
+            "emotional_traits": tuple(interpretation["emotional_traits"]),
+            "therapeutic_approach": MappingProxyType(
+                dict(interpretation["therapeutic_approach"])
+            )
+        })
+    
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError("InterpretationOutcome is immutable")
+        object.__setattr__(self, name, value)
+
+
+# Outcomes keyed by physical percentage (version independent) and
+# compiled outcome tables keyed by version -> (q1_lookup, combined_lookup)
+_outcomes_by_percentage: Dict[int, InterpretationOutcome] = {}
+_outcome_tables: Dict[str, Dict[Tuple[int, int], InterpretationOutcome]] = {}
+
+
+def get_outcome_for_percentage(physical_percentage: int) -> InterpretationOutcome:
+    """
+    Build (once) the shared outcome for a physical percentage.
+    
+    Use this for stored assessments: the interpretation then always agrees
+    with the stored percentage, even after a chart correction.
+    """
+    outcome = _outcomes_by_percentage.get(physical_percentage)
+    if outcome is None:
+        emotional_percentage = 100 - physical_percentage
+        outcome = InterpretationOutcome(
+            SuggestibilityScorer._generate_interpretation(
+                physical_percentage,
+                emotional_percentage,
+                SuggestibilityScorer._determine_type(physical_percentage)
+            )
+        )
+        outcome = _outcomes_by_percentage.setdefault(physical_percentage, outcome)
+    return outcome
+
+
+def get_outcome_table(
+    db: Session,
+    questionnaire_version_id: str
+) -> Dict[Tuple[int, int], InterpretationOutcome]:
+    """
+    Get the compiled (q1_lookup, combined_lookup) -> outcome table.
+    
+    Compiled from the cached HMI chart the first time a version is used;
+    invalidate_lookup_tables() drops it together with the chart.
+    """
+    version_key = str(questionnaire_version_id)
+    outcomes = _outcome_tables.get(version_key)
+    if outcomes is not None:
+        return outcomes
+    
+    table = get_lookup_table(db, version_key)
+    outcomes = {}
+    for q1_score in range(table.Q1_MIN, table.Q1_MAX + 1, table.STEP):
+        for combined_score in range(
+            table.COMBINED_MIN, table.COMBINED_MAX + 1, table.STEP
+        ):
+            physical_percentage = table.get(q1_score, combined_score)
+            if physical_percentage is not None:
+                outcomes[(q1_score, combined_score)] = get_outcome_for_percentage(
+                    physical_percentage
+                )
+    
+    with _lookup_tables_lock:
+        # Only cache against the chart it was compiled from: if the chart
+        # was invalidated meanwhile, this table is stale and must not
+        # outlive the invalidation.
+        if _lookup_tables.get(version_key) is not table:
+            return outcomes
+        return _outcome_tables.setdefault(version_key, outcomes)
+
+
 class SuggestibilityScorer:
     """
     Official HMI E and P Suggestibility scoring calculator.
@@ -35,9 +322,145 @@ class SuggestibilityScorer:
     MAX_Q2_SCORE = 100  # (2  10) + (16  5)
     MAX_COMBINED_SCORE = 200
     
+    # Suggestibility types indexed by the codes score_batch returns
+    SUGGESTIBILITY_TYPES = (
+        "Pure Physical",
+        "Primarily Physical",
+        "Somnambulistic (Balanced)",
+        "Primarily Emotional",
+        "Pure Emotional"
+    )
+    
     def __init__(self, db: Session):
         self.db = db
     
+    @classmethod
+    def weight_matrix(cls) -> np.ndarray:
+        """
+        (36, 2) int16 matrix of HMI points per question.
+        
+        Column 0 holds Q1 (physical) weights, column 1 Q2 (emotional)
+        weights; row i is question i + 1.
+        """
+        weights = np.zeros((36, 2), dtype=np.int16)
+        for q_num in cls.Q1_HIGH_WEIGHT_QUESTIONS:
+            weights[q_num - 1, 0] = cls.HIGH_WEIGHT_POINTS
+        for q_num in cls.Q1_STANDARD_WEIGHT_QUESTIONS:
+            weights[q_num - 1, 0] = cls.STANDARD_WEIGHT_POINTS
+        for q_num in cls.Q2_HIGH_WEIGHT_QUESTIONS:
+            weights[q_num - 1, 1] = cls.HIGH_WEIGHT_POINTS
+        for q_num in cls.Q2_STANDARD_WEIGHT_QUESTIONS:
+            weights[q_num - 1, 1] = cls.STANDARD_WEIGHT_POINTS
+        return weights
+    
+    @staticmethod
+    def answers_to_matrix(rows: Iterable[Dict[int, bool]]) -> np.ndarray:
+        """
+        Pack answer dicts into an (N, 36) bool matrix for score_batch.
+        
+        Keys may be ints or numeric strings (as stored in
+        user_assessments.answers); missing questions count as "no".
+        """
+        rows = list(rows)
+        matrix = np.zeros((len(rows), 36), dtype=bool)
+        for row_index, answers in enumerate(rows):
+            for q_num, answer in answers.items():
+                if answer:
+                    matrix[row_index, int(q_num) - 1] = True
+        return matrix
+    
+    def score_batch(
+        self,
+        answers: np.ndarray,
+        questionnaire_version_id: str
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score many assessments at once.
+        
+        Equivalent to calling calculate_scores per row, minus the
+        interpretation: weights are applied as one matrix product, rounding
+        and chart lookup are array operations, and the chart is read once.
+        
+        Args:
+            answers: (N, 36) boolean matrix; column j is question j + 1
+            questionnaire_version_id: UUID of questionnaire version
+            
+        Returns:
+            Dict of length-N columns: q1_score, q2_score, combined_score,
+            q1_lookup, combined_lookup, physical_percentage,
+            emotional_percentage, suggestibility_type_code (index into
+            SUGGESTIBILITY_TYPES) and suggestibility_type
+        """
+        answers = np.asarray(answers)
+        if answers.ndim != 2 or answers.shape[1] != 36:
+            raise ValueError(
+                f"Expected an (N, 36) answer matrix, got shape {answers.shape}"
+            )
+        
+        # Q1 and Q2 in a single matrix-vector product
+        scores = answers.astype(np.int16) @ self.weight_matrix()
+        q1_score = np.minimum(scores[:, 0], self.MAX_Q1_SCORE)
+        q2_score = np.minimum(scores[:, 1], self.MAX_Q2_SCORE)
+        combined_score = q1_score + q2_score
+        
+        # Round to nearest 5 (np.round matches round(): half to even)
+        q1_lookup = (np.round(q1_score / 5) * 5).astype(np.int16)
+        combined_lookup = (np.round(combined_score / 5) * 5).astype(np.int16)
+        
+        # Chart lookup on clamped coordinates
+        table = get_lookup_table(self.db, questionnaire_version_id)
+        grid = table.as_array()
+        q1_slot = (
+            np.clip(q1_lookup, HMILookupTable.Q1_MIN, HMILookupTable.Q1_MAX)
+            - HMILookupTable.Q1_MIN
+        ) // HMILookupTable.STEP
+        combined_slot = (
+            np.clip(
+                combined_lookup,
+                HMILookupTable.COMBINED_MIN,
+                HMILookupTable.COMBINED_MAX
+            )
+            - HMILookupTable.COMBINED_MIN
+        ) // HMILookupTable.STEP
+        physical_percentage = grid[q1_slot, combined_slot]
+        
+        missing = np.flatnonzero(physical_percentage == HMILookupTable.MISSING)
+        if missing.size:
+            row = missing[0]
+            raise ValueError(
+                f"No lookup entry found for Q1={q1_lookup[row]}, "
+                f"Combined={combined_lookup[row]} (row {row}, "
+                f"{missing.size} rows affected)"
+            )
+        
+        emotional_percentage = 100 - physical_percentage
+        
+        # Same thresholds as _determine_type
+        type_code = np.select(
+            [
+                physical_percentage >= 90,
+                physical_percentage >= 60,
+                physical_percentage >= 40,
+                physical_percentage >= 11
+            ],
+            [0, 1, 2, 3],
+            default=4
+        ).astype(np.int8)
+        
+        return {
+            "q1_score": q1_score,
+            "q2_score": q2_score,
+            "combined_score": combined_score,
+            "q1_lookup": q1_lookup,
+            "combined_lookup": combined_lookup,
+            "physical_percentage": physical_percentage,
+            "emotional_percentage": emotional_percentage,
+            "suggestibility_type_code": type_code,
+            "suggestibility_type": np.array(
+                self.SUGGESTIBILITY_TYPES, dtype=object
+            )[type_code]
+        }
+    
     def calculate_scores(
         self,
         answers: Dict[int, bool],
@@ -70,35 +493,51 @@ class SuggestibilityScorer:
         q1_lookup = self._round_to_nearest_5(q1_score)
         combined_lookup = self._round_to_nearest_5(combined_score)
         
-        # Get physical percentage from lookup table
-        physical_percentage = self._lookup_physical_percentage(
+        # Physical percentage, type and interpretation from the
+        # precompiled outcome for this chart cell
+        outcome = self.get_outcome(
             q1_lookup,
             combined_lookup,
             questionnaire_version_id
         )
         
-        # Calculate emotional percentage
-        emotional_percentage = 100 - physical_percentage
-        
-        # Determine suggestibility type
-        suggestibility_type = self._determine_type(physical_percentage)
-        
         return {
             "q1_score": q1_score,
             "q2_score": q2_score,
             "combined_score": combined_score,
             "q1_lookup": q1_lookup,
             "combined_lookup": combined_lookup,
-            "physical_percentage": physical_percentage,
-            "emotional_percentage": emotional_percentage,
-            "suggestibility_type": suggestibility_type,
-            "interpretation": self._generate_interpretation(
-                physical_percentage,
-                emotional_percentage,
-                suggestibility_type
-            )
+            "physical_percentage": outcome.physical_percentage,
+            "emotional_percentage": outcome.emotional_percentage,
+            "suggestibility_type": outcome.suggestibility_type,
+            "interpretation": outcome.interpretation
         }
     
+    def get_outcome(
+        self,
+        q1_lookup: int,
+        combined_lookup: int,
+        questionnaire_version_id: str
+    ) -> InterpretationOutcome:
+        """
+        Get the shared, precompiled outcome for a chart cell.
+        
+        Scores are clamped to the chart range the same way as
+        _lookup_physical_percentage.
+        """
+        q1_lookup = max(0, min(100, q1_lookup))
+        combined_lookup = max(50, min(200, combined_lookup))
+        
+        outcome = get_outcome_table(self.db, questionnaire_version_id).get(
+            (q1_lookup, combined_lookup)
+        )
+        if outcome is None:
+            raise ValueError(
+                f"No lookup entry found for Q1={q1_lookup}, "
+                f"Combined={combined_lookup}"
+            )
+        return outcome
+    
     def _calculate_q1_score(self, answers: Dict[int, bool]) -> int:
         """Calculate Questionnaire 1 score (Physical indicators)."""
         score = 0
@@ -144,40 +583,26 @@ class SuggestibilityScorer:
         """
         Lookup physical percentage from HMI chart.
         
-        Uses official HMI lookup table seeded in database.
+        Uses official HMI lookup table seeded in database, cached in-process
+        per questionnaire version (see get_lookup_table).
         """
         # Clamp scores to valid ranges
         q1_score = max(0, min(100, q1_score))
         combined_score = max(50, min(200, combined_score))
         
-        query = text("""
-            SELECT physical_percentage
-            FROM scoring_lookup_tables
-            WHERE questionnaire_version_id = :version_id
-                AND lookup_type = 'physical_percentage'
-                AND q1_score = :q1_score
-                AND combined_score = :combined_score
-            LIMIT 1
-        """)
-        
-        result = self.db.execute(
-            query,
-            {
-                "version_id": questionnaire_version_id,
-                "q1_score": q1_score,
-                "combined_score": combined_score
-            }
-        ).fetchone()
+        table = get_lookup_table(self.db, questionnaire_version_id)
+        physical_percentage = table.get(q1_score, combined_score)
         
-        if not result:
+        if physical_percentage is None:
             raise ValueError(
                 f"No lookup entry found for Q1={q1_score}, "
                 f"Combined={combined_score}"
             )
         
-        return result[0]
+        return physical_percentage
     
-    def _determine_type(self, physical_percentage: int) -> str:
+    @classmethod
+    def _determine_type(cls, physical_percentage: int) -> str:
         """
         Determine suggestibility type based on physical percentage.
         
@@ -199,8 +624,9 @@ class SuggestibilityScorer:
         else:
             return "Pure Emotional"
     
+    @classmethod
     def _generate_interpretation(
-        self,
+        cls,
         physical_pct: int,
         emotional_pct: int,
         sugg_type: str
@@ -262,10 +688,11 @@ class SuggestibilityScorer:
             "physical_traits": physical_traits,
             "emotional_traits": emotional_traits,
             "therapeutic_approach": therapy_approach,
-            "clinical_notes": self._get_clinical_notes(sugg_type)
+            "clinical_notes": cls._get_clinical_notes(sugg_type)
         }
     
-    def _get_clinical_notes(self, sugg_type: str) -> str:
+    @classmethod
+    def _get_clinical_notes(cls, sugg_type: str) -> str:
         """Get clinical notes for suggestibility type."""
         notes = {
             "Pure Physical": (
@@ -306,27 +733,21 @@ def get_answer_breakdown(
     Get detailed breakdown of answers by category.
     
     Returns analysis showing which physical/emotional indicators
-    the client answered yes/no to.
+    the client answered yes/no to. Question text comes from the shared
+    per-version catalogue cache rather than a query per call.
     """
     physical_yes = []
     physical_no = []
     emotional_yes = []
     emotional_no = []
     
-    # Get questions from database
-    query = text("""
-        SELECT question_number, question_text, category
-        FROM questionnaire_questions
-        WHERE questionnaire_version_id = :version_id
-        ORDER BY question_number
-    """)
-    
-    questions = db.execute(
-        query,
-        {"version_id": questionnaire_version_id}
-    ).fetchall()
+    # Get questions from the version catalogue
+    catalogue = get_question_catalogue(db, questionnaire_version_id)
     
-    for q_num, q_text, category in questions:
+    for question in catalogue.questions:
+        q_num = question.question_number
+        q_text = question.question_text
+        category = question.category
         answered_yes = answers.get(q_num, False)
         
         if category == 'physical':